@@ -20,15 +20,21 @@ from space_based_telescope_image_generator.objects.astral_objects.astral_object
 )
 from space_based_telescope_image_generator.utils.configuration import MainConfig
 from space_based_telescope_image_generator.utils.constants import (
+    EARTH_TEXTURE_LONGITUDE_OFFSET_DEG,
     earth_radius,
     atmosphere_radius,
 )
 
 
 class Earth(AstralObject):
-    def __init__(self) -> None:
-        """Constructor for BasicEarth."""
+    def __init__(self, rotation_deg: float = 0.0) -> None:
+        """Constructor for BasicEarth.
+
+        Args:
+            rotation_deg (float): Earth rotation angle (GMST) [deg], between the vernal equinox and Greenwich.
+        """
         super().__init__()
+        self.rotation_deg = rotation_deg
         # Combine Earth and Clouds into a single model
         self.earth_model = self.get_povray_object()
 
@@ -86,6 +92,22 @@ class Earth(AstralObject):
             Interior(rayleigh_media),
         )
 
+    def _orientation(self) -> list:
+        """POV-Ray transformations orienting the textured spheres in the equatorial scene frame.
+
+        The spherical image maps have their poles along y, they are first turned so that the north pole is along
+        z, then rotated about the pole by the Earth rotation angle.
+
+        Returns:
+            list: Transformation arguments.
+        """
+        return [
+            "rotate",
+            [90, 0, 0],
+            "rotate",
+            [0, 0, self.rotation_deg + EARTH_TEXTURE_LONGITUDE_OFFSET_DEG],
+        ]
+
     def _create_earth(self) -> Object:
         """Create and return the Earth object.
 
@@ -119,9 +141,7 @@ class Earth(AstralObject):
             Finish("diffuse", 0.8, "ambient", 0, "specular", 0.2, "roughness", 0.05),
             earth_normal,
         )
-        return Object(
-            Sphere([0, 0, 0], earth_radius), earth_texture, "rotate", [0, 25, 0]
-        )
+        return Object(Sphere([0, 0, 0], earth_radius), earth_texture, *self._orientation())
 
     def _create_clouds(self) -> Object:
         """Create and return the Clouds object.
@@ -146,7 +166,9 @@ class Earth(AstralObject):
         clouds_texture = Texture(
             clouds_pigment, Finish("diffuse", 0.7, "ambient", 0.0, "specular", 0.2)
         )
-        return Object(Sphere([0, 0, 0], earth_radius + 10), clouds_texture, "hollow")
+        return Object(
+            Sphere([0, 0, 0], earth_radius + 10), clouds_texture, "hollow", *self._orientation()
+        )
 
     def get_povray_object(self) -> Union:
         """Return an Earth Povray Object.
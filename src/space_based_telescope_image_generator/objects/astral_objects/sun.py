@@ -1,13 +1,14 @@
 """Definition of Sun lightsource."""
 
+import numpy as np
 from vapory import LightSource
 from space_based_telescope_image_generator.objects.astral_objects.astral_object import (
     AstralObject,
 )
+from space_based_telescope_image_generator.processings.ephemeris import (
+    sun_direction_from_longitude,
+)
 from space_based_telescope_image_generator.utils.constants import OBLIQUITY, earth_sun_distance
-import math as m
-import datetime
-
 
 
 class Sun(AstralObject):
@@ -25,33 +26,32 @@ class Sun(AstralObject):
         """
         super().__init__()
         self.illumination_angle_deg = illumination_angle_deg % 360
+        self.direction: list[float] | None = None  # Direction given by the ephemeris, if any
         self.sun = self.get_povray_object()
 
+    def set_direction(self, direction: list[float] | None) -> None:
+        """Set the Sun direction, e.g. from the ephemeris of the simulation clock.
+
+        Args:
+            direction (list[float] | None): Unit vector in the scene frame, None to use the illumination angle.
+        """
+        self.direction = direction
+
     def get_povray_object(
         self,
-    ) -> LightSource:  # First dummy modelization. TODO: Change (IN PROGRESS)
-        """Retrieve the povray object."""
-        ref = datetime.datetime(
-            2025, 3, 10, 9, 1, 0
-        )  # Datetime Vernal equinox of 2025 UTC
-        date = datetime.datetime(
-            2025, 3, 10, 9, 1, 0
-        )  # TODO: Iterate it so that it takes the date of the simulation
-
-        # Get the difference in seconds
-        seconds_difference = (
-            date - ref
-        ).total_seconds()  # [s] Difference between reference date and current date
-        angle = (
-            2 * m.pi * seconds_difference / 86164
-        )  # [rad] Angle between ECI and ECEF reference frames
+    ) -> LightSource:
+        """Retrieve the povray object.
 
+        Without direction from the ephemeris, the illumination angle is the Sun ecliptic longitude.
+        """
+        if self.direction is not None:
+            direction = np.asarray(self.direction, dtype=float)
+        else:
+            direction = sun_direction_from_longitude(
+                np.radians(self.illumination_angle_deg), abs(OBLIQUITY)
+            )
         return LightSource(
-            [
-                earth_sun_distance * m.cos(angle),
-                earth_sun_distance * m.cos(OBLIQUITY) * m.sin(angle),
-                earth_sun_distance * m.sin(OBLIQUITY) * m.sin(angle),
-            ],
+            (earth_sun_distance * direction).tolist(),
             "color",
             [1, 1, 1],
         )
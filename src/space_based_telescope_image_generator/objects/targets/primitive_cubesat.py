@@ -1,12 +1,13 @@
 """Definition of a really primitive Cubesat."""
 
+import numpy as np
 from vapory import Texture, Pigment, Finish, Box, Union
 
 from space_based_telescope_image_generator.objects.targets.target_object import (
     TargetObject,
 )
 from space_based_telescope_image_generator.processings.attitude import AttitudeDynamicModel
-from space_based_telescope_image_generator.processings.propagation import KeplerianModel
+from space_based_telescope_image_generator.processings.propagation import OrbitalDynamicModel
 
 
 class PrimitiveCubesat(TargetObject):
@@ -16,7 +17,7 @@ class PrimitiveCubesat(TargetObject):
 
     def __init__(
         self,
-        kepler_dynamic_model: KeplerianModel,
+        kepler_dynamic_model: OrbitalDynamicModel,
         attitude_model: AttitudeDynamicModel,
         size: float = 0.0001,
         thickness: float = 0.00001,
@@ -24,12 +25,17 @@ class PrimitiveCubesat(TargetObject):
         """
         Constructeur de la classe PrimitiveCubesat.
 
-        :param kepler_dynamic_model: (KeplerianModel): Orbital Dynamic of the satellite.
+        :param kepler_dynamic_model: (OrbitalDynamicModel): Orbital Dynamic of the satellite.
         :param attitude_model: (AttitudeDynamicModel): Attitude dynamic of the satellite.
         :param size: Taille du CubeSat (cm).
         :param thickness: Épaisseur des faces du CubeSat (cm).
         """
-        super().__init__(kepler_dynamic_model, attitude_model, ["metals.inc", "textures.inc"])
+        super().__init__(
+            kepler_dynamic_model,
+            attitude_model,
+            ["metals.inc", "textures.inc"],
+            bounding_radius_km=np.sqrt(3) * size * 1e-5,
+        )
         self.size = size
         self.thickness = thickness
         self.cubesat_model = self.get_povray_object()
@@ -1,33 +1,110 @@
 """Define the rusty satellite."""
 
+import re
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from numpy.typing import NDArray
+
 from space_based_telescope_image_generator.objects.targets.target_object import (
     TargetObject,
 )
 from vapory import Object
 
 from space_based_telescope_image_generator.processings.attitude import AttitudeDynamicModel
-from space_based_telescope_image_generator.processings.propagation import KeplerianModel
+from space_based_telescope_image_generator.processings.propagation import OrbitalDynamicModel
 from space_based_telescope_image_generator.utils.configuration import MainConfig
 
+MODEL_SCALE_KM = 0.001  # The model is in meters
+_VECTOR_PATTERN = re.compile(r"<\s*([-+\d.eE]+)\s*,\s*([-+\d.eE]+)\s*,\s*([-+\d.eE]+)\s*>")
+
+
+@lru_cache(maxsize=4)
+def read_mesh_vertices(path: Path) -> NDArray:
+    """Read the vertices of the meshes of a POV-Ray include file.
+
+    The `vertex_vectors` of the mesh2 objects are read, or the vertices of the triangles of the mesh objects.
+
+    Args:
+        path (Path): Include file.
+
+    Returns:
+        NDArray: Vertices in the units of the file, shape (N, 3).
+    """
+    text = path.read_text(errors="replace")
+    blocks = re.findall(r"vertex_vectors\s*\{([^}]*)\}", text)
+    vectors = [vector for block in blocks for vector in _VECTOR_PATTERN.findall(block)]
+    if not blocks:
+        for kind, block in re.findall(r"\b(smooth_triangle|triangle)\s*\{([^}]*)\}", text):
+            # Smooth triangles alternate vertices and normals
+            vectors.extend(_VECTOR_PATTERN.findall(block)[:: 2 if kind == "smooth_triangle" else 1])
+    return np.array(vectors, dtype=float).reshape(-1, 3)
+
 
 class RustySatellite(TargetObject):
     """Define the Rusty Satellite."""
 
     def __init__(
         self,
-        kepler_dynamic_model: KeplerianModel,
+        kepler_dynamic_model: OrbitalDynamicModel,
         attitude_model: AttitudeDynamicModel,
     ) -> None:
         """
         Constructeur de la classe RustySatellite.
 
-            kepler_dynamic_model (KeplerianModel): Orbital Dynamic of the satellite.
+            kepler_dynamic_model (OrbitalDynamicModel): Orbital Dynamic of the satellite.
             attitude_model (AttitudeDynamicModel): Attitude dynamic of the satellite.
         """
         geom_file = f"/{MainConfig().path_management.models_path}/{MainConfig().online_resources.rusty_satellite_resources.model_name}/{MainConfig().online_resources.rusty_satellite_resources.geom_inc_file}"
         super().__init__(kepler_dynamic_model, attitude_model, [str(geom_file)])
         self.rusty_satellite = self.get_povray_object()
 
+        # Bounding sphere and bounding box corners of the model, if it is available locally
+        vertices = self.model_vertices()
+        self.has_geometry = len(vertices) > 0
+        if self.has_geometry:
+            self.bounding_radius_km = float(np.max(np.linalg.norm(vertices, axis=1)))
+            low, high = vertices.min(axis=0), vertices.max(axis=0)
+            self._keypoints = np.array(
+                [[x, y, z] for x in (low[0], high[0]) for y in (low[1], high[1]) for z in (low[2], high[2])]
+            )
+
+    @staticmethod
+    def model_path() -> Path:
+        """Local path of the include file of the model.
+
+        Returns:
+            Path: Include file, in the models folder of the home folder.
+        """
+        resources = MainConfig().online_resources.rusty_satellite_resources
+        return (
+            Path.home()
+            .joinpath(MainConfig().path_management.home_folder, MainConfig().path_management.models_path)
+            .joinpath(resources.model_name, resources.geom_inc_file)
+        )
+
+    def model_vertices(self) -> NDArray:
+        """Vertices of the model in the body frame.
+
+        Returns:
+            NDArray: Vertices [km], shape (N, 3), empty if the model is not available locally.
+        """
+        path = self.model_path()
+        if not path.exists():
+            return np.zeros((0, 3))
+        return MODEL_SCALE_KM * read_mesh_vertices(path)
+
+    def keypoints(self) -> NDArray:
+        """Corners of the bounding box of the model, used as 2D keypoints in the annotations.
+
+        Returns:
+            NDArray: Points in the body frame [km], shape (8, 3).
+        """
+        if not self.has_geometry:
+            raise ValueError(f"The model {self.model_path()} is not available, its keypoints are unknown.")
+        return self._keypoints
+
     def get_povray_object(self) -> Object:
         """Return povray object.
 
@@ -40,7 +117,7 @@ class RustySatellite(TargetObject):
         return rusty_sat.add_args(
             [
                 "scale",
-                0.001,  # Project scale in km, satelite uses meters
+                MODEL_SCALE_KM,  # Project scale in km, satelite uses meters
                 "rotate",
                 self.attitude,
                 "translate",
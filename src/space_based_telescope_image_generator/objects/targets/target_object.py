@@ -3,34 +3,56 @@
 from vapory import POVRayElement
 
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
+import numpy as np
+from numpy.typing import NDArray
 
 from space_based_telescope_image_generator.processings.attitude import AttitudeDynamicModel
-from space_based_telescope_image_generator.processings.propagation import KeplerianModel
+from space_based_telescope_image_generator.processings.frames import FrameStack
+from space_based_telescope_image_generator.processings.propagation import (
+    DEFAULT_CHUNK_SIZE,
+    OrbitalDynamicModel,
+)
+from space_based_telescope_image_generator.processings.quaternions import (
+    euler_to_quaternion,
+    quaternion_multiply,
+    quaternion_to_euler,
+)
 
 
 class TargetObject(ABC, POVRayElement):
-    """Base for targets."""
+    """Base for targets.
+
+    `has_geometry` tells whether the bounding radius and the keypoints are those of the model, which the
+    annotations require. Subclasses whose model may be missing override it, e.g. RustySatellite sets it from its
+    mesh file.
+    """
+
+    has_geometry: bool = True
 
     def __init__(
         self,
-        kepler_dynamic_model: KeplerianModel,
+        kepler_dynamic_model: OrbitalDynamicModel,
         attitude_model: AttitudeDynamicModel,
         additional_includes: list[str] = [],
+        bounding_radius_km: float = 0.005,
     ) -> None:
         """_summary_
 
         Args:
-            kepler_dynamic_model (KeplerianModel): Orbital Dynamic of the satellite.
+            kepler_dynamic_model (OrbitalDynamicModel): Orbital Dynamic of the satellite.
             attitude_model (AttitudeDynamicModel): Attitude dynamic of the satellite.
             additional_includes: list[str]: Important includes.
+            bounding_radius_km (float): Radius of a sphere enclosing the target, centred on its origin [km].
 
         """
         super().__init__()
         self.kepler_dynamic_model = kepler_dynamic_model
         self.position = kepler_dynamic_model.keplerian2cartesian()[0]
         self.attitude_model = attitude_model
-        self.attitude = attitude_model.init_pos
+        self.attitude_quaternion: NDArray = attitude_model.init_quaternion
         self.additional_includes = additional_includes
+        self.bounding_radius_km = bounding_radius_km
 
     def get_position(self) -> list[float]:
         """Retrieve object's position.
@@ -48,6 +70,16 @@ class TargetObject(ABC, POVRayElement):
         """
         return self.attitude
 
+    @property
+    def attitude(self) -> list[float]:
+        """POV-Ray rotation triplet [deg], computed from the attitude quaternion when serialised."""
+        return quaternion_to_euler(self.attitude_quaternion).tolist()
+
+    @attitude.setter
+    def attitude(self, rotation_deg: list[float]) -> None:
+        """Set the attitude from a POV-Ray rotation triplet [deg]."""
+        self.attitude_quaternion = euler_to_quaternion(np.asarray(rotation_deg, dtype=float))
+
     def propagate_position(
         self, propagation_time: float, dt_s: float
     ) -> list[tuple[float, float, float]]:
@@ -72,11 +104,95 @@ class TargetObject(ABC, POVRayElement):
             dt_s (float): Delta t between two steps.
 
         Returns:
-            list[tuple[float, float, float]]: Returns a list of attitudes [deg] in LVLH.
+            list[tuple[float, float, float]]: Returns a list of attitudes [deg] in the attitude model reference frame.
 
         """
         return self.attitude_model.propagate(propagation_time,dt_s)
 
+    def propagate_position_chunks(
+        self, propagation_time: float, dt_s: float, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[NDArray]:
+        """Propagate the orbite for an amount of time, yielding the positions by chunks.
+
+        Args:
+            propagation_time (float): Amount of seconds to propagate.
+            dt_s (float): Delta t between two steps.
+            chunk_size (int): Maximum number of steps per chunk.
+
+        Yields:
+            NDArray: Positions [km] in EME2000 of the chunk, shape (n, 3).
+        """
+        for positions, _ in self.kepler_dynamic_model.propagate_chunks(propagation_time, dt_s, chunk_size):
+            yield positions
+
+    def propagate_attitude_chunks(
+        self, propagation_time: float, dt_s: float, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[NDArray]:
+        """Propagate the attitude for an amount of time, yielding the attitudes by chunks.
+
+        Args:
+            propagation_time (float): Amount of seconds to propagate.
+            dt_s (float): Delta t between two steps.
+            chunk_size (int): Maximum number of steps per chunk.
+
+        Yields:
+            NDArray: Attitudes [deg] in the attitude model reference frame of the chunk, shape (n, 3).
+        """
+        return self.attitude_model.propagate_chunks(propagation_time, dt_s, chunk_size)
+
+    def propagate_attitude_quaternion_chunks(
+        self,
+        propagation_time: float,
+        dt_s: float,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        start_step: int = 0,
+    ) -> Iterator[NDArray]:
+        """Propagate the attitude for an amount of time, yielding the quaternions by chunks.
+
+        Args:
+            propagation_time (float): Amount of seconds to propagate.
+            dt_s (float): Delta t between two steps.
+            chunk_size (int): Maximum number of steps per chunk.
+            start_step (int): Index of the first step yielded, the previous steps being skipped.
+
+        Yields:
+            NDArray: Attitude quaternions (scalar first) of the chunk, shape (n, 4).
+        """
+        return self.attitude_model.propagate_quaternion_chunks(propagation_time, dt_s, chunk_size, start_step)
+
+    def keypoints(self) -> NDArray:
+        """Remarkable points of the target, used as 2D keypoints in the annotations.
+
+        By default the corners of the cube inscribed in the bounding sphere.
+
+        Returns:
+            NDArray: Points in the body frame [km], shape (K, 3).
+        """
+        half_side = self.bounding_radius_km / np.sqrt(3)
+        corners = np.array([[x, y, z] for x in (-1, 1) for y in (-1, 1) for z in (-1, 1)], dtype=float)
+        return half_side * corners
+
+    def scene_attitude_quaternions(
+        self, quaternions: NDArray, positions: NDArray, velocities: NDArray
+    ) -> NDArray:
+        """Express attitudes given in the attitude model reference frame in the scene frame.
+
+        Args:
+            quaternions (NDArray): Attitude quaternions (scalar first), shape (n, 4).
+            positions (NDArray): Target positions [km], shape (n, 3).
+            velocities (NDArray): Target velocities [km/s], shape (n, 3).
+
+        Returns:
+            NDArray: Body to scene quaternions (scalar first), shape (n, 4).
+        """
+        reference_frame = self.attitude_model.reference_frame
+        if reference_frame == "eci":
+            return quaternions
+        if reference_frame != "lvlh":
+            raise ValueError(f"Unsupported attitude reference frame {reference_frame}, use 'eci' or 'lvlh'.")
+        frames = FrameStack(chief_positions=positions, chief_velocities=velocities)
+        return quaternion_multiply(frames.quaternions("lvlh", "eci"), quaternions)
+
     @abstractmethod
     def get_povray_object(self):
         """Retrieve the povray object."""
@@ -1,12 +1,25 @@
 """Tracking Satellite, being the object used to capture images in orbit."""
 
 import math
+from collections.abc import Iterator
+import numpy as np
+from numpy.typing import NDArray
 from vapory import POVRayElement, Camera
 
 from space_based_telescope_image_generator.objects.targets.target_object import (
     TargetObject,
 )
-from space_based_telescope_image_generator.processings.propagation import KeplerianModel
+from space_based_telescope_image_generator.processings.pointing import (
+    CameraModel,
+    LVLHRollLaw,
+    RollLaw,
+    compute_pointing,
+)
+from space_based_telescope_image_generator.processings.propagation import (
+    DEFAULT_CHUNK_SIZE,
+    OrbitalDynamicModel,
+)
+from space_based_telescope_image_generator.processings.sensor import SensorModel
 
 
 class TrackingSatellite(POVRayElement):
@@ -14,23 +27,35 @@ class TrackingSatellite(POVRayElement):
 
     def __init__(
         self,
-        kepler_dynamic_model: KeplerianModel,
+        kepler_dynamic_model: OrbitalDynamicModel,
         fov: float = 60.0,
         image_width: int = 1920,
         image_height: int = 1080,
+        roll_law: RollLaw | None = None,
+        sensor: SensorModel | None = None,
     ) -> None:
         """Constructor.
 
         Args:
-            position (list[float]): Position vector in km.
+            kepler_dynamic_model (OrbitalDynamicModel): Orbital dynamic of the satellite.
+            fov (float): Horizontal field of view of the camera [deg].
+            image_width (int): Width of the rendered images [px].
+            image_height (int): Height of the rendered images [px].
+            roll_law (RollLaw | None): Roll law of the camera, the zenith is kept upwards by default.
+            sensor (SensorModel | None): Sensor applied to the rendered frames, raw frames if None.
         """
         self.additional_includes: list[str] = []
         self.kepler_dynamic_model = kepler_dynamic_model
-        self.position: list[float] = kepler_dynamic_model.keplerian2cartesian()[0]
+        self.position, self.velocity = (list(state) for state in kepler_dynamic_model.keplerian2cartesian())
         self.pointing: list[float] = [0, 0, 0]  # NADIR pointing by default
+        self.roll_law: RollLaw = LVLHRollLaw() if roll_law is None else roll_law
+        self.sky: list[float] | None = None  # Up vector of the camera, POV-Ray default if None
         self.fov: float = fov
         self.image_width = image_width
         self.image_height = image_height
+        if sensor is not None and sensor.fov_deg is None:
+            sensor = sensor.model_copy(update={"fov_deg": fov})
+        self.sensor = sensor
 
     def target_pointing(self, target_position: list[float]) -> list[float]:
         """Compute the Tracking Satellite's pointing.
@@ -41,7 +66,11 @@ class TrackingSatellite(POVRayElement):
         Returns:
             list[float]: Pointing.
         """
-        self.pointing = target_position
+        self.pointing = list(target_position)
+        pointing = compute_pointing(
+            np.array(self.position), np.array(self.velocity), np.array(self.pointing), roll_law=self.roll_law
+        )
+        self.sky = pointing.sky[0].tolist()
         return self.pointing
 
     def get_camera(self) -> Camera:
@@ -51,6 +80,20 @@ class TrackingSatellite(POVRayElement):
             Camera: Camera object representing the satellite.
 
         """
+        if self.sky is not None:
+            # The sky vector has to be given before look_at to be taken into account
+            return Camera(
+                "location",
+                self.position,
+                "sky",
+                self.sky,
+                "look_at",
+                self.pointing,
+                "angle",
+                self.fov,
+                "right",
+                "x*image_width/image_height",
+            )
         return Camera(
             "location",
             self.position,
@@ -62,6 +105,14 @@ class TrackingSatellite(POVRayElement):
             "x*image_width/image_height",
         )
 
+    def camera_model(self) -> CameraModel:
+        """Pinhole model of the camera.
+
+        Returns:
+            CameraModel: Camera model with the satellite field of view and resolution.
+        """
+        return CameraModel(self.fov, self.image_width, self.image_height)
+
     def compute_relative_distance(self, target: TargetObject) -> float:
         """Compute the distance with a target.
 
@@ -90,4 +141,20 @@ class TrackingSatellite(POVRayElement):
         Returns:
             list[tuple[float, float, float]]: Returns a list of positions [km] in EME2000.
         """
-        return self.kepler_dynamic_model.propagate(propagation_time, dt_s)[0]
\ No newline at end of file
+        return self.kepler_dynamic_model.propagate(propagation_time, dt_s)[0]
+
+    def propagate_position_chunks(
+        self, propagation_time: float, dt_s: float, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[NDArray]:
+        """Propagate the orbite for an amount of time, yielding the positions by chunks.
+
+        Args:
+            propagation_time (float): Amount of seconds to propagate.
+            dt_s (float): Delta t between two steps.
+            chunk_size (int): Maximum number of steps per chunk.
+
+        Yields:
+            NDArray: Positions [km] in EME2000 of the chunk, shape (n, 3).
+        """
+        for positions, _ in self.kepler_dynamic_model.propagate_chunks(propagation_time, dt_s, chunk_size):
+            yield positions
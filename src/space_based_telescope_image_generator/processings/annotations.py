@@ -0,0 +1,140 @@
+"""Ground truth labels of the rendered frames, computed analytically from the known geometry.
+
+Every label comes from the satellite and target states, the camera pointing and the camera model, for a whole
+sequence in one pass, without any extra rendering. The labels are stored as a columnar file (a NumPy `.npz`
+archive holding one array per column, the first axis being the frame index) next to the frames.
+"""
+
+from pathlib import Path
+
+import numpy as np
+from numpy.typing import NDArray
+
+from space_based_telescope_image_generator.processings.events import line_of_sight_clearance
+from space_based_telescope_image_generator.processings.frames import apply_inverse_rotation
+from space_based_telescope_image_generator.processings.pointing import CameraModel, CameraPointing
+from space_based_telescope_image_generator.processings.quaternions import (
+    matrix_to_quaternion,
+    quaternion_conjugate,
+    quaternion_multiply,
+    quaternion_to_matrix,
+)
+
+ANNOTATIONS_FILE_NAME = "annotations.npz"
+
+
+def compute_annotations(
+    sat_positions: NDArray,
+    target_positions: NDArray,
+    target_quaternions: NDArray,
+    pointing: CameraPointing,
+    camera: CameraModel,
+    keypoints_body: NDArray,
+    bounding_radius_km: float,
+) -> dict[str, NDArray]:
+    """Compute the labels of a sequence of frames.
+
+    Image coordinates are in pixels, u towards the right and v downwards, the top left corner of the image being
+    (0, 0).
+
+    Args:
+        sat_positions (NDArray): Satellite positions [km], shape (N, 3).
+        target_positions (NDArray): Target positions [km], shape (N, 3).
+        target_quaternions (NDArray): Target body to scene quaternions (scalar first), shape (N, 4).
+        pointing (CameraPointing): Camera pointing of the frames.
+        camera (CameraModel): Camera model.
+        keypoints_body (NDArray): Target keypoints in the body frame [km], shape (K, 3).
+        bounding_radius_km (float): Radius of the target bounding sphere [km].
+
+    Returns:
+        dict[str, NDArray]: Columns, shape (N, ...):
+            - centroid_px (N, 2): projection of the target origin,
+            - range_km (N,): distance between the camera and the target origin,
+            - relative_quaternion (N, 4): target body to camera frame quaternion (camera x right, y up,
+              z boresight),
+            - keypoints_px (N, K, 2) and keypoints_visible (N, K): projected keypoints, visible when they are in
+              front of the camera and inside the image (self-occlusions are not checked),
+            - bbox_px (N, 4): u_min, v_min, u_max, v_max of the projected keypoints (of the bounding sphere
+              without keypoints), clipped to the image,
+            - in_image (N,): the bounding box is not empty,
+            - earth_occluded (N,): the Earth is between the camera and the target.
+    """
+    keypoints_body = np.asarray(keypoints_body, dtype=float).reshape(-1, 3)
+    camera_to_scene = pointing.rotation  # (N, 3, 3)
+    target_rotation = quaternion_to_matrix(target_quaternions)  # (N, 3, 3)
+
+    relative_position = target_positions - sat_positions
+    centre_camera = apply_inverse_rotation(camera_to_scene, relative_position)
+    u, v, _ = camera.image_coordinates(centre_camera)
+    range_km = np.linalg.norm(relative_position, axis=-1)
+
+    # Keypoints: body frame -> scene -> camera, for every frame at once
+    keypoints_scene = target_positions[:, None] + np.einsum("nij,kj->nki", target_rotation, keypoints_body)
+    keypoints_camera = np.einsum("nji,nkj->nki", camera_to_scene, keypoints_scene - sat_positions[:, None])
+    keypoints_u, keypoints_v, in_front = camera.image_coordinates(keypoints_camera)
+    keypoints_visible = (
+        in_front
+        & (keypoints_u >= 0)
+        & (keypoints_u < camera.width)
+        & (keypoints_v >= 0)
+        & (keypoints_v < camera.height)
+    )
+
+    # Bounding box of the projected keypoints, or of the bounding sphere extremes for targets without keypoints
+    if len(keypoints_body):
+        all_u, all_v, all_in_front = keypoints_u, keypoints_v, in_front
+    else:
+        offsets = bounding_radius_km * np.array([[1, 0, 0], [-1, 0, 0], [0, 1, 0], [0, -1, 0]], dtype=float)
+        all_u, all_v, all_in_front = camera.image_coordinates(centre_camera[:, None] + offsets)
+    u_min = np.clip(np.min(np.where(all_in_front, all_u, np.inf), axis=1), 0, camera.width)
+    u_max = np.clip(np.max(np.where(all_in_front, all_u, -np.inf), axis=1), 0, camera.width)
+    v_min = np.clip(np.min(np.where(all_in_front, all_v, np.inf), axis=1), 0, camera.height)
+    v_max = np.clip(np.max(np.where(all_in_front, all_v, -np.inf), axis=1), 0, camera.height)
+
+    return {
+        "centroid_px": np.stack((u, v), axis=-1),
+        "range_km": range_km,
+        "relative_quaternion": quaternion_multiply(
+            quaternion_conjugate(matrix_to_quaternion(camera_to_scene)), target_quaternions
+        ),
+        "keypoints_px": np.stack((keypoints_u, keypoints_v), axis=-1),
+        "keypoints_visible": keypoints_visible,
+        "bbox_px": np.stack((u_min, v_min, u_max, v_max), axis=-1),
+        "in_image": (u_max > u_min) & (v_max > v_min),
+        "earth_occluded": line_of_sight_clearance(sat_positions, target_positions) < 0,
+    }
+
+
+def write_annotations(path: Path, columns: dict[str, NDArray]) -> Path:
+    """Write the labels as a columnar file.
+
+    Args:
+        path (Path): Output file, or folder in which ANNOTATIONS_FILE_NAME is written.
+        columns (dict[str, NDArray]): Columns, all of the same length.
+
+    Returns:
+        Path: Written file.
+    """
+    lengths = {len(column) for column in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError("All the annotation columns must have the same length.")
+    if path.is_dir():
+        path = path.joinpath(ANNOTATIONS_FILE_NAME)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(path, **columns)
+    return path
+
+
+def read_annotations(path: Path) -> dict[str, NDArray]:
+    """Read a columnar labels file.
+
+    Args:
+        path (Path): Annotations file, or folder containing ANNOTATIONS_FILE_NAME.
+
+    Returns:
+        dict[str, NDArray]: Columns.
+    """
+    if path.is_dir():
+        path = path.joinpath(ANNOTATIONS_FILE_NAME)
+    with np.load(path) as archive:
+        return {name: archive[name] for name in archive.files}
@@ -0,0 +1,320 @@
+"""Asynchronous rendering, for applications running an asyncio event loop.
+
+POV-Ray is run with `asyncio.create_subprocess_exec`, the image being read from its output pipe (uncompressed PPM),
+so that the event loop is never blocked while a frame is traced. The number of POV-Ray processes running at once
+is limited by a semaphore, or by the CPU slots of a CpuAllocation (render threads and pinning), and optionally by a
+memory budget (see memory). A cancelled or timed out render kills its POV-Ray process and removes its temporary
+files.
+
+The local POV-Ray binary of the vapory configuration is used. The scenes are written for the Docker image, where the
+resources folder is mounted as /resources: the paths are rewritten to the local resources folder, which is also
+given as a library path.
+"""
+
+import asyncio
+import tempfile
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import nullcontext
+from pathlib import Path
+
+import numpy as np
+from numpy.typing import NDArray
+from PIL import Image
+from vapory.config import POVRAY_BINARY
+
+from space_based_telescope_image_generator.processings.cpu_allocation import CpuAllocation, set_affinity
+from space_based_telescope_image_generator.processings.memory import (
+    MemoryBudget,
+    MemoryEstimator,
+    local_povstring,
+    peak_rss_bytes,
+)
+from space_based_telescope_image_generator.processings.scene_manager import SceneManager
+
+
+def ppm_to_array(buffer: bytes) -> NDArray:
+    """Decode a binary PPM (P6) image.
+
+    Args:
+        buffer (bytes): PPM file content, 8 or 16 bits per channel.
+
+    Returns:
+        NDArray: Image, shape (H, W, 3), uint8 or uint16.
+    """
+    # Header: magic number, width, height and maximum value, separated by whitespaces (comments are allowed)
+    fields: list[bytes] = []
+    position = 0
+    while len(fields) < 4:
+        while buffer[position:position + 1].isspace():
+            position += 1
+        if buffer[position:position + 1] == b"#":
+            position = buffer.index(b"\n", position) + 1
+            continue
+        start = position
+        while not buffer[position:position + 1].isspace():
+            position += 1
+        fields.append(buffer[start:position])
+    if fields[0] != b"P6":
+        raise ValueError("Only binary PPM (P6) images are supported.")
+    width, height, max_value = (int(field) for field in fields[1:])
+    dtype = np.dtype(">u2") if max_value > 255 else np.dtype(np.uint8)
+    # A single whitespace separates the header from the pixels
+    pixels = np.frombuffer(buffer, dtype=dtype, count=width * height * 3, offset=position + 1)
+    return pixels.reshape(height, width, 3).astype(dtype.newbyteorder("="))
+
+
+class AsyncRenderer:
+    """Render the images of a scene without blocking the event loop."""
+
+    def __init__(
+        self,
+        scene_manager: SceneManager,
+        max_concurrency: int = 2,
+        frame_timeout_s: float | None = None,
+        povray_binary: str = POVRAY_BINARY,
+        memory_budget: MemoryBudget | None = None,
+        memory_estimator: MemoryEstimator | None = None,
+        cpu_allocation: CpuAllocation | None = None,
+    ) -> None:
+        """Class constructor.
+
+        Args:
+            scene_manager (SceneManager): Scene to be rendered.
+            max_concurrency (int): Maximum number of POV-Ray processes running at once.
+            frame_timeout_s (float | None): Maximum time to render a frame (s), unlimited if None.
+            povray_binary (str): POV-Ray executable.
+            memory_budget (MemoryBudget | None): If given, a render only starts while the memory reserved by the
+                running renders stays under the budget. Can be shared by several renderers.
+            memory_estimator (MemoryEstimator | None): Peak memory of the renders, learnt from the measured peaks
+                of the POV-Ray processes. A new estimator is created if None.
+            cpu_allocation (CpuAllocation | None): If given, one render runs per CPU slot, with the slot number of
+                render threads (+WT) and pinned to its CPUs, max_concurrency being ignored. POV-Ray uses all the
+                CPUs otherwise.
+        """
+        if max_concurrency < 1:
+            raise ValueError("At least one render must be allowed at once.")
+        self.scene_manager = scene_manager
+        self.cpu_allocation = cpu_allocation
+        self._cpu_slots = None if cpu_allocation is None else cpu_allocation.slots()
+        self.max_concurrency = max_concurrency if self._cpu_slots is None else len(self._cpu_slots)
+        self.frame_timeout_s = frame_timeout_s
+        self.povray_binary = povray_binary
+        self.memory_budget = memory_budget
+        self.memory_estimator = (
+            MemoryEstimator(SceneManager.resources_folder()) if memory_estimator is None else memory_estimator
+        )
+        self._semaphore: asyncio.Semaphore | None = None
+        self._free_slots: asyncio.Queue | None = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Semaphore limiting the POV-Ray processes, created in the running event loop."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    @property
+    def free_slots(self) -> asyncio.Queue:
+        """CPU slots not used by a running render, created in the running event loop."""
+        if self._free_slots is None:
+            self._free_slots = asyncio.Queue()
+            for slot in self._cpu_slots or [()] * self.max_concurrency:
+                self._free_slots.put_nowait(slot)
+        return self._free_slots
+
+    async def render_povstring(self, povstring: str, quality: int | None = None) -> NDArray:
+        """Render a POV-Ray scene description.
+
+        Args:
+            povstring (str): Scene description.
+            quality (int | None): POV-Ray quality (+Q), the POV-Ray default if None.
+
+        Returns:
+            NDArray: Rendered image, shape (H, W, 3), uint8.
+        """
+        satellite = self.scene_manager.satellite
+        profile, reserved_bytes = self.memory_estimator.estimate(
+            povstring, satellite.image_width, satellite.image_height
+        )
+        reservation = nullcontext() if self.memory_budget is None else self.memory_budget.reserve(reserved_bytes)
+        async with self.semaphore, reservation:
+            cpu_slot = await self.free_slots.get()
+            try:
+                return await self._run_povray(povstring, quality, profile, cpu_slot)
+            finally:
+                self.free_slots.put_nowait(cpu_slot)
+
+    async def _run_povray(
+        self, povstring: str, quality: int | None, profile: str, cpu_slot: tuple[int, ...]
+    ) -> NDArray:
+        """Run POV-Ray on a scene description, once admitted.
+
+        Args:
+            povstring (str): Scene description.
+            quality (int | None): POV-Ray quality (+Q), the POV-Ray default if None.
+            profile (str): Memory profile of the render.
+            cpu_slot (tuple[int, ...]): CPUs the process is pinned to, not pinned if empty.
+
+        Returns:
+            NDArray: Rendered image, shape (H, W, 3), uint8.
+        """
+        satellite = self.scene_manager.satellite
+        with tempfile.TemporaryDirectory(prefix="sbtig_") as temporary_folder:
+            pov_path = Path(temporary_folder).joinpath("scene.pov")
+            pov_path.write_text(local_povstring(povstring, SceneManager.resources_folder()))
+            command = [
+                self.povray_binary,
+                f"+I{pov_path}",
+                f"+W{satellite.image_width}",
+                f"+H{satellite.image_height}",
+                f"+L{SceneManager.resources_folder()}",
+                "-D",
+                "Output_File_Type=P",
+                "+O-",
+            ]
+            if quality is not None:
+                command.append(f"+Q{quality}")
+            if self.cpu_allocation is not None:
+                command.append(f"+WT{self.cpu_allocation.threads_per_render}")
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=temporary_folder,
+                preexec_fn=(lambda: set_affinity(cpu_slot)) if cpu_slot else None,
+            )
+            peaks: list[float] = []
+            monitor = asyncio.create_task(self._monitor_memory(process.pid, peaks))
+            try:
+                output, error = await asyncio.wait_for(process.communicate(), self.frame_timeout_s)
+            except BaseException:
+                # Cancellation or timeout: the process must not outlive its render
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                raise
+            finally:
+                monitor.cancel()
+            if peaks:
+                self.memory_estimator.observe(profile, max(peaks))
+        if process.returncode:
+            raise OSError(f"POV-Ray rendering failed with the following error: {error.decode(errors='replace')}")
+        return SceneManager.to_rgb8(ppm_to_array(output))
+
+    @staticmethod
+    async def _monitor_memory(pid: int, peaks: list[float], period_s: float = 0.1) -> None:
+        """Sample the peak resident memory of a process until cancelled.
+
+        Args:
+            pid (int): Process id.
+            peaks (list[float]): Measured peaks [bytes], appended to.
+            period_s (float): Time between two samples.
+        """
+        while True:
+            peak = peak_rss_bytes(pid)
+            if peak is not None:
+                peaks.append(peak)
+            await asyncio.sleep(period_s)
+
+    async def render_image(self, output_image_path: Path | None = None) -> NDArray:
+        """Render the image of the current state of the scene.
+
+        Args:
+            output_image_path (Path | None): Optional sink, the image is also saved there (PNG) if given.
+
+        Returns:
+            NDArray: Rendered image, shape (H, W, 3), uint8.
+        """
+        # The scene description is taken now, the objects can be modified while the frame is traced
+        return await self._render_to_sink(str(self.scene_manager.build_scene()), output_image_path)
+
+    async def _render_to_sink(self, povstring: str, output_image_path: Path | None) -> NDArray:
+        """Render a scene description and save the image if asked.
+
+        Args:
+            povstring (str): Scene description.
+            output_image_path (Path | None): Optional sink of the image (PNG).
+
+        Returns:
+            NDArray: Rendered image, shape (H, W, 3), uint8.
+        """
+        image = await self.render_povstring(povstring)
+        if output_image_path is not None:
+            output_image_path.parent.mkdir(parents=True, exist_ok=True)
+            Image.fromarray(image).save(output_image_path)
+        return image
+
+    async def render_video(
+        self, framerate: int, duration_s: float, output_folder: Path | None = None
+    ) -> AsyncIterator[tuple[int, NDArray]]:
+        """Render the frames of a sequence, up to max_concurrency frames being traced at once.
+
+        Every frame is traced (no keyframe scheduling). Leaving the iteration early cancels the frames in progress.
+
+        Args:
+            framerate (int): Image per seconds.
+            duration_s (float): Total video duration.
+            output_folder (Path | None): If given, the frames are also saved in its "steps" folder, with the same
+                names as in `render_video`.
+
+        Yields:
+            tuple[int, NDArray]: Frame index and image (H, W, 3), uint8, in order.
+        """
+        delta_t = 1 / framerate
+        timeline = self.scene_manager.clock.timeline(int(duration_s / delta_t), delta_t)
+        in_progress: deque[tuple[int, asyncio.Task]] = deque()
+        try:
+            for step_i, view in enumerate(self.scene_manager.frame_views(framerate, duration_s)):
+                self.scene_manager.set_frame_state(view, timeline, step_i)
+                image_path = (
+                    None if output_folder is None else output_folder.joinpath("steps", f"image_{step_i + 1}.png")
+                )
+                povstring = str(self.scene_manager.build_scene())
+                in_progress.append((step_i, asyncio.create_task(self._render_to_sink(povstring, image_path))))
+                # A few frames are prepared ahead, the semaphore limiting the running processes
+                while len(in_progress) > self.max_concurrency:
+                    index, task = in_progress.popleft()
+                    yield index, await task
+            while in_progress:
+                index, task = in_progress.popleft()
+                yield index, await task
+        finally:
+            for _, task in in_progress:
+                task.cancel()
+            await asyncio.gather(*(task for _, task in in_progress), return_exceptions=True)
+
+
+async def calibrate(
+    scene_manager: SceneManager,
+    n_frames: int = 16,
+    splits: list[int] | None = None,
+    pinning: str | None = "core",
+    **renderer_options: object,
+) -> dict[int, float]:
+    """Measure the frame rate of the CPU splits on the current host, rendering the current scene.
+
+    Args:
+        scene_manager (SceneManager): Scene used for the measure, representative of the renders to come.
+        n_frames (int): Frames rendered per split.
+        splits (list[int] | None): Threads per render to be measured, every divisor of the CPU count if None.
+        pinning (str | None): Pinning of the renders (see CpuAllocation).
+        **renderer_options (object): Other options of the AsyncRenderer (POV-Ray binary, timeout...).
+
+    Returns:
+        dict[int, float]: Frames per second for each number of threads per render.
+    """
+    if splits is None:
+        splits = CpuAllocation.candidate_splits(CpuAllocation(pinning=pinning).n_cpus)
+    frame_rates: dict[int, float] = {}
+    povstring = str(scene_manager.build_scene())
+    for threads_per_render in splits:
+        renderer = AsyncRenderer(
+            scene_manager, cpu_allocation=CpuAllocation(threads_per_render, pinning), **renderer_options
+        )
+        start = time.perf_counter()
+        await asyncio.gather(*(renderer.render_povstring(povstring) for _ in range(n_frames)))
+        frame_rates[threads_per_render] = n_frames / (time.perf_counter() - start)
+        print(f"{threads_per_render} thread(s) per render: {frame_rates[threads_per_render]:.3f} frames/s")
+    return frame_rates
@@ -1,12 +1,58 @@
 """File with the definition of attitude computation."""
 
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+from pathlib import Path
 import numpy as np
 from numpy.typing import NDArray
 
+from space_based_telescope_image_generator.processings.propagation import DEFAULT_CHUNK_SIZE
+from space_based_telescope_image_generator.processings.quaternions import (
+    euler_to_quaternion,
+    propagate_body_rates,
+    quaternion_conjugate,
+    quaternion_continuity,
+    quaternion_log,
+    quaternion_multiply,
+    quaternion_to_euler,
+    rotation_vector_to_quaternion,
+    sample_quaternions,
+)
+
+
+def propagate_attitudes(
+        models: list["AttitudeDynamicModel"],
+        propagation_time: float,
+        dt_s: float,
+    )->NDArray:
+    """Propagate the attitude of several targets at once.
+
+    Args:
+        models (list[AttitudeDynamicModel]): Attitude dynamic of each target.
+        propagation_time (float): Amount of seconds to propagate.
+        dt_s (float): Delta t between two steps.
+
+    Returns:
+        NDArray: Attitude quaternions (scalar first), shape (K, N, 4).
+    """
+    initial_quaternions = np.stack([model.init_quaternion for model in models])
+    body_rates = np.stack(
+        [
+            np.asarray(model.angular_velocity_profile_maker(propagation_time, dt_s), dtype=float).reshape(-1, 3)
+            for model in models
+        ]
+    )
+    return propagate_body_rates(initial_quaternions, body_rates, dt_s)
+
 
 class AttitudeDynamicModel(ABC):
-    """Define how a target attitude will evolve."""
+    """Define how a target attitude will evolve.
+
+    The attitudes are expressed in `reference_frame`: "eci" (the scene frame) or "lvlh" (the LVLH frame of the
+    target itself, e.g. for a nadir pointing target).
+    """
+    reference_frame: str = "eci"
+
     def __init__(
             self,
             init_pos: tuple[float, float, float],
@@ -14,45 +60,132 @@ class AttitudeDynamicModel(ABC):
         """Class Constructor."""
         self.init_pos = init_pos
 
+    @property
+    def init_quaternion(self) -> NDArray:
+        """Initial attitude as a quaternion (scalar first)."""
+        return euler_to_quaternion(np.asarray(self.init_pos, dtype=float))
+
     def propagate(
             self,
             propagation_time: float,
             dt_s: float
         )->list[tuple[float,float,float]]:
-        """_summary_
+        """Propagate the attitude for an amount of time.
 
         Args:
             propagation_time (float): Amount of seconds to propagate.
             dt_s (float): Delta t between two steps.
 
         Returns:
-            list[tuple[float,float,float]]: _description_
+            list[tuple[float,float,float]]: POV-Ray rotation triplets [deg] of each step.
         """
-        vel_profile = self.angular_velocity_profile_maker(propagation_time, dt_s)
-
         attitudes: list[tuple[float,float,float]] = []
-        last_pos = self.init_pos
-        for vel in vel_profile:
-            attitude_n = last_pos + np.array(vel)*dt_s
-            attitudes.append(
-                (
-                    attitude_n[0] % 360,
-                    attitude_n[1] % 360,
-                    attitude_n[2] % 360,
-                )
-            )
-            last_pos = np.array(attitudes[len(attitudes)-1])
+        for chunk in self.propagate_chunks(propagation_time, dt_s):
+            attitudes.extend(tuple(attitude) for attitude in chunk.tolist())  # type: ignore[misc]
         return attitudes
 
+    def propagate_chunks(
+            self,
+            propagation_time: float,
+            dt_s: float,
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+            start_step: int = 0,
+        )->Iterator[NDArray]:
+        """Propagate the attitude for an amount of time, yielding POV-Ray rotation triplets by chunks.
+
+        Args:
+            propagation_time (float): Amount of seconds to propagate.
+            dt_s (float): Delta t between two steps.
+            chunk_size (int): Maximum number of steps per chunk.
+            start_step (int): Index of the first step yielded, the previous steps being skipped.
+
+        Yields:
+            NDArray: Rotation triplets [deg] of the chunk, shape (n, 3).
+        """
+        for quaternions in self.propagate_quaternion_chunks(propagation_time, dt_s, chunk_size, start_step):
+            yield quaternion_to_euler(quaternions)
+
+    def propagate_quaternions(
+            self,
+            propagation_time: float,
+            dt_s: float
+        )->NDArray:
+        """Propagate the attitude for an amount of time.
+
+        Args:
+            propagation_time (float): Amount of seconds to propagate.
+            dt_s (float): Delta t between two steps.
+
+        Returns:
+            NDArray: Attitude quaternions (scalar first) of each step, shape (N, 4).
+        """
+        chunks = list(self.propagate_quaternion_chunks(propagation_time, dt_s))
+        return np.concatenate(chunks) if chunks else np.zeros((0, 4))
+
+    def propagate_quaternion_chunks(
+            self,
+            propagation_time: float,
+            dt_s: float,
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+            start_step: int = 0,
+        )->Iterator[NDArray]:
+        """Propagate the attitude for an amount of time, yielding quaternions by chunks.
+
+        The angular velocity profile gives body rates, held constant over each step. Every step is integrated in
+        closed form and the steps of a chunk are accumulated at once.
+
+        Args:
+            propagation_time (float): Amount of seconds to propagate.
+            dt_s (float): Delta t between two steps.
+            chunk_size (int): Maximum number of steps per chunk.
+            start_step (int): Index of the first step yielded, the previous steps are integrated without being
+                yielded.
+
+        Yields:
+            NDArray: Attitude quaternions (scalar first) of the chunk, shape (n, 4).
+        """
+        last_quaternion = self.init_quaternion
+        n_integrated = 0
+        for vel_chunk in self.angular_velocity_profile_chunks(propagation_time, dt_s, chunk_size):
+            quaternions = propagate_body_rates(last_quaternion, np.asarray(vel_chunk, dtype=float).reshape(-1, 3), dt_s)
+            last_quaternion = quaternions[-1]
+            n_integrated += len(quaternions)
+            if n_integrated > start_step:
+                yield quaternions[max(start_step - n_integrated + len(quaternions), 0):]
+
+    def angular_velocity_profile_chunks(
+            self,
+            propagation_time: float,
+            dt_s: float,
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+        )->Iterator[NDArray]:
+        """Yield the angular velocity profile by chunks.
+
+        This default implementation slices the output of angular_velocity_profile_maker, override it when the
+        profile can be generated incrementally.
+
+        Args:
+            propagation_time (float): Amount of seconds to propagate.
+            dt_s (float): Delta t between two steps.
+            chunk_size (int): Maximum number of steps per chunk.
+
+        Yields:
+            NDArray: Angular velocities [deg/s] of the chunk, shape (n, 3).
+        """
+        vel_profile = self.angular_velocity_profile_maker(propagation_time, dt_s)
+        for start in range(0, len(vel_profile), chunk_size):
+            yield np.array(vel_profile[start:start + chunk_size], dtype=float)
+
 
     @abstractmethod
     def angular_velocity_profile_maker(
             self,
             propagation_time: float,
             dt_s: float
-        )->list[tuple[float,float,float]]:
+        )->list[tuple[float,float,float]] | NDArray:
         """Abstract method used to define an angular velocity profile that will be used for the computation.
 
+        The angular velocities are body rates [deg/s] about the target own axes.
         The objective of this abstract method is to be able to define easily an angular velocity profile depending
         on the scenario. You might want to modelize constant slew or slew correction profile, etc... just implement
         this method in a child class. You shouldn't have to modify the propagate method.
@@ -67,7 +200,10 @@ class AttitudeDynamicModel(ABC):
         """
 
 class ConstantSlewAttitudeModel(AttitudeDynamicModel):
-    """Attitude Dynamic in case of constant slew on all axis."""
+    """Attitude Dynamic in case of constant slew on all axis.
+
+    The body rate is the same on each axis, the target spins about its (1, 1, 1) axis.
+    """
     def __init__(
             self,
             init_pos: tuple[float, float, float],
@@ -81,24 +217,279 @@ class ConstantSlewAttitudeModel(AttitudeDynamicModel):
             self,
             propagation_time: float,
             dt_s: float
-        )->list[tuple[float,float,float]]:
-        """In this case, we define a list of angular speed vector with the same constant value in all axis. 
+        )->list[tuple[float,float,float]] | NDArray:
+        """In this case, the angular speed vector has the same constant value on all axis.
 
         Args:
             propagation_time (float): Amount of seconds to propagate.
             dt_s (float): Delta t between two steps.
 
         Returns:
-            list[tuple[float,float,float]]: list of np.array containing angular velocities for each axis.
+            list[tuple[float,float,float]] | NDArray: Array (N, 3) containing angular velocities for each axis.
+
+        """
+        return np.full((int(propagation_time / dt_s), 3), self.slew_deg_s, dtype=float)
+
+    def angular_velocity_profile_chunks(
+            self,
+            propagation_time: float,
+            dt_s: float,
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+        )->Iterator[NDArray]:
+        """Yield the constant angular velocity profile by chunks, without building the full profile.
+
+        Args:
+            propagation_time (float): Amount of seconds to propagate.
+            dt_s (float): Delta t between two steps.
+            chunk_size (int): Maximum number of steps per chunk.
+
+        Yields:
+            NDArray: Angular velocities [deg/s] of the chunk, shape (n, 3).
+        """
+        n_steps = int(propagation_time / dt_s)
+        for start in range(0, n_steps, chunk_size):
+            yield np.full((min(chunk_size, n_steps - start), 3), self.slew_deg_s, dtype=float)
+
+    def propagate_quaternion_chunks(
+            self,
+            propagation_time: float,
+            dt_s: float,
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+            start_step: int = 0,
+        )->Iterator[NDArray]:
+        """Propagate the constant slew in closed form, yielding quaternions by chunks.
+
+        Args:
+            propagation_time (float): Amount of seconds to propagate.
+            dt_s (float): Delta t between two steps.
+            chunk_size (int): Maximum number of steps per chunk.
+            start_step (int): Index of the first step yielded, the attitude starting at its time.
+
+        Yields:
+            NDArray: Attitude quaternions (scalar first) of the chunk, shape (n, 4).
+        """
+        rate = np.radians(np.full(3, self.slew_deg_s))
+        n_steps = int(propagation_time / dt_s)
+        for start in range(start_step, n_steps, chunk_size):
+            times = np.arange(start + 1, min(start + chunk_size, n_steps) + 1) * dt_s
+            yield quaternion_multiply(self.init_quaternion, rotation_vector_to_quaternion(times[:, None] * rate))
+
+
+class SampledAttitudeModel(AttitudeDynamicModel):
+    """Attitude known at any time, sampled directly at the frame times instead of being integrated."""
+    def __init__(
+            self,
+            init_pos: tuple[float, float, float] | None = None,
+        )->None:
+        """Class Constructor.
+
+        Args:
+            init_pos (tuple[float, float, float] | None): Initial attitude, defaults to the attitude at t = 0.
+        """
+        if init_pos is None:
+            init_pos = tuple(quaternion_to_euler(self.attitude_at(np.zeros(1))[0]).tolist())  # type: ignore[assignment]
+        super().__init__(init_pos)  # type: ignore[arg-type]
+
+    @property
+    def init_quaternion(self) -> NDArray:
+        """Initial attitude as a quaternion (scalar first)."""
+        return self.attitude_at(np.zeros(1))[0]
+
+    @abstractmethod
+    def attitude_at(self, times: NDArray)->NDArray:
+        """Sample the attitude.
+
+        Args:
+            times (NDArray): Seconds since the start of the propagation, shape (T,).
+
+        Returns:
+            NDArray: Attitude quaternions (scalar first), shape (T, 4).
+        """
+
+    def propagate_quaternion_chunks(
+            self,
+            propagation_time: float,
+            dt_s: float,
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+            start_step: int = 0,
+        )->Iterator[NDArray]:
+        """Sample the attitude for an amount of time, yielding quaternions by chunks.
+
+        Args:
+            propagation_time (float): Amount of seconds to propagate.
+            dt_s (float): Delta t between two steps.
+            chunk_size (int): Maximum number of steps per chunk.
+            start_step (int): Index of the first step yielded, the attitude starting at its time.
+
+        Yields:
+            NDArray: Attitude quaternions (scalar first) of the chunk, shape (n, 4).
+        """
+        n_steps = int(propagation_time / dt_s)
+        for start in range(start_step, n_steps, chunk_size):
+            yield self.attitude_at(np.arange(start + 1, min(start + chunk_size, n_steps) + 1) * dt_s)
+
+    def angular_velocity_profile_maker(
+            self,
+            propagation_time: float,
+            dt_s: float
+        )->list[tuple[float,float,float]] | NDArray:
+        """Mean body rates over each step, such that integrating them gives back the sampled attitudes.
+
+        Args:
+            propagation_time (float): Amount of seconds to propagate.
+            dt_s (float): Delta t between two steps.
+
+        Returns:
+            list[tuple[float,float,float]] | NDArray: Array (N, 3) containing angular velocities for each axis.
+        """
+        quaternions = quaternion_continuity(
+            self.attitude_at(np.arange(int(propagation_time / dt_s) + 1) * dt_s)
+        )
+        increments = quaternion_multiply(quaternion_conjugate(quaternions[:-1]), quaternions[1:])
+        return np.degrees(2 * quaternion_log(increments)) / dt_s
+
+
+class TabulatedAttitudeModel(SampledAttitudeModel):
+    """Attitude interpolated in a table of quaternions, e.g. attitude telemetry at irregular times."""
+    def __init__(
+            self,
+            times_s: NDArray,
+            quaternions: NDArray,
+            interpolation: str = "slerp",
+        )->None:
+        """Class Constructor.
 
+        Args:
+            times_s (NDArray): Table times, in seconds since the start of the propagation, shape (N,).
+            quaternions (NDArray): Table quaternions (scalar first), shape (N, 4).
+            interpolation (str): "slerp" or "squad".
+        """
+        times_s = np.asarray(times_s, dtype=float)
+        quaternions = np.asarray(quaternions, dtype=float)
+        if len(times_s) == 0 or quaternions.shape != (len(times_s), 4):
+            raise ValueError("The attitude table must contain one quaternion (w, x, y, z) per time.")
+        order = np.argsort(times_s, kind="stable")
+        if np.any(np.diff(times_s[order]) <= 0):
+            raise ValueError("The attitude table times must be unique.")
+        self.times_s = times_s[order]
+        self.quaternions = quaternions[order]
+        self.interpolation = interpolation
+        super().__init__()
+
+    @classmethod
+    def from_array(
+            cls,
+            table: NDArray,
+            epoch: float | None = None,
+            interpolation: str = "slerp",
+        )->"TabulatedAttitudeModel":
+        """Build the model from an array whose rows are (time, qw, qx, qy, qz).
+
+        Args:
+            table (NDArray): Attitude table, shape (N, 5).
+            epoch (float | None): Time of the start of the propagation, in the table time scale. Defaults to the
+                first time of the table.
+            interpolation (str): "slerp" or "squad".
+
+        Returns:
+            TabulatedAttitudeModel: Tabulated attitude model.
+        """
+        table = np.atleast_2d(np.asarray(table, dtype=float))
+        if table.shape[1] != 5:
+            raise ValueError("The attitude table must have 5 columns: time, qw, qx, qy, qz.")
+        epoch = float(table[:, 0].min()) if epoch is None else epoch
+        return cls(table[:, 0] - epoch, table[:, 1:], interpolation)
+
+    @classmethod
+    def from_csv(
+            cls,
+            path: Path,
+            epoch: float | None = None,
+            interpolation: str = "slerp",
+        )->"TabulatedAttitudeModel":
+        """Load a CSV attitude table with columns time, qw, qx, qy, qz. A header line is allowed.
+
+        Args:
+            path (Path): Path of the CSV file.
+            epoch (float | None): Time of the start of the propagation, in the table time scale. Defaults to the
+                first time of the table.
+            interpolation (str): "slerp" or "squad".
+
+        Returns:
+            TabulatedAttitudeModel: Tabulated attitude model.
+        """
+        table = np.atleast_2d(np.genfromtxt(path, delimiter=",", comments="#"))
+        return cls.from_array(table[~np.isnan(table).any(axis=1)], epoch, interpolation)
+
+    @classmethod
+    def from_npy(
+            cls,
+            path: Path,
+            epoch: float | None = None,
+            interpolation: str = "slerp",
+        )->"TabulatedAttitudeModel":
+        """Load a NPY attitude table of shape (N, 5), with columns time, qw, qx, qy, qz.
+
+        Args:
+            path (Path): Path of the NPY file.
+            epoch (float | None): Time of the start of the propagation, in the table time scale. Defaults to the
+                first time of the table.
+            interpolation (str): "slerp" or "squad".
+
+        Returns:
+            TabulatedAttitudeModel: Tabulated attitude model.
+        """
+        return cls.from_array(np.load(path), epoch, interpolation)
+
+    def attitude_at(self, times: NDArray)->NDArray:
+        """Interpolate the attitude table, the attitude is held outside of the table.
+
+        Args:
+            times (NDArray): Seconds since the start of the propagation, shape (T,).
+
+        Returns:
+            NDArray: Attitude quaternions (scalar first), shape (T, 4).
+        """
+        return sample_quaternions(self.times_s, self.quaternions, times, self.interpolation)
+
+
+class CallableAttitudeModel(SampledAttitudeModel):
+    """Attitude given by an analytic profile."""
+    def __init__(
+            self,
+            profile: Callable[[NDArray], NDArray],
+            table_step_s: float | None = None,
+            table_duration_s: float | None = None,
+            interpolation: str = "slerp",
+        )->None:
+        """Class Constructor.
+
+        Args:
+            profile (Callable[[NDArray], NDArray]): Vectorised function returning the attitude quaternions
+                (scalar first, shape (T, 4)) at times in seconds since the start of the propagation (shape (T,)).
+            table_step_s (float | None): If set, the profile is only evaluated every table_step_s seconds and
+                interpolated in between, for expensive profiles that are smooth at the frame scale.
+            table_duration_s (float | None): Duration covered by the table, required with table_step_s.
+            interpolation (str): "slerp" or "squad", used with table_step_s.
+        """
+        self.profile = profile
+        self._table: TabulatedAttitudeModel | None = None
+        if table_step_s is not None:
+            if table_duration_s is None:
+                raise ValueError("table_duration_s is required to tabulate the profile.")
+            times = np.arange(int(np.ceil(table_duration_s / table_step_s)) + 1) * table_step_s
+            self._table = TabulatedAttitudeModel(times, np.asarray(profile(times), dtype=float), interpolation)
+        super().__init__()
+
+    def attitude_at(self, times: NDArray)->NDArray:
+        """Evaluate the profile, or interpolate its table.
+
+        Args:
+            times (NDArray): Seconds since the start of the propagation, shape (T,).
+
+        Returns:
+            NDArray: Attitude quaternions (scalar first), shape (T, 4).
         """
-        vel_profile: list[tuple[float,float,float]] = []
-        for _ in range(int(propagation_time / dt_s)):
-            vel_profile.append(
-                [
-                    self.slew_deg_s,
-                    self.slew_deg_s,
-                    self.slew_deg_s,
-                ]
-            )
-        return vel_profile
\ No newline at end of file
+        if self._table is not None:
+            return self._table.attitude_at(times)
+        return np.asarray(self.profile(np.asarray(times, dtype=float)), dtype=float).reshape(-1, 4)
@@ -0,0 +1,288 @@
+"""Prediction of the render time of the jobs, to run the longest ones first.
+
+The render time of a frame varies by more than an order of magnitude across a dataset, mostly with the part of the
+image covered by the Earth and by the scattering media of its atmosphere (limb views), the apparent size of the
+target and the resolution. A CostModel predicts the render time of a frame from these features, computed from the
+scene geometry without rendering (a coarse grid of camera rays intersected with the Earth and atmosphere spheres):
+
+    time = c0 + Mpx * (c1 + c2 * earth_fraction + c3 * media * atmosphere_fraction) + c4 * target_Mpx
+
+The coefficients start from a coarse prior and are fitted online by recursive least squares from the measured render
+times, one set of coefficients per profile (e.g. target class) and a set shared by all the profiles, used for the
+profiles without measurements. The jobs are then run longest first: with workers taking the next job as soon as they
+are free, the jobs still running at the end are short ones and the workers finish together.
+"""
+
+import heapq
+from collections.abc import Hashable
+from typing import TypeVar
+
+import numpy as np
+from numpy.typing import NDArray
+from pydantic import BaseModel
+
+from space_based_telescope_image_generator.processings.frames import camera_rotation
+from space_based_telescope_image_generator.processings.pointing import CameraModel, RollLaw, compute_pointing
+from space_based_telescope_image_generator.processings.scene_manager import SceneManager
+from space_based_telescope_image_generator.utils.configuration import MainConfig
+from space_based_telescope_image_generator.utils.constants import atmosphere_radius, earth_radius
+
+# Coarse prior of the coefficients [s], only used to order the jobs before the first measurements
+PRIOR_COEFFICIENTS = (0.5, 2.0, 10.0, 60.0, 10.0)
+SHARED_PROFILE = "*"
+_FEATURE_GRID_WIDTH = 64  # Columns of the grid of camera rays used for the coverage fractions
+
+JobT = TypeVar("JobT", bound=Hashable)
+
+
+class RenderFeatures(BaseModel):
+    """Cheap features of a render, computed from the scene geometry."""
+
+    earth_fraction: float  # Fraction of the image covered by the Earth
+    atmosphere_fraction: float  # Fraction of the image covered by the atmosphere sphere (Earth and limb)
+    target_area_px: float  # Apparent area of the target bounding sphere [px]
+    media: bool  # Scattering media of the atmosphere modelled
+    pixels: int  # Image resolution [px]
+    profile: str = ""  # Profile of the render, e.g. target class
+    n_frames: int = 1  # Number of frames of the job
+
+    def regressors(self) -> NDArray:
+        """Regressors of the render time of a frame.
+
+        Returns:
+            NDArray: Constant, Mpx, Earth Mpx, media Mpx and target Mpx, shape (5,).
+        """
+        megapixels = self.pixels * 1e-6
+        return np.array(
+            [
+                1.0,
+                megapixels,
+                megapixels * self.earth_fraction,
+                megapixels * self.atmosphere_fraction * float(self.media),
+                min(self.target_area_px, self.pixels) * 1e-6,
+            ]
+        )
+
+
+def sphere_coverage(rays: NDArray, origin: NDArray, radius: float) -> float:
+    """Fraction of rays hitting a sphere centred on the origin of the scene.
+
+    Args:
+        rays (NDArray): Unit ray directions in the scene frame, shape (N, 3).
+        origin (NDArray): Origin of the rays [km], shape (3,).
+        radius (float): Sphere radius [km].
+
+    Returns:
+        float: Fraction of the rays hitting the sphere.
+    """
+    along = rays @ origin
+    miss_distance_sq = origin @ origin - along**2
+    inside = origin @ origin <= radius**2
+    hits = (miss_distance_sq <= radius**2) & ((along < 0) | inside)
+    return float(np.mean(hits))
+
+
+def _features(
+    position: NDArray,
+    camera_to_scene: NDArray,
+    target_position: NDArray,
+    camera: tuple[float, int, int],
+    bounding_radius_km: float,
+    *,
+    profile: str,
+    n_frames: int,
+) -> RenderFeatures:
+    """Features of a render from the camera position and orientation, the camera being (fov_deg, width, height)."""
+    fov_deg, image_width, image_height = camera
+    # Same field of view on a coarse grid of rays
+    grid_width = min(image_width, _FEATURE_GRID_WIDTH)
+    grid_height = max(1, round(image_height * grid_width / image_width))
+    rays = CameraModel(fov_deg, grid_width, grid_height).ray_directions.reshape(-1, 3) @ camera_to_scene.T
+
+    camera_model = CameraModel(fov_deg, image_width, image_height)
+    line_of_sight = camera_to_scene.T @ (target_position - position)
+    range_km = float(np.linalg.norm(line_of_sight))
+    u, v, in_front = camera_model.image_coordinates(line_of_sight)
+    target_area_px = 0.0
+    if in_front and 0 <= u < image_width and 0 <= v < image_height and range_km > 0:
+        target_area_px = float(np.pi * (camera_model.focal_px * bounding_radius_km / range_km) ** 2)
+
+    return RenderFeatures(
+        earth_fraction=sphere_coverage(rays, position, earth_radius),
+        atmosphere_fraction=sphere_coverage(rays, position, atmosphere_radius),
+        target_area_px=target_area_px,
+        media=MainConfig().resolution_configuration.modelize_scattering,
+        pixels=image_width * image_height,
+        profile=profile,
+        n_frames=n_frames,
+    )
+
+
+def geometry_features(
+    position: NDArray,
+    velocity: NDArray,
+    target_position: NDArray,
+    camera: tuple[float, int, int],
+    bounding_radius_km: float,
+    *,
+    roll_law: RollLaw | None = None,
+    profile: str = "",
+    n_frames: int = 1,
+) -> RenderFeatures:
+    """Features of a render from the states of the camera satellite and of the target, without building the scene.
+
+    The camera points at the target, as set by TrackingSatellite.target_pointing.
+
+    Args:
+        position (NDArray): Satellite position [km], shape (3,).
+        velocity (NDArray): Satellite velocity [km/s], shape (3,).
+        target_position (NDArray): Target position [km], shape (3,).
+        camera (tuple[float, int, int]): Field of view [deg], image width and height [px] of the camera.
+        bounding_radius_km (float): Radius of the bounding sphere of the target [km].
+        roll_law (RollLaw | None): Roll law of the camera, LVLHRollLaw by default.
+        profile (str): Profile of the render, e.g. target class.
+        n_frames (int): Number of frames of the job, the first one being representative.
+
+    Returns:
+        RenderFeatures: Features of the render.
+    """
+    position = np.asarray(position, dtype=float)
+    target_position = np.asarray(target_position, dtype=float)
+    boresight = target_position - position
+    boresight /= np.linalg.norm(boresight)
+    sky = compute_pointing(position, np.asarray(velocity, dtype=float), target_position, roll_law=roll_law).sky[0]
+    return _features(
+        position,
+        camera_rotation(boresight, sky),
+        target_position,
+        camera,
+        bounding_radius_km,
+        profile=profile,
+        n_frames=n_frames,
+    )
+
+
+def render_features(scene_manager: SceneManager, n_frames: int = 1, profile: str | None = None) -> RenderFeatures:
+    """Features of a render of a scene, in the current state of its objects.
+
+    Args:
+        scene_manager (SceneManager): Scene to be rendered.
+        n_frames (int): Number of frames of the job, the first one being representative.
+        profile (str | None): Profile of the render, the target class if None.
+
+    Returns:
+        RenderFeatures: Features of the render.
+    """
+    satellite = scene_manager.satellite
+    position = np.asarray(satellite.position, dtype=float)
+    boresight = np.asarray(satellite.pointing, dtype=float) - position
+    boresight /= np.linalg.norm(boresight)
+    if satellite.sky is None:
+        sky = compute_pointing(
+            position, np.asarray(satellite.velocity, dtype=float), np.asarray(satellite.pointing, dtype=float),
+            roll_law=satellite.roll_law,
+        ).sky[0]
+    else:
+        sky = np.asarray(satellite.sky, dtype=float)
+    return _features(
+        position,
+        camera_rotation(boresight, sky),
+        np.asarray(scene_manager.target.position, dtype=float),
+        (satellite.fov, satellite.image_width, satellite.image_height),
+        scene_manager.target.bounding_radius_km,
+        profile=type(scene_manager.target).__name__ if profile is None else profile,
+        n_frames=n_frames,
+    )
+
+
+class CostModel:
+    """Render time model fitted online, per profile, by recursive least squares."""
+
+    def __init__(self, prior: tuple[float, ...] = PRIOR_COEFFICIENTS, forgetting: float = 1.0) -> None:
+        """Class constructor.
+
+        Args:
+            prior (tuple[float, ...]): Prior coefficients [s], see the module documentation. Their standard
+                deviation is taken equal to them.
+            forgetting (float): Forgetting factor in ]0, 1], below 1 to track render times drifting with time
+                (e.g. host load).
+        """
+        if not 0 < forgetting <= 1:
+            raise ValueError("The forgetting factor must be in ]0, 1].")
+        self.prior = np.asarray(prior, dtype=float)
+        self.forgetting = forgetting
+        self.coefficients: dict[str, NDArray] = {}
+        self.covariances: dict[str, NDArray] = {}
+        self.n_observations: dict[str, int] = {}
+
+    def _state(self, profile: str) -> tuple[NDArray, NDArray]:
+        """Coefficients and covariance of a profile, initialised from the prior."""
+        if profile not in self.coefficients:
+            self.coefficients[profile] = self.prior.copy()
+            self.covariances[profile] = np.diag(np.maximum(self.prior, 1e-3) ** 2)
+            self.n_observations[profile] = 0
+        return self.coefficients[profile], self.covariances[profile]
+
+    def frame_time(self, features: RenderFeatures) -> float:
+        """Predicted render time of a frame.
+
+        Args:
+            features (RenderFeatures): Features of the render.
+
+        Returns:
+            float: Render time [s], at least 1 ms.
+        """
+        profile = features.profile if self.n_observations.get(features.profile, 0) else SHARED_PROFILE
+        coefficients, _ = self._state(profile)
+        return max(float(features.regressors() @ coefficients), 1e-3)
+
+    def predict(self, features: RenderFeatures) -> float:
+        """Predicted render time of a job.
+
+        Args:
+            features (RenderFeatures): Features of the job.
+
+        Returns:
+            float: Render time of its frames [s].
+        """
+        return features.n_frames * self.frame_time(features)
+
+    def observe(self, features: RenderFeatures, elapsed_s: float) -> None:
+        """Update the profile and shared coefficients with a measured render time.
+
+        Args:
+            features (RenderFeatures): Features of the job.
+            elapsed_s (float): Measured render time of the job [s].
+        """
+        regressors = features.regressors()
+        frame_time = elapsed_s / max(features.n_frames, 1)
+        for profile in {features.profile, SHARED_PROFILE}:
+            coefficients, covariance = self._state(profile)
+            gain = covariance @ regressors / (self.forgetting + regressors @ covariance @ regressors)
+            coefficients += gain * (frame_time - regressors @ coefficients)
+            covariance -= np.outer(gain, regressors @ covariance)
+            covariance /= self.forgetting
+            self.n_observations[profile] += 1
+
+
+def pack_longest_first(costs: dict[JobT, float], n_workers: int) -> tuple[list[list[JobT]], float]:
+    """Assign jobs to workers, longest first, each job to the worker that is free first.
+
+    This is the schedule followed by workers claiming the jobs of a queue ordered by decreasing cost.
+
+    Args:
+        costs (dict[JobT, float]): Predicted cost of each job [s], by job identifier.
+        n_workers (int): Number of workers.
+
+    Returns:
+        tuple[list[list[JobT]], float]: Jobs of each worker, in order, and predicted wall-clock time [s].
+    """
+    if n_workers < 1:
+        raise ValueError("At least one worker is needed.")
+    assignments: list[list[JobT]] = [[] for _ in range(n_workers)]
+    free_at = [(0.0, worker) for worker in range(n_workers)]
+    for job in sorted(costs, key=lambda job: costs[job], reverse=True):
+        time_s, worker = heapq.heappop(free_at)
+        assignments[worker].append(job)
+        heapq.heappush(free_at, (time_s + costs[job], worker))
+    return assignments, max(time_s for time_s, _ in free_at)
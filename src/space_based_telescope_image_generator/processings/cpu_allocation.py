@@ -0,0 +1,157 @@
+"""Allocation of the CPUs between the POV-Ray processes running in parallel.
+
+POV-Ray uses as many render threads as CPUs by default: several frames traced at once oversubscribe the cores.
+A CpuAllocation splits the CPUs available to the process into slots of `threads_per_render` CPUs, one render
+running per slot with `+WT<threads_per_render>`, from many single-threaded renders to a few multi-threaded ones.
+The slots follow the host topology (NUMA nodes, then physical cores, hyper-threads of a core being kept together),
+and each render can be pinned to the CPUs of its slot or of its whole NUMA node. The frame rate of each split on the
+current host is measured by `async_render.calibrate`.
+"""
+
+import os
+from pathlib import Path
+
+PINNINGS = (None, "core", "numa")
+_SYSTEM_FOLDER = Path("/sys/devices/system")
+
+
+def parse_cpu_list(text: str) -> list[int]:
+    """Parse a Linux CPU list, e.g. "0-3,8,10-11".
+
+    Args:
+        text (str): CPU list.
+
+    Returns:
+        list[int]: CPU indices.
+    """
+    cpus: list[int] = []
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def available_cpus() -> list[int]:
+    """CPUs the process is allowed to run on.
+
+    Returns:
+        list[int]: CPU indices, sorted.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def numa_nodes(cpus: list[int] | None = None) -> list[list[int]]:
+    """CPUs of each NUMA node, a single node when the topology is not exposed.
+
+    Args:
+        cpus (list[int] | None): CPUs to be split, the available CPUs if None.
+
+    Returns:
+        list[list[int]]: CPUs of the nodes, empty nodes removed.
+    """
+    cpus = available_cpus() if cpus is None else cpus
+    allowed = set(cpus)
+    nodes = []
+    for node_folder in sorted(_SYSTEM_FOLDER.joinpath("node").glob("node[0-9]*")):
+        try:
+            node_cpus = parse_cpu_list(node_folder.joinpath("cpulist").read_text())
+        except OSError:
+            continue
+        node_cpus = [cpu for cpu in node_cpus if cpu in allowed]
+        if node_cpus:
+            nodes.append(node_cpus)
+    covered = {cpu for node in nodes for cpu in node}
+    if not nodes or covered != allowed:
+        return [sorted(allowed)]
+    return nodes
+
+
+def _core_key(cpu: int) -> tuple[int, int, int]:
+    """Sort key grouping the hyper-threads of a physical core."""
+    topology = _SYSTEM_FOLDER.joinpath("cpu", f"cpu{cpu}", "topology")
+    try:
+        package = int(topology.joinpath("physical_package_id").read_text())
+        core = int(topology.joinpath("core_id").read_text())
+    except OSError:
+        return (0, cpu, cpu)
+    return (package, core, cpu)
+
+
+class CpuAllocation:
+    """Split of the CPUs into render slots."""
+
+    def __init__(self, threads_per_render: int = 1, pinning: str | None = "core", cpus: list[int] | None = None):
+        """Class constructor.
+
+        Args:
+            threads_per_render (int): Render threads of each POV-Ray process (+WT).
+            pinning (str | None): None to let the system place the renders, "core" to pin each render to the CPUs
+                of its slot, "numa" to pin it to the NUMA node of its slot.
+            cpus (list[int] | None): CPUs to be used, the available CPUs if None.
+        """
+        if threads_per_render < 1:
+            raise ValueError("A render needs at least one thread.")
+        if pinning not in PINNINGS:
+            raise ValueError(f"Unknown pinning {pinning}, use one of {PINNINGS}.")
+        self.threads_per_render = threads_per_render
+        self.pinning = pinning
+        self.nodes = numa_nodes(cpus)
+
+    def slots(self) -> list[tuple[int, ...]]:
+        """CPUs each concurrent render may run on.
+
+        The CPUs of each NUMA node are ordered by physical core and cut in groups of threads_per_render CPUs, a
+        slot never spanning two nodes unless a node is smaller than a slot.
+
+        Returns:
+            list[tuple[int, ...]]: CPU set of each slot, an empty set when the renders are not pinned.
+        """
+        slots: list[tuple[int, ...]] = []
+        leftover: list[int] = []
+        for node in self.nodes:
+            ordered = sorted(node, key=_core_key)
+            n_slots = len(ordered) // self.threads_per_render
+            for k in range(n_slots):
+                slot = tuple(ordered[k * self.threads_per_render:(k + 1) * self.threads_per_render])
+                slots.append(tuple(node) if self.pinning == "numa" else slot)
+            leftover.extend(ordered[n_slots * self.threads_per_render:])
+        # CPUs left by the nodes smaller than a slot are grouped across the nodes
+        for k in range(len(leftover) // self.threads_per_render):
+            slots.append(tuple(leftover[k * self.threads_per_render:(k + 1) * self.threads_per_render]))
+        if not slots:
+            # More threads than CPUs: a single render using every CPU
+            slots.append(tuple(cpu for node in self.nodes for cpu in node))
+        if self.pinning is None:
+            return [() for _ in slots]
+        return slots
+
+    @property
+    def n_cpus(self) -> int:
+        """Number of CPUs split between the renders."""
+        return sum(len(node) for node in self.nodes)
+
+    @staticmethod
+    def candidate_splits(n_cpus: int) -> list[int]:
+        """Threads per render of the splits using every CPU, from single-threaded to a single render.
+
+        Args:
+            n_cpus (int): Number of CPUs.
+
+        Returns:
+            list[int]: Divisors of the number of CPUs.
+        """
+        return [threads for threads in range(1, n_cpus + 1) if n_cpus % threads == 0]
+
+
+def set_affinity(cpus: tuple[int, ...]) -> None:
+    """Restrict the calling process to a CPU set (Linux), nothing is done for an empty set.
+
+    Args:
+        cpus (tuple[int, ...]): CPU set.
+    """
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
@@ -0,0 +1,270 @@
+"""Frame datasets stored as chunked, memory-mappable arrays.
+
+A dataset is a folder holding:
+    - shards of frames, `frames_<k>.npy`, plain `.npy` files (fixed-size header followed by the raw pixels) of at
+      most `frames_per_shard` frames each, so that a frame is read by memory-mapping its shard without decoding
+      anything else,
+    - `metadata.npy`, a structured array with one record per frame (time, states...), aligned with the frames,
+    - `index.json`, describing the frame shape and type, the shards and the render settings.
+"""
+
+import json
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from numpy.typing import DTypeLike, NDArray
+
+INDEX_FILE_NAME = "index.json"
+METADATA_FILE_NAME = "metadata.npy"
+
+
+def shard_file_name(shard_index: int) -> str:
+    """Name of a frame shard.
+
+    Args:
+        shard_index (int): Index of the shard.
+
+    Returns:
+        str: File name.
+    """
+    return f"frames_{shard_index:05d}.npy"
+
+
+def truncate_npy(path: Path, n_rows: int) -> None:
+    """Keep the first rows of a .npy file, rewriting its header in place and truncating the file.
+
+    The header keeps its size (the shape is padded with spaces), so that the data is neither moved nor copied.
+
+    Args:
+        path (Path): .npy file of a C-ordered array, version 1.0 or 2.0 header.
+        n_rows (int): Number of rows (along the first axis) to keep.
+    """
+    with path.open("r+b") as file:
+        version = np.lib.format.read_magic(file)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+        elif version == (2, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+        else:
+            raise ValueError(f"Unsupported .npy format version {version} of {path}.")
+        if fortran_order or not 0 <= n_rows <= shape[0]:
+            raise ValueError(f"Cannot keep {n_rows} rows of the array of shape {shape} of {path}.")
+        data_offset = file.tell()
+        # Magic string, version and header length field
+        header_offset = np.lib.format.MAGIC_LEN + (2 if version == (1, 0) else 4)
+
+        new_shape = (n_rows, *shape[1:])
+        header = repr(
+            {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": new_shape}
+        )
+        header_size = data_offset - header_offset
+        if len(header) + 1 > header_size:
+            raise ValueError(f"The header of {path} cannot hold the shape {new_shape}.")
+        file.seek(header_offset)
+        file.write((header.ljust(header_size - 1) + "\n").encode("latin1"))
+        file.truncate(data_offset + int(np.prod(new_shape)) * dtype.itemsize)
+
+
+class DatasetWriter:
+    """Append frames and their metadata to a dataset folder."""
+
+    def __init__(
+        self,
+        folder: Path,
+        frame_shape: tuple[int, ...],
+        dtype: DTypeLike = np.uint8,
+        frames_per_shard: int = 1024,
+        attributes: dict[str, Any] | None = None,
+    ) -> None:
+        """Class constructor.
+
+        Args:
+            folder (Path): Dataset folder, created if needed.
+            frame_shape (tuple[int, ...]): Shape of a frame, e.g. (H, W, 3).
+            dtype (DTypeLike): Type of the frame pixels.
+            frames_per_shard (int): Maximum number of frames per shard file.
+            attributes (dict[str, Any] | None): Settings shared by all the frames (render settings...), stored in
+                the index. Must be JSON serialisable.
+        """
+        if frames_per_shard < 1:
+            raise ValueError("A shard must hold at least one frame.")
+        self.folder = folder
+        self.frame_shape = tuple(frame_shape)
+        self.dtype = np.dtype(dtype)
+        self.frames_per_shard = frames_per_shard
+        self.attributes = {} if attributes is None else dict(attributes)
+        self.n_frames = 0
+        self._shard: np.memmap | None = None
+        self._shard_names: list[str] = []
+        self._metadata: list[tuple] = []
+        self._metadata_dtype: np.dtype | None = None
+        self.folder.mkdir(parents=True, exist_ok=True)
+
+    def __enter__(self) -> "DatasetWriter":
+        """Use the writer as a context manager, the dataset being finalised at the exit."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Finalise the dataset."""
+        self.close()
+
+    def _metadata_record(self, metadata: dict[str, Any]) -> tuple:
+        """Convert the metadata of a frame to a record of the metadata table.
+
+        The table columns are given by the metadata of the first frame.
+
+        Args:
+            metadata (dict[str, Any]): Scalars or fixed-shape arrays of the frame.
+
+        Returns:
+            tuple: Record.
+        """
+        if self._metadata_dtype is None:
+            fields = []
+            for name, value in metadata.items():
+                array = np.asarray(value)
+                fields.append((name, array.dtype, array.shape))
+            self._metadata_dtype = np.dtype(fields)
+        names = self._metadata_dtype.names or ()
+        if set(metadata) != set(names):
+            raise ValueError("The metadata fields must be the same for every frame.")
+        return tuple(np.asarray(metadata[name]) for name in names)
+
+    def _open_shard(self) -> np.memmap:
+        """Create the next shard file, preallocated for a full shard.
+
+        Returns:
+            np.memmap: Memory map of the shard.
+        """
+        name = shard_file_name(len(self._shard_names))
+        shard = np.lib.format.open_memmap(
+            self.folder.joinpath(name),
+            mode="w+",
+            dtype=self.dtype,
+            shape=(self.frames_per_shard, *self.frame_shape),
+        )
+        self._shard_names.append(name)
+        return shard
+
+    def append(self, frame: NDArray, metadata: dict[str, Any] | None = None) -> int:
+        """Append a frame to the dataset.
+
+        Args:
+            frame (NDArray): Frame, shape frame_shape.
+            metadata (dict[str, Any] | None): Scalars or fixed-shape arrays describing the frame, with the same
+                fields for every frame.
+
+        Returns:
+            int: Index of the frame in the dataset.
+        """
+        frame = np.asarray(frame)
+        if frame.shape != self.frame_shape:
+            raise ValueError(f"Frame of shape {frame.shape} instead of {self.frame_shape}.")
+        position = self.n_frames % self.frames_per_shard
+        if position == 0:
+            if self._shard is not None:
+                self._shard.flush()
+            self._shard = self._open_shard()
+        elif self._shard is None:
+            raise ValueError("The dataset writer is closed.")
+        self._shard[position] = frame
+        self._metadata.append(self._metadata_record({} if metadata is None else metadata))
+        self.n_frames += 1
+        return self.n_frames - 1
+
+    def close(self) -> Path:
+        """Write the metadata table and the index, and trim the last shard to its frames.
+
+        Returns:
+            Path: Index file.
+        """
+        if self._shard is not None:
+            used = self.n_frames - (len(self._shard_names) - 1) * self.frames_per_shard
+            self._shard.flush()
+            self._shard = None  # Closes the memory map
+            if used < self.frames_per_shard:
+                # The last shard is trimmed to its frames, without copying them
+                truncate_npy(self.folder.joinpath(self._shard_names[-1]), used)
+
+        metadata_dtype = np.dtype([]) if self._metadata_dtype is None else self._metadata_dtype
+        np.save(self.folder.joinpath(METADATA_FILE_NAME), np.array(self._metadata, dtype=metadata_dtype))
+
+        index_path = self.folder.joinpath(INDEX_FILE_NAME)
+        index_path.write_text(
+            json.dumps(
+                {
+                    "n_frames": self.n_frames,
+                    "frame_shape": list(self.frame_shape),
+                    "dtype": self.dtype.str,
+                    "frames_per_shard": self.frames_per_shard,
+                    "shards": self._shard_names,
+                    "metadata": METADATA_FILE_NAME,
+                    "attributes": self.attributes,
+                },
+                indent=2,
+            )
+        )
+        return index_path
+
+
+class DatasetReader:
+    """Random access to the frames of a dataset, by frame index."""
+
+    def __init__(self, folder: Path) -> None:
+        """Class constructor.
+
+        Args:
+            folder (Path): Dataset folder.
+        """
+        self.folder = folder
+        index = json.loads(folder.joinpath(INDEX_FILE_NAME).read_text())
+        self.n_frames: int = index["n_frames"]
+        self.frame_shape = tuple(index["frame_shape"])
+        self.dtype = np.dtype(index["dtype"])
+        self.frames_per_shard: int = index["frames_per_shard"]
+        self.shard_names: list[str] = index["shards"]
+        self.attributes: dict[str, Any] = index["attributes"]
+        self.metadata: NDArray = np.load(folder.joinpath(index["metadata"]), mmap_mode="r")
+        self._shards: dict[int, NDArray] = {}
+
+    def __len__(self) -> int:
+        """Number of frames."""
+        return self.n_frames
+
+    def _shard(self, shard_index: int) -> NDArray:
+        """Memory map of a shard, opened on first use."""
+        if shard_index not in self._shards:
+            self._shards[shard_index] = np.load(
+                self.folder.joinpath(self.shard_names[shard_index]), mmap_mode="r"
+            )
+        return self._shards[shard_index]
+
+    def __getitem__(self, frame_index: int) -> NDArray:
+        """Read a frame.
+
+        Args:
+            frame_index (int): Index of the frame, negative values counting from the end.
+
+        Returns:
+            NDArray: Read-only view of the frame, shape frame_shape.
+        """
+        if frame_index < 0:
+            frame_index += self.n_frames
+        if not 0 <= frame_index < self.n_frames:
+            raise IndexError(f"Frame {frame_index} out of the {self.n_frames} frames of the dataset.")
+        shard_index, position = divmod(frame_index, self.frames_per_shard)
+        frame: NDArray = self._shard(shard_index)[position]
+        return frame
+
+    def frame_metadata(self, frame_index: int) -> dict[str, Any]:
+        """Metadata of a frame.
+
+        Args:
+            frame_index (int): Index of the frame.
+
+        Returns:
+            dict[str, Any]: Metadata fields.
+        """
+        record = self.metadata[frame_index]
+        return {name: record[name] for name in self.metadata.dtype.names or ()}
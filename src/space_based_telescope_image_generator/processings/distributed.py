@@ -0,0 +1,410 @@
+"""Distributed rendering through a task folder on shared storage, without any broker.
+
+A coordinator splits a `render_video` sequence (ranges of frames) or the jobs of a dataset (see generator) into
+tasks, one JSON file per task in the `pending` folder of a task folder. Workers, on any node that sees the folder,
+claim a task by renaming its file into the `claimed` folder (an atomic operation, a single worker wins), keep its
+modification time fresh while they work on it (heartbeat), and move it to the `done` folder once finished. A claim
+whose heartbeat is older than a timeout is considered as lost (crashed or disconnected worker) and is moved back to
+`pending` by any worker. The tasks are idempotent: a task run twice writes the same outputs. The attempts of a
+task are counted in its file, a task failing (or losing its claim) too many times is moved to the `failed` folder.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import pickle
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from space_based_telescope_image_generator.processings.generator import (
+    JobParameters,
+    SamplingSpec,
+    run_job,
+    worker_render_admission,
+)
+from space_based_telescope_image_generator.processings.manifest import RenderManifest
+from space_based_telescope_image_generator.processings.memory import RenderAdmission
+from space_based_telescope_image_generator.processings.scene_manager import SceneManager
+
+TASK_STATES = ("pending", "claimed", "done", "failed")
+
+
+class TaskFolder:
+    """Queue of tasks stored as files, claimed atomically by renaming."""
+
+    def __init__(self, root: Path, stale_after_s: float = 120.0, max_attempts: int = 3) -> None:
+        """Class constructor, create the folders of the queue if needed.
+
+        Args:
+            root (Path): Task folder, on a storage shared by the coordinator and the workers.
+            stale_after_s (float): Time without heartbeat after which a claimed task is given back.
+            max_attempts (int): Maximum number of attempts of a task, the claims lost by a missed heartbeat
+                included.
+        """
+        self.root = root
+        self.stale_after_s = stale_after_s
+        self.max_attempts = max_attempts
+        for state in TASK_STATES:
+            root.joinpath(state).mkdir(parents=True, exist_ok=True)
+
+    def _path(self, state: str, task_id: str) -> Path:
+        """File of a task in a given state."""
+        return self.root.joinpath(state, f"{task_id}.json")
+
+    def _write(self, path: Path, task: dict[str, Any]) -> None:
+        """Write a task file atomically, written aside then renamed so that a partial task is never seen."""
+        temporary = self.root.joinpath(f".{path.stem}.{socket.gethostname()}.{os.getpid()}.tmp")
+        temporary.write_text(json.dumps(task))
+        os.replace(temporary, path)
+
+    def submit(self, task_id: str, payload: dict[str, Any]) -> bool:
+        """Add a task, unless it is already known (in any state).
+
+        Args:
+            task_id (str): Task name, usable as a file name. Tasks are claimed in the order of their names.
+            payload (dict[str, Any]): JSON serialisable description of the task.
+
+        Returns:
+            bool: True if the task has been added.
+        """
+        if any(self._path(state, task_id).exists() for state in TASK_STATES):
+            return False
+        self._write(self._path("pending", task_id), {"task_id": task_id, "attempts": 0, **payload})
+        return True
+
+    def claim(self) -> dict[str, Any] | None:
+        """Take the first pending task, counting an attempt.
+
+        Returns:
+            dict[str, Any] | None: Claimed task, None if no task is pending.
+        """
+        for pending in sorted(self.root.joinpath("pending").glob("*.json")):
+            claimed = self._path("claimed", pending.stem)
+            try:
+                # The modification time is kept by the rename: it is refreshed first, so that the claim is not
+                # taken for a stale one by a concurrent requeue_stale
+                os.utime(pending)
+                os.rename(pending, claimed)
+                task: dict[str, Any] = json.loads(claimed.read_text())
+                task["attempts"] = task.get("attempts", 0) + 1
+                self._write(claimed, task)
+            except FileNotFoundError:
+                # Claimed by another worker in the meantime
+                continue
+            return task
+        return None
+
+    def heartbeat(self, task_id: str) -> bool:
+        """Tell that the task is still being worked on.
+
+        Args:
+            task_id (str): Claimed task.
+
+        Returns:
+            bool: False if the claim has been lost (task given back after a missed heartbeat).
+        """
+        try:
+            os.utime(self._path("claimed", task_id))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def complete(self, task_id: str) -> None:
+        """Mark a claimed task as done.
+
+        Args:
+            task_id (str): Claimed task.
+        """
+        # The claim may have been given back and the task run again, which is harmless
+        with contextlib.suppress(FileNotFoundError):
+            os.replace(self._path("claimed", task_id), self._path("done", task_id))
+
+    def release(self, task_id: str) -> bool:
+        """Give a claimed task back, pending again unless it has been attempted max_attempts times.
+
+        Args:
+            task_id (str): Claimed task.
+
+        Returns:
+            bool: False if the task was not claimed anymore.
+        """
+        claimed = self._path("claimed", task_id)
+        try:
+            attempts = json.loads(claimed.read_text()).get("attempts", 0)
+            os.rename(claimed, self._path("pending" if attempts < self.max_attempts else "failed", task_id))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def fail(self, task_id: str, error: str) -> None:
+        """Record a task failure, the task being pending again until it has been attempted max_attempts times.
+
+        Args:
+            task_id (str): Claimed task.
+            error (str): Description of the error.
+        """
+        claimed = self._path("claimed", task_id)
+        try:
+            task = json.loads(claimed.read_text())
+            task["error"] = error
+            self._write(claimed, task)
+        except FileNotFoundError:
+            # The claim was given back in the meantime
+            return
+        self.release(task_id)
+
+    def requeue_stale(self) -> int:
+        """Give back the claimed tasks whose heartbeat is too old.
+
+        Returns:
+            int: Number of requeued tasks, the tasks attempted max_attempts times being moved to `failed`.
+        """
+        requeued = 0
+        deadline = time.time() - self.stale_after_s
+        for claimed in self.root.joinpath("claimed").glob("*.json"):
+            try:
+                if claimed.stat().st_mtime >= deadline:
+                    continue
+            except FileNotFoundError:
+                continue
+            requeued += self.release(claimed.stem)
+        return requeued
+
+    def counts(self) -> dict[str, int]:
+        """Number of tasks per state.
+
+        Returns:
+            dict[str, int]: Counts of TASK_STATES.
+        """
+        return {state: sum(1 for _ in self.root.joinpath(state).glob("*.json")) for state in TASK_STATES}
+
+
+class Heartbeat:
+    """Background thread refreshing the claim of a task while it is run."""
+
+    def __init__(self, tasks: TaskFolder, task_id: str, period_s: float) -> None:
+        """Class constructor.
+
+        Args:
+            tasks (TaskFolder): Task folder.
+            task_id (str): Claimed task.
+            period_s (float): Time between two heartbeats.
+        """
+        self.tasks = tasks
+        self.task_id = task_id
+        self.period_s = period_s
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        """Refresh the claim until stopped."""
+        while not self._stop.wait(self.period_s):
+            self.tasks.heartbeat(self.task_id)
+
+    def __enter__(self) -> "Heartbeat":
+        """Start the heartbeats."""
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Stop the heartbeats."""
+        self._stop.set()
+        self._thread.join()
+
+
+def distribute_video(
+    scene_manager: SceneManager,
+    framerate: int,
+    duration_s: float,
+    output_folder: Path,
+    task_folder: Path,
+    frames_per_task: int = 8,
+) -> int:
+    """Split a video into frame range tasks (coordinator side).
+
+    Every frame is traced, the keyframe scheduling, events, annotations and dataset of `render_video` being not
+    supported (see `SceneManager.render_frames`).
+    The scene file and the tasks are named after a hash of the scene and of the sequence, so that the videos
+    distributed through the same task folder, or a video distributed again after a change, do not mix.
+
+    Args:
+        scene_manager (SceneManager): Scene of the video, sent to the workers.
+        framerate (int): Image per seconds.
+        duration_s (float): Total video duration.
+        output_folder (Path): Output folder of the video, on the shared storage.
+        task_folder (Path): Task folder, on the shared storage.
+        frames_per_task (int): Number of frames per task.
+
+    Returns:
+        int: Number of added tasks.
+    """
+    tasks = TaskFolder(task_folder)
+    scene = pickle.dumps(scene_manager)
+    sequence = json.dumps([framerate, duration_s, str(output_folder), frames_per_task]).encode()
+    video_key = hashlib.sha256(scene + sequence).hexdigest()[:16]
+    scene_path = task_folder.joinpath(f"scene_{video_key}.pkl")
+    if not scene_path.exists():
+        temporary = scene_path.with_suffix(f".{os.getpid()}.tmp")
+        temporary.write_bytes(scene)
+        os.replace(temporary, scene_path)
+
+    n_steps = int(duration_s / (1 / framerate))  # Same number of frames as render_video
+    added = 0
+    for start in range(0, n_steps, frames_per_task):
+        added += tasks.submit(
+            f"video_{video_key}_frames_{start:08d}",
+            {
+                "kind": "frames",
+                "scene_file": scene_path.name,
+                "framerate": framerate,
+                "duration_s": duration_s,
+                "output_folder": str(output_folder),
+                "start": start,
+                "stop": min(start + frames_per_task, n_steps),
+            },
+        )
+    return added
+
+
+def distribute_dataset(spec: SamplingSpec, output_folder: Path, task_folder: Path) -> int:
+    """Split the jobs of a dataset into tasks (coordinator side).
+
+    The tasks are named after a hash of the spec and of the output folder, the datasets distributed through the
+    same task folder do not mix.
+
+    Args:
+        spec (SamplingSpec): Sampling of the scenes.
+        output_folder (Path): Output folder of the dataset, on the shared storage.
+        task_folder (Path): Task folder, on the shared storage.
+
+    Returns:
+        int: Number of added tasks.
+    """
+    tasks = TaskFolder(task_folder)
+    dataset_key = hashlib.sha256(f"{spec.model_dump_json()}{output_folder}".encode()).hexdigest()[:16]
+    return sum(
+        tasks.submit(
+            f"dataset_{dataset_key}_job_{job_index:08d}",
+            {
+                "kind": "job",
+                "output_folder": str(output_folder),
+                "parameters": json.loads(spec.sample_job(job_index).model_dump_json()),
+            },
+        )
+        for job_index in range(spec.n_jobs)
+    )
+
+
+def run_task(
+    task: dict[str, Any],
+    task_folder: Path,
+    scenes: dict[str, SceneManager],
+    render_admission: RenderAdmission | None = None,
+) -> None:
+    """Run a task.
+
+    Args:
+        task (dict[str, Any]): Claimed task.
+        task_folder (Path): Task folder.
+        scenes (dict[str, SceneManager]): Scenes already loaded by the worker, by scene file. The scene files are
+            named after their content and never rewritten, they can be kept for the life of the worker.
+        render_admission (RenderAdmission | None): Memory admission of the renders, None to render without waiting.
+    """
+    output_folder = Path(task["output_folder"])
+    if task["kind"] == "job":
+        run_job(JobParameters.model_validate(task["parameters"]), output_folder, render_admission)
+    elif task["kind"] == "frames":
+        scene_path = str(task_folder.joinpath(task["scene_file"]))
+        if scene_path not in scenes:
+            # Written by the coordinator in the task folder, which only trusted nodes can write to
+            scenes[scene_path] = pickle.loads(Path(scene_path).read_bytes())  # noqa: S301
+        scenes[scene_path].render_admission = render_admission
+        scenes[scene_path].render_frames(
+            task["framerate"], task["duration_s"], output_folder, task["start"], task["stop"]
+        )
+    else:
+        raise ValueError(f"Unknown task kind {task['kind']}.")
+
+
+def run_task_worker(
+    task_folder: Path,
+    stale_after_s: float = 120.0,
+    heartbeat_s: float = 10.0,
+    poll_s: float = 5.0,
+    wait_for_claims: bool = True,
+    *,
+    max_attempts: int = 3,
+    memory_budget_bytes: float | None = None,
+) -> int:
+    """Run the tasks of a task folder until none is left (worker side).
+
+    A failing task is given back to be attempted again, by any worker, up to max_attempts times, the worker going
+    on with the other tasks.
+
+    Args:
+        task_folder (Path): Task folder, on the shared storage.
+        stale_after_s (float): Time without heartbeat after which a claimed task is given back.
+        heartbeat_s (float): Time between two heartbeats, well below stale_after_s.
+        poll_s (float): Waiting time before looking for tasks again, while other workers hold claims.
+        wait_for_claims (bool): If True, the worker only stops once every task is done, to take over the claims of
+            the workers that stop responding. Otherwise it stops when no task is pending.
+        max_attempts (int): Maximum number of attempts of a task.
+        memory_budget_bytes (float | None): Memory that the renders of all the workers of the node may use together
+            [bytes], a render waiting until its learnt peak memory fits. None to render without waiting.
+
+    Returns:
+        int: Number of tasks run by the worker.
+    """
+    if heartbeat_s >= stale_after_s:
+        raise ValueError("The heartbeat period must be shorter than the stale claim timeout.")
+    tasks = TaskFolder(task_folder, stale_after_s, max_attempts)
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    scenes: dict[str, SceneManager] = {}
+    # The peaks are learnt in the task folder, shared by the workers of all the nodes
+    admission = worker_render_admission(memory_budget_bytes, task_folder.joinpath("memory_peaks.json"))
+    done = 0
+    while True:
+        tasks.requeue_stale()
+        task = tasks.claim()
+        if task is None:
+            if not wait_for_claims or tasks.counts()["claimed"] == 0:
+                return done
+            time.sleep(poll_s)
+            continue
+        print(f"Worker {worker} running task {task['task_id']}")
+        try:
+            with Heartbeat(tasks, task["task_id"], heartbeat_s):
+                run_task(task, task_folder, scenes, admission)
+        except Exception as error:
+            print(f"Task {task['task_id']} failed (attempt {task['attempts']}): {error!r}")
+            tasks.fail(task["task_id"], repr(error))
+            continue
+        tasks.complete(task["task_id"])
+        done += 1
+
+
+def collect_video(output_folder: Path, task_folder: Path, framerate: int) -> Path:
+    """Record the frames rendered by the workers and assemble the video (coordinator side).
+
+    Args:
+        output_folder (Path): Output folder of the video.
+        task_folder (Path): Task folder of the video.
+        framerate (int): Image per seconds.
+
+    Returns:
+        Path: Path of the GIF.
+    """
+    tasks = TaskFolder(task_folder)
+    counts = tasks.counts()
+    if counts["pending"] or counts["claimed"] or counts["failed"]:
+        raise ValueError(f"The video tasks are not all done: {counts}.")
+    frames = sorted(output_folder.joinpath("steps").glob("image_*.png"), key=lambda path: int(path.stem[6:]))
+    manifest = RenderManifest(output_folder, {"distributed": str(task_folder)})
+    for image_path in frames:
+        if not manifest.is_complete(image_path):
+            manifest.record(image_path, frame_index=int(image_path.stem[6:]) - 1, traced=True)
+    return SceneManager.assemble_video(output_folder, framerate)
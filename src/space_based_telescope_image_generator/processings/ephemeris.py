@@ -0,0 +1,152 @@
+"""Low precision ephemeris of the astral objects, vectorised over time.
+
+The scene frame is the equatorial inertial frame (z towards the celestial north pole, x towards the vernal
+equinox). The Sun direction uses the low precision formulas of the Astronomical Almanac (~0.01 deg from 1950 to
+2050) and the Earth rotation the Greenwich Mean Sidereal Time (IAU 1982), UT1 being approximated by UTC.
+"""
+
+import numpy as np
+from numpy.typing import NDArray
+
+from space_based_telescope_image_generator.utils.constants import DAY_SECONDS, JD_UNIX_EPOCH
+
+JD_J2000 = 2451545.0  # [days] Julian date of the J2000 epoch
+
+
+def gstime(jdut1: NDArray | float) -> NDArray:
+    """Greenwich mean sidereal time (IAU 1982 model).
+
+    Args:
+        jdut1 (NDArray | float): Julian date(s) in UT1.
+
+    Returns:
+        NDArray: GMST angle(s) in [0, 2pi[ (rad).
+    """
+    tut1 = (np.asarray(jdut1, dtype=float) - JD_J2000) / 36525.0
+    temp = (
+        -6.2e-6 * tut1**3
+        + 0.093104 * tut1**2
+        + (876600.0 * 3600 + 8640184.812866) * tut1
+        + 67310.54841
+    )  # [s]
+    return np.mod(np.radians(temp / 240.0), 2 * np.pi)
+
+
+def timestamps_to_jd(timestamps: NDArray) -> NDArray:
+    """Convert unix timestamps into julian dates.
+
+    Args:
+        timestamps (NDArray): Timestamps (s), shape (N,).
+
+    Returns:
+        NDArray: Julian dates, shape (N,).
+    """
+    return JD_UNIX_EPOCH + np.asarray(timestamps, dtype=float) / DAY_SECONDS
+
+
+def sun_direction_from_longitude(ecliptic_longitude: NDArray, obliquity: NDArray | float) -> NDArray:
+    """Direction of a point of the ecliptic in the equatorial frame.
+
+    Args:
+        ecliptic_longitude (NDArray): Ecliptic longitudes [rad], shape (N,).
+        obliquity (NDArray | float): Obliquity of the ecliptic [rad].
+
+    Returns:
+        NDArray: Unit vectors, shape (N, 3).
+    """
+    return np.stack(
+        (
+            np.cos(ecliptic_longitude),
+            np.cos(obliquity) * np.sin(ecliptic_longitude),
+            np.sin(obliquity) * np.sin(ecliptic_longitude),
+        ),
+        axis=-1,
+    )
+
+
+def sun_direction(timestamps: NDArray) -> NDArray:
+    """Direction of the Sun seen from the Earth centre.
+
+    Args:
+        timestamps (NDArray): Timestamps (s), shape (N,).
+
+    Returns:
+        NDArray: Unit vectors in the equatorial frame, shape (N, 3).
+    """
+    n = timestamps_to_jd(timestamps) - JD_J2000  # [days] Days since J2000
+    mean_longitude = np.radians(280.460 + 0.9856474 * n)
+    mean_anomaly = np.radians(357.528 + 0.9856003 * n)
+    ecliptic_longitude = mean_longitude + np.radians(1.915 * np.sin(mean_anomaly) + 0.020 * np.sin(2 * mean_anomaly))
+    obliquity = np.radians(23.439 - 0.0000004 * n)
+    return sun_direction_from_longitude(ecliptic_longitude, obliquity)
+
+
+def earth_rotation_angle(timestamps: NDArray) -> NDArray:
+    """Rotation of the Earth about its axis, the Greenwich Mean Sidereal Time.
+
+    Args:
+        timestamps (NDArray): Timestamps (s), shape (N,).
+
+    Returns:
+        NDArray: Angles between the vernal equinox and the Greenwich meridian [rad], in [0, 2pi[, shape (N,).
+    """
+    return np.asarray(gstime(timestamps_to_jd(timestamps)), dtype=float)
+
+
+class AstralTimeline:
+    """Sun direction and Earth rotation of every frame of a sequence, computed at once."""
+
+    def __init__(self, times: NDArray) -> None:
+        """Class constructor.
+
+        Args:
+            times (NDArray): Frame timestamps (s), shape (N,).
+        """
+        self.times = np.asarray(times, dtype=float)
+        self.sun_directions = sun_direction(self.times)
+        self.earth_rotation_deg = np.degrees(earth_rotation_angle(self.times))
+
+    def __len__(self) -> int:
+        """Number of frames."""
+        return len(self.times)
+
+
+class SimulationClock:
+    """Clock of a scene, giving the date of every rendered frame."""
+
+    def __init__(self, start_timestamp: float) -> None:
+        """Class constructor.
+
+        Args:
+            start_timestamp (float): Date of the scene start (timestamp, s), usually the satellite epoch.
+        """
+        self.start_timestamp = float(start_timestamp)
+        self.current_timestamp = self.start_timestamp
+        self._timelines: dict[tuple[float, float, int], AstralTimeline] = {}
+
+    def frame_times(self, n_frames: int, dt_s: float) -> NDArray:
+        """Dates of the frames of a sequence, the first frame being one step after the start.
+
+        Args:
+            n_frames (int): Number of frames.
+            dt_s (float): Delta t between two frames.
+
+        Returns:
+            NDArray: Frame timestamps (s), shape (n_frames,).
+        """
+        return self.start_timestamp + np.arange(1, n_frames + 1) * dt_s
+
+    def timeline(self, n_frames: int, dt_s: float) -> AstralTimeline:
+        """Astral timeline of a sequence, computed once per sequence.
+
+        Args:
+            n_frames (int): Number of frames.
+            dt_s (float): Delta t between two frames.
+
+        Returns:
+            AstralTimeline: Sun direction and Earth rotation of every frame.
+        """
+        key = (self.start_timestamp, dt_s, n_frames)
+        if key not in self._timelines:
+            self._timelines = {key: AstralTimeline(self.frame_times(n_frames, dt_s))}
+        return self._timelines[key]
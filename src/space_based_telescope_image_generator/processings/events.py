@@ -0,0 +1,280 @@
+"""Illumination and visibility events along propagated trajectories.
+
+Each event is described by a continuous function of time that is negative while the frame is useless:
+    - eclipse: the target is in the Earth shadow (cylindrical shadow model),
+    - earth_occlusion: the Earth is between the satellite and the target,
+    - sun_exclusion: the Sun is closer to the boresight than the exclusion angle,
+    - sunlit_limb: the sunlit Earth limb is closer to the boresight than the exclusion angle.
+The functions are sampled at the frame times, and their sign changes are refined by root-finding on the bracketed
+intervals, the trajectories being interpolated between the frames.
+"""
+
+from collections.abc import Callable
+
+import numpy as np
+from numpy.typing import NDArray
+from pydantic import BaseModel
+
+from space_based_telescope_image_generator.processings.ephemeris import sun_direction
+from space_based_telescope_image_generator.processings.propagation import hermite_interpolation
+from space_based_telescope_image_generator.utils.constants import earth_radius
+
+EVENT_KINDS = ("eclipse", "earth_occlusion", "sun_exclusion", "sunlit_limb")
+
+
+class VisibilityEvent(BaseModel):
+    """Time interval during which the frames are useless."""
+
+    kind: str  # One of EVENT_KINDS
+    start: float  # timestamp (s) of the event start (entry)
+    end: float  # timestamp (s) of the event end (exit)
+
+
+def _dot(a: NDArray, b: NDArray) -> NDArray:
+    """Row-wise dot product."""
+    return np.einsum("...i,...i->...", a, b)
+
+
+def _angle(a: NDArray, b: NDArray) -> NDArray:
+    """Row-wise angle between two vectors [rad]."""
+    return np.arctan2(np.linalg.norm(np.cross(a, b), axis=-1), _dot(a, b))
+
+
+def line_of_sight_clearance(observer: NDArray, target: NDArray) -> NDArray:
+    """Altitude of the lowest point of the line of sight, negative when the Earth hides the target.
+
+    Args:
+        observer (NDArray): Observer positions [km], shape (..., 3).
+        target (NDArray): Target positions [km], shape (..., 3).
+
+    Returns:
+        NDArray: Clearance [km], shape (...).
+    """
+    line_of_sight = target - observer
+    length2 = _dot(line_of_sight, line_of_sight)
+    # Closest point of the segment to the Earth centre
+    s = np.clip(-_dot(observer, line_of_sight) / np.maximum(length2, 1e-12), 0.0, 1.0)
+    closest = observer + s[..., None] * line_of_sight
+    return np.linalg.norm(closest, axis=-1) - earth_radius
+
+
+def shadow_clearance(position: NDArray, sun: NDArray) -> NDArray:
+    """Distance to the cylindrical Earth shadow, negative in eclipse.
+
+    Args:
+        position (NDArray): Object positions [km], shape (..., 3).
+        sun (NDArray): Unit Sun directions, shape (..., 3).
+
+    Returns:
+        NDArray: Clearance [km], shape (...).
+    """
+    along_sun = _dot(position, sun)
+    distance_to_axis = np.linalg.norm(position - along_sun[..., None] * sun, axis=-1)
+    # On the day side the distance to the Earth centre is used, which keeps the function continuous
+    return np.where(along_sun < 0, distance_to_axis, np.linalg.norm(position, axis=-1)) - earth_radius
+
+
+class EventFinder:
+    """Find the intervals where the frames are useless."""
+
+    def __init__(
+        self,
+        sun_exclusion_deg: float = 30.0,
+        limb_exclusion_deg: float | None = 10.0,
+        kinds: tuple[str, ...] = EVENT_KINDS,
+        sun_direction_function: Callable[[NDArray], NDArray] = sun_direction,
+        tolerance_s: float = 1e-3,
+    ) -> None:
+        """Class constructor.
+
+        Args:
+            sun_exclusion_deg (float): Minimal angle between the boresight and the Sun [deg].
+            limb_exclusion_deg (float | None): Minimal angle between the boresight and the sunlit Earth limb [deg].
+            kinds (tuple[str, ...]): Events to look for, among EVENT_KINDS.
+            sun_direction_function (Callable[[NDArray], NDArray]): Unit Sun directions (N, 3) at timestamps (N,),
+                the ephemeris by default.
+            tolerance_s (float): Accuracy of the event times (s).
+        """
+        unknown = set(kinds) - set(EVENT_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown event kinds {sorted(unknown)}, use {EVENT_KINDS}.")
+        if "sunlit_limb" in kinds and limb_exclusion_deg is None:
+            kinds = tuple(kind for kind in kinds if kind != "sunlit_limb")
+        self.sun_exclusion = np.radians(sun_exclusion_deg)
+        self.limb_exclusion = None if limb_exclusion_deg is None else np.radians(limb_exclusion_deg)
+        self.kinds = kinds
+        self.sun_direction_function = sun_direction_function
+        self.tolerance_s = tolerance_s
+
+    def event_functions(
+        self,
+        times: NDArray,
+        sat_positions: NDArray,
+        target_positions: NDArray,
+        kinds: tuple[str, ...] | None = None,
+        sun_direction_function: Callable[[NDArray], NDArray] | None = None,
+    ) -> dict[str, NDArray]:
+        """Evaluate the event functions, negative while the frame is useless.
+
+        Args:
+            times (NDArray): Timestamps (s), shape (N,).
+            sat_positions (NDArray): Satellite positions [km], shape (N, 3).
+            target_positions (NDArray): Target positions [km], shape (N, 3).
+            kinds (tuple[str, ...] | None): Events to evaluate, all the events of the finder by default.
+            sun_direction_function (Callable[[NDArray], NDArray] | None): Sun directions overriding the ones of
+                the finder, e.g. the fixed Sun of a scene.
+
+        Returns:
+            dict[str, NDArray]: Function values of each event kind, shape (N,).
+        """
+        kinds = self.kinds if kinds is None else kinds
+        sun_direction_function = sun_direction_function or self.sun_direction_function
+        sun = np.asarray(sun_direction_function(times), dtype=float).reshape(-1, 3)
+        line_of_sight = target_positions - sat_positions
+        values: dict[str, NDArray] = {}
+        if "eclipse" in kinds:
+            values["eclipse"] = shadow_clearance(target_positions, sun)
+        if "earth_occlusion" in kinds:
+            values["earth_occlusion"] = line_of_sight_clearance(sat_positions, target_positions)
+        if "sun_exclusion" in kinds:
+            values["sun_exclusion"] = _angle(line_of_sight, sun) - self.sun_exclusion
+        if "sunlit_limb" in kinds:
+            values["sunlit_limb"] = self._limb_function(sat_positions, line_of_sight, sun)
+        return values
+
+    def _limb_function(self, sat_positions: NDArray, line_of_sight: NDArray, sun: NDArray) -> NDArray:
+        """Angle between the boresight and the Earth limb, minus the exclusion, where that limb is sunlit.
+
+        Args:
+            sat_positions (NDArray): Satellite positions [km], shape (N, 3).
+            line_of_sight (NDArray): Satellite to target vectors [km], shape (N, 3).
+            sun (NDArray): Unit Sun directions, shape (N, 3).
+
+        Returns:
+            NDArray: Function values [rad], shape (N,).
+        """
+        radius = np.linalg.norm(sat_positions, axis=-1)
+        nadir = -sat_positions / radius[:, None]
+        earth_angular_radius = np.arcsin(np.clip(earth_radius / radius, -1.0, 1.0))
+        angle_to_nadir = _angle(line_of_sight, nadir)
+
+        # Limb point in the plane of the nadir and the boresight, on the boresight side
+        side = line_of_sight - _dot(line_of_sight, nadir)[:, None] * nadir
+        side_norm = np.linalg.norm(side, axis=-1, keepdims=True)
+        side = np.where(side_norm > 1e-12, side / np.maximum(side_norm, 1e-12), 0.0)
+        limb_direction = np.cos(earth_angular_radius)[:, None] * nadir + np.sin(earth_angular_radius)[:, None] * side
+        limb_point = sat_positions + (radius * np.cos(earth_angular_radius))[:, None] * limb_direction
+        sunlit = _dot(limb_point, sun) > 0
+
+        return np.where(sunlit, angle_to_nadir - earth_angular_radius - self.limb_exclusion, np.pi)
+
+    def find(
+        self,
+        times: NDArray,
+        sat_positions: NDArray,
+        sat_velocities: NDArray,
+        target_positions: NDArray,
+        target_velocities: NDArray,
+        sun_direction_function: Callable[[NDArray], NDArray] | None = None,
+    ) -> list[VisibilityEvent]:
+        """Find the events along sampled trajectories.
+
+        Events already running at the first sample start at the first sample, events still running at the last
+        sample end at the last sample.
+
+        Args:
+            times (NDArray): Timestamps (s), increasing, shape (N,).
+            sat_positions (NDArray): Satellite positions [km], shape (N, 3).
+            sat_velocities (NDArray): Satellite velocities [km/s], shape (N, 3).
+            target_positions (NDArray): Target positions [km], shape (N, 3).
+            target_velocities (NDArray): Target velocities [km/s], shape (N, 3).
+            sun_direction_function (Callable[[NDArray], NDArray] | None): Sun directions overriding the ones of
+                the finder, e.g. the fixed Sun of a scene.
+
+        Returns:
+            list[VisibilityEvent]: Events, sorted by start time.
+        """
+        times = np.asarray(times, dtype=float)
+        if len(times) == 0:
+            return []
+        values = self.event_functions(
+            times, sat_positions, target_positions, sun_direction_function=sun_direction_function
+        )
+
+        def evaluate(kind: str, query_times: NDArray) -> NDArray:
+            # States between the samples are interpolated from the positions and velocities
+            sat_r, _ = hermite_interpolation(times, sat_positions, sat_velocities, query_times)
+            target_r, _ = hermite_interpolation(times, target_positions, target_velocities, query_times)
+            return self.event_functions(
+                query_times, sat_r, target_r, kinds=(kind,), sun_direction_function=sun_direction_function
+            )[kind]
+
+        events: list[VisibilityEvent] = []
+        for kind, value in values.items():
+            inside = value < 0
+            changes = np.flatnonzero(inside[1:] != inside[:-1])
+            crossings = self._refine(
+                lambda query, kind=kind: evaluate(kind, query), times[changes], times[changes + 1]
+            )
+            entries = list(crossings[inside[changes + 1]])
+            exits = list(crossings[inside[changes]])
+            if inside[0]:
+                entries.insert(0, times[0])
+            if inside[-1]:
+                exits.append(times[-1])
+            events.extend(
+                VisibilityEvent(kind=kind, start=float(start), end=float(end))
+                for start, end in zip(entries, exits, strict=True)
+            )
+        return sorted(events, key=lambda event: event.start)
+
+    def _refine(self, function: Callable[[NDArray], NDArray], lo: NDArray, hi: NDArray) -> NDArray:
+        """Vectorised Illinois (modified regula falsi) root-finding on bracketing intervals.
+
+        Args:
+            function (Callable[[NDArray], NDArray]): Function whose sign changes on every interval.
+            lo (NDArray): Lower bounds of the intervals (s).
+            hi (NDArray): Upper bounds of the intervals (s).
+
+        Returns:
+            NDArray: Roots (s).
+        """
+        if len(lo) == 0:
+            return lo
+        lo, hi = lo.copy(), hi.copy()
+        f_lo, f_hi = function(lo), function(hi)
+        side = np.zeros(len(lo))
+        root = 0.5 * (lo + hi)
+        for _ in range(60):
+            if np.all(hi - lo < self.tolerance_s):
+                break
+            denominator = f_hi - f_lo
+            secant = (lo * f_hi - hi * f_lo) / np.where(denominator != 0, denominator, 1.0)
+            # Discontinuous functions (sunlit limb) fall back on bisection
+            root = np.where(denominator != 0, secant, 0.5 * (lo + hi))
+            root = np.where((root > lo) & (root < hi), root, 0.5 * (lo + hi))
+            f_root = function(root)
+            same_as_lo = np.sign(f_root) == np.sign(f_lo)
+            lo = np.where(same_as_lo, root, lo)
+            hi = np.where(same_as_lo, hi, root)
+            f_hi = np.where(same_as_lo, np.where(side == 1, f_hi / 2, f_hi), f_root)
+            f_lo = np.where(same_as_lo, f_root, np.where(side == -1, f_lo / 2, f_lo))
+            side = np.where(same_as_lo, 1, -1)
+        return 0.5 * (lo + hi)
+
+    @staticmethod
+    def dead_frames(times: NDArray, events: list[VisibilityEvent]) -> NDArray:
+        """Flag the frames falling inside an event.
+
+        Args:
+            times (NDArray): Frame timestamps (s), shape (N,).
+            events (list[VisibilityEvent]): Events found on the trajectories.
+
+        Returns:
+            NDArray: True for the useless frames, shape (N,).
+        """
+        times = np.asarray(times, dtype=float)
+        dead = np.zeros(len(times), dtype=bool)
+        for event in events:
+            dead |= (times >= event.start) & (times <= event.end)
+        return dead
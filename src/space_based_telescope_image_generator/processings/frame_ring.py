@@ -0,0 +1,183 @@
+"""Frame transport between processes through a ring of shared memory slots.
+
+The frames are never pickled: a fixed number of frame slots is allocated once in a shared memory block, the
+producers (render workers) write a frame in place in a free slot, and only the (slot, frame index) pair goes
+through the queues. Each consumer stage (encoder, annotation writer, sensor model...) reads zero-copy views of the
+published slots, a slot being recycled once every stage has released it. When all the slots are in use, the
+producers block until a slot is released (back-pressure), so that the memory used stays constant whatever the
+length of the sequence.
+
+The ring has to be given to the worker processes when they are created (`multiprocessing.Process` arguments or a
+pool initializer), its queues and lock cannot be sent through the task queue of a running pool.
+"""
+
+import contextlib
+import multiprocessing
+import os
+import queue
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+from numpy.typing import DTypeLike, NDArray
+
+END_OF_STREAM = -1  # Frame index published to tell the readers that no more frames will come
+
+
+class FrameRing:
+    """Fixed-size ring of frame slots in shared memory, with back-pressure."""
+
+    def __init__(
+        self,
+        n_slots: int,
+        frame_shape: tuple[int, ...],
+        dtype: DTypeLike = np.uint8,
+        n_readers: int = 1,
+    ) -> None:
+        """Class constructor, allocate the slots.
+
+        Args:
+            n_slots (int): Number of frames held at once.
+            frame_shape (tuple[int, ...]): Shape of a frame, e.g. (H, W, 3).
+            dtype (DTypeLike): Type of the frame pixels (uint8, uint16...).
+            n_readers (int): Number of consumer stages, each of them receives every frame.
+        """
+        if n_slots < 1:
+            raise ValueError("The ring needs at least one slot.")
+        if n_readers < 1:
+            raise ValueError("The ring needs at least one reader.")
+        self.n_slots = n_slots
+        self.frame_shape = tuple(frame_shape)
+        self.dtype = np.dtype(dtype)
+        self.n_readers = n_readers
+        self.frame_nbytes = int(np.prod(self.frame_shape)) * self.dtype.itemsize
+
+        self._frames_memory = SharedMemory(create=True, size=n_slots * self.frame_nbytes)
+        # Number of readers that have not released each slot yet
+        self._counts_memory = SharedMemory(create=True, size=n_slots * np.dtype(np.int32).itemsize)
+        # Only the creating process frees the blocks, the forked children inherit the ring as it is
+        self._owner_pid = os.getpid()
+        self._lock = multiprocessing.Lock()
+        self._free_slots: multiprocessing.Queue = multiprocessing.Queue()
+        self._ready_slots: list[multiprocessing.Queue] = [multiprocessing.Queue() for _ in range(n_readers)]
+        self._attach_arrays()
+        self._counts[:] = 0
+        for slot in range(n_slots):
+            self._free_slots.put(slot)
+
+    def _attach_arrays(self) -> None:
+        """Map the NumPy arrays on the shared memory blocks."""
+        self._frames = np.ndarray(
+            (self.n_slots, *self.frame_shape), dtype=self.dtype, buffer=self._frames_memory.buf
+        )
+        self._counts = np.ndarray((self.n_slots,), dtype=np.int32, buffer=self._counts_memory.buf)
+
+    def __getstate__(self) -> dict:
+        """Pickle the ring by the names of its shared memory blocks, the frames are not copied."""
+        state = self.__dict__.copy()
+        for key in ("_frames_memory", "_counts_memory", "_frames", "_counts"):
+            state.pop(key)
+        state["_frames_name"] = self._frames_memory.name
+        state["_counts_name"] = self._counts_memory.name
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Attach to the shared memory blocks of the ring in a worker process."""
+        self._frames_memory = SharedMemory(name=state.pop("_frames_name"))
+        self._counts_memory = SharedMemory(name=state.pop("_counts_name"))
+        self.__dict__.update(state)
+        self._attach_arrays()
+
+    def __enter__(self) -> "FrameRing":
+        """Use the ring as a context manager, the shared memory being freed at the exit."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Free the shared memory."""
+        self.close()
+
+    def view(self, slot: int) -> NDArray:
+        """Zero-copy view of a slot.
+
+        Args:
+            slot (int): Slot index.
+
+        Returns:
+            NDArray: Frame stored in the slot, shape frame_shape.
+        """
+        return self._frames[slot]
+
+    def acquire(self, timeout: float | None = None) -> tuple[int, NDArray]:
+        """Take a free slot to write a frame, waiting for one if they are all in use.
+
+        Args:
+            timeout (float | None): Maximum waiting time (s), unlimited if None.
+
+        Returns:
+            tuple[int, NDArray]: Slot index and writable view of the slot.
+        """
+        try:
+            slot = self._free_slots.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("No frame slot was released in time.") from None
+        return slot, self._frames[slot]
+
+    def publish(self, slot: int, frame_index: int) -> None:
+        """Hand a written slot to every reader.
+
+        Args:
+            slot (int): Slot index, obtained from `acquire`.
+            frame_index (int): Index of the frame in its sequence.
+        """
+        with self._lock:
+            self._counts[slot] = self.n_readers
+        for ready_slots in self._ready_slots:
+            ready_slots.put((slot, frame_index))
+
+    def close_stream(self) -> None:
+        """Tell every reader that no more frames will be published."""
+        for ready_slots in self._ready_slots:
+            ready_slots.put((END_OF_STREAM, END_OF_STREAM))
+
+    def receive(self, reader: int = 0, timeout: float | None = None) -> tuple[int, int] | None:
+        """Wait for the next frame published to a reader.
+
+        Args:
+            reader (int): Index of the reader, in [0, n_readers[.
+            timeout (float | None): Maximum waiting time (s), unlimited if None.
+
+        Returns:
+            tuple[int, int] | None: Slot index and frame index, None at the end of the stream. The slot must be
+                released once read.
+        """
+        try:
+            slot, frame_index = self._ready_slots[reader].get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("No frame was published in time.") from None
+        if frame_index == END_OF_STREAM:
+            return None
+        return slot, frame_index
+
+    def release(self, slot: int) -> None:
+        """Give a slot back, it is recycled once released by every reader.
+
+        Args:
+            slot (int): Slot index, obtained from `receive`.
+        """
+        with self._lock:
+            self._counts[slot] -= 1
+            free = self._counts[slot] == 0
+        if free:
+            self._free_slots.put(slot)
+
+    def close(self) -> None:
+        """Detach from the shared memory, and free it in the process that created the ring."""
+        if not hasattr(self, "_frames"):
+            return
+        # The views must be dropped before the blocks can be closed
+        del self._frames, self._counts
+        self._frames_memory.close()
+        self._counts_memory.close()
+        if os.getpid() == self._owner_pid:
+            for memory in (self._frames_memory, self._counts_memory):
+                with contextlib.suppress(FileNotFoundError):
+                    memory.unlink()
@@ -0,0 +1,288 @@
+"""Reference frames of the scene and batch conversions between them.
+
+Frames:
+    - eci: equatorial inertial frame, the scene frame (z towards the celestial north pole, x towards the vernal
+      equinox). TEME states given by SGP4 are used as is.
+    - ecef: Earth fixed frame, rotated from the ECI frame by the Greenwich Mean Sidereal Time.
+    - lvlh: RSW frame of a chief, x radial (outward), y along-track, z cross-track (orbit normal).
+    - camera: x towards the image right, y towards the image top (the sky vector) and z along the boresight, as
+      the POV-Ray camera (right = sky x direction).
+
+Rotations are stacks of matrices, shape (..., 3, 3), mapping the vectors of a frame into the ECI frame, and are
+applied with einsum. The quaternion equivalents are scalar first.
+"""
+
+from functools import cached_property
+
+import numpy as np
+from numpy.typing import NDArray
+
+from space_based_telescope_image_generator.processings.ephemeris import earth_rotation_angle
+from space_based_telescope_image_generator.processings.quaternions import matrix_to_quaternion
+from space_based_telescope_image_generator.utils.constants import EARTH_ROTATION_RATE
+
+FRAMES = ("eci", "ecef", "lvlh", "camera")
+
+
+def axis_rotation(angles: NDArray | float, axis: int) -> NDArray:
+    """Elementary rotation matrices about a coordinate axis.
+
+    Args:
+        angles (NDArray | float): Rotation angles [rad], shape (...).
+        axis (int): Rotation axis (0 = x, 1 = y, 2 = z).
+
+    Returns:
+        NDArray: Rotation matrices, shape (..., 3, 3).
+    """
+    if axis not in (0, 1, 2):
+        raise ValueError(f"Wrong axis number {axis} provided for rotation matrix, use 0, 1 or 2.")
+    angles = np.asarray(angles, dtype=float)
+    c, s = np.cos(angles), np.sin(angles)
+    rotation = np.zeros(angles.shape + (3, 3))
+    # Cyclic order of the other axes, so that every rotation is right-handed
+    i, j = (axis + 1) % 3, (axis + 2) % 3
+    rotation[..., axis, axis] = 1.0
+    rotation[..., i, i] = c
+    rotation[..., j, j] = c
+    rotation[..., i, j] = -s
+    rotation[..., j, i] = s
+    return rotation
+
+
+def apply_rotation(rotation: NDArray, vectors: NDArray) -> NDArray:
+    """Rotate vectors, i.e. express the vectors of a frame in the ECI frame.
+
+    Args:
+        rotation (NDArray): Rotation matrices, shape (..., 3, 3).
+        vectors (NDArray): Vectors, shape (..., 3).
+
+    Returns:
+        NDArray: Rotated vectors, shape (..., 3).
+    """
+    return np.einsum("...ij,...j->...i", rotation, vectors)
+
+
+def apply_inverse_rotation(rotation: NDArray, vectors: NDArray) -> NDArray:
+    """Rotate vectors by the transposed matrices, i.e. express ECI vectors in the rotated frame.
+
+    Args:
+        rotation (NDArray): Rotation matrices, shape (..., 3, 3).
+        vectors (NDArray): Vectors, shape (..., 3).
+
+    Returns:
+        NDArray: Rotated vectors, shape (..., 3).
+    """
+    return np.einsum("...ji,...j->...i", rotation, vectors)
+
+
+def perifocal_rotation(raan: NDArray | float, inclination: NDArray | float, arg_perigee: NDArray | float) -> NDArray:
+    """Rotation from the perifocal frame of an orbit to the ECI frame, Rz(raan) Rx(i) Rz(omega).
+
+    Args:
+        raan (NDArray | float): Right ascension of the ascending node [rad].
+        inclination (NDArray | float): Inclination [rad].
+        arg_perigee (NDArray | float): Argument of perigee [rad].
+
+    Returns:
+        NDArray: Rotation matrices, shape (..., 3, 3).
+    """
+    return axis_rotation(raan, 2) @ axis_rotation(inclination, 0) @ axis_rotation(arg_perigee, 2)
+
+
+def ecef_rotation(times: NDArray) -> NDArray:
+    """Rotation from the ECEF frame to the ECI frame.
+
+    Args:
+        times (NDArray): Timestamps (s), shape (N,).
+
+    Returns:
+        NDArray: Rotation matrices, shape (N, 3, 3).
+    """
+    return axis_rotation(earth_rotation_angle(times), 2)
+
+
+def lvlh_rotation(position: NDArray, velocity: NDArray) -> NDArray:
+    """Compute the rotation matrices from the LVLH frame to the inertial frame.
+
+    Args:
+        position (NDArray): Chief positions [km], shape (..., 3).
+        velocity (NDArray): Chief velocities [km/s], shape (..., 3).
+
+    Returns:
+        NDArray: Matrices (..., 3, 3) whose columns are the radial, along-track and cross-track axes.
+    """
+    radial = position / np.linalg.norm(position, axis=-1, keepdims=True)
+    normal = np.cross(position, velocity)
+    normal = normal / np.linalg.norm(normal, axis=-1, keepdims=True)
+    along_track = np.cross(normal, radial)
+    return np.stack((radial, along_track, normal), axis=-1)
+
+
+def camera_rotation(boresight: NDArray, sky: NDArray) -> NDArray:
+    """Compute the rotation matrices from the camera frame to the inertial frame.
+
+    Args:
+        boresight (NDArray): Unit line of sight directions, shape (..., 3).
+        sky (NDArray): Unit up vectors, orthogonal to the boresight, shape (..., 3).
+
+    Returns:
+        NDArray: Matrices (..., 3, 3) whose columns are the image right, the image up and the boresight.
+    """
+    return np.stack((np.cross(sky, boresight), sky, boresight), axis=-1)
+
+
+def eci_to_ecef(
+    times: NDArray, positions: NDArray, velocities: NDArray | None = None
+) -> tuple[NDArray, NDArray | None]:
+    """Express inertial states in the Earth fixed frame.
+
+    Args:
+        times (NDArray): Timestamps (s), shape (N,).
+        positions (NDArray): ECI positions [km], shape (N, 3).
+        velocities (NDArray | None): ECI velocities [km/s], shape (N, 3).
+
+    Returns:
+        tuple[NDArray, NDArray | None]: ECEF positions [km] and velocities [km/s] (None without velocities).
+    """
+    rotation = ecef_rotation(times)
+    ecef_positions = apply_inverse_rotation(rotation, positions)
+    if velocities is None:
+        return ecef_positions, None
+    omega = np.array([0.0, 0.0, EARTH_ROTATION_RATE])
+    return ecef_positions, apply_inverse_rotation(rotation, velocities) - np.cross(omega, ecef_positions)
+
+
+def ecef_to_eci(
+    times: NDArray, positions: NDArray, velocities: NDArray | None = None
+) -> tuple[NDArray, NDArray | None]:
+    """Express Earth fixed states in the inertial frame.
+
+    Args:
+        times (NDArray): Timestamps (s), shape (N,).
+        positions (NDArray): ECEF positions [km], shape (N, 3).
+        velocities (NDArray | None): ECEF velocities [km/s], shape (N, 3).
+
+    Returns:
+        tuple[NDArray, NDArray | None]: ECI positions [km] and velocities [km/s] (None without velocities).
+    """
+    rotation = ecef_rotation(times)
+    eci_positions = apply_rotation(rotation, positions)
+    if velocities is None:
+        return eci_positions, None
+    omega = np.array([0.0, 0.0, EARTH_ROTATION_RATE])
+    return eci_positions, apply_rotation(rotation, velocities + np.cross(omega, positions))
+
+
+class FrameStack:
+    """Rotation stacks of a sequence, computed once and shared by every conversion of the sequence.
+
+    The ECEF rotations need the frame times, the LVLH rotations the chief states and the camera rotations the
+    camera pointing. The stacks and their combinations are memoised, so converting many vector sets (positions,
+    velocities, attitudes...) between the same frames costs a single einsum each.
+    """
+
+    def __init__(
+        self,
+        times: NDArray | None = None,
+        chief_positions: NDArray | None = None,
+        chief_velocities: NDArray | None = None,
+        boresight: NDArray | None = None,
+        sky: NDArray | None = None,
+    ) -> None:
+        """Class constructor.
+
+        Args:
+            times (NDArray | None): Frame timestamps (s), shape (N,), required by the ECEF frame.
+            chief_positions (NDArray | None): Chief positions [km], shape (N, 3), required by the LVLH frame.
+            chief_velocities (NDArray | None): Chief velocities [km/s], shape (N, 3), required by the LVLH frame.
+            boresight (NDArray | None): Camera lines of sight, shape (N, 3), required by the camera frame.
+            sky (NDArray | None): Camera up vectors, shape (N, 3), required by the camera frame.
+        """
+        self.times = times
+        self.chief_positions = chief_positions
+        self.chief_velocities = chief_velocities
+        self.boresight = boresight
+        self.sky = sky
+        self._rotations: dict[tuple[str, str], NDArray] = {}
+
+    @cached_property
+    def ecef_to_eci(self) -> NDArray:
+        """Rotations from the ECEF frame to the ECI frame, shape (N, 3, 3)."""
+        if self.times is None:
+            raise ValueError("The frame times are required by the ECEF frame.")
+        return ecef_rotation(self.times)
+
+    @cached_property
+    def lvlh_to_eci(self) -> NDArray:
+        """Rotations from the LVLH frame to the ECI frame, shape (N, 3, 3)."""
+        if self.chief_positions is None or self.chief_velocities is None:
+            raise ValueError("The chief states are required by the LVLH frame.")
+        return lvlh_rotation(self.chief_positions, self.chief_velocities)
+
+    @cached_property
+    def camera_to_eci(self) -> NDArray:
+        """Rotations from the camera frame to the ECI frame, shape (N, 3, 3)."""
+        if self.boresight is None or self.sky is None:
+            raise ValueError("The camera pointing is required by the camera frame.")
+        return camera_rotation(self.boresight, self.sky)
+
+    def _to_eci(self, frame: str) -> NDArray | None:
+        """Rotations from a frame to the ECI frame, None for the ECI frame itself."""
+        if frame not in FRAMES:
+            raise ValueError(f"Unknown frame {frame}, use one of {FRAMES}.")
+        if frame == "eci":
+            return None
+        return getattr(self, f"{frame}_to_eci")
+
+    def rotation(self, from_frame: str, to_frame: str) -> NDArray:
+        """Rotations between two frames, memoised.
+
+        Args:
+            from_frame (str): Frame of the input vectors, one of FRAMES.
+            to_frame (str): Frame of the output vectors, one of FRAMES.
+
+        Returns:
+            NDArray: Matrices mapping the vectors of from_frame into to_frame, shape (N, 3, 3) (or (3, 3) for
+                the identity).
+        """
+        key = (from_frame, to_frame)
+        if key not in self._rotations:
+            source, target = self._to_eci(from_frame), self._to_eci(to_frame)
+            if source is None and target is None:
+                rotation = np.eye(3)
+            elif target is None:
+                rotation = source
+            elif source is None:
+                rotation = np.swapaxes(target, -1, -2)
+            else:
+                rotation = np.einsum("...ji,...jk->...ik", target, source)
+            self._rotations[key] = rotation
+        return self._rotations[key]
+
+    def quaternions(self, from_frame: str, to_frame: str) -> NDArray:
+        """Quaternions (scalar first) of the rotations between two frames.
+
+        Args:
+            from_frame (str): Frame of the input vectors, one of FRAMES.
+            to_frame (str): Frame of the output vectors, one of FRAMES.
+
+        Returns:
+            NDArray: Unit quaternions, shape (N, 4).
+        """
+        return matrix_to_quaternion(self.rotation(from_frame, to_frame))
+
+    def convert(self, vectors: NDArray, from_frame: str, to_frame: str) -> NDArray:
+        """Express directions (or positions about the common origin) in another frame.
+
+        The frames only differ by their orientation here: positions relative to the chief or the camera must be
+        offset by the caller.
+
+        Args:
+            vectors (NDArray): Vectors, shape (N, 3).
+            from_frame (str): Frame of the input vectors, one of FRAMES.
+            to_frame (str): Frame of the output vectors, one of FRAMES.
+
+        Returns:
+            NDArray: Converted vectors, shape (N, 3).
+        """
+        return apply_rotation(self.rotation(from_frame, to_frame), vectors)
@@ -0,0 +1,665 @@
+"""Generation of image datasets from a declarative sampling of the scenes.
+
+A SamplingSpec describes the distributions of the scene parameters (target orbit offsets with respect to the
+camera satellite, target attitude and slew rate, Sun direction, field of view and target class). The jobs sampled
+from it are stored in a SQLite queue, from which any number of worker processes claim them. The parameters of a job
+only depend on the spec seed and on the job index, and a job is marked as done once its images are written: a
+crashed or pre-empted run is resumed by running the generator again on the same queue, only the jobs that are not
+done being rendered. The pending jobs are claimed longest first, their render time being predicted by a cost model
+(see cost_model) that the coordinator refits from the render times measured by the workers while they run. With a
+memory budget, the renders of the workers only start while their learnt peak memory fits in it (see memory). With a
+CpuAllocation, each worker is pinned to a CPU slot and renders with the slot number of threads.
+"""
+
+import json
+import multiprocessing
+import multiprocessing.connection
+import os
+import socket
+import sqlite3
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+from pydantic import BaseModel, field_validator
+
+from space_based_telescope_image_generator.objects.targets.primitive_cubesat import PrimitiveCubesat
+from space_based_telescope_image_generator.objects.targets.rusty_satellite import RustySatellite
+from space_based_telescope_image_generator.objects.targets.target_object import TargetObject
+from space_based_telescope_image_generator.objects.tracking_satellite import TrackingSatellite
+from space_based_telescope_image_generator.processings.attitude import ConstantSlewAttitudeModel
+from space_based_telescope_image_generator.processings.cost_model import (
+    CostModel,
+    RenderFeatures,
+    geometry_features,
+    pack_longest_first,
+)
+from space_based_telescope_image_generator.processings.cpu_allocation import CpuAllocation, set_affinity
+from space_based_telescope_image_generator.processings.memory import HostMemoryBudget, MemoryEstimator, RenderAdmission
+from space_based_telescope_image_generator.processings.propagation import KeplerianModel
+from space_based_telescope_image_generator.processings.scene_manager import SceneManager
+
+TARGET_CLASSES: dict[str, type[TargetObject]] = {
+    "PrimitiveCubesat": PrimitiveCubesat,
+    "RustySatellite": RustySatellite,
+}
+ORBIT_ELEMENTS = ("a", "e", "i", "Omega", "omega", "nu")  # KeplerianModel elements that can be offset
+DISTRIBUTIONS = ("constant", "uniform", "normal", "choice")
+JOB_STATUSES = ("pending", "running", "done", "failed")
+ParameterValue = float | int | str  # Value of a sampled parameter or of a target constructor argument
+
+
+class Distribution(BaseModel):
+    """Distribution of a sampled parameter."""
+
+    kind: str = "constant"  # One of DISTRIBUTIONS
+    value: ParameterValue = 0.0  # constant
+    low: float = 0.0  # uniform
+    high: float = 1.0  # uniform
+    mean: float = 0.0  # normal
+    std: float = 1.0  # normal
+    choices: list[ParameterValue] = []  # choice
+    weights: list[float] | None = None  # choice, uniform if None
+
+    @field_validator("kind")
+    @classmethod
+    def check_kind(cls, kind: str) -> str:
+        """Check the distribution kind."""
+        if kind not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution {kind}, use one of {DISTRIBUTIONS}.")
+        return kind
+
+    def sample(self, rng: np.random.Generator) -> ParameterValue:
+        """Draw a value.
+
+        Args:
+            rng (np.random.Generator): Random generator.
+
+        Returns:
+            ParameterValue: Sampled value.
+        """
+        if self.kind == "uniform":
+            return float(rng.uniform(self.low, self.high))
+        if self.kind == "normal":
+            return float(rng.normal(self.mean, self.std))
+        if self.kind == "choice":
+            if not self.choices:
+                raise ValueError("A choice distribution needs choices.")
+            probabilities = None
+            if self.weights is not None:
+                probabilities = np.asarray(self.weights, dtype=float) / np.sum(self.weights)
+            return self.choices[int(rng.choice(len(self.choices), p=probabilities))]
+        return self.value
+
+    def sample_number(self, rng: np.random.Generator) -> float:
+        """Draw a numerical value.
+
+        Args:
+            rng (np.random.Generator): Random generator.
+
+        Returns:
+            float: Sampled value.
+        """
+        value = self.sample(rng)
+        if isinstance(value, str):
+            raise ValueError(f"Numerical value expected, {value!r} was sampled.")
+        return float(value)
+
+
+class JobParameters(BaseModel):
+    """Parameters of one generated scene."""
+
+    job_index: int
+    satellite_orbit: KeplerianModel
+    target_orbit: KeplerianModel
+    target_class: str
+    target_options: dict[str, ParameterValue] = {}
+    initial_attitude_deg: tuple[float, float, float]
+    slew_deg_s: float
+    sun_direction_deg: float
+    fov_deg: float
+    image_width: int
+    image_height: int
+    framerate: int | None = None
+    duration_s: float | None = None
+
+
+class SamplingSpec(BaseModel):
+    """Declarative description of the scenes of a dataset."""
+
+    n_jobs: int
+    seed: int = 0
+    satellite_tle: list[str]  # Orbit of the camera satellite
+    orbit_offsets: dict[str, Distribution] = {}  # Offsets of the target elements (KeplerianModel units)
+    initial_attitude_deg: tuple[Distribution, Distribution, Distribution] = (
+        Distribution(kind="uniform", low=0.0, high=360.0),
+        Distribution(kind="uniform", low=0.0, high=360.0),
+        Distribution(kind="uniform", low=0.0, high=360.0),
+    )
+    slew_deg_s: Distribution = Distribution()
+    sun_direction_deg: Distribution = Distribution(kind="uniform", low=0.0, high=360.0)
+    fov_deg: Distribution = Distribution(value=60.0)
+    target_class: Distribution = Distribution(value="PrimitiveCubesat")
+    target_options: dict[str, dict[str, ParameterValue]] = {}  # Constructor arguments per target class
+    image_width: int = 1920
+    image_height: int = 1080
+    framerate: int | None = None  # Single image per job if None
+    duration_s: float | None = None
+
+    @field_validator("orbit_offsets")
+    @classmethod
+    def check_orbit_offsets(cls, offsets: dict[str, Distribution]) -> dict[str, Distribution]:
+        """Check that the offsets apply to KeplerianModel elements."""
+        for element in offsets:
+            if element not in ORBIT_ELEMENTS:
+                raise ValueError(f"Unknown orbital element {element}, use one of {ORBIT_ELEMENTS}.")
+        return offsets
+
+    def sample_job(self, job_index: int) -> JobParameters:
+        """Sample the parameters of a job.
+
+        The random generator is seeded with the spec seed and the job index, a job is thus always sampled the same
+        way whatever the order and the number of sampled jobs.
+
+        Args:
+            job_index (int): Index of the job.
+
+        Returns:
+            JobParameters: Parameters of the scene.
+        """
+        rng = np.random.default_rng([self.seed, job_index])
+        satellite_orbit = KeplerianModel.from_tle(self.satellite_tle)
+        elements = satellite_orbit.model_dump()
+        for element, distribution in self.orbit_offsets.items():
+            elements[element] += distribution.sample_number(rng)
+        target_class = str(self.target_class.sample(rng))
+        if target_class not in TARGET_CLASSES:
+            raise ValueError(f"Unknown target class {target_class}, use one of {tuple(TARGET_CLASSES)}.")
+        return JobParameters(
+            job_index=job_index,
+            satellite_orbit=satellite_orbit,
+            target_orbit=KeplerianModel(**elements),
+            target_class=target_class,
+            target_options=self.target_options.get(target_class, {}),
+            initial_attitude_deg=(
+                self.initial_attitude_deg[0].sample_number(rng),
+                self.initial_attitude_deg[1].sample_number(rng),
+                self.initial_attitude_deg[2].sample_number(rng),
+            ),
+            slew_deg_s=self.slew_deg_s.sample_number(rng),
+            sun_direction_deg=self.sun_direction_deg.sample_number(rng),
+            fov_deg=self.fov_deg.sample_number(rng),
+            image_width=self.image_width,
+            image_height=self.image_height,
+            framerate=self.framerate,
+            duration_s=self.duration_s,
+        )
+
+
+class JobQueue:
+    """Persistent queue of generation jobs in a SQLite file, shared by the worker processes."""
+
+    def __init__(self, path: Path, timeout_s: float = 60.0) -> None:
+        """Class constructor, create the queue if needed.
+
+        Args:
+            path (Path): SQLite file.
+            timeout_s (float): Maximum waiting time for the lock of the file (s).
+        """
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Transactions are opened explicitly, to claim the jobs atomically
+        self._connection = sqlite3.connect(path, timeout=timeout_s, isolation_level=None)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id INTEGER PRIMARY KEY,
+                parameters TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                updated_at REAL,
+                output TEXT,
+                error TEXT,
+                predicted_s REAL,
+                elapsed_s REAL
+            )
+            """
+        )
+        # Queues created before the cost model
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(jobs)")}
+        for column in ("predicted_s", "elapsed_s"):
+            if column not in columns:
+                self._connection.execute(f"ALTER TABLE jobs ADD COLUMN {column} REAL")
+
+    def close(self) -> None:
+        """Close the connection to the queue."""
+        self._connection.close()
+
+    def submit(self, jobs: list[JobParameters]) -> int:
+        """Add jobs to the queue, the jobs already present (whatever their status) being left untouched.
+
+        Args:
+            jobs (list[JobParameters]): Jobs to be added.
+
+        Returns:
+            int: Number of added jobs.
+        """
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = self._connection.executemany(
+                "INSERT OR IGNORE INTO jobs (job_id, parameters, updated_at) VALUES (?, ?, ?)",
+                [(job.job_index, job.model_dump_json(), time.time()) for job in jobs],
+            )
+            self._connection.execute("COMMIT")
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        return cursor.rowcount
+
+    def claim(self, worker: str) -> JobParameters | None:
+        """Atomically take the next pending job, the longest predicted one first (in index order without prediction).
+
+        Args:
+            worker (str): Name of the worker.
+
+        Returns:
+            JobParameters | None: Claimed job, None if no job is pending.
+        """
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._connection.execute(
+                "SELECT job_id, parameters FROM jobs WHERE status = 'pending' "
+                "ORDER BY COALESCE(predicted_s, 0) DESC, job_id LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                self._connection.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, worker = ?, updated_at = ? "
+                    "WHERE job_id = ?",
+                    (worker, time.time(), row[0]),
+                )
+            self._connection.execute("COMMIT")
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        return None if row is None else JobParameters.model_validate_json(row[1])
+
+    def complete(self, job_id: int, output: Path, elapsed_s: float | None = None) -> None:
+        """Record a job as done, recording it again has no effect.
+
+        Args:
+            job_id (int): Job index.
+            output (Path): Folder of the job outputs.
+            elapsed_s (float | None): Measured render time of the job [s].
+        """
+        self._connection.execute(
+            "UPDATE jobs SET status = 'done', output = ?, error = NULL, elapsed_s = ?, updated_at = ? "
+            "WHERE job_id = ? AND status != 'done'",
+            (str(output), elapsed_s, time.time(), job_id),
+        )
+
+    def fail(self, job_id: int, error: str, max_attempts: int = 3) -> None:
+        """Record a job failure, the job being pending again until it has been attempted max_attempts times.
+
+        Args:
+            job_id (int): Job index.
+            error (str): Error message.
+            max_attempts (int): Maximum number of attempts of a job.
+        """
+        self._connection.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts < ? THEN 'pending' ELSE 'failed' END, error = ?, "
+            "updated_at = ? WHERE job_id = ? AND status = 'running'",
+            (max_attempts, error, time.time(), job_id),
+        )
+
+    def requeue_running(self) -> int:
+        """Make the jobs left running by a stopped run pending again, before resuming it.
+
+        Returns:
+            int: Number of requeued jobs.
+        """
+        cursor = self._connection.execute(
+            "UPDATE jobs SET status = 'pending', worker = NULL, updated_at = ? WHERE status = 'running'",
+            (time.time(),),
+        )
+        return cursor.rowcount
+
+    def pending_ids(self) -> list[int]:
+        """Indices of the pending jobs.
+
+        Returns:
+            list[int]: Job indices.
+        """
+        return [row[0] for row in self._connection.execute("SELECT job_id FROM jobs WHERE status = 'pending'")]
+
+    def timings(self) -> dict[int, float]:
+        """Measured render times of the done jobs.
+
+        Returns:
+            dict[int, float]: Render time [s] by job index.
+        """
+        rows = self._connection.execute(
+            "SELECT job_id, elapsed_s FROM jobs WHERE status = 'done' AND elapsed_s IS NOT NULL"
+        )
+        return dict(rows.fetchall())
+
+    def set_predictions(self, predictions: dict[int, float]) -> None:
+        """Set the predicted render times of pending jobs, which give their claim order.
+
+        Args:
+            predictions (dict[int, float]): Predicted render time [s] by job index.
+        """
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            self._connection.executemany(
+                "UPDATE jobs SET predicted_s = ? WHERE job_id = ? AND status = 'pending'",
+                [(predicted_s, job_id) for job_id, predicted_s in predictions.items()],
+            )
+            self._connection.execute("COMMIT")
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+
+    def counts(self) -> dict[str, int]:
+        """Number of jobs per status.
+
+        Returns:
+            dict[str, int]: Counts of JOB_STATUSES.
+        """
+        counts = dict.fromkeys(JOB_STATUSES, 0)
+        for status, count in self._connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"):
+            counts[status] = count
+        return counts
+
+
+def build_target(job: JobParameters) -> TargetObject:
+    """Create the target of a job.
+
+    Args:
+        job (JobParameters): Parameters of the scene.
+
+    Returns:
+        TargetObject: Target, at its state of the first frame.
+    """
+    # The options are checked by the constructor of the sampled class
+    target_class: Callable[..., TargetObject] = TARGET_CLASSES[job.target_class]
+    return target_class(
+        kepler_dynamic_model=job.target_orbit,
+        attitude_model=ConstantSlewAttitudeModel(job.initial_attitude_deg, job.slew_deg_s),
+        **job.target_options,
+    )
+
+
+def build_scene(job: JobParameters) -> SceneManager:
+    """Create the scene of a job.
+
+    Args:
+        job (JobParameters): Parameters of the scene.
+
+    Returns:
+        SceneManager: Scene, the camera pointing at the target.
+    """
+    target = build_target(job)
+    satellite = TrackingSatellite(
+        kepler_dynamic_model=job.satellite_orbit,
+        fov=job.fov_deg,
+        image_width=job.image_width,
+        image_height=job.image_height,
+    )
+    satellite.target_pointing(target.get_position())
+    return SceneManager(target=target, satellite=satellite, sun_direction_deg=job.sun_direction_deg)
+
+
+def job_features(job: JobParameters) -> RenderFeatures:
+    """Features of the render time of a job, computed from its parameters without building the scene.
+
+    Args:
+        job (JobParameters): Parameters of the scene.
+
+    Returns:
+        RenderFeatures: Features of the first frame, the target class being the profile.
+    """
+    n_frames = 1
+    if job.framerate is not None and job.duration_s is not None:
+        n_frames = max(int(job.duration_s / (1 / job.framerate)), 1)
+    # States of the first frame, as set by build_scene. Only the target is built, for its bounding sphere: the scene
+    # (home folder checks, astral objects) is not needed
+    position, velocity = (np.asarray(state, dtype=float) for state in job.satellite_orbit.keplerian2cartesian())
+    target = build_target(job)
+    return geometry_features(
+        position,
+        velocity,
+        np.asarray(target.position, dtype=float),
+        (job.fov_deg, job.image_width, job.image_height),
+        target.bounding_radius_km,
+        profile=job.target_class,
+        n_frames=n_frames,
+    )
+
+
+class JobScheduler:
+    """Order of the pending jobs of a queue, longest predicted render time first, refitted as the jobs are done."""
+
+    def __init__(self, queue: JobQueue, spec: SamplingSpec, cost_model: CostModel | None = None) -> None:
+        """Class constructor.
+
+        Args:
+            queue (JobQueue): Queue of the jobs.
+            spec (SamplingSpec): Sampling of the jobs, their features being computed from their parameters.
+            cost_model (CostModel | None): Render time model, a new model with the default prior if None.
+        """
+        self.queue = queue
+        self.spec = spec
+        self.cost_model = CostModel() if cost_model is None else cost_model
+        self.features: dict[int, RenderFeatures] = {}
+        self.observed: set[int] = set()
+
+    def _features(self, job_index: int) -> RenderFeatures:
+        """Features of a job, computed once."""
+        if job_index not in self.features:
+            self.features[job_index] = job_features(self.spec.sample_job(job_index))
+        return self.features[job_index]
+
+    def update(self) -> dict[int, float]:
+        """Learn the render times measured since the last update and predict the pending jobs again.
+
+        Returns:
+            dict[int, float]: Predicted render time [s] of the pending jobs.
+        """
+        for job_index, elapsed_s in self.queue.timings().items():
+            if job_index not in self.observed:
+                self.cost_model.observe(self._features(job_index), elapsed_s)
+                self.observed.add(job_index)
+        predictions = {
+            job_index: self.cost_model.predict(self._features(job_index)) for job_index in self.queue.pending_ids()
+        }
+        self.queue.set_predictions(predictions)
+        return predictions
+
+
+def job_folder(output_folder: Path, job_index: int) -> Path:
+    """Output folder of a job.
+
+    Args:
+        output_folder (Path): Output folder of the dataset.
+        job_index (int): Job index.
+
+    Returns:
+        Path: Folder of the job outputs.
+    """
+    return output_folder.joinpath(f"job_{job_index:06d}")
+
+
+def run_job(
+    job: JobParameters,
+    output_folder: Path,
+    render_admission: RenderAdmission | None = None,
+    *,
+    render_threads: int | None = None,
+) -> Path:
+    """Render a job, the outputs of a previous attempt being overwritten.
+
+    Args:
+        job (JobParameters): Parameters of the scene.
+        output_folder (Path): Output folder of the dataset.
+        render_admission (RenderAdmission | None): Memory admission of the renders, None to render without waiting.
+        render_threads (int | None): Render threads (+WT) of each POV-Ray process, the POV-Ray default if None.
+
+    Returns:
+        Path: Folder of the job outputs.
+    """
+    folder = job_folder(output_folder, job.job_index)
+    folder.mkdir(parents=True, exist_ok=True)
+    folder.joinpath("parameters.json").write_text(job.model_dump_json(indent=2))
+    scene_manager = build_scene(job)
+    scene_manager.render_admission = render_admission
+    scene_manager.render_threads = render_threads
+    if job.framerate is None:
+        scene_manager.render_image(folder.joinpath("image.png"))
+    else:
+        if job.duration_s is None:
+            raise ValueError("A video job needs a duration.")
+        scene_manager.render_video(job.framerate, job.duration_s, folder)
+    return folder
+
+
+def worker_render_admission(memory_budget_bytes: float | None, peaks_path: Path) -> RenderAdmission | None:
+    """Memory admission of the renders of a worker.
+
+    Args:
+        memory_budget_bytes (float | None): Memory that the renders of all the workers of the host may use together
+            [bytes], None for no admission.
+        peaks_path (Path): File of the peak memory learnt per render profile, shared by the workers.
+
+    Returns:
+        RenderAdmission | None: Admission of the renders, None without budget.
+    """
+    if memory_budget_bytes is None:
+        return None
+    estimator = MemoryEstimator(SceneManager.resources_folder(), peaks_path)
+    return RenderAdmission(HostMemoryBudget(memory_budget_bytes), estimator)
+
+
+def run_worker(
+    queue_path: Path,
+    output_folder: Path,
+    worker: str | None = None,
+    max_attempts: int = 3,
+    *,
+    memory_budget_bytes: float | None = None,
+    cpu_slot: tuple[int, ...] = (),
+    render_threads: int | None = None,
+) -> int:
+    """Render the pending jobs of a queue until there is none left.
+
+    Args:
+        queue_path (Path): SQLite file of the queue.
+        output_folder (Path): Output folder of the dataset.
+        worker (str | None): Name of the worker, host and process id by default.
+        max_attempts (int): Maximum number of attempts of a job.
+        memory_budget_bytes (float | None): Memory that the renders of all the workers of the host may use together
+            [bytes], a render waiting until its learnt peak memory fits. None to render without waiting.
+        cpu_slot (tuple[int, ...]): CPUs the worker and its renders are pinned to, not pinned if empty.
+        render_threads (int | None): Render threads (+WT) of each POV-Ray process, the POV-Ray default if None.
+
+    Returns:
+        int: Number of jobs done by the worker.
+    """
+    # Inherited by the POV-Ray processes started by the worker
+    set_affinity(cpu_slot)
+    worker = f"{socket.gethostname()}:{os.getpid()}" if worker is None else worker
+    admission = worker_render_admission(memory_budget_bytes, output_folder.joinpath("memory_peaks.json"))
+    queue = JobQueue(queue_path)
+    done = 0
+    try:
+        while (job := queue.claim(worker)) is not None:
+            start = time.perf_counter()
+            try:
+                output = run_job(job, output_folder, admission, render_threads=render_threads)
+            except Exception as error:
+                print(f"Job {job.job_index} failed: {error!r}")
+                queue.fail(job.job_index, repr(error), max_attempts)
+                continue
+            queue.complete(job.job_index, output, time.perf_counter() - start)
+            done += 1
+    finally:
+        queue.close()
+    return done
+
+
+def generate_dataset(
+    spec: SamplingSpec,
+    output_folder: Path,
+    n_workers: int = 1,
+    max_attempts: int = 3,
+    longest_first: bool = True,
+    cost_model: CostModel | None = None,
+    refresh_s: float = 30.0,
+    *,
+    memory_budget_bytes: float | None = None,
+    cpu_allocation: CpuAllocation | None = None,
+) -> dict[str, int]:
+    """Sample the jobs of a spec and render them, resuming a previous run of the same output folder.
+
+    Args:
+        spec (SamplingSpec): Sampling of the scenes.
+        output_folder (Path): Output folder of the dataset, holding the queue ("jobs.sqlite") and the spec.
+        n_workers (int): Number of worker processes.
+        max_attempts (int): Maximum number of attempts of a job.
+        longest_first (bool): If True, the jobs are claimed longest predicted render time first. Otherwise they
+            are claimed in index order.
+        cost_model (CostModel | None): Render time model, e.g. with a prior fitted on the current host. A new
+            model is used if None, fitted on the render times already measured in the queue.
+        refresh_s (float): Time between two updates of the predictions from the measured render times.
+        memory_budget_bytes (float | None): Memory that the renders of the workers may use together [bytes], None
+            to render without waiting. The workers of other runs on the host share the same budget.
+        cpu_allocation (CpuAllocation | None): If given, one worker runs per CPU slot, with the slot number of render
+            threads (+WT) and pinned to its CPUs, n_workers being ignored.
+
+    Returns:
+        dict[str, int]: Number of jobs per status at the end of the run.
+    """
+    output_folder.mkdir(parents=True, exist_ok=True)
+    spec_path = output_folder.joinpath("spec.json")
+    if spec_path.exists() and json.loads(spec_path.read_text()) != json.loads(spec.model_dump_json()):
+        raise ValueError("The output folder holds the jobs of another spec.")
+    spec_path.write_text(spec.model_dump_json(indent=2))
+
+    cpu_slots = [()] * n_workers if cpu_allocation is None else cpu_allocation.slots()
+    render_threads = None if cpu_allocation is None else cpu_allocation.threads_per_render
+    queue_path = output_folder.joinpath("jobs.sqlite")
+    queue = JobQueue(queue_path)
+    try:
+        # The jobs interrupted by a crash are run again, the added jobs are only the missing ones
+        queue.requeue_running()
+        queue.submit([spec.sample_job(job_index) for job_index in range(spec.n_jobs)])
+        scheduler = JobScheduler(queue, spec, cost_model) if longest_first else None
+        if scheduler is not None:
+            predictions = scheduler.update()
+            _, wall_clock_s = pack_longest_first(predictions, len(cpu_slots))
+            print(f"{len(predictions)} pending jobs, predicted wall-clock time {wall_clock_s:.1f} s")
+
+        workers = [
+            multiprocessing.Process(
+                target=run_worker,
+                args=(queue_path, output_folder, None, max_attempts),
+                kwargs={
+                    "memory_budget_bytes": memory_budget_bytes,
+                    "cpu_slot": cpu_slot,
+                    "render_threads": render_threads,
+                },
+            )
+            for cpu_slot in cpu_slots
+        ]
+        for process in workers:
+            process.start()
+        while running := [process for process in workers if process.is_alive()]:
+            multiprocessing.connection.wait([process.sentinel for process in running], refresh_s)
+            if scheduler is not None:
+                scheduler.update()
+        for process in workers:
+            process.join()
+        return queue.counts()
+    finally:
+        queue.close()
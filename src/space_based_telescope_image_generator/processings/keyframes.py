@@ -0,0 +1,181 @@
+"""Adaptive keyframe sampling, driven by the image-space motion predicted from the trajectories.
+
+A frame is only rendered (keyframe) when the image would have changed by more than a threshold since the last
+keyframe. The image change is predicted in pixels for:
+    - the target centroid and apparent size,
+    - the target attitude seen from the camera (displacement of the target outline),
+    - the Earth limb (direction of the Earth centre and angular radius seen from the camera).
+The other frames of the requested frame rate are held from, blended between or reprojected from the surrounding
+keyframes.
+"""
+
+import numpy as np
+from numpy.typing import NDArray
+
+from space_based_telescope_image_generator.processings.frames import apply_inverse_rotation
+from space_based_telescope_image_generator.processings.pointing import CameraPointing
+from space_based_telescope_image_generator.processings.quaternions import (
+    matrix_to_quaternion,
+    quaternion_conjugate,
+    quaternion_multiply,
+)
+from space_based_telescope_image_generator.utils.constants import earth_radius
+
+INTERPOLATIONS = ("hold", "blend", "reproject")
+
+
+def _angle_between(a: NDArray, b: NDArray) -> NDArray:
+    """Row-wise angle between two vectors [rad]."""
+    return np.arctan2(np.linalg.norm(np.cross(a, b), axis=-1), np.einsum("...i,...i->...", a, b))
+
+
+class KeyframeScheduler:
+    """Select the frames to be rendered from the predicted image motion.
+
+    The scheduler follows a sequence chunk by chunk: the last keyframe is kept between two calls of `select`,
+    `reset` must be called before a new sequence.
+    """
+
+    def __init__(
+        self,
+        threshold_px: float = 1.0,
+        target_radius_km: float = 0.005,
+        max_hold_frames: int | None = None,
+        interpolation: str = "hold",
+        max_hole_fraction: float = 0.002,
+    ) -> None:
+        """Class constructor.
+
+        Args:
+            threshold_px (float): Image motion [px] above which a new keyframe is rendered.
+            target_radius_km (float): Radius of the target bounding sphere [km], used to convert the attitude and
+                range changes into pixels.
+            max_hold_frames (int | None): Maximum number of frames between two keyframes, unlimited if None.
+            interpolation (str): "hold" to repeat the last keyframe, "blend" to cross-fade between the keyframes,
+                "reproject" to warp the keyframes to the poses of the frame (see FrameReprojector).
+            max_hole_fraction (float): With "reproject", maximum fraction of disoccluded pixels before the frame
+                is rendered instead.
+        """
+        if threshold_px <= 0:
+            raise ValueError("The motion threshold must be positive.")
+        if interpolation not in INTERPOLATIONS:
+            raise ValueError(f"Unknown interpolation {interpolation}, use one of {INTERPOLATIONS}.")
+        self.threshold_px = threshold_px
+        self.target_radius_km = target_radius_km
+        self.max_hold_frames = max_hold_frames
+        self.interpolation = interpolation
+        self.max_hole_fraction = max_hole_fraction
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the last keyframe, before scheduling a new sequence."""
+        self._reference: dict[str, NDArray] | None = None
+        self._frames_since_keyframe = 0
+
+    @staticmethod
+    def frame_states(
+        sat_positions: NDArray, target_positions: NDArray, pointing: CameraPointing, target_quaternions: NDArray
+    ) -> dict[str, NDArray]:
+        """Quantities of each frame seen from the camera.
+
+        Args:
+            sat_positions (NDArray): Satellite positions [km], shape (n, 3).
+            target_positions (NDArray): Target positions [km], shape (n, 3).
+            pointing (CameraPointing): Camera pointing of the frames.
+            target_quaternions (NDArray): Target body to scene quaternions (scalar first), shape (n, 4).
+
+        Returns:
+            dict[str, NDArray]: Target direction and range, target attitude, Earth direction and angular radius
+                in the camera frame.
+        """
+        camera_to_scene = pointing.rotation
+        line_of_sight = target_positions - sat_positions
+        range_km = np.linalg.norm(line_of_sight, axis=-1)
+        earth_distance = np.linalg.norm(sat_positions, axis=-1)
+        return {
+            "target_direction": apply_inverse_rotation(camera_to_scene, line_of_sight / range_km[:, None]),
+            "range_km": range_km,
+            "target_attitude": quaternion_multiply(
+                quaternion_conjugate(matrix_to_quaternion(camera_to_scene)), target_quaternions
+            ),
+            "earth_direction": apply_inverse_rotation(camera_to_scene, -sat_positions / earth_distance[:, None]),
+            "earth_angular_radius": np.arcsin(np.clip(earth_radius / earth_distance, -1.0, 1.0)),
+        }
+
+    def image_motion(
+        self, reference: dict[str, NDArray], states: dict[str, NDArray], focal_px: float
+    ) -> dict[str, NDArray]:
+        """Predict the image motion between a reference frame and candidate frames.
+
+        Args:
+            reference (dict[str, NDArray]): States of the reference frame (see `frame_states`), shape (1, ...).
+            states (dict[str, NDArray]): States of the candidate frames, shape (n, ...).
+            focal_px (float): Focal length [px].
+
+        Returns:
+            dict[str, NDArray]: Motion [px] of the target centroid, the target outline (attitude) and the Earth
+                limb, shape (n,).
+        """
+        target_radius_px = focal_px * self.target_radius_km / states["range_km"]
+        reference_radius_px = focal_px * self.target_radius_km / reference["range_km"]
+        centroid = focal_px * _angle_between(reference["target_direction"], states["target_direction"])
+        centroid += np.abs(target_radius_px - reference_radius_px)
+
+        # Relative rotation of the target seen from the camera, moving its outline by 2 sin(angle / 2) radius
+        relative = quaternion_multiply(quaternion_conjugate(reference["target_attitude"]), states["target_attitude"])
+        half_angle_sin = np.linalg.norm(relative[..., 1:], axis=-1)
+        attitude = 2 * np.clip(half_angle_sin, 0.0, 1.0) * target_radius_px
+
+        earth = focal_px * (
+            _angle_between(reference["earth_direction"], states["earth_direction"])
+            + np.abs(states["earth_angular_radius"] - reference["earth_angular_radius"])
+        )
+        return {"centroid_px": centroid, "attitude_px": attitude, "earth_limb_px": earth}
+
+    def select(
+        self,
+        sat_positions: NDArray,
+        target_positions: NDArray,
+        pointing: CameraPointing,
+        target_quaternions: NDArray,
+        focal_px: float,
+    ) -> NDArray:
+        """Select the keyframes of a chunk of the sequence.
+
+        The first frame of the sequence is always a keyframe. The next keyframe is the first frame whose motion
+        since the last keyframe exceeds the threshold.
+
+        Args:
+            sat_positions (NDArray): Satellite positions [km], shape (n, 3).
+            target_positions (NDArray): Target positions [km], shape (n, 3).
+            pointing (CameraPointing): Camera pointing of the frames.
+            target_quaternions (NDArray): Target body to scene quaternions (scalar first), shape (n, 4).
+            focal_px (float): Focal length [px].
+
+        Returns:
+            NDArray: True for the frames to be rendered, shape (n,).
+        """
+        states = self.frame_states(sat_positions, target_positions, pointing, target_quaternions)
+        n_frames = len(sat_positions)
+        keyframes = np.zeros(n_frames, dtype=bool)
+        start = 0
+        while start < n_frames:
+            if self._reference is None:
+                keyframe = start
+            else:
+                motion = self.image_motion(
+                    self._reference, {key: value[start:] for key, value in states.items()}, focal_px
+                )
+                exceeded = np.maximum.reduce(list(motion.values())) > self.threshold_px
+                if self.max_hold_frames is not None:
+                    hold = self._frames_since_keyframe + np.arange(1, n_frames - start + 1)
+                    exceeded |= hold > self.max_hold_frames
+                if not np.any(exceeded):
+                    self._frames_since_keyframe += n_frames - start
+                    break
+                keyframe = start + int(np.argmax(exceeded))
+            keyframes[keyframe] = True
+            self._reference = {key: value[keyframe:keyframe + 1] for key, value in states.items()}
+            self._frames_since_keyframe = 0
+            start = keyframe + 1
+        return keyframes
@@ -0,0 +1,223 @@
+"""Manifest of the files written by a render, to resume an interrupted render.
+
+The manifest is an append-only JSON lines file in the output folder: a first line holding the render settings,
+then one line per completed file (name, size and SHA-256 hash), written once the file is complete. A file is only
+considered as done when it is recorded and still matches its size and hash, the frames being written by an
+interrupted render are thus rendered again. The manifest is restarted when the render settings change.
+"""
+
+import functools
+import hashlib
+import json
+import types
+from pathlib import Path
+
+import numpy as np
+from pydantic import BaseModel, JsonValue, ValidationError
+
+MANIFEST_FILE_NAME = "manifest.jsonl"
+_MAX_LISTED_ARRAY_SIZE = 16  # Larger arrays are described by their hash
+
+
+def file_digest(path: Path) -> tuple[int, str]:
+    """Size and hash of a file.
+
+    Args:
+        path (Path): File.
+
+    Returns:
+        tuple[int, str]: Size (bytes) and SHA-256 hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return path.stat().st_size, digest.hexdigest()
+
+
+def _code_digest(code: types.CodeType) -> str:
+    """Hash of the bytecode and constants of a function, nested functions included."""
+    digest = hashlib.sha256(code.co_code)
+    for constant in code.co_consts:
+        digest.update((_code_digest(constant) if isinstance(constant, types.CodeType) else repr(constant)).encode())
+    return digest.hexdigest()
+
+
+def state_fingerprint(value: object, _seen: frozenset[int] = frozenset()) -> JsonValue:
+    """Describe the state of an object with JSON serialisable values, to compare render settings.
+
+    Pydantic models are dumped, large arrays are described by their shape, type and hash, functions by their name,
+    bytecode, defaults and closure, and the other objects by their class and attributes, recursively.
+
+    Args:
+        value (object): Object, e.g. an orbital or attitude model.
+
+    Returns:
+        JsonValue: JSON serialisable description, equal for objects in the same state.
+    """
+    if value is None or isinstance(value, bool | int | float | str | Path):
+        return str(value) if isinstance(value, Path) else value
+    if id(value) in _seen:
+        return f"<cycle {type(value).__qualname__}>"
+    seen = _seen | {id(value)}
+    if isinstance(value, np.generic | np.ndarray):
+        return _array_fingerprint(value)
+    if isinstance(value, BaseModel | dict | list | tuple | set | frozenset):
+        return _container_fingerprint(value, seen)
+    if isinstance(value, functools.partial | types.MethodType | types.FunctionType):
+        return _function_fingerprint(value, seen)
+    return _object_fingerprint(value, seen)
+
+
+def _array_fingerprint(value: np.generic | np.ndarray) -> JsonValue:
+    """Values of a small array or scalar, shape, type and hash of a large array."""
+    listed: JsonValue
+    if isinstance(value, np.generic):
+        listed = value.item()
+        return listed
+    if value.size <= _MAX_LISTED_ARRAY_SIZE and value.dtype != object:
+        listed = value.tolist()
+        return listed
+    digest = hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()
+    return {"shape": list(value.shape), "dtype": value.dtype.str, "sha256": digest}
+
+
+def _container_fingerprint(
+    value: BaseModel | dict | list | tuple | set | frozenset, seen: frozenset[int]
+) -> JsonValue:
+    """Fingerprints of the items of a container or the fields of a pydantic model."""
+    if isinstance(value, BaseModel):
+        return {"class": type(value).__qualname__, "state": state_fingerprint(value.model_dump(), seen)}
+    if isinstance(value, dict):
+        return {str(key): state_fingerprint(item, seen) for key, item in value.items()}
+    items = sorted(value, key=repr) if isinstance(value, set | frozenset) else value
+    return [state_fingerprint(item, seen) for item in items]
+
+
+def _object_fingerprint(value: object, seen: frozenset[int]) -> JsonValue:
+    """Class and attributes of an object, name of a class, module or builtin."""
+    if hasattr(value, "__dict__") and not isinstance(value, type | types.ModuleType):
+        return {"class": type(value).__qualname__, "state": state_fingerprint(vars(value), seen)}
+    return f"{type(value).__module__}.{getattr(value, '__qualname__', type(value).__qualname__)}"
+
+
+def _function_fingerprint(
+    value: functools.partial | types.MethodType | types.FunctionType, seen: frozenset[int]
+) -> JsonValue:
+    """Name, code and bound state of a function."""
+    if isinstance(value, functools.partial):
+        return {
+            "partial": state_fingerprint(value.func, seen),
+            "args": state_fingerprint(value.args, seen),
+            "keywords": state_fingerprint(value.keywords, seen),
+        }
+    if isinstance(value, types.MethodType):
+        return {"method": value.__func__.__qualname__, "self": state_fingerprint(value.__self__, seen)}
+    return {
+        "function": f"{value.__module__}.{value.__qualname__}",
+        "code": _code_digest(value.__code__),
+        "defaults": state_fingerprint(value.__defaults__, seen),
+        "closure": state_fingerprint([cell.cell_contents for cell in value.__closure__ or ()], seen),
+    }
+
+
+class ManifestEntry(BaseModel):
+    """Record of a completed file."""
+
+    name: str  # Path relative to the output folder
+    size: int  # [bytes]
+    sha256: str
+    frame_index: int | None = None  # Frames of the sequence
+    traced: bool | None = None  # Frames traced by POV-Ray, the other ones being reprojected
+    frames: list[str] | None = None  # Hashes of the frames a video is built from
+
+
+class RenderManifest:
+    """Record of the completed files of a render."""
+
+    def __init__(self, folder: Path, settings: dict[str, JsonValue] | None = None, reset: bool = False) -> None:
+        """Class constructor, load the manifest of a previous render with the same settings.
+
+        Args:
+            folder (Path): Output folder of the render, the file names are relative to it.
+            settings (dict[str, JsonValue] | None): Render settings (JSON serialisable), a manifest written with other
+                settings is discarded. If None, the existing manifest is loaded whatever its settings.
+            reset (bool): If True, the manifest is restarted, every file having to be written again.
+        """
+        self.folder = folder
+        self.path = folder.joinpath(MANIFEST_FILE_NAME)
+        self.entries: dict[str, ManifestEntry] = {}
+        folder.mkdir(parents=True, exist_ok=True)
+
+        content = self.path.read_text() if self.path.exists() else ""
+        if content and not content.endswith("\n"):
+            # Line cut by an interruption, the next records must start on a new line
+            with open(self.path, "a") as file:
+                file.write("\n")
+        lines = content.splitlines()
+        previous_settings = json.loads(lines[0]).get("settings") if lines else None
+        # Same types as once read back
+        self.settings = previous_settings if settings is None else json.loads(json.dumps(settings))
+        if lines and not reset and previous_settings == self.settings:
+            for line in lines[1:]:
+                try:
+                    entry = ManifestEntry.model_validate_json(line)
+                except ValidationError:
+                    continue
+                self.entries[entry.name] = entry
+        else:
+            self.path.write_text(json.dumps({"settings": self.settings}) + "\n")
+
+    def _name(self, path: Path) -> str:
+        """Name of a file in the manifest."""
+        return path.relative_to(self.folder).as_posix()
+
+    def is_complete(self, path: Path) -> bool:
+        """Check that a file is recorded and unchanged since.
+
+        Args:
+            path (Path): File of the render.
+
+        Returns:
+            bool: True if the file does not have to be written again.
+        """
+        entry = self.entries.get(self._name(path))
+        if entry is None or not path.exists() or path.stat().st_size != entry.size:
+            return False
+        return file_digest(path)[1] == entry.sha256
+
+    def record(
+        self,
+        path: Path,
+        *,
+        frame_index: int | None = None,
+        traced: bool | None = None,
+        frames: list[str] | None = None,
+    ) -> None:
+        """Record a completed file.
+
+        Args:
+            path (Path): File of the render.
+            frame_index (int | None): Index of the frame in the sequence, for the frames.
+            traced (bool | None): True if the frame was traced by POV-Ray, False if it was reprojected.
+            frames (list[str] | None): Hashes of the frames a video is built from, for the videos.
+        """
+        size, sha256 = file_digest(path)
+        entry = ManifestEntry(
+            name=self._name(path), size=size, sha256=sha256, frame_index=frame_index, traced=traced, frames=frames
+        )
+        self.entries[entry.name] = entry
+        with open(self.path, "a") as file:
+            file.write(entry.model_dump_json(exclude_none=True) + "\n")
+            file.flush()
+
+    def entry(self, path: Path) -> ManifestEntry | None:
+        """Record of a file.
+
+        Args:
+            path (Path): File of the render.
+
+        Returns:
+            ManifestEntry | None: Name, size, hash and additional fields of the file, None if not recorded.
+        """
+        return self.entries.get(self._name(path))
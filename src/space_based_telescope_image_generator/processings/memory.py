@@ -0,0 +1,479 @@
+"""Memory-aware admission of the renders.
+
+A POV-Ray process holds every image map of its scene decoded in memory: with the highest Earth, clouds and
+topography resolutions and a large star map, a single render needs several GB. The peak memory of a render is
+first estimated from the image maps referenced by the scene (decoded size from the image headers, or from the
+nominal resolution in the file name when the file is not available) and the output resolution. The peak resident
+memory of the POV-Ray processes is then measured, and the measured peaks replace the estimates of the renders with
+the same profile (same image maps and resolution). New renders are only started while the memory reserved by the
+running renders and the new one stays under a budget: the renders of an event loop (MemoryBudget), or the renders of
+all the worker processes of a host (HostMemoryBudget, reservations shared through a SQLite file).
+"""
+
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+
+from PIL import Image
+
+DOCKER_RESOURCES_PREFIX = "/resources/"  # Mount point of the resources folder in the scenes
+POVRAY_BASE_BYTES = 150e6  # Memory of a POV-Ray process before loading the scene
+_IMAGE_FILE_PATTERN = re.compile(r'"([^"]+\.(?:tif|tiff|png|jpg|jpeg|exr|hdr|tga|ppm))"', re.IGNORECASE)
+_NOMINAL_RESOLUTION_PATTERN = re.compile(r"_(\d+)[kK]")
+
+
+def _exr_size(path: Path) -> tuple[int, int] | None:
+    """Read the image size from the header of an OpenEXR file.
+
+    Args:
+        path (Path): OpenEXR file.
+
+    Returns:
+        tuple[int, int] | None: Width and height, None if the header cannot be read.
+    """
+    with open(path, "rb") as file:
+        header = file.read(1 << 16)
+    if header[:4] != b"\x76\x2f\x31\x01":
+        return None
+    position = 8
+    while position < len(header) and header[position] != 0:
+        name_end = header.index(b"\0", position)
+        type_end = header.index(b"\0", name_end + 1)
+        size = int.from_bytes(header[type_end + 1:type_end + 5], "little")
+        value = header[type_end + 5:type_end + 5 + size]
+        if header[position:name_end] == b"dataWindow":
+            x_min, y_min, x_max, y_max = (
+                int.from_bytes(value[k:k + 4], "little", signed=True) for k in range(0, 16, 4)
+            )
+            return x_max - x_min + 1, y_max - y_min + 1
+        position = type_end + 5 + size
+    return None
+
+
+def image_map_bytes(path: Path) -> float:
+    """Memory taken by an image map once decoded by POV-Ray.
+
+    8 and 16 bits images are stored with their channels as is, high dynamic range images (EXR, HDR) as 4 floats
+    per pixel.
+
+    Args:
+        path (Path): Image file, possibly missing.
+
+    Returns:
+        float: Estimated size [bytes], 0 if unknown.
+    """
+    high_dynamic_range = path.suffix.lower() in (".exr", ".hdr")
+    size = None
+    bytes_per_pixel = 16.0 if high_dynamic_range else 3.0
+    if path.exists():
+        if path.suffix.lower() == ".exr":
+            size = _exr_size(path)
+        elif not high_dynamic_range:
+            with Image.open(path) as image:
+                size = image.size
+                bytes_per_pixel = len(image.getbands()) * (2.0 if image.mode.startswith("I;16") else 1.0)
+    if size is None:
+        # Nominal resolution of the equirectangular maps, e.g. "earth_color_43K.tif" is 43200 x 21600
+        match = _NOMINAL_RESOLUTION_PATTERN.search(path.stem)
+        if match is None:
+            return 0.0
+        width = int(match.group(1)) * 1000
+        size = (width, width // 2)
+    return float(size[0]) * size[1] * bytes_per_pixel
+
+
+def scene_image_maps(povstring: str, resources_folder: Path) -> list[Path]:
+    """Image maps referenced by a scene and by the files it includes.
+
+    Args:
+        povstring (str): Scene description.
+        resources_folder (Path): Folder mounted as /resources in the scenes.
+
+    Returns:
+        list[Path]: Image files, without duplicates.
+    """
+    def local_path(name: str) -> Path:
+        if name.startswith(DOCKER_RESOURCES_PREFIX):
+            return resources_folder.joinpath(name[len(DOCKER_RESOURCES_PREFIX):])
+        return Path(name)
+
+    texts = [povstring]
+    for include in re.findall(r'#include\s+"([^"]+)"', povstring):
+        include_path = local_path(include)
+        if include_path.suffix == ".inc" and include_path.exists():
+            texts.append(include_path.read_text(errors="replace"))
+    images: dict[str, Path] = {}
+    for text in texts:
+        for name in _IMAGE_FILE_PATTERN.findall(text):
+            images.setdefault(name, local_path(name))
+    return list(images.values())
+
+
+def local_povstring(povstring: str, resources_folder: Path) -> str:
+    """Rewrite the resources paths of a scene written for the Docker image to a local resources folder.
+
+    Args:
+        povstring (str): Scene description, the resources being referenced as "/resources/...".
+        resources_folder (Path): Local resources folder.
+
+    Returns:
+        str: Scene description for a local POV-Ray.
+    """
+    local_prefix = f"{resources_folder.as_posix().rstrip('/')}/"
+    return re.sub(f'(?<="){re.escape(DOCKER_RESOURCES_PREFIX)}', lambda _: local_prefix, povstring)
+
+
+def peak_rss_bytes(pid: int) -> float | None:
+    """Peak resident memory of a running process (Linux).
+
+    Args:
+        pid (int): Process id.
+
+    Returns:
+        float | None: Peak resident set size [bytes], None if it cannot be read.
+    """
+    try:
+        status = Path(f"/proc/{pid}/status").read_text()
+    except OSError:
+        return None
+    match = re.search(r"^VmHWM:\s+(\d+)\s+kB", status, re.MULTILINE)
+    return None if match is None else float(match.group(1)) * 1024
+
+
+def descendant_pids(pid: int) -> list[int]:
+    """List the processes started by a process, directly or not (Linux).
+
+    Args:
+        pid (int): Process id.
+
+    Returns:
+        list[int]: Process ids of the descendants, empty if they cannot be read.
+    """
+    descendants: list[int] = []
+    parents = [pid]
+    while parents:
+        parent = parents.pop()
+        for task in Path(f"/proc/{parent}/task").glob("*"):
+            try:
+                children = [int(child) for child in task.joinpath("children").read_text().split()]
+            except OSError:
+                continue
+            descendants.extend(children)
+            parents.extend(children)
+    return descendants
+
+
+class PeakMemoryMonitor:
+    """Background thread measuring the peak memory of the POV-Ray processes started by the current process.
+
+    A render running in a container is not a descendant of the current process, and is not measured.
+    """
+
+    def __init__(self, process_name: str = "povray", period_s: float = 0.1) -> None:
+        """Class constructor.
+
+        Args:
+            process_name (str): Name of the measured processes (as in /proc/<pid>/comm).
+            period_s (float): Time between two samples.
+        """
+        self.process_name = process_name[:15]  # comm is truncated to 15 characters
+        self.period_s = period_s
+        self.peak_bytes: float | None = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self) -> None:
+        """Update the peak with the current high-water marks of the measured processes."""
+        peaks = []
+        for pid in descendant_pids(os.getpid()):
+            try:
+                name = Path(f"/proc/{pid}/comm").read_text().strip()
+            except OSError:
+                continue
+            if name == self.process_name and (peak := peak_rss_bytes(pid)) is not None:
+                peaks.append(peak)
+        if peaks:
+            self.peak_bytes = max(sum(peaks), self.peak_bytes or 0.0)
+
+    def _run(self) -> None:
+        """Sample until stopped."""
+        while not self._stop.wait(self.period_s):
+            self._sample()
+
+    def __enter__(self) -> "PeakMemoryMonitor":
+        """Start the measurements."""
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Stop the measurements."""
+        self._stop.set()
+        self._thread.join()
+
+
+class MemoryEstimator:
+    """Peak memory of the renders, estimated per profile and learnt from the measurements."""
+
+    def __init__(self, resources_folder: Path, path: Path | None = None, safety_factor: float = 1.2) -> None:
+        """Class constructor.
+
+        Args:
+            resources_folder (Path): Folder mounted as /resources in the scenes.
+            path (Path | None): JSON file where the measured peaks are kept between runs, if given.
+            safety_factor (float): Margin applied to the estimates and measurements.
+        """
+        self.resources_folder = resources_folder
+        self.path = path
+        self.safety_factor = safety_factor
+        self.measured: dict[str, float] = {}
+        if path is not None and path.exists():
+            self.measured = json.loads(path.read_text())
+        self._image_bytes: dict[Path, float] = {}
+
+    def profile(self, povstring: str, width: int, height: int) -> tuple[str, float]:
+        """Profile of a render and its analytic peak memory estimate.
+
+        Args:
+            povstring (str): Scene description.
+            width (int): Image width [px].
+            height (int): Image height [px].
+
+        Returns:
+            tuple[str, float]: Profile key (resolution and image maps) and estimated peak memory [bytes].
+        """
+        images = scene_image_maps(povstring, self.resources_folder)
+        for image in images:
+            if image not in self._image_bytes:
+                self._image_bytes[image] = image_map_bytes(image)
+        # Output buffer: colour and alpha in single precision
+        estimate = POVRAY_BASE_BYTES + width * height * 16.0 + sum(self._image_bytes[image] for image in images)
+        key = f"{width}x{height}:" + ",".join(sorted(image.name for image in images))
+        return key, estimate
+
+    def estimate(self, povstring: str, width: int, height: int) -> tuple[str, float]:
+        """Memory to be reserved for a render.
+
+        Args:
+            povstring (str): Scene description.
+            width (int): Image width [px].
+            height (int): Image height [px].
+
+        Returns:
+            tuple[str, float]: Profile key and memory to be reserved [bytes], the measured peak of the profile if
+                any, the analytic estimate otherwise.
+        """
+        key, estimate = self.profile(povstring, width, height)
+        return key, self.safety_factor * self.measured.get(key, estimate)
+
+    def observe(self, key: str, peak_bytes: float) -> None:
+        """Learn the measured peak memory of a render.
+
+        Args:
+            key (str): Profile of the render.
+            peak_bytes (float): Measured peak resident memory [bytes].
+        """
+        # The largest peak is kept, the renders of a profile being admitted on their worst case
+        self.measured[key] = max(peak_bytes, self.measured.get(key, 0.0))
+        if self.path is not None:
+            # The file may be shared by several workers: their measurements are merged
+            if self.path.exists():
+                for other_key, other_peak in json.loads(self.path.read_text()).items():
+                    self.measured[other_key] = max(other_peak, self.measured.get(other_key, 0.0))
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            temporary.write_text(json.dumps(self.measured, indent=2))
+            os.replace(temporary, self.path)
+
+
+class MemoryBudget:
+    """Admission of the renders of an event loop under a memory budget."""
+
+    def __init__(self, budget_bytes: float) -> None:
+        """Class constructor.
+
+        Args:
+            budget_bytes (float): Memory that the running renders may reserve together [bytes].
+        """
+        if budget_bytes <= 0:
+            raise ValueError("The memory budget must be positive.")
+        self.budget_bytes = budget_bytes
+        self.reserved_bytes = 0.0
+        self.running = 0
+        self._condition: asyncio.Condition | None = None
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        """Condition notified when memory is given back, created in the running event loop."""
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    @asynccontextmanager
+    async def reserve(self, nbytes: float) -> AsyncIterator[None]:
+        """Wait until a render fits in the budget and reserve its memory while it runs.
+
+        A render larger than the whole budget is admitted alone, so that it is not blocked forever.
+
+        Args:
+            nbytes (float): Memory to be reserved [bytes].
+        """
+        async with self.condition:
+            await self.condition.wait_for(
+                lambda: self.running == 0 or self.reserved_bytes + nbytes <= self.budget_bytes
+            )
+            self.reserved_bytes += nbytes
+            self.running += 1
+        try:
+            yield
+        finally:
+            async with self.condition:
+                self.reserved_bytes -= nbytes
+                self.running -= 1
+                self.condition.notify_all()
+
+
+def _process_alive(pid: int) -> bool:
+    """Check that a process of the host is running."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class HostMemoryBudget:
+    """Admission of the renders of all the processes of a host under a memory budget.
+
+    The reservations are rows of a SQLite file local to the host, shared by the worker processes (the workers of
+    generate_dataset, the distributed workers running on the node...). The reservations of the processes that are
+    not running anymore are dropped, a crashed worker does not keep its memory reserved.
+    """
+
+    def __init__(
+        self, budget_bytes: float, path: Path | None = None, poll_s: float = 0.5, timeout_s: float = 60.0
+    ) -> None:
+        """Class constructor.
+
+        Args:
+            budget_bytes (float): Memory that the running renders of the host may reserve together [bytes].
+            path (Path | None): SQLite file of the reservations, on a local file system. The same file must be used
+                by all the workers of the host, a file of the temporary folder by default.
+            poll_s (float): Time between two admission attempts while the budget is full.
+            timeout_s (float): Maximum waiting time for the lock of the file (s).
+        """
+        if budget_bytes <= 0:
+            raise ValueError("The memory budget must be positive.")
+        self.budget_bytes = budget_bytes
+        self.path = Path(tempfile.gettempdir()).joinpath("sbtig_memory_budget.sqlite") if path is None else path
+        self.poll_s = poll_s
+        self.timeout_s = timeout_s
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the reservations file, creating it if needed."""
+        # Transactions are opened explicitly, to check and reserve the memory atomically
+        connection = sqlite3.connect(self.path, timeout=self.timeout_s, isolation_level=None)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS reservations "
+            "(reservation_id INTEGER PRIMARY KEY, pid INTEGER NOT NULL, nbytes REAL NOT NULL, created_at REAL)"
+        )
+        return connection
+
+    def _try_reserve(self, connection: sqlite3.Connection, nbytes: float) -> int | None:
+        """Reserve memory if it fits in the budget.
+
+        Args:
+            connection (sqlite3.Connection): Connection to the reservations file.
+            nbytes (float): Memory to be reserved [bytes].
+
+        Returns:
+            int | None: Reservation id, None if the memory does not fit in the budget.
+        """
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            rows = connection.execute("SELECT reservation_id, pid, nbytes FROM reservations").fetchall()
+            dead = [(reservation_id,) for reservation_id, pid, _ in rows if not _process_alive(pid)]
+            connection.executemany("DELETE FROM reservations WHERE reservation_id = ?", dead)
+            alive = [row for row in rows if (row[0],) not in dead]
+            reserved_bytes = sum(row[2] for row in alive)
+            reservation_id = None
+            # A render larger than the whole budget is admitted alone, so that it is not blocked forever
+            if not alive or reserved_bytes + nbytes <= self.budget_bytes:
+                reservation_id = connection.execute(
+                    "INSERT INTO reservations (pid, nbytes, created_at) VALUES (?, ?, ?)",
+                    (os.getpid(), nbytes, time.time()),
+                ).lastrowid
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return reservation_id
+
+    @contextmanager
+    def reserve(self, nbytes: float) -> Iterator[None]:
+        """Wait until a render fits in the budget and reserve its memory while it runs.
+
+        Args:
+            nbytes (float): Memory to be reserved [bytes].
+        """
+        connection = self._connect()
+        try:
+            while (reservation_id := self._try_reserve(connection, nbytes)) is None:
+                time.sleep(self.poll_s)
+            try:
+                yield
+            finally:
+                connection.execute("DELETE FROM reservations WHERE reservation_id = ?", (reservation_id,))
+        finally:
+            connection.close()
+
+    def reserved_bytes(self) -> float:
+        """Memory reserved by the running renders of the host.
+
+        Returns:
+            float: Reserved memory [bytes].
+        """
+        connection = self._connect()
+        try:
+            return float(connection.execute("SELECT COALESCE(SUM(nbytes), 0) FROM reservations").fetchone()[0])
+        finally:
+            connection.close()
+
+
+class RenderAdmission:
+    """Memory admission of the renders of a worker process, the peaks of the renders being learnt."""
+
+    def __init__(self, budget: HostMemoryBudget, estimator: MemoryEstimator) -> None:
+        """Class constructor.
+
+        Args:
+            budget (HostMemoryBudget): Budget shared by the workers of the host.
+            estimator (MemoryEstimator): Peak memory of the renders, with a file shared by the workers to learn
+                from all their measurements.
+        """
+        self.budget = budget
+        self.estimator = estimator
+
+    @contextmanager
+    def admit(self, povstring: str, width: int, height: int) -> Iterator[None]:
+        """Wait until a render fits in the budget, and learn its peak memory once done.
+
+        Args:
+            povstring (str): Scene description.
+            width (int): Image width [px].
+            height (int): Image height [px].
+        """
+        profile, reserved_bytes = self.estimator.estimate(povstring, width, height)
+        with self.budget.reserve(reserved_bytes), PeakMemoryMonitor() as monitor:
+            yield
+        if monitor.peak_bytes is not None:
+            self.estimator.observe(profile, monitor.peak_bytes)
@@ -0,0 +1,295 @@
+"""Camera pointing of the Tracking Satellite, computed for a whole trajectory at once.
+
+For every frame the pointing gives the look_at point, an explicit sky (up) vector following a roll law, the
+range and the angular rate of the line of sight, so that the camera never relies on the POV-Ray default sky.
+"""
+
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from functools import cached_property
+
+import numpy as np
+from numpy.typing import NDArray
+
+from space_based_telescope_image_generator.processings.frames import camera_rotation, lvlh_rotation
+
+_DEGENERATE_UP = 1e-6  # Minimal norm of the projected reference before falling back on the secondary reference
+
+
+class RollLaw(ABC):
+    """Define the camera roll, i.e. the direction that must appear at the top of the image."""
+
+    @abstractmethod
+    def reference_vectors(
+        self, sat_positions: NDArray, sat_velocities: NDArray, times: NDArray | None
+    ) -> tuple[NDArray, NDArray]:
+        """Compute the directions to be kept upwards in the image.
+
+        Args:
+            sat_positions (NDArray): Satellite positions [km], shape (N, 3).
+            sat_velocities (NDArray): Satellite velocities [km/s], shape (N, 3).
+            times (NDArray | None): Frame timestamps (s), shape (N,), if known.
+
+        Returns:
+            tuple[NDArray, NDArray]: Primary and secondary references, shape (N, 3). The secondary one is used
+                when the primary reference is aligned with the line of sight.
+        """
+
+
+class LVLHRollLaw(RollLaw):
+    """Keep a direction of the satellite LVLH frame upwards, the zenith by default (the Earth stays below)."""
+
+    def __init__(self, up_lvlh: tuple[float, float, float] = (1.0, 0.0, 0.0)) -> None:
+        """Class constructor.
+
+        Args:
+            up_lvlh (tuple[float, float, float]): Up direction in LVLH (radial, along-track, cross-track).
+        """
+        self.up_lvlh = np.asarray(up_lvlh, dtype=float) / np.linalg.norm(up_lvlh)
+
+    def reference_vectors(
+        self, sat_positions: NDArray, sat_velocities: NDArray, times: NDArray | None
+    ) -> tuple[NDArray, NDArray]:
+        """Compute the directions to be kept upwards in the image.
+
+        Args:
+            sat_positions (NDArray): Satellite positions [km], shape (N, 3).
+            sat_velocities (NDArray): Satellite velocities [km/s], shape (N, 3).
+            times (NDArray | None): Frame timestamps (s), shape (N,), if known.
+
+        Returns:
+            tuple[NDArray, NDArray]: LVLH up direction, and the orbit normal (or the radial direction when the
+                up direction is the orbit normal) as secondary reference.
+        """
+        rotation = lvlh_rotation(sat_positions, sat_velocities)
+        secondary_axis = 0 if abs(self.up_lvlh[2]) > 0.9 else 2
+        return rotation @ self.up_lvlh, rotation[..., secondary_axis]
+
+
+class SunConstrainedRollLaw(RollLaw):
+    """Keep the Sun upwards in the image, which gives a consistent illumination direction."""
+
+    def __init__(self, sun_direction: NDArray | Callable[[NDArray], NDArray]) -> None:
+        """Class constructor.
+
+        Args:
+            sun_direction (NDArray | Callable[[NDArray], NDArray]): Sun direction in the scene frame, either
+                constant (shape (3,)) or a function of the frame timestamps returning shape (N, 3).
+        """
+        self.sun_direction = sun_direction
+
+    def reference_vectors(
+        self, sat_positions: NDArray, sat_velocities: NDArray, times: NDArray | None
+    ) -> tuple[NDArray, NDArray]:
+        """Compute the directions to be kept upwards in the image.
+
+        Args:
+            sat_positions (NDArray): Satellite positions [km], shape (N, 3).
+            sat_velocities (NDArray): Satellite velocities [km/s], shape (N, 3).
+            times (NDArray | None): Frame timestamps (s), shape (N,), required for a time varying Sun.
+
+        Returns:
+            tuple[NDArray, NDArray]: Sun direction, and the satellite zenith as secondary reference.
+        """
+        if callable(self.sun_direction):
+            if times is None:
+                raise ValueError("Frame times are required by a time varying Sun direction.")
+            sun = np.asarray(self.sun_direction(times), dtype=float)
+        else:
+            sun = np.broadcast_to(np.asarray(self.sun_direction, dtype=float), sat_positions.shape)
+        return sun, sat_positions
+
+
+class InertialRollLaw(RollLaw):
+    """Keep a fixed scene direction upwards, the celestial north by default."""
+
+    def __init__(self, up: tuple[float, float, float] = (0.0, 0.0, 1.0)) -> None:
+        """Class constructor.
+
+        Args:
+            up (tuple[float, float, float]): Up direction in the scene frame.
+        """
+        self.up = np.asarray(up, dtype=float)
+
+    def reference_vectors(
+        self, sat_positions: NDArray, sat_velocities: NDArray, times: NDArray | None
+    ) -> tuple[NDArray, NDArray]:
+        """Compute the directions to be kept upwards in the image.
+
+        Args:
+            sat_positions (NDArray): Satellite positions [km], shape (N, 3).
+            sat_velocities (NDArray): Satellite velocities [km/s], shape (N, 3).
+            times (NDArray | None): Frame timestamps (s), shape (N,), if known.
+
+        Returns:
+            tuple[NDArray, NDArray]: Fixed direction, and the orbit normal as secondary reference.
+        """
+        return np.broadcast_to(self.up, sat_positions.shape), np.cross(sat_positions, sat_velocities)
+
+
+class CameraPointing:
+    """Per-frame camera pointing of a trajectory."""
+
+    def __init__(
+        self,
+        look_at: NDArray,
+        sky: NDArray,
+        boresight: NDArray,
+        range_km: NDArray,
+        los_rate_deg_s: NDArray,
+    ) -> None:
+        """Class constructor.
+
+        Args:
+            look_at (NDArray): Pointed positions [km], shape (N, 3).
+            sky (NDArray): Unit up vectors, orthogonal to the boresight, shape (N, 3).
+            boresight (NDArray): Unit line of sight directions, shape (N, 3).
+            range_km (NDArray): Distances to the target [km], shape (N,).
+            los_rate_deg_s (NDArray): Angular rates of the line of sight [deg/s], shape (N,).
+        """
+        self.look_at = look_at
+        self.sky = sky
+        self.boresight = boresight
+        self.range_km = range_km
+        self.los_rate_deg_s = los_rate_deg_s
+
+    def __len__(self) -> int:
+        """Number of frames."""
+        return len(self.look_at)
+
+    @property
+    def rotation(self) -> NDArray:
+        """Rotations from the camera frame to the scene frame, shape (N, 3, 3)."""
+        return camera_rotation(self.boresight, self.sky)
+
+
+def compute_pointing(
+    sat_positions: NDArray,
+    sat_velocities: NDArray,
+    target_positions: NDArray,
+    target_velocities: NDArray | None = None,
+    roll_law: RollLaw | None = None,
+    times: NDArray | None = None,
+    dt_s: float | None = None,
+) -> CameraPointing:
+    """Compute the camera pointing of every frame in one pass.
+
+    Args:
+        sat_positions (NDArray): Satellite positions [km], shape (N, 3).
+        sat_velocities (NDArray): Satellite velocities [km/s], shape (N, 3).
+        target_positions (NDArray): Target positions [km], shape (N, 3).
+        target_velocities (NDArray | None): Target velocities [km/s], shape (N, 3). If None, the line of sight
+            rate is obtained by finite differences with dt_s.
+        roll_law (RollLaw | None): Roll law of the camera, LVLHRollLaw by default.
+        times (NDArray | None): Frame timestamps (s), shape (N,), used by time dependent roll laws.
+        dt_s (float | None): Delta t between two frames, used when the target velocities are unknown.
+
+    Returns:
+        CameraPointing: Pointing of every frame.
+    """
+    sat_positions = np.atleast_2d(np.asarray(sat_positions, dtype=float))
+    sat_velocities = np.atleast_2d(np.asarray(sat_velocities, dtype=float))
+    target_positions = np.atleast_2d(np.asarray(target_positions, dtype=float))
+    roll_law = LVLHRollLaw() if roll_law is None else roll_law
+
+    line_of_sight = target_positions - sat_positions
+    range_km = np.linalg.norm(line_of_sight, axis=-1)
+    boresight = line_of_sight / np.maximum(range_km, 1e-12)[:, None]
+
+    # Sky vector: the roll law reference projected orthogonally to the boresight
+    primary, secondary = roll_law.reference_vectors(sat_positions, sat_velocities, times)
+    sky = primary - np.einsum("ij,ij->i", primary, boresight)[:, None] * boresight
+    fallback = secondary - np.einsum("ij,ij->i", secondary, boresight)[:, None] * boresight
+    norm = np.linalg.norm(sky, axis=-1, keepdims=True)
+    degenerate = norm < _DEGENERATE_UP * np.linalg.norm(primary, axis=-1, keepdims=True)
+    sky = np.where(degenerate, fallback, sky)
+    sky /= np.linalg.norm(sky, axis=-1, keepdims=True)
+
+    # Angular rate of the line of sight, |u x du/dt| = |los x dlos/dt| / |los|²
+    if target_velocities is not None:
+        los_derivative = np.atleast_2d(np.asarray(target_velocities, dtype=float)) - sat_velocities
+    elif dt_s is not None and len(line_of_sight) > 1:
+        los_derivative = np.gradient(line_of_sight, dt_s, axis=0)
+    else:
+        los_derivative = np.zeros_like(line_of_sight)
+    los_rate = np.linalg.norm(np.cross(line_of_sight, los_derivative), axis=-1) / np.maximum(range_km, 1e-12) ** 2
+
+    return CameraPointing(
+        look_at=target_positions,
+        sky=sky,
+        boresight=boresight,
+        range_km=range_km,
+        los_rate_deg_s=np.degrees(los_rate),
+    )
+
+
+def focal_length_px(fov_deg: float, image_width: int) -> float:
+    """Focal length of the POV-Ray camera, `angle` being the horizontal field of view.
+
+    Args:
+        fov_deg (float): Horizontal field of view [deg].
+        image_width (int): Image width [px].
+
+    Returns:
+        float: Focal length [px].
+    """
+    return 0.5 * image_width / np.tan(np.radians(fov_deg) / 2)
+
+
+class CameraModel:
+    """Pinhole model of the POV-Ray camera, `angle` being the horizontal field of view."""
+
+    def __init__(self, fov_deg: float, image_width: int, image_height: int) -> None:
+        """Class constructor.
+
+        Args:
+            fov_deg (float): Horizontal field of view [deg].
+            image_width (int): Image width [px].
+            image_height (int): Image height [px].
+        """
+        self.width = image_width
+        self.height = image_height
+        self.focal_px = focal_length_px(fov_deg, image_width)
+
+    @cached_property
+    def ray_directions(self) -> NDArray:
+        """Unit directions of the pixel centres in the camera frame (x right, y up, z boresight), shape (H, W, 3)."""
+        u, v = np.meshgrid(np.arange(self.width) + 0.5, np.arange(self.height) + 0.5)
+        rays = np.stack(
+            ((u - self.width / 2) / self.focal_px, (self.height / 2 - v) / self.focal_px, np.ones_like(u)), axis=-1
+        )
+        return rays / np.linalg.norm(rays, axis=-1, keepdims=True)
+
+    def image_coordinates(self, camera_vectors: NDArray) -> tuple[NDArray, NDArray, NDArray]:
+        """Project vectors of the camera frame onto the image plane.
+
+        Args:
+            camera_vectors (NDArray): Points or directions in the camera frame, shape (..., 3).
+
+        Returns:
+            tuple[NDArray, NDArray, NDArray]: Image coordinates u (towards the right) and v (downwards) [px],
+                the top left corner of the image being (0, 0), and a mask of the vectors in front of the camera,
+                shape (...).
+        """
+        z = camera_vectors[..., 2]
+        in_front = z > 1e-9
+        safe_z = np.where(in_front, z, 1.0)
+        u = self.width / 2 + self.focal_px * camera_vectors[..., 0] / safe_z
+        v = self.height / 2 - self.focal_px * camera_vectors[..., 1] / safe_z
+        return u, v, in_front
+
+    def project(self, camera_vectors: NDArray) -> tuple[NDArray, NDArray, NDArray]:
+        """Project vectors of the camera frame onto the pixel grid.
+
+        Args:
+            camera_vectors (NDArray): Points or directions in the camera frame, shape (M, 3).
+
+        Returns:
+            tuple[NDArray, NDArray, NDArray]: Column and row indices of the nearest pixels, and a mask of the
+                vectors falling inside the image, shape (M,).
+        """
+        u, v, in_front = self.image_coordinates(camera_vectors)
+        columns = np.floor(u).astype(np.int64)
+        rows = np.floor(v).astype(np.int64)
+        valid = in_front & (columns >= 0) & (columns < self.width) & (rows >= 0) & (rows < self.height)
+        return columns, rows, valid
@@ -1,20 +1,118 @@
 import math as m
 import numpy as np
-import re
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
 from datetime import datetime
 from numpy.typing import NDArray
 import matplotlib.pyplot as plt
 from pydantic import BaseModel
 
+from space_based_telescope_image_generator.processings.frames import apply_rotation, perifocal_rotation
+from space_based_telescope_image_generator.processings.tle_catalog import TLECatalog
 from space_based_telescope_image_generator.utils.constants import (
+    DAY_SECONDS,
     J2,
+    JD_UNIX_EPOCH,
     MU,
-    PI,
     RE,
 )
 
+DEFAULT_CHUNK_SIZE = 256  # Number of propagation steps generated at once by the streaming propagations
+
+
+def hermite_interpolation(
+    times: NDArray, positions: NDArray, velocities: NDArray, query_times: NDArray
+) -> tuple[NDArray, NDArray]:
+    """Cubic Hermite interpolation of a sampled trajectory.
+
+    Args:
+        times (NDArray): Sample times (s), shape (T,), increasing.
+        positions (NDArray): Positions [km], shape (T, 3).
+        velocities (NDArray): Velocities [km/s], shape (T, 3).
+        query_times (NDArray): Times to interpolate (s), any shape (...).
+
+    Returns:
+        tuple[NDArray, NDArray]: Positions [km] and velocities [km/s], shape (..., 3).
+    """
+    idx = np.clip(np.searchsorted(times, query_times, side="right") - 1, 0, len(times) - 2)
+    h = (times[idx + 1] - times[idx])[..., None]
+    s = ((query_times - times[idx])[..., None]) / h
+    p0, p1 = positions[idx], positions[idx + 1]
+    m0, m1 = velocities[idx] * h, velocities[idx + 1] * h
+
+    s2 = s * s
+    s3 = s2 * s
+    position = (
+        (2 * s3 - 3 * s2 + 1) * p0
+        + (s3 - 2 * s2 + s) * m0
+        + (-2 * s3 + 3 * s2) * p1
+        + (s3 - s2) * m1
+    )
+    velocity = (
+        (6 * s2 - 6 * s) * p0 + (3 * s2 - 4 * s + 1) * m0 + (-6 * s2 + 6 * s) * p1 + (3 * s2 - 2 * s) * m1
+    ) / h
+    return position, velocity
+
+
+class OrbitalDynamicModel(ABC):
+    """Define how an object position will evolve."""
+
+    @abstractmethod
+    def keplerian2cartesian(
+        self,
+    ) -> tuple[tuple[float, float, float], tuple[float, float, float]]:
+        """Exposed method used to retrieve the PVT at epoch in km - km/s.
+
+        Returns:
+            tuple[tuple[float, float, float],tuple[float, float, float]]: Position [km] / Speed [km/s]
+
+        """
+
+    @abstractmethod
+    def propagate(
+        self, propagation_time: float, dt_s: float
+    ) -> tuple[list[tuple[float, float, float]], list[tuple[float, float, float]]]:
+        """Propagate the orbit for an amount of time.
+
+        Args:
+            propagation_time (float): Amount of seconds to propagate.
+            dt_s (float): Delta t between two steps.
+
+        Returns:
+            tuple[list[tuple[float, float, float]], list[tuple[float, float, float]]]: Returns two list
+              with the positions [km]/ instantanate speed [km/s].
+        """
 
-class KeplerianModel(BaseModel):
+    def propagate_chunks(
+        self,
+        propagation_time: float,
+        dt_s: float,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        start_step: int = 0,
+    ) -> Iterator[tuple[NDArray, NDArray]]:
+        """Propagate the orbit for an amount of time, yielding the states by chunks.
+
+        This default implementation slices the output of propagate(), models able to generate their states
+        incrementally should override it so that the memory does not depend on the propagation time.
+
+        Args:
+            propagation_time (float): Amount of seconds to propagate.
+            dt_s (float): Delta t between two steps.
+            chunk_size (int): Maximum number of steps per chunk.
+            start_step (int): Index of the first step yielded, the previous steps being skipped.
+
+        Yields:
+            tuple[NDArray, NDArray]: Positions [km] / instantanate speeds [km/s] of the chunk, shape (n, 3).
+        """
+        positions, velocities = self.propagate(propagation_time, dt_s)
+        for start in range(start_step, len(positions), chunk_size):
+            yield (
+                np.array(positions[start : start + chunk_size], dtype=float).reshape(-1, 3),
+                np.array(velocities[start : start + chunk_size], dtype=float).reshape(-1, 3),
+            )
+
+
+class KeplerianModel(BaseModel, OrbitalDynamicModel):
     """Class containing Orbital Parameters data."""
 
     a: float  # Semi-major axis (m)
@@ -32,42 +130,33 @@ class KeplerianModel(BaseModel):
         and returns an instance of OrbitalParameters.
 
         Args:
-            TLE: tuple[str, str], Two-line element set.
+            TLE: tuple[str, str], Two-line element set, an optional title line is allowed.
 
         Returns:
             OrbitalParameters: Instance populated with the extracted Keplerian elements.
         """
-        # Cleans the TLE from all multiple spaces, replaces them with single spaces
-        for j in range(len(TLE)):  # Runs through all line of the TLE
-            count = 0  # While loop safety
-            while "  " in TLE[j] and count < 100:
-                TLE[j] = re.sub(  # type: ignore
-                    r"\s+", " ", TLE[j]
-                ).strip()  # Detects and replaces multiple spaces
-                count += 1  # Avoids infinite while loop in case of problem
-        TLE1 = TLE[0].split(" ")
-        TLE2 = TLE[1].split(" ")
-
-        e = float("0." + TLE2[4])  # [-] Eccentricity
-        i = float(TLE2[2])  # [deg] Inclination
-        Omega = float(TLE2[3])  # [deg] Longitude of RAAN
-        omega = float(TLE2[5])  # [deg] Argument of perigee
-        nu = float(TLE2[6])  # [deg] True anomaly
-        MM = float(TLE2[7])  # [rev/day] Mean motion
-        T = 86400 / MM  # [s] Orbital period
-        a = (MU * (T / (2 * PI)) ** 2) ** (1 / 3)  # [m] Semi-major axis
-
-        year = 2000 + int(float(TLE1[3]) / 1000)  # Associated date
-        doy = float(TLE1[3]) % 1000  # Day of the year
-
-        month, day = cls._getDate(year, doy)
-        hour, minute, second = cls._s2hms(doy)
-
-        date = datetime(year, month, day, hour, minute, second)
+        catalog = TLECatalog.from_lines(list(TLE[-2:]), strict=True)
+
+        e = float(catalog.ecco[0])  # [-] Eccentricity
+        M = float(catalog.mo[0])  # [rad] Mean anomaly
+        E = M  # [rad] Eccentric anomaly, solution of Kepler's equation
+        for _ in range(20):
+            E = E - (E - e * m.sin(E) - M) / (1 - e * m.cos(E))
+        nu = 2 * m.atan2(
+            m.sqrt(1 + e) * m.sin(E / 2), m.sqrt(1 - e) * m.cos(E / 2)
+        )  # [rad] True anomaly
+        n = float(catalog.no_kozai[0]) / 60  # [rad/s] Mean motion
+        a = (MU / n**2) ** (1 / 3)  # [m] Semi-major axis
 
         # Create and return an instance of OrbitalParameters
         return cls(
-            a=a, e=e, i=i, Omega=Omega, omega=omega, nu=nu, epoch=date.timestamp()
+            a=a,
+            e=e,
+            i=float(catalog.inclo[0]),
+            Omega=float(catalog.nodeo[0]),
+            omega=float(catalog.argpo[0]),
+            nu=nu,
+            epoch=(float(catalog.epoch_jd[0]) - JD_UNIX_EPOCH) * DAY_SECONDS,
         )
 
     @classmethod
@@ -142,100 +231,6 @@ class KeplerianModel(BaseModel):
             epoch=epoch.timestamp(),  # Convert datetime to timestamp (seconds)
         )
 
-    @classmethod
-    def _getDate(cls, y: float, doy: float) -> tuple[int, int]:
-        """
-        This function finds the date according to the year and the day of the year (doy)
-
-        Args:
-            y: float, year (2000+)
-            doy: float, day of the year
-
-        Returns:
-            month: int, number of the month from 1 to 12
-            day: int, number of the date from 1 to 31
-        """
-        doy = int(
-            doy
-        )  # Takes the integer part: the fractional part corresponds to hours, minute, second
-        dayPerMonth = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
-
-        if y % 4 == 0:  # Leap year
-            dayPerMonth[1] += 1  # Adds one day in February
-
-        countDay = 0  # Counts the number of days passed after each month
-        count = 0  # While loop safety
-        j = 0  # Iteration
-        while countDay < doy and count < 100:
-            countDay += dayPerMonth[j]
-            j += 1
-            count += 1
-        month = j
-        day = doy - countDay + dayPerMonth[month]
-        return month, day
-
-    @classmethod
-    def _s2hms(cls, doy: float) -> tuple[int, int, int]:
-        """
-        This function converts the day of the year into the corresponding hour, minute and second
-
-        Args:
-            doy: float, day of the year between 0 and 366
-
-        Returns:
-            hour: int, number of hours passed since the beginning of the say in UTC
-            minute: int, number of minutes passed
-            second: int, number of whole seconds passed
-        """
-        fractional = (
-            doy % 1
-        )  # Takes the fractional part of the DOY (corresponding to the advancement in the day)
-        secondDoy = fractional * 86400  # Converts the fractional part in seconds
-
-        # Initializing the variables
-        hour = 0
-        minute = 0
-        second = 0
-
-        count = 0  # While loop safety
-        while secondDoy > 3600 and count < 100:  # Counts the hours
-            hour += 1
-            secondDoy -= 3600
-            count += 1
-
-        count = 0  # While loop safety
-        while secondDoy > 60 and count < 100:  # Counts the minutes
-            minute += 1
-            secondDoy -= 60
-            count += 1
-        second = int(secondDoy)  # The remainder is the number of seconds
-
-        return hour, minute, second
-
-    def _get_rotation_matrix(self, a: float, u: int) -> NDArray:
-        """
-        Rotation matrices method
-
-        Args:
-            a: float, rotation angle [rad]
-            u: int, rotation axis (0 = x, 1 = y, 2 = z)
-
-        Returns:
-            Rot: NDArray, 3x3 matrix
-        """
-        c = np.cos(a)
-        s = np.sin(a)
-        if u == 0:  # Rotation about the x-axis
-            Rot = np.array([[1, 0, 0], [0, c, -s], [0, s, c]])
-        elif u == 1:  # Rotation about the y-axis
-            Rot = np.array([[c, 0, s], [0, 1, 0], [-s, 0, c]])
-        elif u == 2:  # Rotation about the z-axis
-            Rot = np.array([[c, -s, 0], [s, c, 0], [0, 0, 1]])
-        else:  # Wrong axis number: error
-            Rot = np.array([[1, 0, 0], [0, 1, 0], [0, 0, 1]])
-            print("Error: wrong axis number provided for rotation matrix")
-        return Rot
-
     def _radius(self) -> float:
         """
         Instantaneous radius of the orbit, given for the current Keplerian elements a, e and nu
@@ -278,20 +273,10 @@ class KeplerianModel(BaseModel):
             * np.array([-m.sin(E), m.sqrt(1 - self.e**2) * m.cos(E), 0])
         )
 
-        r = np.matmul(
-            self._get_rotation_matrix(self.Omega, 2),
-            np.matmul(
-                self._get_rotation_matrix(self.i, 0),
-                np.matmul(self._get_rotation_matrix(self.omega, 2), o),
-            ),
-        )
-        rdot = np.matmul(
-            self._get_rotation_matrix(self.Omega, 2),
-            np.matmul(
-                self._get_rotation_matrix(self.i, 0),
-                np.matmul(self._get_rotation_matrix(self.omega, 2), odot),
-            ),
-        )
+        # Perifocal to ECI rotation, shared by the position and the velocity
+        rotation = perifocal_rotation(self.Omega, self.i, self.omega)
+        r = apply_rotation(rotation, o)
+        rdot = apply_rotation(rotation, odot)
         return r, rdot
 
     def compute_jerk_and_acc(
@@ -360,34 +345,77 @@ class KeplerianModel(BaseModel):
             tuple[list[tuple[float, float, float]], list[tuple[float, float, float]]]: Returns two list
               with the positions [km]/ instantanate speed [km/s] in EME2000.
         """
+        position_list: list[tuple[float, float, float]] = []
+        velocity_list: list[tuple[float, float, float]] = []
+        for positions, velocities in self.propagate_chunks(propagation_time, dt_s):
+            position_list.extend(tuple(pos) for pos in positions.tolist())  # type: ignore[misc]
+            velocity_list.extend(tuple(vel) for vel in velocities.tolist())  # type: ignore[misc]
+        return (position_list, velocity_list)
+
+    def propagate_chunks(
+        self,
+        propagation_time: float,
+        dt_s: float,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        start_step: int = 0,
+    ) -> Iterator[tuple[NDArray, NDArray]]:
+        """Propagate the orbite for an amount of time, yielding the states by chunks.
+
+        Only the current state and one chunk are kept in memory.
+
+        Args:
+            propagation_time (float): Amount of seconds to propagate.
+            dt_s (float): Delta t between two steps.
+            chunk_size (int): Maximum number of steps per chunk.
+            start_step (int): Index of the first step yielded, the previous steps are integrated without being
+                stored.
+
+        Yields:
+            tuple[NDArray, NDArray]: Positions [km] / instantanate speeds [km/s] in EME2000, shape (n, 3).
+        """
         # Initialize arrays to store position and velocity
         pos, vel = self._keplerian2cartesian()
         acc, jerk = self.compute_jerk_and_acc(pos, vel)
 
-        position_list = []
-        velocity_list = []
-        # Main simulation loop
-        date = self.epoch
-        for _ in range(int(propagation_time / dt_s)):
-            pos_new: NDArray = (
-                pos + vel * dt_s + acc * dt_s**2 / 2 + jerk * dt_s**3 / 6
-            )  # [m] Forward Euler, order 3 integration
-            vel_new: NDArray = (
-                vel + acc * dt_s + jerk * dt_s**2 / 2
-            )  # [m/s] Forward Euler, order 2 integration
-            date = date + dt_s  # [s] timestamp
-            acc, jerk = self.compute_jerk_and_acc(
-                pos_new, vel_new
-            )  # [m/s2, m/s3] New acceleration and jerk vectors
-            position_list.append(
-                (pos_new[0] / 1000, pos_new[1] / 1000, pos_new[2] / 1000)
-            )  # [km] Position array
-            velocity_list.append(
-                (pos_new[0] / 1000, pos_new[1] / 1000, pos_new[2] / 1000)
-            )  # [km/s] Velocity array
-            pos = pos_new  # [m] Resetting position vector
-            vel = vel_new  # [m/s] Resetting velocity vector
-        return (position_list, velocity_list)
+        n_steps = int(propagation_time / dt_s)
+        for _ in range(min(start_step, n_steps)):
+            pos, vel, acc, jerk = self._integration_step(pos, vel, acc, jerk, dt_s)
+        for start in range(start_step, n_steps, chunk_size):
+            n_chunk = min(chunk_size, n_steps - start)
+            positions = np.empty((n_chunk, 3))
+            velocities = np.empty((n_chunk, 3))
+            # Main simulation loop
+            for step in range(n_chunk):
+                pos, vel, acc, jerk = self._integration_step(pos, vel, acc, jerk, dt_s)
+                positions[step] = pos / 1000  # [km] Position array
+                velocities[step] = vel / 1000  # [km/s] Velocity array
+            yield positions, velocities
+
+    def _integration_step(
+        self, pos: NDArray, vel: NDArray, acc: NDArray, jerk: NDArray, dt_s: float
+    ) -> tuple[NDArray, NDArray, NDArray, NDArray]:
+        """Integrate the state over one step.
+
+        Args:
+            pos (NDArray): Position [m].
+            vel (NDArray): Velocity [m/s].
+            acc (NDArray): Acceleration [m/s2].
+            jerk (NDArray): Jerk [m/s3].
+            dt_s (float): Delta t of the step.
+
+        Returns:
+            tuple[NDArray, NDArray, NDArray, NDArray]: Position, velocity, acceleration and jerk after the step.
+        """
+        pos_new: NDArray = (
+            pos + vel * dt_s + acc * dt_s**2 / 2 + jerk * dt_s**3 / 6
+        )  # [m] Forward Euler, order 3 integration
+        vel_new: NDArray = (
+            vel + acc * dt_s + jerk * dt_s**2 / 2
+        )  # [m/s] Forward Euler, order 2 integration
+        acc_new, jerk_new = self.compute_jerk_and_acc(
+            pos_new, vel_new
+        )  # [m/s2, m/s3] New acceleration and jerk vectors
+        return pos_new, vel_new, acc_new, jerk_new
 
     def plot_orbit(self, pos_array: NDArray, dt_s: float)->None:
         """Plot orbit, for debug purpose.
@@ -0,0 +1,350 @@
+"""Vectorised quaternion algebra used by the attitude propagation.
+
+Quaternions are stored scalar first, as arrays of shape (..., 4). A quaternion represents the rotation from the
+object body frame to the scene frame, i.e. the rotation POV-Ray applies to the object with its `rotate` modifier.
+"""
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+def quaternion_multiply(p: NDArray, q: NDArray) -> NDArray:
+    """Hamilton product p * q.
+
+    Args:
+        p (NDArray): Quaternions, shape (..., 4).
+        q (NDArray): Quaternions, shape (..., 4).
+
+    Returns:
+        NDArray: Products, shape (..., 4).
+    """
+    pw, px, py, pz = np.moveaxis(p, -1, 0)
+    qw, qx, qy, qz = np.moveaxis(q, -1, 0)
+    return np.stack(
+        (
+            pw * qw - px * qx - py * qy - pz * qz,
+            pw * qx + px * qw + py * qz - pz * qy,
+            pw * qy - px * qz + py * qw + pz * qx,
+            pw * qz + px * qy - py * qx + pz * qw,
+        ),
+        axis=-1,
+    )
+
+
+def quaternion_conjugate(q: NDArray) -> NDArray:
+    """Conjugate, the inverse rotation of a unit quaternion.
+
+    Args:
+        q (NDArray): Quaternions, shape (..., 4).
+
+    Returns:
+        NDArray: Conjugates, shape (..., 4).
+    """
+    return q * np.array([1.0, -1.0, -1.0, -1.0])
+
+
+def quaternion_normalize(q: NDArray) -> NDArray:
+    """Normalize quaternions to unit norm.
+
+    Args:
+        q (NDArray): Quaternions, shape (..., 4).
+
+    Returns:
+        NDArray: Unit quaternions, shape (..., 4).
+    """
+    return q / np.linalg.norm(q, axis=-1, keepdims=True)
+
+
+def rotation_vector_to_quaternion(rotation_vector: NDArray) -> NDArray:
+    """Exponential map, the rotation of angle |v| about the axis v.
+
+    Args:
+        rotation_vector (NDArray): Rotation vectors [rad], shape (..., 3).
+
+    Returns:
+        NDArray: Unit quaternions, shape (..., 4).
+    """
+    angle = np.linalg.norm(rotation_vector, axis=-1, keepdims=True)
+    half = 0.5 * angle
+    # sin(x/2)/x tends to 1/2 - x²/48 near 0
+    scale = np.where(angle > 1e-8, np.sin(half) / np.where(angle > 1e-8, angle, 1.0), 0.5 - angle**2 / 48)
+    return np.concatenate((np.cos(half), scale * rotation_vector), axis=-1)
+
+
+def quaternion_cumulative_product(q: NDArray, axis: int = -2) -> NDArray:
+    """Cumulative Hamilton product along an axis, q0, q0*q1, q0*q1*q2, ...
+
+    The product is computed with a parallel prefix scan: log2(N) vectorised products instead of N Python steps.
+
+    Args:
+        q (NDArray): Quaternions, shape (..., N, ..., 4).
+        axis (int): Axis along which the product is accumulated.
+
+    Returns:
+        NDArray: Cumulative products, same shape.
+    """
+    result = np.moveaxis(np.array(q, dtype=float), axis, 0)
+    shift = 1
+    while shift < len(result):
+        result[shift:] = quaternion_multiply(result[:-shift], result[shift:])
+        shift *= 2
+    return np.moveaxis(result, 0, axis)
+
+
+def quaternion_to_matrix(q: NDArray) -> NDArray:
+    """Convert unit quaternions into rotation matrices.
+
+    Args:
+        q (NDArray): Unit quaternions, shape (..., 4).
+
+    Returns:
+        NDArray: Rotation matrices, shape (..., 3, 3).
+    """
+    w, x, y, z = np.moveaxis(q, -1, 0)
+    return np.stack(
+        (
+            np.stack((1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)), axis=-1),
+            np.stack((2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)), axis=-1),
+            np.stack((2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)), axis=-1),
+        ),
+        axis=-2,
+    )
+
+
+def matrix_to_quaternion(rotation: NDArray) -> NDArray:
+    """Convert rotation matrices into unit quaternions (Shepperd's method).
+
+    Args:
+        rotation (NDArray): Rotation matrices, shape (..., 3, 3).
+
+    Returns:
+        NDArray: Unit quaternions with a non-negative scalar part, shape (..., 4).
+    """
+    rotation = np.asarray(rotation, dtype=float)
+    m00, m11, m22 = rotation[..., 0, 0], rotation[..., 1, 1], rotation[..., 2, 2]
+    trace = m00 + m11 + m22
+    # Each candidate is computed from the largest of w, x, y, z to stay well conditioned
+    candidates = np.stack(
+        (
+            np.stack(
+                (
+                    1 + trace,
+                    rotation[..., 2, 1] - rotation[..., 1, 2],
+                    rotation[..., 0, 2] - rotation[..., 2, 0],
+                    rotation[..., 1, 0] - rotation[..., 0, 1],
+                ),
+                axis=-1,
+            ),
+            np.stack(
+                (
+                    rotation[..., 2, 1] - rotation[..., 1, 2],
+                    1 + m00 - m11 - m22,
+                    rotation[..., 0, 1] + rotation[..., 1, 0],
+                    rotation[..., 0, 2] + rotation[..., 2, 0],
+                ),
+                axis=-1,
+            ),
+            np.stack(
+                (
+                    rotation[..., 0, 2] - rotation[..., 2, 0],
+                    rotation[..., 0, 1] + rotation[..., 1, 0],
+                    1 - m00 + m11 - m22,
+                    rotation[..., 1, 2] + rotation[..., 2, 1],
+                ),
+                axis=-1,
+            ),
+            np.stack(
+                (
+                    rotation[..., 1, 0] - rotation[..., 0, 1],
+                    rotation[..., 0, 2] + rotation[..., 2, 0],
+                    rotation[..., 1, 2] + rotation[..., 2, 1],
+                    1 - m00 - m11 + m22,
+                ),
+                axis=-1,
+            ),
+        ),
+        axis=-2,
+    )
+    best = np.argmax(np.stack((trace, m00, m11, m22), axis=-1), axis=-1)
+    q = np.take_along_axis(candidates, best[..., None, None], axis=-2)[..., 0, :]
+    q = quaternion_normalize(q)
+    return np.where(q[..., :1] < 0, -q, q)
+
+
+def euler_to_quaternion(angles_deg: NDArray) -> NDArray:
+    """Convert POV-Ray `rotate <x, y, z>` triplets into quaternions.
+
+    POV-Ray rotates about x first, then y, then z (fixed axes), i.e. R = Rz * Ry * Rx.
+
+    Args:
+        angles_deg (NDArray): Rotation triplets [deg], shape (..., 3).
+
+    Returns:
+        NDArray: Unit quaternions, shape (..., 4).
+    """
+    half = np.radians(np.asarray(angles_deg, dtype=float)) / 2
+    zeros = np.zeros(half.shape[:-1])
+    qx = np.stack((np.cos(half[..., 0]), np.sin(half[..., 0]), zeros, zeros), axis=-1)
+    qy = np.stack((np.cos(half[..., 1]), zeros, np.sin(half[..., 1]), zeros), axis=-1)
+    qz = np.stack((np.cos(half[..., 2]), zeros, zeros, np.sin(half[..., 2])), axis=-1)
+    return quaternion_multiply(qz, quaternion_multiply(qy, qx))
+
+
+def quaternion_to_euler(q: NDArray) -> NDArray:
+    """Convert quaternions into POV-Ray `rotate <x, y, z>` triplets.
+
+    Args:
+        q (NDArray): Unit quaternions, shape (..., 4).
+
+    Returns:
+        NDArray: Rotation triplets in [0, 360[ [deg], shape (..., 3).
+    """
+    rotation = quaternion_to_matrix(q)
+    sin_y = np.clip(-rotation[..., 2, 0], -1.0, 1.0)
+    gimbal_lock = np.abs(sin_y) > 1 - 1e-12
+    angle_x = np.where(gimbal_lock, 0.0, np.arctan2(rotation[..., 2, 1], rotation[..., 2, 2]))
+    angle_z = np.where(
+        gimbal_lock,
+        np.arctan2(-rotation[..., 0, 1], rotation[..., 1, 1]),
+        np.arctan2(rotation[..., 1, 0], rotation[..., 0, 0]),
+    )
+    return np.degrees(np.stack((angle_x, np.arcsin(sin_y), angle_z), axis=-1)) % 360
+
+
+def propagate_body_rates(initial_quaternions: NDArray, body_rates_deg_s: NDArray, dt_s: float) -> NDArray:
+    """Propagate attitudes with body angular rates held constant over each step, vectorised over time and objects.
+
+    Each step is integrated in closed form, q(k+1) = q(k) * exp(w(k) dt / 2).
+
+    Args:
+        initial_quaternions (NDArray): Attitudes before the first step, shape (..., 4).
+        body_rates_deg_s (NDArray): Body angular rates [deg/s] of each step, shape (..., N, 3).
+        dt_s (float): Delta t between two steps.
+
+    Returns:
+        NDArray: Attitudes at the end of each step, shape (..., N, 4).
+    """
+    increments = rotation_vector_to_quaternion(np.radians(body_rates_deg_s) * dt_s)
+    attitudes = quaternion_multiply(
+        np.asarray(initial_quaternions, dtype=float)[..., None, :], quaternion_cumulative_product(increments)
+    )
+    return quaternion_normalize(attitudes)
+
+
+def quaternion_log(q: NDArray) -> NDArray:
+    """Logarithm of unit quaternions, half the rotation vector.
+
+    Args:
+        q (NDArray): Unit quaternions, shape (..., 4).
+
+    Returns:
+        NDArray: Logarithms, shape (..., 3).
+    """
+    vector = q[..., 1:]
+    norm = np.linalg.norm(vector, axis=-1, keepdims=True)
+    angle = np.arctan2(norm, q[..., :1])
+    return vector * np.where(norm > 1e-12, angle / np.where(norm > 1e-12, norm, 1.0), 1.0)
+
+
+def quaternion_exp(v: NDArray) -> NDArray:
+    """Exponential of pure quaternions, inverse of quaternion_log.
+
+    Args:
+        v (NDArray): Vectors, shape (..., 3).
+
+    Returns:
+        NDArray: Unit quaternions, shape (..., 4).
+    """
+    return rotation_vector_to_quaternion(2 * v)
+
+
+def quaternion_continuity(q: NDArray) -> NDArray:
+    """Flip the signs of a quaternion sequence so that consecutive quaternions are in the same hemisphere.
+
+    Args:
+        q (NDArray): Quaternions, shape (N, 4).
+
+    Returns:
+        NDArray: Quaternions of the same rotations, shape (N, 4).
+    """
+    flips = np.ones(len(q))
+    flips[1:] = np.where(np.einsum("ij,ij->i", q[1:], q[:-1]) < 0, -1.0, 1.0)
+    return q * np.cumprod(flips)[:, None]
+
+
+def quaternion_slerp(q0: NDArray, q1: NDArray, t: NDArray) -> NDArray:
+    """Spherical linear interpolation, along the shortest path.
+
+    Args:
+        q0 (NDArray): Start quaternions, shape (..., 4).
+        q1 (NDArray): End quaternions, shape (..., 4).
+        t (NDArray): Interpolation parameters in [0, 1], shape (...).
+
+    Returns:
+        NDArray: Interpolated unit quaternions, shape (..., 4).
+    """
+    t = np.asarray(t, dtype=float)[..., None]
+    dot = np.sum(q0 * q1, axis=-1, keepdims=True)
+    q1 = np.where(dot < 0, -q1, q1)
+    dot = np.abs(dot)
+    angle = np.arccos(np.clip(dot, -1.0, 1.0))
+    sin_angle = np.sin(angle)
+    # Close quaternions fall back to a normalized linear interpolation
+    close = dot > 1 - 1e-10
+    safe_sin = np.where(close, 1.0, sin_angle)
+    w0 = np.where(close, 1 - t, np.sin((1 - t) * angle) / safe_sin)
+    w1 = np.where(close, t, np.sin(t * angle) / safe_sin)
+    return quaternion_normalize(w0 * q0 + w1 * q1)
+
+
+def squad_control_points(q: NDArray) -> NDArray:
+    """Inner control points of the SQUAD spline through a quaternion sequence.
+
+    Args:
+        q (NDArray): Quaternions with sign continuity, shape (N, 4).
+
+    Returns:
+        NDArray: Control points, shape (N, 4).
+    """
+    # The end points are extended by reflection, which gives them a null tangent
+    first = quaternion_multiply(q[:1], quaternion_multiply(quaternion_conjugate(q[1:2]), q[:1]))
+    last = quaternion_multiply(q[-1:], quaternion_multiply(quaternion_conjugate(q[-2:-1]), q[-1:]))
+    previous = np.concatenate((first, q[:-1]))
+    following = np.concatenate((q[1:], last))
+    inverse = quaternion_conjugate(q)
+    tangent = quaternion_log(quaternion_multiply(inverse, following)) + quaternion_log(
+        quaternion_multiply(inverse, previous)
+    )
+    return quaternion_multiply(q, quaternion_exp(-tangent / 4))
+
+
+def sample_quaternions(times: NDArray, q: NDArray, query_times: NDArray, interpolation: str = "slerp") -> NDArray:
+    """Sample a quaternion table at arbitrary times.
+
+    The tables are irregular: the interval of each query is found with searchsorted, the queries outside of the
+    table hold the first or last attitude.
+
+    Args:
+        times (NDArray): Table times (s), increasing, shape (N,).
+        q (NDArray): Table quaternions, shape (N, 4).
+        query_times (NDArray): Sampling times (s), shape (T,).
+        interpolation (str): "slerp" or "squad".
+
+    Returns:
+        NDArray: Unit quaternions, shape (T, 4).
+    """
+    if interpolation not in ("slerp", "squad"):
+        raise ValueError(f"Unknown interpolation {interpolation}, use slerp or squad.")
+    q = quaternion_continuity(quaternion_normalize(np.asarray(q, dtype=float)))
+    if len(q) == 1:
+        return np.repeat(q, len(query_times), axis=0)
+    query_times = np.clip(np.asarray(query_times, dtype=float), times[0], times[-1])
+    idx = np.clip(np.searchsorted(times, query_times, side="right") - 1, 0, len(times) - 2)
+    t = (query_times - times[idx]) / (times[idx + 1] - times[idx])
+    interpolated = quaternion_slerp(q[idx], q[idx + 1], t)
+    if interpolation == "squad":
+        control = squad_control_points(q)
+        interpolated = quaternion_slerp(
+            interpolated, quaternion_slerp(control[idx], control[idx + 1], t), 2 * t * (1 - t)
+        )
+    return interpolated
@@ -0,0 +1,422 @@
+"""Relative motion of a target about a chief orbit, expressed in the chief LVLH frame.
+
+The LVLH frame is the RSW frame of the chief: x radial (outward), y along-track, z cross-track (orbit normal).
+Relative positions are in km and relative velocities in km/s, as seen from the rotating frame.
+"""
+
+import math as m
+from abc import abstractmethod
+from collections.abc import Iterator
+
+import numpy as np
+from numpy.typing import NDArray
+
+from space_based_telescope_image_generator.processings.frames import (
+    apply_inverse_rotation,
+    apply_rotation,
+    lvlh_rotation,
+)
+from space_based_telescope_image_generator.processings.propagation import (
+    DEFAULT_CHUNK_SIZE,
+    OrbitalDynamicModel,
+)
+from space_based_telescope_image_generator.utils.constants import MU
+
+MU_KM = MU * 1e-9  # [km3/s2] Standard gravitational constant of the Earth
+
+
+def inertial_to_lvlh(
+    chief_position: NDArray, chief_velocity: NDArray, position: NDArray, velocity: NDArray
+) -> tuple[NDArray, NDArray]:
+    """Express inertial states relative to the chief, in the rotating LVLH frame.
+
+    Args:
+        chief_position (NDArray): Chief positions [km], shape (..., 3).
+        chief_velocity (NDArray): Chief velocities [km/s], shape (..., 3).
+        position (NDArray): Target positions [km], shape (..., 3).
+        velocity (NDArray): Target velocities [km/s], shape (..., 3).
+
+    Returns:
+        tuple[NDArray, NDArray]: Relative positions [km] and velocities [km/s] in LVLH, shape (..., 3).
+    """
+    rotation = lvlh_rotation(chief_position, chief_velocity)
+    omega = np.cross(chief_position, chief_velocity) / np.sum(chief_position**2, axis=-1, keepdims=True)
+    relative_position = position - chief_position
+    relative_velocity = velocity - chief_velocity - np.cross(omega, relative_position)
+    return (
+        apply_inverse_rotation(rotation, relative_position),
+        apply_inverse_rotation(rotation, relative_velocity),
+    )
+
+
+def lvlh_to_inertial(
+    chief_position: NDArray, chief_velocity: NDArray, position_lvlh: NDArray, velocity_lvlh: NDArray
+) -> tuple[NDArray, NDArray]:
+    """Convert relative LVLH states into inertial states.
+
+    Args:
+        chief_position (NDArray): Chief positions [km], shape (..., 3).
+        chief_velocity (NDArray): Chief velocities [km/s], shape (..., 3).
+        position_lvlh (NDArray): Relative positions [km] in LVLH, shape (..., 3).
+        velocity_lvlh (NDArray): Relative velocities [km/s] in LVLH, shape (..., 3).
+
+    Returns:
+        tuple[NDArray, NDArray]: Inertial positions [km] and velocities [km/s], shape (..., 3).
+    """
+    rotation = lvlh_rotation(chief_position, chief_velocity)
+    omega = np.cross(chief_position, chief_velocity) / np.sum(chief_position**2, axis=-1, keepdims=True)
+    relative_position = apply_rotation(rotation, position_lvlh)
+    relative_velocity = apply_rotation(rotation, velocity_lvlh) + np.cross(omega, relative_position)
+    return chief_position + relative_position, chief_velocity + relative_velocity
+
+
+class RelativeMotionModel(OrbitalDynamicModel):
+    """Define how a target moves about a chief, usually the Tracking Satellite orbit.
+
+    The relative motion is computed in closed form, so that close-proximity scenes do not require to propagate
+    and subtract two absolute orbits. The absolute states are only rebuilt from the chief when needed.
+    """
+
+    def __init__(
+        self,
+        chief: OrbitalDynamicModel,
+        relative_position_lvlh: tuple[float, float, float],
+        relative_velocity_lvlh: tuple[float, float, float] = (0.0, 0.0, 0.0),
+    ) -> None:
+        """Class constructor.
+
+        Args:
+            chief (OrbitalDynamicModel): Orbital dynamic of the chief, usually the Tracking Satellite one.
+            relative_position_lvlh (tuple[float, float, float]): Target position relative to the chief at epoch,
+                in LVLH [km].
+            relative_velocity_lvlh (tuple[float, float, float]): Target velocity relative to the chief at
+                epoch, in the rotating LVLH frame [km/s].
+        """
+        self.chief = chief
+        self.relative_position_lvlh = np.asarray(relative_position_lvlh, dtype=float)
+        self.relative_velocity_lvlh = np.asarray(relative_velocity_lvlh, dtype=float)
+
+        chief_position, chief_velocity = (np.asarray(state, dtype=float) for state in chief.keplerian2cartesian())
+        self._chief_position = chief_position
+        self._chief_velocity = chief_velocity
+        self._initialize(chief_position, chief_velocity)
+
+    @classmethod
+    def from_inertial_state(
+        cls,
+        chief: OrbitalDynamicModel,
+        position: tuple[float, float, float],
+        velocity: tuple[float, float, float],
+    ) -> "RelativeMotionModel":
+        """Build the model from the inertial state of the target at the chief epoch.
+
+        Args:
+            chief (OrbitalDynamicModel): Orbital dynamic of the chief.
+            position (tuple[float, float, float]): Target position [km].
+            velocity (tuple[float, float, float]): Target velocity [km/s].
+
+        Returns:
+            RelativeMotionModel: Relative motion model of the target.
+        """
+        chief_position, chief_velocity = (np.asarray(state, dtype=float) for state in chief.keplerian2cartesian())
+        relative_position, relative_velocity = inertial_to_lvlh(
+            chief_position, chief_velocity, np.asarray(position, dtype=float), np.asarray(velocity, dtype=float)
+        )
+        return cls(chief, tuple(relative_position.tolist()), tuple(relative_velocity.tolist()))  # type: ignore[arg-type]
+
+    @property
+    def epoch(self) -> float:
+        """Epoch of the model, being the chief one (timestamp, s)."""
+        return self.chief.epoch  # type: ignore[attr-defined]
+
+    @abstractmethod
+    def _initialize(self, chief_position: NDArray, chief_velocity: NDArray) -> None:
+        """Compute the chief orbit quantities used by the closed form solution.
+
+        Args:
+            chief_position (NDArray): Chief position at epoch [km].
+            chief_velocity (NDArray): Chief velocity at epoch [km/s].
+        """
+
+    @abstractmethod
+    def propagate_relative(self, times: NDArray) -> tuple[NDArray, NDArray]:
+        """Propagate the relative state, vectorised over time.
+
+        Args:
+            times (NDArray): Seconds since the epoch, shape (T,).
+
+        Returns:
+            tuple[NDArray, NDArray]: Relative positions [km] and velocities [km/s] in LVLH, shape (T, 3).
+        """
+
+    def propagate_relative_chunks(
+        self,
+        propagation_time: float,
+        dt_s: float,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        start_step: int = 0,
+    ) -> Iterator[tuple[NDArray, NDArray]]:
+        """Propagate the relative state for an amount of time, yielding the states by chunks.
+
+        Args:
+            propagation_time (float): Amount of seconds to propagate.
+            dt_s (float): Delta t between two steps.
+            chunk_size (int): Maximum number of steps per chunk.
+            start_step (int): Index of the first step yielded, the propagation starting at its time.
+
+        Yields:
+            tuple[NDArray, NDArray]: Relative positions [km] / velocities [km/s] in LVLH, shape (n, 3).
+        """
+        n_steps = int(propagation_time / dt_s)
+        for start in range(start_step, n_steps, chunk_size):
+            yield self.propagate_relative(np.arange(start + 1, min(start + chunk_size, n_steps) + 1) * dt_s)
+
+    def keplerian2cartesian(
+        self,
+    ) -> tuple[tuple[float, float, float], tuple[float, float, float]]:
+        """Exposed method used to retrieve the PVT at epoch in km - km/s.
+
+        Returns:
+            tuple[tuple[float, float, float],tuple[float, float, float]]: Position [km] / Speed [km/s]
+
+        """
+        position, velocity = lvlh_to_inertial(
+            self._chief_position, self._chief_velocity, self.relative_position_lvlh, self.relative_velocity_lvlh
+        )
+        return (tuple(position.tolist()), tuple(velocity.tolist()))  # type: ignore[return-value]
+
+    def propagate(
+        self, propagation_time: float, dt_s: float
+    ) -> tuple[list[tuple[float, float, float]], list[tuple[float, float, float]]]:
+        """Propagate the orbit for an amount of time.
+
+        Args:
+            propagation_time (float): Amount of seconds to propagate.
+            dt_s (float): Delta t between two steps.
+
+        Returns:
+            tuple[list[tuple[float, float, float]], list[tuple[float, float, float]]]: Returns two list
+              with the positions [km]/ instantanate speed [km/s], in the chief frame.
+        """
+        position_list: list[tuple[float, float, float]] = []
+        velocity_list: list[tuple[float, float, float]] = []
+        for positions, velocities in self.propagate_chunks(propagation_time, dt_s):
+            position_list.extend(tuple(pos) for pos in positions.tolist())  # type: ignore[misc]
+            velocity_list.extend(tuple(vel) for vel in velocities.tolist())  # type: ignore[misc]
+        return (position_list, velocity_list)
+
+    def propagate_chunks(
+        self,
+        propagation_time: float,
+        dt_s: float,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        start_step: int = 0,
+    ) -> Iterator[tuple[NDArray, NDArray]]:
+        """Propagate the orbit for an amount of time, yielding the states by chunks.
+
+        The chief is propagated with its own model and the relative states are added in its LVLH frame.
+
+        Args:
+            propagation_time (float): Amount of seconds to propagate.
+            dt_s (float): Delta t between two steps.
+            chunk_size (int): Maximum number of steps per chunk.
+            start_step (int): Index of the first step yielded, the previous steps being skipped.
+
+        Yields:
+            tuple[NDArray, NDArray]: Positions [km] / instantanate speeds [km/s], shape (n, 3).
+        """
+        for (chief_positions, chief_velocities), (relative_positions, relative_velocities) in zip(
+            self.chief.propagate_chunks(propagation_time, dt_s, chunk_size, start_step),
+            self.propagate_relative_chunks(propagation_time, dt_s, chunk_size, start_step),
+            strict=True,
+        ):
+            yield lvlh_to_inertial(chief_positions, chief_velocities, relative_positions, relative_velocities)
+
+
+class ClohessyWiltshireModel(RelativeMotionModel):
+    """Clohessy-Wiltshire (Hill) relative motion, valid for a near circular chief orbit."""
+
+    def _initialize(self, chief_position: NDArray, chief_velocity: NDArray) -> None:
+        """Compute the chief mean motion.
+
+        Args:
+            chief_position (NDArray): Chief position at epoch [km].
+            chief_velocity (NDArray): Chief velocity at epoch [km/s].
+        """
+        semi_major_axis = 1 / (2 / np.linalg.norm(chief_position) - np.dot(chief_velocity, chief_velocity) / MU_KM)
+        self.mean_motion = m.sqrt(MU_KM / semi_major_axis**3)  # [rad/s]
+
+    def propagate_relative(self, times: NDArray) -> tuple[NDArray, NDArray]:
+        """Propagate the relative state with the closed form Clohessy-Wiltshire solution.
+
+        Args:
+            times (NDArray): Seconds since the epoch, shape (T,).
+
+        Returns:
+            tuple[NDArray, NDArray]: Relative positions [km] and velocities [km/s] in LVLH, shape (T, 3).
+        """
+        n = self.mean_motion
+        x0, y0, z0 = self.relative_position_lvlh
+        vx0, vy0, vz0 = self.relative_velocity_lvlh
+        nt = n * np.asarray(times, dtype=float)
+        s = np.sin(nt)
+        c = np.cos(nt)
+
+        position = np.stack(
+            (
+                (4 - 3 * c) * x0 + s / n * vx0 + 2 / n * (1 - c) * vy0,
+                6 * (s - nt) * x0 + y0 - 2 / n * (1 - c) * vx0 + (4 * s - 3 * nt) / n * vy0,
+                c * z0 + s / n * vz0,
+            ),
+            axis=-1,
+        )
+        velocity = np.stack(
+            (
+                3 * n * s * x0 + c * vx0 + 2 * s * vy0,
+                6 * n * (c - 1) * x0 - 2 * s * vx0 + (4 * c - 3) * vy0,
+                -n * s * z0 + c * vz0,
+            ),
+            axis=-1,
+        )
+        return position, velocity
+
+
+class YamanakaAnkersenModel(RelativeMotionModel):
+    """Yamanaka-Ankersen relative motion, valid for an elliptic chief orbit.
+
+    The state transition matrix is written in the Yamanaka-Ankersen frame (x along-track, y opposite to the
+    orbit normal, z towards the Earth) and in the scaled coordinates of the Tschauner-Hempel equations.
+    """
+
+    def _initialize(self, chief_position: NDArray, chief_velocity: NDArray) -> None:
+        """Compute the chief osculating orbit at epoch.
+
+        Args:
+            chief_position (NDArray): Chief position at epoch [km].
+            chief_velocity (NDArray): Chief velocity at epoch [km/s].
+        """
+        radius = np.linalg.norm(chief_position)
+        angular_momentum = np.linalg.norm(np.cross(chief_position, chief_velocity))
+        self.p = angular_momentum**2 / MU_KM  # [km] Semi-latus rectum
+        e_cos = self.p / radius - 1
+        e_sin = angular_momentum * np.dot(chief_position, chief_velocity) / (MU_KM * radius)
+        self.e = m.hypot(e_cos, e_sin)
+        if self.e >= 1:
+            raise ValueError("The chief orbit must be elliptic.")
+        self.true_anomaly0 = m.atan2(e_sin, e_cos)
+        self.k2 = angular_momentum / self.p**2  # [rad/s]
+        self.mean_motion = m.sqrt(MU_KM * (1 - self.e**2) ** 3 / self.p**3)  # [rad/s]
+        eccentric_anomaly0 = 2 * m.atan2(
+            m.sqrt(1 - self.e) * m.sin(self.true_anomaly0 / 2), m.sqrt(1 + self.e) * m.cos(self.true_anomaly0 / 2)
+        )
+        self.mean_anomaly0 = eccentric_anomaly0 - self.e * m.sin(eccentric_anomaly0)
+
+        # Pseudo initial values of the in-plane solution
+        f0 = self.true_anomaly0
+        rho = 1 + self.e * m.cos(f0)
+        s, c = rho * m.sin(f0), rho * m.cos(f0)
+        e = self.e
+        inverse = np.array(
+            [
+                [1 - e**2, 3 * e * s * (1 / rho + 1 / rho**2), -e * s * (1 + 1 / rho), -e * c + 2],
+                [0, -3 * s * (1 / rho + e**2 / rho**2), s * (1 + 1 / rho), c - 2 * e],
+                [0, -3 * (c / rho + e), c * (1 + 1 / rho) + e, -s],
+                [0, 3 * rho + e**2 - 1, -(rho**2), e * s],
+            ]
+        ) / (1 - e**2)
+        (x, y, z), (vx, vy, vz) = self._to_scaled(self.relative_position_lvlh, self.relative_velocity_lvlh, f0)
+        self._in_plane_constants = inverse @ np.array([x, z, vx, vz])
+        self._out_of_plane_initial = np.array([y, vy])
+
+    def _true_anomaly(self, times: NDArray) -> NDArray:
+        """Chief true anomaly.
+
+        Args:
+            times (NDArray): Seconds since the epoch, shape (T,).
+
+        Returns:
+            NDArray: True anomalies [rad], shape (T,).
+        """
+        mean_anomaly = self.mean_anomaly0 + self.mean_motion * times
+        eccentric_anomaly = mean_anomaly.copy()
+        for _ in range(20):
+            eccentric_anomaly -= (eccentric_anomaly - self.e * np.sin(eccentric_anomaly) - mean_anomaly) / (
+                1 - self.e * np.cos(eccentric_anomaly)
+            )
+        return 2 * np.arctan2(
+            m.sqrt(1 + self.e) * np.sin(eccentric_anomaly / 2), m.sqrt(1 - self.e) * np.cos(eccentric_anomaly / 2)
+        )
+
+    def _to_scaled(self, position: NDArray, velocity: NDArray, f: NDArray | float) -> tuple[NDArray, NDArray]:
+        """Convert LVLH states into the scaled Yamanaka-Ankersen states.
+
+        Args:
+            position (NDArray): Relative positions [km] in LVLH, shape (..., 3).
+            velocity (NDArray): Relative velocities [km/s] in LVLH, shape (..., 3).
+            f (NDArray | float): Chief true anomaly [rad], shape (...).
+
+        Returns:
+            tuple[NDArray, NDArray]: Scaled positions and derivatives with respect to the true anomaly.
+        """
+        axes = np.array([[0, 1, 0], [0, 0, -1], [-1, 0, 0]])  # LVLH (RSW) to Yamanaka-Ankersen
+        position_ya = position @ axes.T
+        velocity_ya = velocity @ axes.T
+        rho = (1 + self.e * np.cos(f))[..., None]
+        scaled_position = rho * position_ya
+        scaled_velocity = -self.e * np.sin(f)[..., None] * position_ya + velocity_ya / (self.k2 * rho)
+        return scaled_position, scaled_velocity
+
+    def _from_scaled(self, scaled_position: NDArray, scaled_velocity: NDArray, f: NDArray) -> tuple[NDArray, NDArray]:
+        """Convert scaled Yamanaka-Ankersen states into LVLH states.
+
+        Args:
+            scaled_position (NDArray): Scaled positions, shape (T, 3).
+            scaled_velocity (NDArray): Derivatives of the scaled positions with respect to the true anomaly,
+                shape (T, 3).
+            f (NDArray): Chief true anomaly [rad], shape (T,).
+
+        Returns:
+            tuple[NDArray, NDArray]: Relative positions [km] and velocities [km/s] in LVLH, shape (T, 3).
+        """
+        axes = np.array([[0, 1, 0], [0, 0, -1], [-1, 0, 0]])
+        rho = (1 + self.e * np.cos(f))[..., None]
+        position_ya = scaled_position / rho
+        velocity_ya = self.k2 * (rho * scaled_velocity + self.e * np.sin(f)[..., None] * scaled_position)
+        return position_ya @ axes, velocity_ya @ axes
+
+    def propagate_relative(self, times: NDArray) -> tuple[NDArray, NDArray]:
+        """Propagate the relative state with the Yamanaka-Ankersen state transition matrix.
+
+        Args:
+            times (NDArray): Seconds since the epoch, shape (T,).
+
+        Returns:
+            tuple[NDArray, NDArray]: Relative positions [km] and velocities [km/s] in LVLH, shape (T, 3).
+        """
+        times = np.asarray(times, dtype=float)
+        f = self._true_anomaly(times)
+        e = self.e
+        rho = 1 + e * np.cos(f)
+        s, c = rho * np.sin(f), rho * np.cos(f)
+        s_prime = np.cos(f) + e * np.cos(2 * f)
+        c_prime = -(np.sin(f) + e * np.sin(2 * f))
+        j = self.k2 * times
+        zeros, ones = np.zeros_like(f), np.ones_like(f)
+
+        transition = np.stack(
+            (
+                np.stack((ones, -c * (1 + 1 / rho), s * (1 + 1 / rho), 3 * rho**2 * j), axis=-1),
+                np.stack((zeros, s, c, 2 - 3 * e * s * j), axis=-1),
+                np.stack((zeros, 2 * s, 2 * c - e, 3 * (1 - 2 * e * s * j)), axis=-1),
+                np.stack((zeros, s_prime, c_prime, -3 * e * (s_prime * j + s / rho**2)), axis=-1),
+            ),
+            axis=-2,
+        )
+        x, z, vx, vz = np.moveaxis(transition @ self._in_plane_constants, -1, 0)
+
+        delta_f = f - self.true_anomaly0
+        y0, vy0 = self._out_of_plane_initial
+        y = np.cos(delta_f) * y0 + np.sin(delta_f) * vy0
+        vy = -np.sin(delta_f) * y0 + np.cos(delta_f) * vy0
+
+        return self._from_scaled(np.stack((x, y, z), axis=-1), np.stack((vx, vy, vz), axis=-1), f)
@@ -0,0 +1,245 @@
+"""Synthesis of intermediate frames by reprojection of the rendered keyframes.
+
+Each pixel of a keyframe is given a depth along its ray:
+    - target pixels, known from a cheap mask pass of POV-Ray (target alone, ambient colours only), lie on the
+      front of the target bounding sphere and move rigidly with the target,
+    - Earth pixels are given by the intersection of the ray with the Earth sphere and rotate with the Earth,
+    - the other pixels (stars, space) are at infinity and only move with the camera rotation.
+The pixels of the previous keyframe are splatted forward and those of the next keyframe backward at the camera and
+target poses of the intermediate time, the closest point winning. When the holes left by disocclusions are too
+large, the frame must be rendered instead.
+"""
+
+from functools import cached_property
+from pathlib import Path
+
+import numpy as np
+from numpy.typing import NDArray
+from PIL import Image
+
+from space_based_telescope_image_generator.processings.frames import (
+    apply_inverse_rotation,
+    apply_rotation,
+    axis_rotation,
+    camera_rotation,
+)
+from space_based_telescope_image_generator.processings.pointing import CameraModel
+from space_based_telescope_image_generator.processings.quaternions import quaternion_to_matrix
+from space_based_telescope_image_generator.utils.constants import EARTH_ROTATION_RATE, earth_radius
+
+BACKGROUND, EARTH, TARGET = 0, 1, 2  # Pixel layers
+
+
+class ViewState:
+    """Camera and target poses of a frame."""
+
+    def __init__(
+        self,
+        time: float,
+        sat_position: NDArray,
+        sat_velocity: NDArray,
+        look_at: NDArray,
+        sky: NDArray,
+        target_position: NDArray,
+        target_quaternion: NDArray,
+    ) -> None:
+        """Class constructor.
+
+        Args:
+            time (float): Timestamp of the frame (s).
+            sat_position (NDArray): Satellite position [km], shape (3,).
+            sat_velocity (NDArray): Satellite velocity [km/s], shape (3,).
+            look_at (NDArray): Pointed position [km], shape (3,).
+            sky (NDArray): Unit up vector of the camera, shape (3,).
+            target_position (NDArray): Target position [km], shape (3,).
+            target_quaternion (NDArray): Target body to scene quaternion (scalar first), shape (4,).
+        """
+        self.time = float(time)
+        self.sat_position = np.asarray(sat_position, dtype=float)
+        self.sat_velocity = np.asarray(sat_velocity, dtype=float)
+        self.look_at = np.asarray(look_at, dtype=float)
+        self.sky = np.asarray(sky, dtype=float)
+        self.target_position = np.asarray(target_position, dtype=float)
+        self.target_quaternion = np.asarray(target_quaternion, dtype=float)
+
+    @cached_property
+    def camera_rotation(self) -> NDArray:
+        """Rotation from the camera frame to the scene frame, shape (3, 3)."""
+        boresight = self.look_at - self.sat_position
+        return camera_rotation(boresight / np.linalg.norm(boresight), self.sky)
+
+    @cached_property
+    def target_rotation(self) -> NDArray:
+        """Rotation from the target body frame to the scene frame, shape (3, 3)."""
+        return quaternion_to_matrix(self.target_quaternion)
+
+
+class Keyframe:
+    """Rendered keyframe with the 3D point seen by each pixel."""
+
+    def __init__(self, image: NDArray, layers: NDArray, points: NDArray, view: ViewState) -> None:
+        """Class constructor.
+
+        Args:
+            image (NDArray): RGB image, shape (H, W, 3).
+            layers (NDArray): Layer of each pixel (BACKGROUND, EARTH or TARGET), shape (H, W).
+            points (NDArray): Scene points [km] (Earth), target body points [km] (target) or scene directions
+                (background) of each pixel, shape (H, W, 3).
+            view (ViewState): Poses of the keyframe.
+        """
+        self.image = image
+        self.layers = layers
+        self.points = points
+        self.view = view
+
+
+class FrameReprojector:
+    """Synthesise intermediate frames from the surrounding keyframes."""
+
+    def __init__(self, camera: CameraModel, target_radius_km: float = 0.005, max_hole_fraction: float = 0.002) -> None:
+        """Class constructor.
+
+        Args:
+            camera (CameraModel): Camera model of the rendered images.
+            target_radius_km (float): Radius of the target bounding sphere [km].
+            max_hole_fraction (float): Maximum fraction of pixels seen by none of the keyframes before the frame
+                has to be rendered.
+        """
+        self.camera = camera
+        self.target_radius_km = target_radius_km
+        self.max_hole_fraction = max_hole_fraction
+
+    def keyframe(self, image_path: Path, mask_path: Path, view: ViewState) -> Keyframe:
+        """Load a rendered keyframe and give a depth to its pixels.
+
+        Args:
+            image_path (Path): Rendered image.
+            mask_path (Path): Mask pass of the target (non black pixels belong to the target).
+            view (ViewState): Poses of the keyframe.
+
+        Returns:
+            Keyframe: Keyframe ready to be reprojected.
+        """
+        with Image.open(image_path) as image, Image.open(mask_path) as mask:
+            rgb = np.asarray(image.convert("RGB"), dtype=np.float32)
+            target_mask = np.asarray(mask.convert("L")) > 0
+
+        rays = apply_rotation(view.camera_rotation, self.camera.ray_directions)  # Scene directions (H, W, 3)
+        layers = np.full(target_mask.shape, BACKGROUND, dtype=np.int8)
+        points = rays.copy()
+
+        # Earth: nearest intersection of the rays with the sphere
+        b = np.einsum("...i,i->...", rays, view.sat_position)
+        discriminant = b**2 - (view.sat_position @ view.sat_position - earth_radius**2)
+        earth_distance = -b - np.sqrt(np.maximum(discriminant, 0.0))
+        on_earth = (discriminant > 0) & (earth_distance > 0)
+        layers[on_earth] = EARTH
+        points[on_earth] = view.sat_position + earth_distance[on_earth, None] * rays[on_earth]
+
+        # Target: front of the bounding sphere, expressed in the target body frame
+        relative = view.target_position - view.sat_position
+        b = np.einsum("...i,i->...", rays, relative)
+        discriminant = b**2 - (relative @ relative - self.target_radius_km**2)
+        target_distance = b - np.sqrt(np.maximum(discriminant, 0.0))
+        layers[target_mask] = TARGET
+        target_points = view.sat_position + target_distance[target_mask, None] * rays[target_mask]
+        points[target_mask] = apply_inverse_rotation(view.target_rotation, target_points - view.target_position)
+
+        return Keyframe(rgb, layers, points, view)
+
+    def _splat(self, keyframe: Keyframe, view: ViewState) -> tuple[NDArray, NDArray]:
+        """Move the pixels of a keyframe to the poses of another frame.
+
+        Args:
+            keyframe (Keyframe): Source keyframe.
+            view (ViewState): Poses of the synthesised frame.
+
+        Returns:
+            tuple[NDArray, NDArray]: Synthesised image (H, W, 3) and mask of the covered pixels (H, W).
+        """
+        layers = keyframe.layers.ravel()
+        points = keyframe.points.reshape(-1, 3)
+        colours = keyframe.image.reshape(-1, 3)
+
+        # Points of the synthesised frame, relative to the camera
+        vectors = points.copy()
+        earth = layers == EARTH
+        earth_turn = axis_rotation(EARTH_ROTATION_RATE * (view.time - keyframe.view.time), 2)
+        vectors[earth] = points[earth] @ earth_turn.T - view.sat_position
+        target = layers == TARGET
+        vectors[target] = view.target_position + points[target] @ view.target_rotation.T - view.sat_position
+        camera_vectors = apply_inverse_rotation(view.camera_rotation, vectors)
+
+        columns, rows, valid = self.camera.project(camera_vectors)
+        depth = np.where(layers == BACKGROUND, np.inf, np.linalg.norm(vectors, axis=-1))
+
+        # Z-buffer: the closest point of each pixel is kept
+        pixels = (rows * self.camera.width + columns)[valid]
+        order = np.lexsort((depth[valid], pixels))
+        kept_pixels, first = np.unique(pixels[order], return_index=True)
+        image = np.zeros((self.camera.height * self.camera.width, 3), dtype=np.float32)
+        covered = np.zeros(self.camera.height * self.camera.width, dtype=bool)
+        image[kept_pixels] = colours[valid][order[first]]
+        covered[kept_pixels] = True
+        shape = (self.camera.height, self.camera.width)
+        return image.reshape(shape + (3,)), covered.reshape(shape)
+
+    @staticmethod
+    def _close_cracks(image: NDArray, covered: NDArray) -> None:
+        """Fill the isolated uncovered pixels left by the splatting with the mean of their covered neighbours.
+
+        Args:
+            image (NDArray): Synthesised image, modified in place, shape (H, W, 3).
+            covered (NDArray): Mask of the covered pixels, modified in place, shape (H, W).
+        """
+        padded_image = np.pad(image * covered[..., None], ((1, 1), (1, 1), (0, 0)))
+        padded_covered = np.pad(covered, 1).astype(np.float32)
+        height, width = covered.shape
+        total = np.zeros_like(image)
+        count = np.zeros(covered.shape, dtype=np.float32)
+        for dy in range(3):
+            for dx in range(3):
+                if dy == 1 and dx == 1:
+                    continue
+                total += padded_image[dy:dy + height, dx:dx + width]
+                count += padded_covered[dy:dy + height, dx:dx + width]
+        cracks = ~covered & (count >= 5)
+        image[cracks] = total[cracks] / count[cracks, None]
+        covered |= cracks
+
+    def interpolate(
+        self, previous: Keyframe, following: Keyframe | None, view: ViewState, weight: float
+    ) -> NDArray | None:
+        """Synthesise an intermediate frame.
+
+        Args:
+            previous (Keyframe): Keyframe before the frame.
+            following (Keyframe | None): Keyframe after the frame, if any.
+            view (ViewState): Poses of the frame.
+            weight (float): Position of the frame between the keyframes, 0 at the previous one and 1 at the next.
+
+        Returns:
+            NDArray | None: RGB image (H, W, 3) in uint8, None when the frame has to be rendered.
+        """
+        forward, forward_covered = self._splat(previous, view)
+        self._close_cracks(forward, forward_covered)
+        if following is None:
+            image, covered = forward, forward_covered
+        else:
+            backward, backward_covered = self._splat(following, view)
+            self._close_cracks(backward, backward_covered)
+            both = forward_covered & backward_covered
+            image = np.where(forward_covered[..., None], forward, backward)
+            image[both] = (1 - weight) * forward[both] + weight * backward[both]
+            covered = forward_covered | backward_covered
+
+        # The borders uncovered by the camera rotation are not disocclusions, they are not counted
+        relative_rotation = previous.view.camera_rotation.T @ view.camera_rotation
+        rotation_angle = np.arccos(np.clip((np.trace(relative_rotation) - 1) / 2, -1.0, 1.0))
+        margin = min(int(np.ceil(self.camera.focal_px * rotation_angle)) + 1, min(covered.shape) // 2)
+        interior = covered[margin:covered.shape[0] - margin, margin:covered.shape[1] - margin]
+        if np.mean(~interior) > self.max_hole_fraction:
+            return None
+        # The few remaining holes are filled with the keyframe colours
+        image[~covered] = previous.image[~covered]
+        return np.clip(np.rint(image), 0, 255).astype(np.uint8)
@@ -1,6 +1,16 @@
 """Manage the scene definition and image generation."""
 
+from collections.abc import Iterator
+from datetime import datetime
+from contextlib import nullcontext
 from pathlib import Path
+import os
+import shutil
+import subprocess
+import tempfile
+import warnings
+import numpy as np
+from numpy.typing import NDArray
 from PIL import Image
 from typing import Union
 from space_based_telescope_image_generator.objects.astral_objects.astral_object import (
@@ -15,17 +25,94 @@ from space_based_telescope_image_generator.objects.targets.target_object import
 from space_based_telescope_image_generator.objects.tracking_satellite import (
     TrackingSatellite,
 )
+from space_based_telescope_image_generator.processings.dataset import DatasetWriter
+from space_based_telescope_image_generator.processings.annotations import (
+    compute_annotations,
+    write_annotations,
+)
+from space_based_telescope_image_generator.processings.ephemeris import (
+    AstralTimeline,
+    SimulationClock,
+    sun_direction,
+    sun_direction_from_longitude,
+)
+from space_based_telescope_image_generator.processings.events import EventFinder
+from space_based_telescope_image_generator.processings.keyframes import KeyframeScheduler
+from space_based_telescope_image_generator.processings.manifest import RenderManifest, state_fingerprint
+from space_based_telescope_image_generator.processings.memory import RenderAdmission, local_povstring
+from space_based_telescope_image_generator.processings.pointing import (
+    CameraPointing,
+    compute_pointing,
+    focal_length_px,
+)
+from space_based_telescope_image_generator.processings.reprojection import (
+    FrameReprojector,
+    Keyframe,
+    ViewState,
+)
+from space_based_telescope_image_generator.processings.sensor import (
+    SensorPipeline,
+    apply_sensor as apply_sensor_model,
+    process_frame_files,
+)
+from space_based_telescope_image_generator.processings.relative_motion import (
+    RelativeMotionModel,
+    lvlh_to_inertial,
+)
 from space_based_telescope_image_generator.utils.configuration import MainConfig
+from space_based_telescope_image_generator.utils.constants import OBLIQUITY
 from space_based_telescope_image_generator.utils.home_folder_management import (
     verify_home_folder,
 )
 from vapory import Scene
+from vapory.config import POVRAY_BINARY
 
 from space_based_telescope_image_generator.utils.resolution_checker import (
     check_resolutions,
 )
 
 
+class _VideoSequence:
+    """Frames of a video being rendered, and the stages they are handed to once complete."""
+
+    def __init__(
+        self,
+        step_images_folder: Path,
+        timeline: AstralTimeline,
+        manifest: RenderManifest,
+        *,
+        interpolation: str = "hold",
+        reprojector: FrameReprojector | None = None,
+        sensor_pipeline: SensorPipeline | None = None,
+        dataset_writer: DatasetWriter | None = None,
+    ) -> None:
+        """Class constructor.
+
+        Args:
+            step_images_folder (Path): Folder of the frames.
+            timeline (AstralTimeline): Astral timeline of the sequence.
+            manifest (RenderManifest): Manifest the completed frames are recorded in.
+            interpolation (str): Filling of the frames that are not traced, see KeyframeScheduler.
+            reprojector (FrameReprojector | None): Reprojection of the keyframes, with the "reproject" interpolation.
+            sensor_pipeline (SensorPipeline | None): Sensor workers, if any.
+            dataset_writer (DatasetWriter | None): Dataset the frames are appended to, if any.
+        """
+        self.step_images_folder = step_images_folder
+        self.timeline = timeline
+        self.manifest = manifest
+        self.reprojector = reprojector
+        self.interpolation = interpolation
+        self.sensor_pipeline = sensor_pipeline
+        self.dataset_writer = dataset_writer
+        self.image_list: list[Path] = []
+        # Frames waiting for the next rendered image to be filled
+        self.pending_frames: list[tuple[int, Path, ViewState]] = []
+        self.last_rendered: tuple[Path, Keyframe | None] | None = None
+        # Poses of the frames not handed over yet, and whether they were traced
+        self.frame_views: dict[int, tuple[ViewState, bool]] = {}
+        self.finalised = 0  # Frames already sent to the sensor workers and the dataset
+
+
 class SceneManager:
     """Class managing the creation of a scene with all the mandatory elements (satellite, target, Earth, Background)."""
 
@@ -33,19 +120,39 @@ class SceneManager:
         self,
         target: TargetObject,
         satellite: TrackingSatellite,
-        sun_direction_deg: float = 0.0,
+        sun_direction_deg: float | None = None,
+        start_date: datetime | None = None,
     ):
-        """Class constructor."""
+        """Class constructor.
+
+        Args:
+            target (TargetObject): Target of the satellite.
+            satellite (TrackingSatellite): Satellite holding the camera.
+            sun_direction_deg (float | None): Fixed Sun ecliptic longitude [deg]. If None, the Sun direction is
+                given by the ephemeris at the simulation date.
+            start_date (datetime | None): Date of the scene start, the satellite epoch by default.
+        """
         verify_home_folder()
         check_resolutions()
-        self.earth = Earth()
-        self.background = StarMap()
-        self.sun = Sun(sun_direction_deg)
         self.verify_satellite(satellite)
         self.satellite = satellite
         self.verify_target(target)
         self.target = target
 
+        if start_date is not None:
+            start_timestamp = start_date.timestamp()
+        elif getattr(satellite.kepler_dynamic_model, "epoch", None) is not None:
+            start_timestamp = float(np.atleast_1d(satellite.kepler_dynamic_model.epoch)[0])  # type: ignore[attr-defined]
+        else:
+            start_timestamp = datetime.now().timestamp()
+        self.clock = SimulationClock(start_timestamp)
+        self.sun_ephemeris = sun_direction_deg is None
+
+        self.earth = Earth()
+        self.background = StarMap()
+        self.sun = Sun(0.0 if sun_direction_deg is None else sun_direction_deg)
+        self.update_astral_objects()
+
         self.object_list: list[Union[AstralObject, TargetObject]] = [
             self.background,
             self.sun,
@@ -53,6 +160,11 @@ class SceneManager:
             self.satellite,
             self.target,
         ]
+        # Memory admission of the renders, shared with the other workers of the host, e.g. set by the workers
+        self.render_admission: RenderAdmission | None = None
+        # Render threads (+WT) of each POV-Ray process, e.g. the CPU slot size of a worker. The vapory render command
+        # does not take this option, the local POV-Ray binary is then run directly. POV-Ray default if None.
+        self.render_threads: int | None = None
 
     def verify_target(self, target: TargetObject) -> None:
         """Set the target.
@@ -76,6 +188,38 @@ class SceneManager:
             raise ValueError("Provided object is not a valid TrackingSatellite.")
         self.target = satellite
 
+    def update_astral_objects(self) -> None:
+        """Orient the Earth and the Sun at the current date of the simulation clock."""
+        timeline = AstralTimeline(np.array([self.clock.current_timestamp]))
+        self._set_astral_state(timeline, 0)
+
+    def _set_astral_state(self, timeline: AstralTimeline, frame_index: int) -> None:
+        """Orient the Earth and the Sun for a frame of a timeline.
+
+        Args:
+            timeline (AstralTimeline): Astral timeline of the sequence.
+            frame_index (int): Index of the frame.
+        """
+        self.clock.current_timestamp = float(timeline.times[frame_index])
+        self.earth.rotation_deg = float(timeline.earth_rotation_deg[frame_index])
+        if self.sun_ephemeris:
+            self.sun.set_direction(timeline.sun_directions[frame_index].tolist())
+
+    def sun_directions(self, times: NDArray) -> NDArray:
+        """Sun directions of the scene at given dates.
+
+        Args:
+            times (NDArray): Timestamps (s), shape (N,).
+
+        Returns:
+            NDArray: Unit vectors in the scene frame, shape (N, 3).
+        """
+        times = np.asarray(times, dtype=float)
+        if self.sun_ephemeris:
+            return sun_direction(times)
+        direction = sun_direction_from_longitude(np.radians(self.sun.illumination_angle_deg), abs(OBLIQUITY))
+        return np.broadcast_to(direction, times.shape + (3,))
+
     def check_includes(self) -> list[str]:
         """Retrieve important includes.
 
@@ -89,28 +233,198 @@ class SceneManager:
 
         return list(set(include_list))
 
-    def render_image(self, ouput_image_path: Path) -> None:
+    def render_image(self, ouput_image_path: Path, apply_sensor: bool = True) -> None:
         """Render the image.
 
+        Args:
+            ouput_image_path (Path): Path where the image will be saved (should be a file).
+            apply_sensor (bool): If the satellite has a sensor, also write the sensor image in a "sensor" folder
+                next to the rendered image.
+        """
+        self._render_scene(ouput_image_path)
+        if apply_sensor and self.satellite.sensor is not None:
+            process_frame_files(
+                self.satellite.sensor, [ouput_image_path], [0], ouput_image_path.parent.joinpath("sensor")
+            )
+
+    def render_image_array(
+        self, output_image_path: Path | None = None, apply_sensor: bool = False, out: NDArray | None = None
+    ) -> NDArray:
+        """Render the image in memory, POV-Ray writing an uncompressed image to a pipe instead of a file.
+
+        Args:
+            output_image_path (Path | None): Optional sink, the image is also saved there (PNG) if given.
+            apply_sensor (bool): If the satellite has a sensor, return the sensor image instead of the rendered one.
+            out (NDArray | None): Array the image is written into (e.g. a FrameRing slot), shape (H, W, 3).
+
+        Returns:
+            NDArray: Rendered image, shape (H, W, 3), uint8 (or the sensor digital numbers), `out` if given.
+        """
+        image = self._render_scene_array()
+        if output_image_path is not None:
+            if output_image_path.is_dir():
+                raise ValueError("Provided path is a folder.")
+            output_image_path.parent.mkdir(parents=True, exist_ok=True)
+            Image.fromarray(image).save(output_image_path)
+        if apply_sensor and self.satellite.sensor is not None:
+            image = apply_sensor_model(self.satellite.sensor, image[None], np.zeros(1, dtype=int))[0]
+        if out is not None:
+            out[...] = image
+            return out
+        return image
+
+    def render_target_mask(self, ouput_image_path: Path) -> None:
+        """Render a cheap mask pass: the target alone, with its ambient colours only, on a black background.
+
         Args:
             ouput_image_path (Path): Path where the image will be saved (should be a file).
         """
+        self._render_scene(ouput_image_path, objects=[self.target.get_povray_object()], quality=0)
+
+    def _render_scene(self, ouput_image_path: Path, objects: list | None = None, quality: int | None = None) -> None:
+        """Render some objects of the scene from the satellite camera to an image file.
+
+        Args:
+            ouput_image_path (Path): Path where the image will be saved (should be a file).
+            objects (list | None): POV-Ray objects of the scene, the whole scene if None.
+            quality (int | None): POV-Ray quality (+Q), the POV-Ray default if None.
+        """
         if ouput_image_path.is_dir():
             raise ValueError("Provided path is a folder.")
-        home_folder = Path.home().joinpath(MainConfig().path_management.home_folder)
-        resources_folder = home_folder.joinpath(
-            MainConfig().path_management.resources_path
-        )
         ouput_image_path.parent.mkdir(parents=True, exist_ok=True)
+        self._run_povray(str(ouput_image_path), objects, quality)
 
-        scene = Scene(
-            self.satellite.get_camera(),
-            objects=[
+    def _render_scene_array(self, objects: list | None = None, quality: int | None = None) -> NDArray:
+        """Render some objects of the scene from the satellite camera to an array.
+
+        The image is read from the POV-Ray output pipe (+O-, uncompressed PPM), without touching the disk.
+
+        Args:
+            objects (list | None): POV-Ray objects of the scene, the whole scene if None.
+            quality (int | None): POV-Ray quality (+Q), the POV-Ray default if None.
+
+        Returns:
+            NDArray: Rendered image, shape (H, W, 3), uint8.
+
+        Raises:
+            ValueError: If POV-Ray did not return an image.
+        """
+        image = self._run_povray(None, objects, quality)
+        if image is None:
+            raise ValueError("POV-Ray did not return the image.")
+        return self.to_rgb8(image)
+
+    def _run_povray(self, output_file: str | None, objects: list | None, quality: int | None) -> NDArray | None:
+        """Run POV-Ray on the scene.
+
+        Args:
+            output_file (str | None): Image file, the image being returned if None.
+            objects (list | None): POV-Ray objects of the scene, the whole scene if None.
+            quality (int | None): POV-Ray quality (+Q), the POV-Ray default if None.
+
+        Returns:
+            NDArray | None: Image as decoded by vapory when no output file is given.
+        """
+        scene = self.build_scene(objects)
+        admission = (
+            nullcontext()
+            if self.render_admission is None
+            else self.render_admission.admit(str(scene), self.satellite.image_width, self.satellite.image_height)
+        )
+        # Scene file unique to this render, the workers of a host may share the working directory
+        file_descriptor, scene_file = tempfile.mkstemp(prefix="temp_", suffix=".pov", dir=".")
+        os.close(file_descriptor)
+        try:
+            with admission:
+                if self.render_threads is not None:
+                    return self._run_local_povray(str(scene), Path(scene_file), output_file, quality)
+                image: NDArray | None = scene.render(
+                    output_file,
+                    width=self.satellite.image_width,
+                    height=self.satellite.image_height,
+                    quality=quality,
+                    tempfile=Path(scene_file).name,
+                    docker=True,
+                    resources_folder=str(self.resources_folder()),
+                )
+        finally:
+            Path(scene_file).unlink(missing_ok=True)
+        return image
+
+    def _run_local_povray(
+        self, povstring: str, scene_file: Path, output_file: str | None, quality: int | None
+    ) -> NDArray | None:
+        """Run the local POV-Ray binary on a scene description, with render_threads threads.
+
+        Args:
+            povstring (str): Scene description, written for the Docker image.
+            scene_file (Path): Scene file of the render, overwritten.
+            output_file (str | None): Image file, the image being returned if None.
+            quality (int | None): POV-Ray quality (+Q), the POV-Ray default if None.
+
+        Returns:
+            NDArray | None: Rendered image when no output file is given.
+
+        Raises:
+            OSError: If POV-Ray failed.
+        """
+        scene_file.write_text(local_povstring(povstring, self.resources_folder()))
+        image_file = scene_file.with_suffix(".png") if output_file is None else Path(output_file)
+        command = [
+            POVRAY_BINARY,
+            f"+I{scene_file}",
+            f"+W{self.satellite.image_width}",
+            f"+H{self.satellite.image_height}",
+            f"+L{self.resources_folder()}",
+            f"+WT{self.render_threads}",
+            "+FN",
+            f"+O{image_file}",
+            "-D",
+        ]
+        if quality is not None:
+            command.append(f"+Q{quality}")
+        try:
+            process = subprocess.run(command, capture_output=True, check=False)
+            if process.returncode:
+                error = process.stderr.decode(errors="replace")
+                raise OSError(f"POV-Ray rendering failed with the following error: {error}")
+            if output_file is not None:
+                return None
+            with Image.open(image_file) as image:
+                return np.asarray(image.convert("RGB"))
+        finally:
+            if output_file is None:
+                image_file.unlink(missing_ok=True)
+
+    @staticmethod
+    def resources_folder() -> Path:
+        """Folder of the POV-Ray resources (models, textures) included by the scenes.
+
+        Returns:
+            Path: Resources folder.
+        """
+        home_folder = Path.home().joinpath(MainConfig().path_management.home_folder)
+        return home_folder.joinpath(MainConfig().path_management.resources_path)
+
+    def build_scene(self, objects: list | None = None) -> Scene:
+        """Build the POV-Ray scene seen from the satellite camera, in the current state of the objects.
+
+        Args:
+            objects (list | None): POV-Ray objects of the scene, the Sun, Earth, target and background if None.
+
+        Returns:
+            Scene: POV-Ray scene.
+        """
+        if objects is None:
+            objects = [
                 self.sun.get_povray_object(),
                 self.earth.get_povray_object(),
                 self.target.get_povray_object(),
                 self.background.get_povray_object(),
-            ],
+            ]
+        return Scene(
+            self.satellite.get_camera(),
+            objects=objects,
             included=self.check_includes(),
             global_settings=[
                 "max_trace_level",
@@ -122,19 +436,299 @@ class SceneManager:
             ],
         )
 
-        # Rendu
-        output_file = str(ouput_image_path)
-        scene.render(
-            output_file,
-            width=self.satellite.image_width,
-            height=self.satellite.image_height,
-            tempfile="temp.pov",
-            docker=True,
-            resources_folder=str(resources_folder),
+    @staticmethod
+    def to_rgb8(image: NDArray) -> NDArray:
+        """Convert an image read from the POV-Ray pipe to 8 bits RGB.
+
+        Args:
+            image (NDArray): Decoded PPM, 8 or 16 bits per channel, shape (H, W, 3).
+
+        Returns:
+            NDArray: Image, shape (H, W, 3), uint8.
+        """
+        image = np.asarray(image)
+        if image.dtype == np.uint8:
+            return image
+        # 16 bits PPM (maxval 65535), rescaled with rounding
+        return ((image.astype(np.uint32) * 255 + 32767) // 65535).astype(np.uint8)
+
+    def state_chunks(
+        self, duration_s: float, delta_t: float, start_step: int = 0
+    ) -> Iterator[tuple[NDArray, NDArray, NDArray, NDArray]]:
+        """Stream the satellite and target states.
+
+        When the target moves relatively to the satellite orbit, the satellite orbit is propagated once and the
+        relative states are added in its LVLH frame.
+
+        Args:
+            duration_s (float): Amount of seconds to propagate.
+            delta_t (float): Delta t between two steps.
+            start_step (int): Index of the first step, the previous steps being skipped.
+
+        Yields:
+            tuple[NDArray, NDArray, NDArray, NDArray]: Satellite positions [km] and velocities [km/s], target
+                positions [km] and velocities [km/s] of the chunk, shape (n, 3).
+        """
+        target_model = self.target.kepler_dynamic_model
+        if (
+            isinstance(target_model, RelativeMotionModel)
+            and target_model.chief is self.satellite.kepler_dynamic_model
+        ):
+            for (sat_pos, sat_vel), (rel_pos, rel_vel) in zip(
+                target_model.chief.propagate_chunks(duration_s, delta_t, start_step=start_step),
+                target_model.propagate_relative_chunks(duration_s, delta_t, start_step=start_step),
+                strict=True,
+            ):
+                yield sat_pos, sat_vel, *lvlh_to_inertial(sat_pos, sat_vel, rel_pos, rel_vel)
+        else:
+            for (sat_pos, sat_vel), (target_pos, target_vel) in zip(
+                self.satellite.kepler_dynamic_model.propagate_chunks(duration_s, delta_t, start_step=start_step),
+                target_model.propagate_chunks(duration_s, delta_t, start_step=start_step),
+                strict=True,
+            ):
+                yield sat_pos, sat_vel, target_pos, target_vel
+
+    def pointing_chunks(
+        self, duration_s: float, delta_t: float, start_step: int = 0
+    ) -> Iterator[tuple[NDArray, NDArray, NDArray, NDArray, CameraPointing]]:
+        """Stream the satellite and target states with the camera pointing of each chunk.
+
+        Args:
+            duration_s (float): Amount of seconds to propagate.
+            delta_t (float): Delta t between two steps.
+            start_step (int): Index of the first step, the previous steps being skipped.
+
+        Yields:
+            tuple[NDArray, NDArray, NDArray, NDArray, CameraPointing]: Satellite positions [km] and velocities
+                [km/s], target positions [km] and velocities [km/s] and camera pointing of the chunk.
+        """
+        for sat_pos, sat_vel, target_pos, target_vel in self.state_chunks(duration_s, delta_t, start_step):
+            pointing = compute_pointing(
+                sat_pos, sat_vel, target_pos, target_vel, roll_law=self.satellite.roll_law, dt_s=delta_t
+            )
+            yield sat_pos, sat_vel, target_pos, target_vel, pointing
+
+    def frame_views(self, framerate: int, duration_s: float, start: int = 0) -> Iterator[ViewState]:
+        """Stream the camera and target poses of the frames of a sequence.
+
+        Args:
+            framerate (int): Image per seconds.
+            duration_s (float): Total video duration.
+            start (int): Index of the first frame, the propagation starting at its time.
+
+        Yields:
+            ViewState: Poses of the frames, in order.
+        """
+        delta_t = 1 / framerate
+        timeline = self.clock.timeline(int(duration_s / delta_t), delta_t)
+        attitude_chunks = self.target.propagate_attitude_quaternion_chunks(duration_s, delta_t, start_step=start)
+        step_i = start
+        for (
+            sat_positions, sat_velocities, target_positions, target_velocities, pointing
+        ), target_attitudes in zip(self.pointing_chunks(duration_s, delta_t, start), attitude_chunks, strict=True):
+            scene_attitudes = self.target.scene_attitude_quaternions(
+                target_attitudes, target_positions, target_velocities
+            )
+            for frame_i in range(len(pointing)):
+                yield ViewState(
+                    time=timeline.times[step_i],
+                    sat_position=sat_positions[frame_i],
+                    sat_velocity=sat_velocities[frame_i],
+                    look_at=pointing.look_at[frame_i],
+                    sky=pointing.sky[frame_i],
+                    target_position=target_positions[frame_i],
+                    target_quaternion=scene_attitudes[frame_i],
+                )
+                step_i += 1
+
+    def render_frames(
+        self,
+        framerate: int,
+        duration_s: float,
+        output_folder: Path,
+        start: int,
+        stop: int,
+        *,
+        event_finder: EventFinder | None = None,
+        keyframe_scheduler: KeyframeScheduler | None = None,
+        annotate: bool = False,
+        dataset: bool = False,
+    ) -> list[Path]:
+        """Render a range of frames of a sequence, with the same names as in `render_video`.
+
+        The states are propagated from the time of the first frame of the range. Every frame is traced, and the
+        sensor images are written in a "sensor" folder as by `render_video`. The options of `render_video` that
+        depend on the other frames of the sequence are not supported.
+
+        Args:
+            framerate (int): Image per seconds.
+            duration_s (float): Total video duration.
+            output_folder (Path): Path to the output folder.
+            start (int): Index of the first frame.
+            stop (int): Index after the last frame.
+            event_finder (EventFinder | None): Not supported, must be None.
+            keyframe_scheduler (KeyframeScheduler | None): Not supported, must be None.
+            annotate (bool): Not supported, must be False.
+            dataset (bool): Not supported, must be False.
+
+        Returns:
+            list[Path]: Rendered frames.
+
+        Raises:
+            ValueError: If an unsupported option is given.
+        """
+        unsupported = {
+            "event finder": event_finder is not None,
+            "keyframe scheduler": keyframe_scheduler is not None,
+            "annotations": annotate,
+            "dataset": dataset,
+        }
+        if any(unsupported.values()):
+            options = ", ".join(option for option, used in unsupported.items() if used)
+            raise ValueError(f"Frame ranges are rendered without {options}, use render_video instead.")
+        delta_t = 1 / framerate
+        timeline = self.clock.timeline(int(duration_s / delta_t), delta_t)
+        step_images_folder = output_folder.joinpath("steps")
+        step_images_folder.mkdir(parents=True, exist_ok=True)
+        rendered = []
+        for step_i, view in enumerate(self.frame_views(framerate, duration_s, start), start=start):
+            if step_i >= stop:
+                break
+            image_path = step_images_folder.joinpath(f"image_{step_i + 1}.png")
+            self._render_frame(view, timeline, step_i, image_path)
+            rendered.append(image_path)
+        if rendered and self.satellite.sensor is not None:
+            # The sensor noise only depends on the frame index, the images are those of render_video
+            process_frame_files(
+                self.satellite.sensor,
+                rendered,
+                list(range(start, start + len(rendered))),
+                output_folder.joinpath("sensor"),
+            )
+        return rendered
+
+    def _render_frame(self, view: ViewState, timeline: AstralTimeline, step_i: int, image_path: Path) -> None:
+        """Set the scene to the poses of a frame and render it.
+
+        Args:
+            view (ViewState): Poses of the frame.
+            timeline (AstralTimeline): Astral timeline of the sequence.
+            step_i (int): Index of the frame in the sequence.
+            image_path (Path): Path where the image will be saved.
+        """
+        self.set_frame_state(view, timeline, step_i)
+
+        #Render image
+        self.render_image(
+            ouput_image_path=image_path, apply_sensor=False
         )
 
+    def set_frame_state(self, view: ViewState, timeline: AstralTimeline, step_i: int) -> None:
+        """Set the scene objects to the poses of a frame.
+
+        Args:
+            view (ViewState): Poses of the frame.
+            timeline (AstralTimeline): Astral timeline of the sequence.
+            step_i (int): Index of the frame in the sequence.
+        """
+        # Set satellite position & attitude
+        self.satellite.position = view.sat_position.tolist()
+        self.satellite.velocity = view.sat_velocity.tolist()
+        self.satellite.pointing = view.look_at.tolist()
+        self.satellite.sky = view.sky.tolist()
+
+        # Set target position & attitude
+        self.target.position = view.target_position.tolist()
+        self.target.attitude_quaternion = view.target_quaternion
+
+        # Set Earth & Sun
+        self._set_astral_state(timeline, step_i)
+
+    def _fill_frames(self, sequence: "_VideoSequence", following: tuple[Path, Keyframe | None] | None) -> None:
+        """Write the frames lying between two rendered images, then empty the pending list.
+
+        Args:
+            sequence (_VideoSequence): Sequence being rendered, whose pending frames lie after its last rendered
+                image (with its keyframe when the frames are reprojected).
+            following (tuple[Path, Keyframe | None] | None): Rendered image after the pending frames. If None,
+                the previous image is held (or reprojected forward only), otherwise the frames are cross-faded
+                between (or reprojected from) both images.
+        """
+        if sequence.last_rendered is None:
+            raise ValueError("No frame has been rendered yet.")
+        previous = sequence.last_rendered
+        pending_frames = sequence.pending_frames
+        reprojector = sequence.reprojector
+        if reprojector is not None and previous[1] is not None:
+            following_keyframe = None if following is None else following[1]
+            for k, (step_i, image_path, view) in enumerate(pending_frames):
+                weight = (k + 1) / (len(pending_frames) + 1)
+                image = reprojector.interpolate(previous[1], following_keyframe, view, weight)
+                if image is None:
+                    warnings.warn(
+                        f"Reprojection of frame {step_i + 1} leaves too many disoccluded pixels, it is traced.",
+                        stacklevel=2,
+                    )
+                    self._render_frame(view, sequence.timeline, step_i, image_path)
+                else:
+                    Image.fromarray(image).save(image_path)
+        elif following is None:
+            for _, image_path, _ in pending_frames:
+                shutil.copyfile(previous[0], image_path)
+        else:
+            with Image.open(previous[0]) as previous_image, Image.open(following[0]) as following_image:
+                previous_rgb, following_rgb = previous_image.convert("RGB"), following_image.convert("RGB")
+                for k, (_, image_path, _) in enumerate(pending_frames):
+                    weight = (k + 1) / (len(pending_frames) + 1)
+                    Image.blend(previous_rgb, following_rgb, weight).save(image_path)
+        pending_frames.clear()
+
+    @staticmethod
+    def _finalise_frames(sequence: "_VideoSequence", stop: int) -> None:
+        """Hand the frames that will not be modified anymore to the sensor workers and the dataset, and record them.
+
+        Args:
+            sequence (_VideoSequence): Sequence being rendered, whose frames from its first frame not handed yet
+                are handed.
+            stop (int): Frame after the last one to be handed.
+        """
+        image_list = sequence.image_list
+        for index in range(sequence.finalised, stop):
+            view, traced = sequence.frame_views.pop(index)
+            if not traced and not sequence.manifest.is_complete(image_list[index]):
+                sequence.manifest.record(image_list[index], frame_index=index, traced=False)
+            if sequence.sensor_pipeline is not None:
+                sequence.sensor_pipeline.submit(image_list[index], index)
+            if sequence.dataset_writer is not None:
+                with Image.open(image_list[index]) as image:
+                    frame = np.asarray(image.convert("RGB"))
+                sequence.dataset_writer.append(
+                    frame,
+                    {
+                        "frame_index": index,
+                        "time": view.time,
+                        "sat_position": view.sat_position,
+                        "sat_velocity": view.sat_velocity,
+                        "look_at": view.look_at,
+                        "sky": view.sky,
+                        "target_position": view.target_position,
+                        "target_quaternion": view.target_quaternion,
+                        "traced": traced,
+                    },
+                )
+        sequence.finalised = max(sequence.finalised, stop)
+
     def render_video(
-        self, framerate: int, duration_s: int, output_folder: Path
+        self,
+        framerate: int,
+        duration_s: int,
+        output_folder: Path,
+        event_finder: EventFinder | None = None,
+        keyframe_scheduler: KeyframeScheduler | None = None,
+        annotate: bool = False,
+        dataset: bool = False,
+        frames_per_shard: int = 1024,
+        resume: bool = True,
     ) -> Path:
         """Render a video.
 
@@ -142,53 +736,367 @@ class SceneManager:
             framerate (int): Image per seconds (can be < 0).
             duration_s (int): Total video duration.
             output_folder (Path): Path to the output folder.
+            event_finder (EventFinder | None): If given, the frames falling inside an event (eclipse, occlusion,
+                Sun exclusion...) are not rendered, the previous image being copied instead.
+            keyframe_scheduler (KeyframeScheduler | None): If given, only the frames whose predicted image motion
+                exceeds the scheduler threshold are rendered, the others being held or blended from the keyframes.
+            annotate (bool): If True, the ground truth labels of every frame (bounding box, keypoints, centroid,
+                range, relative attitude) are computed from the geometry and written in the output folder.
+            dataset (bool): If True, the frames are also appended to a memory-mappable dataset (see DatasetWriter)
+                in a "dataset" folder, with the time and states of each frame.
+            frames_per_shard (int): Number of frames per shard of the dataset.
+            resume (bool): If True, the traced frames recorded as complete in the manifest of a previous render
+                with the same settings (see RenderManifest) are not rendered again. Otherwise the manifest is
+                restarted.
 
         Returns:
-            Path: _description_
+            Path: Path of the GIF.
+
+        Raises:
+            ValueError: If annotate is True and the geometry of the target model is unknown.
         """
+        if annotate and not self.target.has_geometry:
+            raise ValueError(f"The {type(self.target).__name__} model geometry is unknown, it cannot be annotated.")
         delta_t = 1/framerate
         step_images_folder = output_folder.joinpath("steps")
         step_images_folder.mkdir(parents=True, exist_ok=True)
 
-        # Orbital Propagations
-        target_positions = self.target.propagate_position(duration_s, delta_t)
-        sat_positions = self.satellite.propagate_position(duration_s, delta_t)
+        # Orbital & attitude propagations are streamed: the rendering starts with the first chunk
+        attitude_chunks = self.target.propagate_attitude_quaternion_chunks(duration_s, delta_t)
 
-        #Attitude propagation
-        target_attitudes = self.target.propagate_attitude(duration_s, delta_t)
+        # Sun direction and Earth rotation of every frame, computed at once
+        timeline = self.clock.timeline(int(duration_s / delta_t), delta_t)
 
-        #TODO: Add astral propagation
+        if keyframe_scheduler is not None:
+            keyframe_scheduler.reset()
+        # Completed frames, a frame traced by an interrupted run with the same settings is reused
+        manifest = RenderManifest(
+            output_folder,
+            self._render_settings(framerate, duration_s, event_finder, keyframe_scheduler),
+            reset=not resume,
+        )
 
-        image_list: list[Path] = []
+        sensor = self.satellite.sensor
+        sensor_context = (
+            nullcontext() if sensor is None else SensorPipeline(sensor, output_folder.joinpath("sensor"))
+        )
+        dataset_context = (
+            nullcontext() if not dataset else self._dataset_writer(output_folder, framerate, frames_per_shard)
+        )
+        annotation_chunks: list[dict[str, NDArray]] = []
+        with sensor_context as sensor_pipeline, dataset_context as dataset_writer:
+            sequence = _VideoSequence(
+                step_images_folder,
+                timeline,
+                manifest,
+                interpolation="hold" if keyframe_scheduler is None else keyframe_scheduler.interpolation,
+                reprojector=self._frame_reprojector(keyframe_scheduler),
+                sensor_pipeline=sensor_pipeline,
+                dataset_writer=dataset_writer,
+            )
+            for (
+                sat_positions, sat_velocities, target_positions, target_velocities, pointing
+            ), target_attitudes in zip(self.pointing_chunks(duration_s, delta_t), attitude_chunks, strict=True):
+                scene_attitudes = self.target.scene_attitude_quaternions(
+                    target_attitudes, target_positions, target_velocities
+                )
+                chunk_start = len(sequence.image_list)
+                views = [
+                    ViewState(
+                        time=timeline.times[chunk_start + frame_i],
+                        sat_position=sat_positions[frame_i],
+                        sat_velocity=sat_velocities[frame_i],
+                        look_at=pointing.look_at[frame_i],
+                        sky=pointing.sky[frame_i],
+                        target_position=target_positions[frame_i],
+                        target_quaternion=scene_attitudes[frame_i],
+                    )
+                    for frame_i in range(len(pointing))
+                ]
+                traced = self._frames_to_trace(
+                    timeline.times[chunk_start:chunk_start + len(pointing)],
+                    (sat_positions, sat_velocities, target_positions, target_velocities, pointing),
+                    scene_attitudes,
+                    event_finder,
+                    keyframe_scheduler,
+                )
+                if annotate:
+                    annotation_chunks.append(
+                        compute_annotations(
+                            sat_positions,
+                            target_positions,
+                            scene_attitudes,
+                            pointing,
+                            self.satellite.camera_model(),
+                            self.target.keypoints(),
+                            self.target.bounding_radius_km,
+                        )
+                    )
+                for view, trace in zip(views, traced, strict=True):
+                    self._write_frame(sequence, view, trace)
+            self._finish_sequence(sequence)
 
-        for step_i, (sat_pos, target_pos, target_att) in enumerate(zip(sat_positions, target_positions, target_attitudes)):
-            print(f"Generating image {step_i + 1} out of {len(target_positions)}")
-            # Set satellite position & attitude
-            self.satellite.position = sat_pos
-            self.satellite.target_pointing(target_pos)
-            
-            # Set target position & attitude
-            self.target.position = target_pos
-            self.target.attitude = target_att
+        if annotate and annotation_chunks:
+            self._write_video_annotations(output_folder, annotation_chunks, sequence.image_list, timeline)
 
-            #Render image
-            image_path = step_images_folder.joinpath(f"image_{step_i + 1}.png")
-            image_list.append(image_path)
-            self.render_image(
-                ouput_image_path=image_path
+        return self.assemble_video(output_folder, framerate)
+
+    def _frame_reprojector(self, keyframe_scheduler: KeyframeScheduler | None) -> FrameReprojector | None:
+        """Reprojection of the keyframes used to synthesise the frames that are not traced.
+
+        Args:
+            keyframe_scheduler (KeyframeScheduler | None): Scheduler of the keyframes, if any.
+
+        Returns:
+            FrameReprojector | None: Reprojector if the scheduler interpolation is "reproject", None otherwise.
+        """
+        if keyframe_scheduler is None or keyframe_scheduler.interpolation != "reproject":
+            return None
+        return FrameReprojector(
+            self.satellite.camera_model(),
+            target_radius_km=keyframe_scheduler.target_radius_km,
+            max_hole_fraction=keyframe_scheduler.max_hole_fraction,
+        )
+
+    def _dataset_writer(self, output_folder: Path, framerate: int, frames_per_shard: int) -> DatasetWriter:
+        """Writer of the dataset of a video, in a "dataset" folder.
+
+        Args:
+            output_folder (Path): Output folder of the render.
+            framerate (int): Image per seconds.
+            frames_per_shard (int): Number of frames per shard of the dataset.
+
+        Returns:
+            DatasetWriter: Dataset writer.
+        """
+        return DatasetWriter(
+            output_folder.joinpath("dataset"),
+            (self.satellite.image_height, self.satellite.image_width, 3),
+            frames_per_shard=frames_per_shard,
+            attributes={
+                "framerate": framerate,
+                "fov_deg": self.satellite.fov,
+                "image_width": self.satellite.image_width,
+                "image_height": self.satellite.image_height,
+                "start_timestamp": self.clock.start_timestamp,
+                "target": type(self.target).__name__,
+            },
+        )
+
+    def _frames_to_trace(
+        self,
+        chunk_times: NDArray,
+        states: tuple[NDArray, NDArray, NDArray, NDArray, CameraPointing],
+        scene_attitudes: NDArray,
+        event_finder: EventFinder | None,
+        keyframe_scheduler: KeyframeScheduler | None,
+    ) -> NDArray:
+        """Select the frames of a chunk to be traced, the others being filled from the traced ones.
+
+        Args:
+            chunk_times (NDArray): Timestamps of the frames of the chunk, shape (T,).
+            states (tuple[NDArray, NDArray, NDArray, NDArray, CameraPointing]): Satellite positions [km] and
+                velocities [km/s], target positions [km] and velocities [km/s] and camera pointing of the chunk.
+            scene_attitudes (NDArray): Target body to scene quaternions (scalar first), shape (T, 4).
+            event_finder (EventFinder | None): If given, the frames falling inside an event are not traced.
+            keyframe_scheduler (KeyframeScheduler | None): If given, only the keyframes are traced.
+
+        Returns:
+            NDArray: True for the frames to be traced, shape (T,).
+        """
+        sat_positions, sat_velocities, target_positions, target_velocities, pointing = states
+        traced = np.ones(len(chunk_times), dtype=bool)
+        if event_finder is not None:
+            events = event_finder.find(
+                chunk_times,
+                sat_positions,
+                sat_velocities,
+                target_positions,
+                target_velocities,
+                sun_direction_function=self.sun_directions,
             )
-        
+            traced &= ~EventFinder.dead_frames(chunk_times, events)
+        if keyframe_scheduler is not None:
+            focal_px = focal_length_px(self.satellite.fov, self.satellite.image_width)
+            traced &= keyframe_scheduler.select(sat_positions, target_positions, pointing, scene_attitudes, focal_px)
+        return traced
 
-        # Open images and store them as a list of PIL Image objects
-        frames = [Image.open(image) for image in image_list]
+    def _write_frame(self, sequence: "_VideoSequence", view: ViewState, trace: bool) -> None:
+        """Trace the next frame of a sequence or queue it to be filled, then hand the completed frames over.
 
-        # Save as a GIF
-        gif_path = output_folder.joinpath("rendered_video.gif")
-        frames[0].save(
-            gif_path,
-            save_all=True,
-            append_images=frames[1:],
-            duration=int(delta_t*1000),
-            loop=0
+        Args:
+            sequence (_VideoSequence): Sequence being rendered.
+            view (ViewState): Poses of the frame.
+            trace (bool): If False, the frame is filled from the traced frames around it, unless it is the first.
+        """
+        step_i = len(sequence.image_list)
+        n_steps = len(sequence.timeline.times)
+        image_path = sequence.step_images_folder.joinpath(f"image_{step_i + 1}.png")
+        sequence.image_list.append(image_path)
+        if sequence.last_rendered is not None and not trace:
+            # Frame filled from the rendered images instead of being traced
+            print(f"Skipping image {step_i + 1} out of {n_steps}")
+            sequence.pending_frames.append((step_i, image_path, view))
+            sequence.frame_views[step_i] = (view, False)
+            if sequence.interpolation == "hold":
+                self._fill_frames(sequence, None)
+            return
+
+        manifest = sequence.manifest
+        if self._is_traced(manifest, image_path):
+            print(f"Reusing image {step_i + 1} out of {n_steps}")
+        else:
+            print(f"Generating image {step_i + 1} out of {n_steps}")
+            self._render_frame(view, sequence.timeline, step_i, image_path)
+            manifest.record(image_path, frame_index=step_i, traced=True)
+        sequence.frame_views[step_i] = (view, True)
+        keyframe = None
+        if sequence.reprojector is not None:
+            mask_path = image_path.with_name(f"{image_path.stem}_mask.png")
+            if not self._is_traced(manifest, mask_path):
+                self.render_target_mask(mask_path)
+                manifest.record(mask_path, traced=True)
+            keyframe = sequence.reprojector.keyframe(image_path, mask_path, view)
+        if sequence.last_rendered is not None:
+            self._fill_frames(sequence, (image_path, keyframe))
+        sequence.last_rendered = (image_path, keyframe)
+
+        # Frames are handed to the sensor workers and the dataset once written
+        self._finalise_frames(
+            sequence, sequence.pending_frames[0][0] if sequence.pending_frames else len(sequence.image_list)
         )
-        return gif_path
\ No newline at end of file
+
+    def _finish_sequence(self, sequence: "_VideoSequence") -> None:
+        """Fill the frames after the last traced one and hand all the remaining frames over.
+
+        Args:
+            sequence (_VideoSequence): Sequence being rendered.
+        """
+        if sequence.last_rendered is not None:
+            self._fill_frames(sequence, None)
+        self._finalise_frames(sequence, len(sequence.image_list))
+
+    @staticmethod
+    def _write_video_annotations(
+        output_folder: Path,
+        annotation_chunks: list[dict[str, NDArray]],
+        image_list: list[Path],
+        timeline: AstralTimeline,
+    ) -> None:
+        """Gather the annotations of the chunks of a video and write them in the output folder.
+
+        Args:
+            output_folder (Path): Output folder of the render.
+            annotation_chunks (list[dict[str, NDArray]]): Annotations of each chunk, see compute_annotations.
+            image_list (list[Path]): Frames of the sequence.
+            timeline (AstralTimeline): Astral timeline of the sequence.
+        """
+        annotations = {
+            name: np.concatenate([chunk[name] for chunk in annotation_chunks]) for name in annotation_chunks[0]
+        }
+        annotations["frame_index"] = np.arange(len(image_list))
+        annotations["time"] = timeline.times[:len(image_list)]
+        annotations["image"] = np.array([image.name for image in image_list])
+        write_annotations(output_folder, annotations)
+
+    def _render_settings(
+        self,
+        framerate: int,
+        duration_s: float,
+        event_finder: EventFinder | None = None,
+        keyframe_scheduler: KeyframeScheduler | None = None,
+    ) -> dict:
+        """Settings a rendered sequence depends on, a previous render is only reused with the same settings.
+
+        The models are described by their whole state (see state_fingerprint), so that a model changed in a way
+        that is not visible in its class or initial state (e.g. TLE, slew rate, attitude table or profile) is
+        detected.
+
+        Args:
+            framerate (int): Image per seconds.
+            duration_s (float): Total video duration.
+            event_finder (EventFinder | None): Event finder of the render, if any.
+            keyframe_scheduler (KeyframeScheduler | None): Keyframe scheduler of the render, if any.
+
+        Returns:
+            dict: JSON serialisable settings.
+        """
+        return {
+            "framerate": framerate,
+            "duration_s": duration_s,
+            "start_timestamp": self.clock.start_timestamp,
+            "image_width": self.satellite.image_width,
+            "image_height": self.satellite.image_height,
+            "fov": self.satellite.fov,
+            "satellite_orbit": state_fingerprint(self.satellite.kepler_dynamic_model),
+            "roll_law": state_fingerprint(self.satellite.roll_law),
+            "sensor": state_fingerprint(self.satellite.sensor),
+            "target": type(self.target).__name__,
+            "target_orbit": state_fingerprint(self.target.kepler_dynamic_model),
+            "target_attitude": state_fingerprint(self.target.attitude_model),
+            "target_bounding_radius_km": self.target.bounding_radius_km,
+            "sun_direction_deg": None if self.sun_ephemeris else self.sun.illumination_angle_deg,
+            "event_finder": state_fingerprint(event_finder),
+            "keyframe_scheduler": state_fingerprint(keyframe_scheduler),
+        }
+
+    @staticmethod
+    def _is_traced(manifest: RenderManifest, image_path: Path) -> bool:
+        """Check that an image has been traced by a previous render and is still complete.
+
+        Args:
+            manifest (RenderManifest): Manifest of the render.
+            image_path (Path): Image.
+
+        Returns:
+            bool: True if the image can be reused.
+        """
+        entry = manifest.entry(image_path)
+        return entry is not None and bool(entry.traced) and manifest.is_complete(image_path)
+
+    @staticmethod
+    def assemble_video(output_folder: Path, framerate: int) -> Path:
+        """Assemble the frames recorded in the manifest of a render into a GIF.
+
+        The step can be run again on its own: the GIF is written to a temporary file renamed once complete, and is
+        not written again if it is recorded as built from the same frames.
+
+        Args:
+            output_folder (Path): Output folder of the render.
+            framerate (int): Image per seconds.
+
+        Returns:
+            Path: Path of the GIF.
+        """
+        manifest = RenderManifest(output_folder)
+        frame_indices = {
+            entry.frame_index: entry for entry in manifest.entries.values() if entry.frame_index is not None
+        }
+        if not frame_indices:
+            raise ValueError("No frame is recorded in the manifest of the render.")
+        if sorted(frame_indices) != list(range(len(frame_indices))):
+            raise ValueError("Frames are missing from the manifest, the render must be resumed first.")
+        frames = [frame_indices[frame_index] for frame_index in range(len(frame_indices))]
+        image_list = [output_folder.joinpath(entry.name) for entry in frames]
+        frames_digest = [entry.sha256 for entry in frames]
+
+        gif_path = output_folder.joinpath("rendered_video.gif")
+        gif_entry = manifest.entry(gif_path)
+        if gif_entry is not None and gif_entry.frames == frames_digest and manifest.is_complete(gif_path):
+            return gif_path
+
+        # Images are opened one at a time while the GIF is written
+        frames_images = (Image.open(image) for image in image_list[1:])
+        partial_path = gif_path.with_name(f"{gif_path.name}.part")
+        with Image.open(image_list[0]) as first_frame:
+            first_frame.save(
+                partial_path,
+                format="GIF",
+                save_all=True,
+                append_images=frames_images,
+                duration=int(1000 / framerate),
+                loop=0
+            )
+        os.replace(partial_path, gif_path)
+        manifest.record(gif_path, frames=frames_digest)
+        return gif_path
@@ -0,0 +1,413 @@
+"""Screening of a TLE catalog to find the rendering windows of a Tracking Satellite.
+
+The screening runs in three stages:
+    1. Altitude filter: objects whose orbit never crosses the altitude band of the observer are dropped.
+    2. Coarse search: the catalog is propagated in chunks of coarse steps. For each chunk a uniform spatial
+       grid of the object positions is built and only the grid cells around the observer are inspected.
+    3. Refinement: the candidates are propagated at the fine step, in chunks of time, visibility windows are
+       extracted and their entry, exit and closest approach times are refined by bisection on the exact SGP4
+       states.
+"""
+
+import numpy as np
+from numpy.typing import NDArray
+from pydantic import BaseModel
+
+from space_based_telescope_image_generator.objects.tracking_satellite import (
+    TrackingSatellite,
+)
+from space_based_telescope_image_generator.processings.events import line_of_sight_clearance
+from space_based_telescope_image_generator.processings.propagation import hermite_interpolation
+from space_based_telescope_image_generator.processings.sgp4 import SGP4Model
+from space_based_telescope_image_generator.processings.tle_catalog import TLECatalog
+from space_based_telescope_image_generator.utils.constants import (
+    DAY_SECONDS,
+    JD_UNIX_EPOCH,
+    earth_radius,
+)
+
+MAX_RELATIVE_SPEED = 16.0  # [km/s] Upper bound of the relative speed between two Earth orbiting objects
+SGP4_MEAN_ELEMENTS_MARGIN = 50.0  # [km] Margin of the altitude filter, mean vs osculating altitude
+_KEY_BITS = 63  # Bits of the positive int64 keys of the spatial grid
+
+
+class RenderWindow(BaseModel):
+    """Time interval during which a catalogued object can be rendered."""
+
+    satnum: int  # NORAD catalog number
+    name: str  # Object name, empty for 2LE catalogs
+    start: float  # timestamp (s) of the window start
+    end: float  # timestamp (s) of the window end
+    tca: float  # timestamp (s) of the closest approach
+    min_range_km: float  # Distance at closest approach (km)
+    start_offset_s: float  # Window start, in seconds after the observer epoch
+
+    @property
+    def duration_s(self) -> float:
+        """Duration of the window (s)."""
+        return self.end - self.start
+
+
+class CatalogScreener:
+    """Find when catalogued objects can be observed by a Tracking Satellite."""
+
+    def __init__(
+        self,
+        catalog: TLECatalog,
+        satellite: TrackingSatellite,
+        sensor_range_km: float,
+        boresight_lvlh: tuple[float, float, float] | None = None,
+    ) -> None:
+        """Class constructor.
+
+        Args:
+            catalog (TLECatalog): Catalog to screen.
+            satellite (TrackingSatellite): Observer, its dynamic model gives the trajectory.
+            sensor_range_km (float): Maximum distance at which an object is worth rendering (km).
+            boresight_lvlh (tuple[float, float, float] | None): Fixed camera direction in the observer LVLH frame
+                (radial, along-track, cross-track). If None, the camera is assumed to track the object and only the
+                Earth occultation is checked.
+        """
+        if sensor_range_km <= 0:
+            raise ValueError("The sensor range must be positive.")
+        self.catalog = catalog
+        self.satellite = satellite
+        self.sensor_range_km = sensor_range_km
+        self.boresight_lvlh = (
+            None if boresight_lvlh is None else np.asarray(boresight_lvlh, dtype=float) / np.linalg.norm(boresight_lvlh)
+        )
+
+    def target_model(self, window: RenderWindow) -> SGP4Model:
+        """Build the dynamic model of the object of a window, to be used by a TargetObject.
+
+        Args:
+            window (RenderWindow): Window returned by screen().
+
+        Returns:
+            SGP4Model: Dynamic model of the object.
+        """
+        return SGP4Model.from_catalog(self.catalog.select_norad_ids([window.satnum]))
+
+    def screen(
+        self,
+        duration_s: float,
+        dt_s: float = 10.0,
+        coarse_stride: int = 6,
+        chunk_steps: int = 64,
+    ) -> list[RenderWindow]:
+        """Screen the catalog.
+
+        Args:
+            duration_s (float): Duration of the screening, starting at the observer epoch (s).
+            dt_s (float): Fine time step (s).
+            coarse_stride (int): Number of fine steps per coarse step.
+            chunk_steps (int): Number of coarse steps propagated at once, and of fine steps at the refinement.
+
+        Returns:
+            list[RenderWindow]: Render windows, the closest approaches first.
+        """
+        epoch = float(np.atleast_1d(self.satellite.kepler_dynamic_model.epoch)[0])  # type: ignore[attr-defined]
+        positions, velocities = self.satellite.kepler_dynamic_model.propagate(duration_s, dt_s)
+        self._obs_t = epoch + dt_s * np.arange(1, len(positions) + 1)
+        self._obs_r = np.asarray(positions, dtype=float)
+        self._obs_v = np.asarray(velocities, dtype=float)
+        if len(self._obs_t) < 2:
+            raise ValueError("The screening duration must cover at least two time steps.")
+
+        candidates = self._altitude_filter()
+        candidates = candidates.filter(
+            self._coarse_search(candidates, dt_s * coarse_stride, coarse_stride, chunk_steps)
+        )
+        if len(candidates) == 0:
+            return []
+        windows = self._refine(candidates, epoch, chunk_steps)
+        return sorted(windows, key=lambda window: (window.min_range_km, -window.duration_s))
+
+    def _altitude_filter(self) -> TLECatalog:
+        """Drop the objects whose altitude band never comes within sensor range of the observer.
+
+        Returns:
+            TLECatalog: Remaining objects.
+        """
+        radius = np.linalg.norm(self._obs_r, axis=1)
+        margin = self.sensor_range_km + SGP4_MEAN_ELEMENTS_MARGIN
+        return self.catalog.select_altitude_band(
+            radius.min() - earth_radius - margin, radius.max() - earth_radius + margin
+        )
+
+    def _coarse_search(
+        self, catalog: TLECatalog, coarse_dt_s: float, coarse_stride: int, chunk_steps: int
+    ) -> NDArray:
+        """Find the objects coming close to the observer at the coarse steps, using a spatial grid.
+
+        Args:
+            catalog (TLECatalog): Objects remaining after the altitude filter.
+            coarse_dt_s (float): Coarse time step (s).
+            coarse_stride (int): Number of fine steps per coarse step.
+            chunk_steps (int): Number of coarse steps propagated at once.
+
+        Returns:
+            NDArray: Indices of the candidate objects in the catalog.
+        """
+        if len(catalog) == 0:
+            return np.zeros(0, dtype=int)
+        model = SGP4Model.from_catalog(catalog)
+        # Any object coming within range between two coarse samples is within this distance at one of them
+        threshold = self.sensor_range_km + MAX_RELATIVE_SPEED * coarse_dt_s / 2
+        cell = threshold
+
+        coarse_idx = np.arange(0, len(self._obs_t), coarse_stride)
+        found = np.zeros(len(catalog), dtype=bool)
+        for start in range(0, len(coarse_idx), chunk_steps):
+            steps = coarse_idx[start : start + chunk_steps]
+            r, _, error = model.propagate_jd(JD_UNIX_EPOCH + self._obs_t[steps] / DAY_SECONDS)
+            valid = error == 0
+
+            # Grid of the (object, step) points of the chunk and the 27 cells around the observer at each step
+            obj_idx, step_idx = np.nonzero(valid)
+            cells = np.floor(r[obj_idx, step_idx] / cell).astype(np.int64)
+            obs_cells = np.floor(self._obs_r[steps] / cell).astype(np.int64)
+            offsets = [-1, 0, 1]
+            neighbours = np.stack(np.meshgrid(offsets, offsets, offsets, indexing="ij"), axis=-1).reshape(-1, 3)
+            query_cells = (obs_cells[:, None, :] + neighbours[None, :, :]).reshape(-1, 3)
+            query_steps = np.repeat(np.arange(len(steps)), len(neighbours))
+
+            # Keys unique per (step, cell), the cells being counted from the lowest cell of the chunk
+            origin = np.minimum(cells.min(axis=0, initial=0), query_cells.min(axis=0))
+            cells -= origin
+            query_cells -= origin
+            cell_bits = int(max(cells.max(initial=0), query_cells.max())).bit_length()
+            keys = self._grid_keys(step_idx, cells, cell_bits)
+            query_keys = self._grid_keys(query_steps, query_cells, cell_bits)
+            order = np.argsort(keys)
+            sorted_keys = keys[order]
+            lo = np.searchsorted(sorted_keys, query_keys, side="left")
+            hi = np.searchsorted(sorted_keys, query_keys, side="right")
+            counts = hi - lo
+            if counts.sum() == 0:
+                continue
+            points = order[np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())]
+
+            separation = r[obj_idx[points], step_idx[points]] - self._obs_r[steps][step_idx[points]]
+            distance = np.linalg.norm(separation, axis=1)
+            found[obj_idx[points][distance <= threshold]] = True
+        return np.flatnonzero(found)
+
+    @staticmethod
+    def _grid_keys(steps: NDArray, cells: NDArray, cell_bits: int) -> NDArray:
+        """Build a unique integer key per (step, cell), packing the step and the cell indices in 63 bits.
+
+        Args:
+            steps (NDArray): Step indices (N,).
+            cells (NDArray): Non-negative cell indices (N, 3), below 2**cell_bits.
+            cell_bits (int): Bits per cell index.
+
+        Returns:
+            NDArray: Keys (N,).
+        """
+        step_bits = int(steps.max(initial=0)).bit_length()
+        if step_bits + 3 * cell_bits > _KEY_BITS:
+            raise ValueError(
+                "The screening grid does not fit in 63 bits keys, reduce chunk_steps or increase the time step."
+            )
+        keys = steps.astype(np.int64)
+        for axis in range(3):
+            keys = (keys << cell_bits) | cells[:, axis]
+        return keys
+
+    def _visible(self, observer: NDArray, target: NDArray, observer_velocity: NDArray) -> NDArray:
+        """Check the visibility conditions.
+
+        Args:
+            observer (NDArray): Observer positions [km], shape (..., 3).
+            target (NDArray): Target positions [km], shape (..., 3).
+            observer_velocity (NDArray): Observer velocities [km/s], shape (..., 3).
+
+        Returns:
+            NDArray: True where the target is in range, not hidden by the Earth and in the field of view.
+        """
+        line_of_sight = target - observer
+        distance = np.linalg.norm(line_of_sight, axis=-1)
+        visible = (distance <= self.sensor_range_km) & (line_of_sight_clearance(observer, target) >= 0)
+        if self.boresight_lvlh is not None:
+            radial = observer / np.linalg.norm(observer, axis=-1, keepdims=True)
+            normal = np.cross(observer, observer_velocity)
+            normal /= np.linalg.norm(normal, axis=-1, keepdims=True)
+            along_track = np.cross(normal, radial)
+            boresight = (
+                self.boresight_lvlh[0] * radial
+                + self.boresight_lvlh[1] * along_track
+                + self.boresight_lvlh[2] * normal
+            )
+            cos_angle = np.einsum("...i,...i->...", line_of_sight, boresight) / np.maximum(distance, 1e-12)
+            visible &= cos_angle >= np.cos(np.radians(self.satellite.fov / 2))
+        return visible
+
+    def _relative_state(self, model: SGP4Model, times: NDArray) -> tuple[NDArray, NDArray, NDArray, NDArray]:
+        """Exact object states and interpolated observer states, one time per object of the model.
+
+        Args:
+            model (SGP4Model): One entry per time.
+            times (NDArray): Timestamps (s), shape (K,).
+
+        Returns:
+            tuple[NDArray, NDArray, NDArray, NDArray]: Object position and velocity, observer position and
+                velocity, each of shape (K, 3).
+        """
+        tsince = ((JD_UNIX_EPOCH + times / DAY_SECONDS) - model.epoch_jd)[:, None] * 1440.0
+        r, v, _ = model.propagate_tsince(tsince)
+        obs_r, obs_v = hermite_interpolation(self._obs_t, self._obs_r, self._obs_v, times)
+        return r[:, 0], v[:, 0], obs_r, obs_v
+
+    def _bisect(self, model: SGP4Model, lo: NDArray, hi: NDArray, function: str, iterations: int = 20) -> NDArray:
+        """Vectorised bisection of a sign change of the range rate or of the range to sensor range difference.
+
+        Args:
+            model (SGP4Model): One entry per bracket.
+            lo (NDArray): Lower bounds of the brackets (timestamps, s).
+            hi (NDArray): Upper bounds of the brackets (timestamps, s).
+            function (str): "range_rate" or "range".
+            iterations (int): Number of bisections, each one halves the bracket.
+
+        Returns:
+            NDArray: Refined times (timestamps, s).
+        """
+
+        def evaluate(times: NDArray) -> NDArray:
+            r, v, obs_r, obs_v = self._relative_state(model, times)
+            if function == "range_rate":
+                return np.einsum("ij,ij->i", r - obs_r, v - obs_v)
+            return np.linalg.norm(r - obs_r, axis=1) - self.sensor_range_km
+
+        f_lo = evaluate(lo)
+        for _ in range(iterations):
+            mid = 0.5 * (lo + hi)
+            f_mid = evaluate(mid)
+            same_sign = np.sign(f_mid) == np.sign(f_lo)
+            lo = np.where(same_sign, mid, lo)
+            f_lo = np.where(same_sign, f_mid, f_lo)
+            hi = np.where(same_sign, hi, mid)
+        return 0.5 * (lo + hi)
+
+    def _refine(self, candidates: TLECatalog, epoch: float, chunk_steps: int) -> list[RenderWindow]:
+        """Extract the visibility windows of the candidates at the fine step and refine their times.
+
+        Args:
+            candidates (TLECatalog): Candidate objects.
+            epoch (float): Observer epoch (timestamp, s).
+            chunk_steps (int): Number of fine steps propagated at once.
+
+        Returns:
+            list[RenderWindow]: Render windows.
+        """
+        model = SGP4Model.from_catalog(candidates)
+        runs = self._visible_runs(model, chunk_steps)
+        if len(runs) == 0:
+            return []
+        obj_start, start_idx, end_idx, tca_idx = runs[:, :4].astype(int).T
+        distance_before, distance_after = runs[:, 4], runs[:, 5]
+
+        # Range rate root around the closest approach sample of each run
+        last = len(self._obs_t) - 1
+        run_model = SGP4Model.from_catalog(candidates.filter(obj_start))
+        tca = self._bisect(
+            run_model,
+            self._obs_t[np.maximum(tca_idx - 1, 0)],
+            self._obs_t[np.minimum(tca_idx + 1, last)],
+            "range_rate",
+        )
+        r_tca, _, obs_tca, _ = self._relative_state(run_model, tca)
+        min_range = np.linalg.norm(r_tca - obs_tca, axis=1)
+
+        # Entry and exit, refined where the range threshold is crossed inside the screening interval
+        start = self._obs_t[start_idx]
+        end = self._obs_t[end_idx]
+        enters = start_idx > 0
+        leaves = end_idx < last
+        start_refined = self._bisect(run_model, self._obs_t[np.maximum(start_idx - 1, 0)], start, "range")
+        end_refined = self._bisect(run_model, end, self._obs_t[np.minimum(end_idx + 1, last)], "range")
+        start = np.where(enters & (distance_before > self.sensor_range_km), start_refined, start)
+        end = np.where(leaves & (distance_after > self.sensor_range_km), end_refined, end)
+
+        return [
+            RenderWindow(
+                satnum=int(candidates.satnum[k]),
+                name=str(candidates.names[k]),
+                start=float(start[i]),
+                end=float(end[i]),
+                tca=float(np.clip(tca[i], start[i], end[i])),
+                min_range_km=float(min_range[i]),
+                start_offset_s=float(start[i] - epoch),
+            )
+            for i, k in enumerate(obj_start)
+        ]
+
+    def _visible_runs(self, model: SGP4Model, chunk_steps: int) -> NDArray:
+        """Find the runs of visible fine samples of each object, propagating the objects by chunks of time.
+
+        The runs are first cut at the chunk boundaries, then the pieces of a run are merged.
+
+        Args:
+            model (SGP4Model): Candidate objects.
+            chunk_steps (int): Number of fine steps propagated at once.
+
+        Returns:
+            NDArray: One row per run, sorted by object and start: object index, first and last visible samples,
+                closest approach sample, distances [km] at the samples before and after the run (NaN outside the
+                screening interval), and closest approach distance [km], shape (n_runs, 7).
+        """
+        pieces = []
+        previous_distance = np.full(len(model), np.nan)
+        pending_after = np.zeros(0, dtype=int)  # Pieces of the previous chunk ending on its last sample
+        for chunk_start in range(0, len(self._obs_t), chunk_steps):
+            chunk = slice(chunk_start, chunk_start + chunk_steps)
+            r, _, error = model.propagate_jd(JD_UNIX_EPOCH + self._obs_t[chunk] / DAY_SECONDS)
+            visible = self._visible(self._obs_r[None, chunk], r, self._obs_v[None, chunk]) & (error == 0)
+            distance = np.linalg.norm(r - self._obs_r[None, chunk], axis=-1)
+            n_steps = distance.shape[1]
+            if len(pending_after):
+                pieces[-1][pending_after, 5] = distance[pieces[-1][pending_after, 0].astype(int), 0]
+
+            # Contiguous runs of visible samples in the chunk
+            padded = np.pad(visible, ((0, 0), (1, 1)))
+            obj, start_idx = np.nonzero(~padded[:, :-2] & padded[:, 1:-1])
+            _, end_idx = np.nonzero(padded[:, 1:-1] & ~padded[:, 2:])
+            masked = np.where(visible, distance, np.inf)
+            tca_idx = np.array(
+                [s + np.argmin(masked[k, s : e + 1]) for k, s, e in zip(obj, start_idx, end_idx, strict=True)],
+                dtype=int,
+            )
+            before = np.where(
+                start_idx > 0, distance[obj, np.maximum(start_idx - 1, 0)], previous_distance[obj]
+            )
+            after = np.where(end_idx < n_steps - 1, distance[obj, np.minimum(end_idx + 1, n_steps - 1)], np.nan)
+            pieces.append(
+                np.stack(
+                    (
+                        obj,
+                        chunk_start + start_idx,
+                        chunk_start + end_idx,
+                        chunk_start + tca_idx,
+                        before,
+                        after,
+                        distance[obj, tca_idx],
+                    ),
+                    axis=1,
+                ).astype(float)
+            )
+            pending_after = np.flatnonzero(end_idx == n_steps - 1)
+            previous_distance = distance[:, -1]
+
+        pieces_array = np.concatenate(pieces) if pieces else np.zeros((0, 7))
+        pieces_array = pieces_array[np.lexsort((pieces_array[:, 1], pieces_array[:, 0]))]
+        runs: list[NDArray] = []
+        for piece in pieces_array:
+            if runs and runs[-1][0] == piece[0] and runs[-1][2] + 1 == piece[1]:
+                # Continuation of a run across a chunk boundary
+                run = runs[-1]
+                run[2], run[5] = piece[2], piece[5]
+                if piece[6] < run[6]:
+                    run[3], run[6] = piece[3], piece[6]
+            else:
+                runs.append(piece.copy())
+        return np.array(runs).reshape(-1, 7)
@@ -0,0 +1,312 @@
+"""Sensor model turning the rendered frames into telescope-like images.
+
+The frames are processed by stacks (B, H, W, C):
+    - linearisation: the scenes are traced in linear light (assumed_gamma 1.0) but POV-Ray encodes the images with
+      the sRGB transfer curve, which is inverted before any physical processing,
+    - optical blur: Gaussian PSF applied by FFT, the kernel spectrum being cached per image size,
+    - vignetting: cos^4 law of the off-axis angle,
+    - photo-electrons: the rendered intensity scaled to the full well, with shot (Poisson), dark current and read
+      noises drawn by a generator seeded per frame, so that the result does not depend on the batching,
+    - quantisation: gain and bit depth of the analog to digital converter.
+The stacks are processed in a pool of worker processes while the frames come out of the renderer, read either from
+the frame files or, without any copy between the processes, from a shared memory FrameRing.
+"""
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from numpy.typing import NDArray
+from PIL import Image
+from pydantic import BaseModel
+
+from space_based_telescope_image_generator.processings.frame_ring import FrameRing
+
+
+class SensorModel(BaseModel):
+    """Description of the telescope sensor."""
+
+    full_well_e: float = 20000.0  # [e-] Electrons of a pixel rendered at full intensity (before saturation)
+    gain_e_per_adu: float = 5.0  # [e-/ADU] Conversion gain
+    read_noise_e: float = 5.0  # [e-] RMS read noise
+    dark_current_e_s: float = 1.0  # [e-/s] Mean dark current per pixel
+    exposure_s: float = 0.1  # [s] Exposure time
+    bit_depth: int = 12  # [bits] ADC resolution
+    psf_sigma_px: float = 1.0  # [px] Standard deviation of the Gaussian PSF, no blur if 0
+    vignetting: float = 1.0  # [-] 1 for the cos^4 law, 0 for no vignetting
+    fov_deg: float | None = None  # [deg] Horizontal field of view, the camera one when attached to a satellite
+    srgb_input: bool = True  # The rendered frames are sRGB encoded, False for linear frames
+    seed: int = 0  # Seed of the noise, combined with the frame index
+
+    @property
+    def max_adu(self) -> int:
+        """Maximum value of the digital output."""
+        return 2**self.bit_depth - 1
+
+
+def srgb_to_linear(encoded: NDArray) -> NDArray:
+    """Invert the sRGB transfer curve.
+
+    Args:
+        encoded (NDArray): sRGB encoded values in [0, 1].
+
+    Returns:
+        NDArray: Linear intensities in [0, 1], same shape and float type.
+    """
+    return np.where(encoded <= 0.04045, encoded / 12.92, ((encoded + 0.055) / 1.055) ** 2.4).astype(encoded.dtype)
+
+
+@lru_cache(maxsize=8)
+def psf_spectrum(height: int, width: int, sigma_px: float) -> NDArray:
+    """Spectrum of a Gaussian PSF, cached per image size.
+
+    Args:
+        height (int): Image height [px].
+        width (int): Image width [px].
+        sigma_px (float): Standard deviation of the PSF [px].
+
+    Returns:
+        NDArray: Real FFT of the centred, normalised kernel, shape (height, width // 2 + 1).
+    """
+    # Analytic transform of a Gaussian: no kernel image is needed
+    fy = np.fft.fftfreq(height)[:, None]
+    fx = np.fft.rfftfreq(width)[None, :]
+    return np.exp(-2 * (np.pi * sigma_px) ** 2 * (fx**2 + fy**2))
+
+
+@lru_cache(maxsize=8)
+def vignetting_map(height: int, width: int, fov_deg: float, strength: float) -> NDArray:
+    """Relative illumination of the pixels, following the cos^4 law.
+
+    Args:
+        height (int): Image height [px].
+        width (int): Image width [px].
+        fov_deg (float): Horizontal field of view [deg].
+        strength (float): 1 for the full cos^4 law, 0 for no vignetting.
+
+    Returns:
+        NDArray: Illumination factors in ]0, 1], shape (height, width).
+    """
+    focal_px = 0.5 * width / np.tan(np.radians(fov_deg) / 2)
+    u, v = np.meshgrid(np.arange(width) + 0.5 - width / 2, np.arange(height) + 0.5 - height / 2)
+    cos_angle = focal_px / np.sqrt(focal_px**2 + u**2 + v**2)
+    return (1 - strength) + strength * cos_angle**4
+
+
+def apply_sensor(sensor: SensorModel, frames: NDArray, frame_indices: NDArray) -> NDArray:
+    """Apply the sensor model to a stack of frames.
+
+    Args:
+        sensor (SensorModel): Sensor description.
+        frames (NDArray): Rendered frames, values in [0, 255] (sRGB encoded unless sensor.srgb_input is False),
+            shape (B, H, W) or (B, H, W, C), or a list of frames of the same shape.
+        frame_indices (NDArray): Index of each frame in its sequence, seeding its noise, shape (B,).
+
+    Returns:
+        NDArray: Digital numbers, uint8 up to 8 bits and uint16 above, same shape as the frames.
+    """
+    intensity = np.asarray(frames, dtype=np.float32) / 255.0
+    if sensor.srgb_input:
+        intensity = srgb_to_linear(intensity)
+    color = intensity.ndim == 4
+    if not color:
+        intensity = intensity[..., None]
+    _, height, width, _ = intensity.shape
+
+    # Optical blur, all the frames and channels at once
+    if sensor.psf_sigma_px > 0:
+        spectrum = psf_spectrum(height, width, sensor.psf_sigma_px)
+        intensity = np.fft.irfft2(
+            np.fft.rfft2(intensity, axes=(1, 2)) * spectrum[None, :, :, None], s=(height, width), axes=(1, 2)
+        ).astype(np.float32)
+
+    if sensor.vignetting > 0:
+        if sensor.fov_deg is None:
+            raise ValueError("The sensor field of view is required by the vignetting.")
+        intensity *= vignetting_map(height, width, sensor.fov_deg, sensor.vignetting)[None, :, :, None]
+
+    mean_electrons = np.clip(intensity, 0, None) * sensor.full_well_e + sensor.dark_current_e_s * sensor.exposure_s
+    electrons = np.empty_like(mean_electrons)
+    for k, frame_index in enumerate(np.asarray(frame_indices)):
+        rng = np.random.default_rng([sensor.seed, int(frame_index)])
+        electrons[k] = rng.poisson(mean_electrons[k]) + rng.normal(0.0, sensor.read_noise_e, mean_electrons[k].shape)
+
+    digital = np.clip(np.rint(electrons / sensor.gain_e_per_adu), 0, sensor.max_adu)
+    digital = digital.astype(np.uint8 if sensor.bit_depth <= 8 else np.uint16)
+    return digital if color else digital[..., 0]
+
+
+def sensor_output_path(image_path: Path, output_folder: Path, bit_depth: int) -> Path:
+    """Path of the sensor image of a rendered frame.
+
+    Args:
+        image_path (Path): Rendered frame.
+        output_folder (Path): Folder of the sensor images.
+        bit_depth (int): ADC resolution, the images deeper than 8 bits are saved as .npy arrays.
+
+    Returns:
+        Path: Sensor image path.
+    """
+    return output_folder.joinpath(f"{image_path.stem}{'.png' if bit_depth <= 8 else '.npy'}")
+
+
+def process_frame_files(
+    sensor: SensorModel, image_paths: list[Path], frame_indices: list[int], output_folder: Path
+) -> list[Path]:
+    """Load rendered frames, apply the sensor model to the stack and save the results.
+
+    Args:
+        sensor (SensorModel): Sensor description.
+        image_paths (list[Path]): Rendered frames, all of the same size.
+        frame_indices (list[int]): Index of each frame in its sequence.
+        output_folder (Path): Folder of the sensor images.
+
+    Returns:
+        list[Path]: Sensor images.
+    """
+    frames = []
+    for image_path in image_paths:
+        with Image.open(image_path) as image:
+            frames.append(np.asarray(image.convert("RGB")))
+    digital = apply_sensor(sensor, np.stack(frames), np.asarray(frame_indices))
+    return save_sensor_frames(sensor, digital, [image_path.name for image_path in image_paths], output_folder)
+
+
+def save_sensor_frames(
+    sensor: SensorModel, digital: NDArray, image_names: list[str], output_folder: Path
+) -> list[Path]:
+    """Save the sensor images of a stack of frames.
+
+    Args:
+        sensor (SensorModel): Sensor description.
+        digital (NDArray): Digital numbers, shape (B, H, W) or (B, H, W, C).
+        image_names (list[str]): Names of the rendered frames.
+        output_folder (Path): Folder of the sensor images.
+
+    Returns:
+        list[Path]: Sensor images.
+    """
+    output_folder.mkdir(parents=True, exist_ok=True)
+    outputs = []
+    for image_name, frame in zip(image_names, digital, strict=True):
+        output_path = sensor_output_path(Path(image_name), output_folder, sensor.bit_depth)
+        if sensor.bit_depth <= 8:
+            Image.fromarray(frame).save(output_path)
+        else:
+            np.save(output_path, frame)
+        outputs.append(output_path)
+    return outputs
+
+
+def process_ring_frames(
+    sensor: SensorModel, ring: FrameRing, output_folder: Path, reader: int = 0, batch_size: int = 16
+) -> list[Path]:
+    """Sensor stage reading the frames from a shared memory ring until the end of the stream.
+
+    The frames are read through zero-copy views of the ring slots, which are released as soon as their batch has
+    been processed.
+
+    Args:
+        sensor (SensorModel): Sensor description.
+        ring (FrameRing): Ring the rendered frames are published to.
+        output_folder (Path): Folder of the sensor images.
+        reader (int): Index of this stage among the ring readers.
+        batch_size (int): Number of frames processed together.
+
+    Returns:
+        list[Path]: Sensor images, named image_<frame index + 1> like the rendered frames.
+    """
+    outputs: list[Path] = []
+    end_of_stream = False
+    while not end_of_stream:
+        slots, indices = [], []
+        while len(slots) < batch_size:
+            received = ring.receive(reader)
+            if received is None:
+                end_of_stream = True
+                break
+            slots.append(received[0])
+            indices.append(received[1])
+        if not slots:
+            break
+        try:
+            digital = apply_sensor(sensor, [ring.view(slot) for slot in slots], np.asarray(indices))
+        finally:
+            for slot in slots:
+                ring.release(slot)
+        outputs.extend(
+            save_sensor_frames(sensor, digital, [f"image_{index + 1}" for index in indices], output_folder)
+        )
+    return outputs
+
+
+class SensorPipeline:
+    """Pool of workers applying the sensor model to the frames as they are rendered."""
+
+    def __init__(
+        self, sensor: SensorModel, output_folder: Path, batch_size: int = 16, max_workers: int | None = None
+    ) -> None:
+        """Class constructor.
+
+        Args:
+            sensor (SensorModel): Sensor description.
+            output_folder (Path): Folder of the sensor images.
+            batch_size (int): Number of frames processed together by a worker.
+            max_workers (int | None): Number of worker processes, the number of CPUs by default.
+        """
+        self.sensor = sensor
+        self.output_folder = output_folder
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self._executor: ProcessPoolExecutor | None = None
+        self._futures: list[Future] = []
+        self._waiting: list[tuple[Path, int]] = []
+
+    def __enter__(self) -> "SensorPipeline":
+        """Start the workers."""
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Process the remaining frames and stop the workers."""
+        if exc_info[0] is None:
+            self.flush()
+            self.results()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=exc_info[0] is not None)
+            self._executor = None
+
+    def submit(self, image_path: Path, frame_index: int) -> None:
+        """Queue a rendered frame, a batch being sent to the workers once complete.
+
+        Args:
+            image_path (Path): Rendered frame.
+            frame_index (int): Index of the frame in its sequence.
+        """
+        self._waiting.append((image_path, frame_index))
+        if len(self._waiting) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Send the queued frames to the workers."""
+        if not self._waiting:
+            return
+        if self._executor is None:
+            raise ValueError("The sensor pipeline must be used as a context manager.")
+        paths, indices = zip(*self._waiting, strict=True)
+        self._futures.append(
+            self._executor.submit(process_frame_files, self.sensor, list(paths), list(indices), self.output_folder)
+        )
+        self._waiting = []
+
+    def results(self) -> list[Path]:
+        """Wait for the submitted batches.
+
+        Returns:
+            list[Path]: Sensor images, in submission order.
+        """
+        outputs: list[Path] = []
+        for future in self._futures:
+            outputs.extend(future.result())
+        return outputs
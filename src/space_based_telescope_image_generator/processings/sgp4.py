@@ -0,0 +1,1231 @@
+"""SGP4/SDP4 propagation of TLE mean elements, vectorised over time and over satellites.
+
+This is a NumPy port of the revised SGP4 theory (Vallado, Crawford, Hujsak & Kelso, AIAA 2006-6753),
+using the WGS72 constants and the "improved" operation mode. Positions are given in the TEME frame.
+"""
+
+import math as m
+from collections.abc import Iterator
+
+import numpy as np
+from numpy.typing import NDArray
+
+from space_based_telescope_image_generator.processings.ephemeris import gstime
+from space_based_telescope_image_generator.processings.propagation import (
+    DEFAULT_CHUNK_SIZE,
+    OrbitalDynamicModel,
+)
+from space_based_telescope_image_generator.processings.tle_catalog import TLECatalog
+from space_based_telescope_image_generator.utils.constants import JD_UNIX_EPOCH
+
+# WGS72 constants, the only ones consistent with the TLE mean elements
+SGP4_MU = 398600.8  # [km3/s2] Standard gravitational constant of the Earth
+SGP4_RE = 6378.135  # [km] Equatorial radius of the Earth
+SGP4_XKE = 60.0 / m.sqrt(SGP4_RE**3 / SGP4_MU)  # [er^1.5/min] Reciprocal of time units
+SGP4_J2 = 0.001082616  # [-] Zonal harmonics
+SGP4_J3 = -0.00000253881
+SGP4_J4 = -0.00000165597
+SGP4_J3OJ2 = SGP4_J3 / SGP4_J2
+
+JD_1950 = 2433281.5  # [days] Julian date of 1949 December 31 0h UT, origin of the SGP4 time
+TWOPI = 2 * m.pi
+X2O3 = 2.0 / 3.0
+DEEP_SPACE_PERIOD_MIN = 225.0  # [min] Orbits above this period use the SDP4 deep space terms
+RPTIM = 4.37526908801129966e-3  # [rad/min] Earth rotation rate
+
+# Thresholds of the reference implementation
+SIMPLE_PERIGEE_KM = 220.0  # [km] Perigee altitude below which the simplified drag model is used
+LOW_PERIGEE_KM = 156.0  # [km] Perigee altitude below which the atmospheric density parameter is adjusted
+MIN_PERIGEE_KM = 98.0  # [km] Perigee altitude below which the density parameter is set to its minimum
+CIRCULAR_ECCENTRICITY = 1.0e-4  # [-] Eccentricity below which the orbit is treated as circular by the drag terms
+LYDDANE_INCLINATION = 0.2  # [rad] Inclination below which the Lyddane modification is applied
+SYNCHRONOUS_MOTION = (0.0034906585, 0.0052359877)  # [rad/min] Mean motions of the 24 h resonance
+HALF_DAY_MOTION = (8.26e-3, 9.24e-3)  # [rad/min] Mean motions of the 12 h resonance
+HALF_DAY_MIN_ECCENTRICITY = 0.5  # [-] Minimum eccentricity of the 12 h resonance
+EQUATORIAL_INCLINATION = 5.2359877e-2  # [rad] Inclination below which the orbit is treated as equatorial
+HALF_DAY_ECCENTRICITY_BREAKS = (0.65, 0.7, 0.715)  # [-] Breaks of the 12 h resonance polynomial fits
+MIN_ECCENTRICITY = -0.001  # [-] Perturbed eccentricity below which the propagation fails
+SINGULAR_COS_INCLINATION = 1.5e-12  # [-] Guard of the 1 + cos(i) divisor for retrograde equatorial orbits
+KEPLER_TOLERANCE = 1.0e-12  # [rad] Convergence tolerance of the Kepler equation solver
+SYNCHRONOUS_RESONANCE = 1  # Resonance flag (irez) of the 24 h orbits
+HALF_DAY_RESONANCE = 2  # Resonance flag (irez) of the 12 h orbits
+
+# Error codes, as in the reference implementation
+DECAYED_ERROR = 6
+SGP4_ERRORS = {
+    1: "mean eccentricity not within range 0.0 <= e < 1.0",
+    2: "mean motion less than 0.0",
+    3: "perturbed eccentricity not within range 0.0 <= e <= 1.0",
+    4: "semi-latus rectum less than 0.0",
+    DECAYED_ERROR: "satellite has decayed",
+}
+
+
+def _dscom(
+    epoch: NDArray, ep: NDArray, *, argpp: NDArray, inclp: NDArray, nodep: NDArray, np_: NDArray
+) -> dict[str, NDArray]:
+    """Deep space common lunar-solar terms, computed at epoch.
+
+    Args:
+        epoch (NDArray): Epochs in days since 1950.
+        ep (NDArray): Eccentricities.
+        argpp (NDArray): Arguments of perigee (rad).
+        inclp (NDArray): Inclinations (rad).
+        nodep (NDArray): Right ascensions of the ascending node (rad).
+        np_ (NDArray): Un-kozaied mean motions (rad/min).
+
+    Returns:
+        dict[str, NDArray]: Lunar-solar coefficients, named as in the reference implementation.
+    """
+    zes = 0.01675
+    zel = 0.05490
+    c1ss = 2.9864797e-6
+    c1l = 4.7968065e-7
+    zsinis = 0.39785416
+    zcosis = 0.91744867
+    zcosgs = 0.1945905
+    zsings = -0.98088458
+
+    snodm = np.sin(nodep)
+    cnodm = np.cos(nodep)
+    sinomm = np.sin(argpp)
+    cosomm = np.cos(argpp)
+    sinim = np.sin(inclp)
+    cosim = np.cos(inclp)
+    emsq = ep * ep
+    betasq = 1.0 - emsq
+    rtemsq = np.sqrt(betasq)
+
+    day = epoch + 18261.5
+    xnodce = np.mod(4.5236020 - 9.2422029e-4 * day, TWOPI)
+    stem = np.sin(xnodce)
+    ctem = np.cos(xnodce)
+    zcosil = 0.91375164 - 0.03568096 * ctem
+    zsinil = np.sqrt(1.0 - zcosil * zcosil)
+    zsinhl = 0.089683511 * stem / zsinil
+    zcoshl = np.sqrt(1.0 - zsinhl * zsinhl)
+    gam = 5.8351514 + 0.0019443680 * day
+    zx = 0.39785416 * stem / zsinil
+    zy = zcoshl * ctem + 0.91744867 * zsinhl * stem
+    zx = gam + np.arctan2(zx, zy) - xnodce
+    zcosgl = np.cos(zx)
+    zsingl = np.sin(zx)
+
+    # First pass with the solar terms, second pass with the lunar terms
+    passes = [
+        (zcosgs, zsings, zcosis, zsinis, cnodm, snodm, c1ss),
+        (
+            zcosgl,
+            zsingl,
+            zcosil,
+            zsinil,
+            zcoshl * cnodm + zsinhl * snodm,
+            snodm * zcoshl - cnodm * zsinhl,
+            c1l,
+        ),
+    ]
+    terms = []
+    xnoi = 1.0 / np_
+    for zcosg, zsing, zcosi, zsini, zcosh, zsinh, cc in passes:
+        a1 = zcosg * zcosh + zsing * zcosi * zsinh
+        a3 = -zsing * zcosh + zcosg * zcosi * zsinh
+        a7 = -zcosg * zsinh + zsing * zcosi * zcosh
+        a8 = zsing * zsini
+        a9 = zsing * zsinh + zcosg * zcosi * zcosh
+        a10 = zcosg * zsini
+        a2 = cosim * a7 + sinim * a8
+        a4 = cosim * a9 + sinim * a10
+        a5 = -sinim * a7 + cosim * a8
+        a6 = -sinim * a9 + cosim * a10
+
+        x1 = a1 * cosomm + a2 * sinomm
+        x2 = a3 * cosomm + a4 * sinomm
+        x3 = -a1 * sinomm + a2 * cosomm
+        x4 = -a3 * sinomm + a4 * cosomm
+        x5 = a5 * sinomm
+        x6 = a6 * sinomm
+        x7 = a5 * cosomm
+        x8 = a6 * cosomm
+
+        z31 = 12.0 * x1 * x1 - 3.0 * x3 * x3
+        z32 = 24.0 * x1 * x2 - 6.0 * x3 * x4
+        z33 = 12.0 * x2 * x2 - 3.0 * x4 * x4
+        z1 = 3.0 * (a1 * a1 + a2 * a2) + z31 * emsq
+        z2 = 6.0 * (a1 * a3 + a2 * a4) + z32 * emsq
+        z3 = 3.0 * (a3 * a3 + a4 * a4) + z33 * emsq
+        z11 = -6.0 * a1 * a5 + emsq * (-24.0 * x1 * x7 - 6.0 * x3 * x5)
+        z12 = -6.0 * (a1 * a6 + a3 * a5) + emsq * (
+            -24.0 * (x2 * x7 + x1 * x8) - 6.0 * (x3 * x6 + x4 * x5)
+        )
+        z13 = -6.0 * a3 * a6 + emsq * (-24.0 * x2 * x8 - 6.0 * x4 * x6)
+        z21 = 6.0 * a2 * a5 + emsq * (24.0 * x1 * x5 - 6.0 * x3 * x7)
+        z22 = 6.0 * (a4 * a5 + a2 * a6) + emsq * (
+            24.0 * (x2 * x5 + x1 * x6) - 6.0 * (x4 * x7 + x3 * x8)
+        )
+        z23 = 6.0 * a4 * a6 + emsq * (24.0 * x2 * x6 - 6.0 * x4 * x8)
+        z1 = z1 + z1 + betasq * z31
+        z2 = z2 + z2 + betasq * z32
+        z3 = z3 + z3 + betasq * z33
+        s3 = cc * xnoi
+        s2 = -0.5 * s3 / rtemsq
+        s4 = s3 * rtemsq
+        s1 = -15.0 * ep * s4
+        s5 = x1 * x3 + x2 * x4
+        s6 = x2 * x3 + x1 * x4
+        s7 = x2 * x4 - x1 * x3
+        terms.append(
+            {
+                "s1": s1, "s2": s2, "s3": s3, "s4": s4, "s5": s5, "s6": s6, "s7": s7,
+                "z1": z1, "z2": z2, "z3": z3,
+                "z11": z11, "z12": z12, "z13": z13,
+                "z21": z21, "z22": z22, "z23": z23,
+                "z31": z31, "z32": z32, "z33": z33,
+            }
+        )  # fmt: skip
+    sol, lun = terms
+
+    return {
+        "sinim": sinim,
+        "cosim": cosim,
+        "emsq": emsq,
+        "sol": sol,  # type: ignore[dict-item]
+        "lun": lun,  # type: ignore[dict-item]
+        "zmol": np.mod(4.7199672 + 0.22997150 * day - gam, TWOPI),
+        "zmos": np.mod(6.2565837 + 0.017201977 * day, TWOPI),
+        "se2": 2.0 * sol["s1"] * sol["s6"],
+        "se3": 2.0 * sol["s1"] * sol["s7"],
+        "si2": 2.0 * sol["s2"] * sol["z12"],
+        "si3": 2.0 * sol["s2"] * (sol["z13"] - sol["z11"]),
+        "sl2": -2.0 * sol["s3"] * sol["z2"],
+        "sl3": -2.0 * sol["s3"] * (sol["z3"] - sol["z1"]),
+        "sl4": -2.0 * sol["s3"] * (-21.0 - 9.0 * emsq) * zes,
+        "sgh2": 2.0 * sol["s4"] * sol["z32"],
+        "sgh3": 2.0 * sol["s4"] * (sol["z33"] - sol["z31"]),
+        "sgh4": -18.0 * sol["s4"] * zes,
+        "sh2": -2.0 * sol["s2"] * sol["z22"],
+        "sh3": -2.0 * sol["s2"] * (sol["z23"] - sol["z21"]),
+        "ee2": 2.0 * lun["s1"] * lun["s6"],
+        "e3": 2.0 * lun["s1"] * lun["s7"],
+        "xi2": 2.0 * lun["s2"] * lun["z12"],
+        "xi3": 2.0 * lun["s2"] * (lun["z13"] - lun["z11"]),
+        "xl2": -2.0 * lun["s3"] * lun["z2"],
+        "xl3": -2.0 * lun["s3"] * (lun["z3"] - lun["z1"]),
+        "xl4": -2.0 * lun["s3"] * (-21.0 - 9.0 * emsq) * zel,
+        "xgh2": 2.0 * lun["s4"] * lun["z32"],
+        "xgh3": 2.0 * lun["s4"] * (lun["z33"] - lun["z31"]),
+        "xgh4": -18.0 * lun["s4"] * zel,
+        "xh2": -2.0 * lun["s2"] * lun["z22"],
+        "xh3": -2.0 * lun["s2"] * (lun["z23"] - lun["z21"]),
+    }
+
+
+def _dpper(
+    d: dict[str, NDArray],
+    t: NDArray,
+    *,
+    ep: NDArray,
+    inclp: NDArray,
+    nodep: NDArray,
+    argpp: NDArray,
+    mp: NDArray,
+) -> tuple[NDArray, NDArray, NDArray, NDArray, NDArray]:
+    """Apply the lunar-solar long period periodics.
+
+    Args:
+        d (dict[str, NDArray]): Deep space coefficients, shape (K, 1).
+        t (NDArray): Times since epoch (min), shape (K, T).
+        ep (NDArray): Eccentricities.
+        inclp (NDArray): Inclinations (rad).
+        nodep (NDArray): Right ascensions of the ascending node (rad).
+        argpp (NDArray): Arguments of perigee (rad).
+        mp (NDArray): Mean anomalies (rad).
+
+    Returns:
+        tuple[NDArray, NDArray, NDArray, NDArray, NDArray]: Perturbed ep, inclp, nodep, argpp, mp.
+    """
+    zns = 1.19459e-5
+    zes = 0.01675
+    znl = 1.5835218e-4
+    zel = 0.05490
+
+    zm = d["zmos"] + zns * t
+    zf = zm + 2.0 * zes * np.sin(zm)
+    sinzf = np.sin(zf)
+    f2 = 0.5 * sinzf * sinzf - 0.25
+    f3 = -0.5 * sinzf * np.cos(zf)
+    ses = d["se2"] * f2 + d["se3"] * f3
+    sis = d["si2"] * f2 + d["si3"] * f3
+    sls = d["sl2"] * f2 + d["sl3"] * f3 + d["sl4"] * sinzf
+    sghs = d["sgh2"] * f2 + d["sgh3"] * f3 + d["sgh4"] * sinzf
+    shs = d["sh2"] * f2 + d["sh3"] * f3
+
+    zm = d["zmol"] + znl * t
+    zf = zm + 2.0 * zel * np.sin(zm)
+    sinzf = np.sin(zf)
+    f2 = 0.5 * sinzf * sinzf - 0.25
+    f3 = -0.5 * sinzf * np.cos(zf)
+    sel = d["ee2"] * f2 + d["e3"] * f3
+    sil = d["xi2"] * f2 + d["xi3"] * f3
+    sll = d["xl2"] * f2 + d["xl3"] * f3 + d["xl4"] * sinzf
+    sghl = d["xgh2"] * f2 + d["xgh3"] * f3 + d["xgh4"] * sinzf
+    shll = d["xh2"] * f2 + d["xh3"] * f3
+
+    pe = ses + sel
+    pinc = sis + sil
+    pl = sls + sll
+    pgh = sghs + sghl
+    ph = shs + shll
+
+    inclp = inclp + pinc
+    ep = ep + pe
+    sinip = np.sin(inclp)
+    cosip = np.cos(inclp)
+
+    # Lyddane choice: direct application above 0.2 rad, Lyddane modification below
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ph_direct = ph / sinip
+    argpp_direct = argpp + pgh - cosip * ph_direct
+    nodep_direct = nodep + ph_direct
+
+    sinop = np.sin(nodep)
+    cosop = np.cos(nodep)
+    alfdp = sinip * sinop + ph * cosop + pinc * cosip * sinop
+    betdp = sinip * cosop - ph * sinop + pinc * cosip * cosop
+    xnoh = np.fmod(nodep, TWOPI)
+    xls = mp + argpp + pl + pgh + (cosip - pinc * sinip) * xnoh
+    nodep_lyddane = np.arctan2(alfdp, betdp)
+    nodep_lyddane = np.where(
+        np.abs(xnoh - nodep_lyddane) > m.pi,
+        np.where(nodep_lyddane < xnoh, nodep_lyddane + TWOPI, nodep_lyddane - TWOPI),
+        nodep_lyddane,
+    )
+    mp = mp + pl
+    argpp_lyddane = xls - mp - cosip * nodep_lyddane
+
+    direct = inclp >= LYDDANE_INCLINATION
+    return (
+        ep,
+        inclp,
+        np.where(direct, nodep_direct, nodep_lyddane),
+        np.where(direct, argpp_direct, argpp_lyddane),
+        mp,
+    )
+
+
+def _dsinit(c: dict[str, NDArray], ds: dict[str, NDArray]) -> dict[str, NDArray]:
+    """Deep space secular rates and resonance terms.
+
+    Args:
+        c (dict[str, NDArray]): Near earth coefficients of the deep space satellites.
+        ds (dict[str, NDArray]): Output of _dscom for the same satellites.
+
+    Returns:
+        dict[str, NDArray]: Secular rates and resonance coefficients.
+    """
+    q22 = 1.7891679e-6
+    q31 = 2.1460748e-6
+    q33 = 2.2123015e-7
+    root22 = 1.7891679e-6
+    root44 = 7.3636953e-9
+    root54 = 2.1765803e-9
+    root32 = 3.7393792e-7
+    root52 = 1.1428639e-7
+    znl = 1.5835218e-4
+    zns = 1.19459e-5
+
+    sol, lun = ds["sol"], ds["lun"]  # type: ignore[index]
+    nm = c["no"]
+    em = c["ecco"]
+    inclm = c["inclo"]
+    sinim, cosim, emsq = ds["sinim"], ds["cosim"], ds["emsq"]
+
+    irez = np.zeros(nm.shape, dtype=int)
+    irez[(nm > SYNCHRONOUS_MOTION[0]) & (nm < SYNCHRONOUS_MOTION[1])] = SYNCHRONOUS_RESONANCE
+    half_day_motion = (nm >= HALF_DAY_MOTION[0]) & (nm <= HALF_DAY_MOTION[1])
+    irez[half_day_motion & (em >= HALF_DAY_MIN_ECCENTRICITY)] = HALF_DAY_RESONANCE
+
+    equatorial = (inclm < EQUATORIAL_INCLINATION) | (inclm > m.pi - EQUATORIAL_INCLINATION)
+    safe_sinim = np.where(sinim != 0.0, sinim, 1.0)
+
+    ses = sol["s1"] * zns * sol["s5"]
+    sis = sol["s2"] * zns * (sol["z11"] + sol["z13"])
+    sls = -zns * sol["s3"] * (sol["z1"] + sol["z3"] - 14.0 - 6.0 * emsq)
+    sghs = sol["s4"] * zns * (sol["z31"] + sol["z33"] - 6.0)
+    shs = np.where(equatorial, 0.0, -zns * sol["s2"] * (sol["z21"] + sol["z23"]))
+    shs = np.where(sinim != 0.0, shs / safe_sinim, shs)
+    sgs = sghs - cosim * shs
+
+    dedt = ses + lun["s1"] * znl * lun["s5"]
+    didt = sis + lun["s2"] * znl * (lun["z11"] + lun["z13"])
+    dmdt = sls - znl * lun["s3"] * (lun["z1"] + lun["z3"] - 14.0 - 6.0 * emsq)
+    sghl = lun["s4"] * znl * (lun["z31"] + lun["z33"] - 6.0)
+    shll = np.where(equatorial, 0.0, -znl * lun["s2"] * (lun["z21"] + lun["z23"]))
+    domdt = sgs + sghl
+    dnodt = shs
+    domdt = np.where(sinim != 0.0, domdt - cosim / safe_sinim * shll, domdt)
+    dnodt = np.where(sinim != 0.0, dnodt + shll / safe_sinim, dnodt)
+
+    theta = np.mod(c["gsto"], TWOPI)
+    aonv = (nm / SGP4_XKE) ** X2O3
+    zeros = np.zeros(nm.shape)
+    out = {
+        "irez": irez,
+        "dedt": dedt,
+        "didt": didt,
+        "dmdt": dmdt,
+        "dnodt": dnodt,
+        "domdt": domdt,
+        "xfact": zeros,
+        "xlamo": zeros,
+        **{key: zeros for key in ("del1", "del2", "del3")},
+        **{
+            key: zeros
+            for key in (
+                "d2201", "d2211", "d3210", "d3222", "d4410",
+                "d4422", "d5220", "d5232", "d5421", "d5433",
+            )
+        },
+    }  # fmt: skip
+
+    # ---------------- geopotential resonance for 12 hour orbits ----------------
+    half_day = irez == HALF_DAY_RESONANCE
+    if half_day.any():
+        cosisq = cosim * cosim
+        em = c["ecco"]
+        emsq = c["eccsq"]
+        eoc = em * emsq
+        g201 = -0.306 - (em - 0.64) * 0.440
+        low = em <= HALF_DAY_ECCENTRICITY_BREAKS[0]
+        g211 = np.where(low, 3.616 - 13.2470 * em + 16.2900 * emsq,
+                        -72.099 + 331.819 * em - 508.738 * emsq + 266.724 * eoc)
+        g310 = np.where(low, -19.302 + 117.3900 * em - 228.4190 * emsq + 156.5910 * eoc,
+                        -346.844 + 1582.851 * em - 2415.925 * emsq + 1246.113 * eoc)
+        g322 = np.where(low, -18.9068 + 109.7927 * em - 214.6334 * emsq + 146.5816 * eoc,
+                        -342.585 + 1554.908 * em - 2366.899 * emsq + 1215.972 * eoc)
+        g410 = np.where(low, -41.122 + 242.6940 * em - 471.0940 * emsq + 313.9530 * eoc,
+                        -1052.797 + 4758.686 * em - 7193.992 * emsq + 3651.957 * eoc)
+        g422 = np.where(low, -146.407 + 841.8800 * em - 1629.014 * emsq + 1083.4350 * eoc,
+                        -3581.690 + 16178.110 * em - 24462.770 * emsq + 12422.520 * eoc)
+        g520 = np.where(
+            low,
+            -532.114 + 3017.977 * em - 5740.032 * emsq + 3708.2760 * eoc,
+            np.where(em > HALF_DAY_ECCENTRICITY_BREAKS[2], -5149.66 + 29936.92 * em - 54087.36 * emsq + 31324.56 * eoc,
+                     1464.74 - 4664.75 * em + 3763.64 * emsq),
+        )
+        very_low = em < HALF_DAY_ECCENTRICITY_BREAKS[1]
+        g533 = np.where(very_low, -919.22770 + 4988.6100 * em - 9064.7700 * emsq + 5542.21 * eoc,
+                        -37995.780 + 161616.52 * em - 229838.20 * emsq + 109377.94 * eoc)
+        g521 = np.where(very_low, -822.71072 + 4568.6173 * em - 8491.4146 * emsq + 5337.524 * eoc,
+                        -51752.104 + 218913.95 * em - 309468.16 * emsq + 146349.42 * eoc)
+        g532 = np.where(very_low, -853.66600 + 4690.2500 * em - 8624.7700 * emsq + 5341.4 * eoc,
+                        -40023.880 + 170470.89 * em - 242699.48 * emsq + 115605.82 * eoc)  # fmt: skip
+
+        sini2 = sinim * sinim
+        f220 = 0.75 * (1.0 + 2.0 * cosim + cosisq)
+        f221 = 1.5 * sini2
+        f321 = 1.875 * sinim * (1.0 - 2.0 * cosim - 3.0 * cosisq)
+        f322 = -1.875 * sinim * (1.0 + 2.0 * cosim - 3.0 * cosisq)
+        f441 = 35.0 * sini2 * f220
+        f442 = 39.3750 * sini2 * sini2
+        f522 = 9.84375 * sinim * (
+            sini2 * (1.0 - 2.0 * cosim - 5.0 * cosisq) + 0.33333333 * (-2.0 + 4.0 * cosim + 6.0 * cosisq)
+        )
+        f523 = sinim * (
+            4.92187512 * sini2 * (-2.0 - 4.0 * cosim + 10.0 * cosisq)
+            + 6.56250012 * (1.0 + 2.0 * cosim - 3.0 * cosisq)
+        )
+        f542 = 29.53125 * sinim * (2.0 - 8.0 * cosim + cosisq * (-12.0 + 8.0 * cosim + 10.0 * cosisq))
+        f543 = 29.53125 * sinim * (-2.0 - 8.0 * cosim + cosisq * (12.0 + 8.0 * cosim - 10.0 * cosisq))
+
+        temp1 = 3.0 * nm * nm * aonv * aonv
+        temp = temp1 * root22
+        d2201 = temp * f220 * g201
+        d2211 = temp * f221 * g211
+        temp1 = temp1 * aonv
+        temp = temp1 * root32
+        d3210 = temp * f321 * g310
+        d3222 = temp * f322 * g322
+        temp1 = temp1 * aonv
+        temp = 2.0 * temp1 * root44
+        d4410 = temp * f441 * g410
+        d4422 = temp * f442 * g422
+        temp1 = temp1 * aonv
+        temp = temp1 * root52
+        d5220 = temp * f522 * g520
+        d5232 = temp * f523 * g532
+        temp = 2.0 * temp1 * root54
+        d5421 = temp * f542 * g521
+        d5433 = temp * f543 * g533
+        for key, value in (
+            ("d2201", d2201), ("d2211", d2211), ("d3210", d3210), ("d3222", d3222), ("d4410", d4410),
+            ("d4422", d4422), ("d5220", d5220), ("d5232", d5232), ("d5421", d5421), ("d5433", d5433),
+        ):  # fmt: skip
+            out[key] = np.where(half_day, value, 0.0)
+        out["xlamo"] = np.where(
+            half_day, np.mod(c["mo"] + 2.0 * c["nodeo"] - 2.0 * theta, TWOPI), out["xlamo"]
+        )
+        out["xfact"] = np.where(
+            half_day, c["mdot"] + dmdt + 2.0 * (c["nodedot"] + dnodt - RPTIM) - c["no"], out["xfact"]
+        )
+
+    # ---------------- synchronous resonance terms ----------------
+    synchronous = irez == SYNCHRONOUS_RESONANCE
+    if synchronous.any():
+        g200 = 1.0 + emsq * (-2.5 + 0.8125 * emsq)
+        g310 = 1.0 + 2.0 * emsq
+        g300 = 1.0 + emsq * (-6.0 + 6.60937 * emsq)
+        f220 = 0.75 * (1.0 + cosim) * (1.0 + cosim)
+        f311 = 0.9375 * sinim * sinim * (1.0 + 3.0 * cosim) - 0.75 * (1.0 + cosim)
+        f330 = 1.875 * (1.0 + cosim) ** 3
+        del1 = 3.0 * nm * nm * aonv * aonv
+        out["del2"] = np.where(synchronous, 2.0 * del1 * f220 * g200 * q22, 0.0)
+        out["del3"] = np.where(synchronous, 3.0 * del1 * f330 * g300 * q33 * aonv, 0.0)
+        out["del1"] = np.where(synchronous, del1 * f311 * g310 * q31 * aonv, 0.0)
+        out["xlamo"] = np.where(
+            synchronous, np.mod(c["mo"] + c["nodeo"] + c["argpo"] - theta, TWOPI), out["xlamo"]
+        )
+        out["xfact"] = np.where(
+            synchronous,
+            c["mdot"] + c["xpidot"] - RPTIM + dmdt + domdt + dnodt - c["no"],
+            out["xfact"],
+        )
+    return out
+
+
+def _resonance_rates(
+    d: dict[str, NDArray], xli: NDArray, xni: NDArray, atime: NDArray
+) -> tuple[NDArray, NDArray, NDArray]:
+    """Derivatives used by the resonance integrator.
+
+    Args:
+        d (dict[str, NDArray]): Deep space coefficients.
+        xli (NDArray): Resonance mean longitude.
+        xni (NDArray): Resonance mean motion.
+        atime (NDArray): Integrator time (min).
+
+    Returns:
+        tuple[NDArray, NDArray, NDArray]: xndt, xldot and xnddt.
+    """
+    fasx2 = 0.13130908
+    fasx4 = 2.8843198
+    fasx6 = 0.37448087
+    g22 = 5.7686396
+    g32 = 0.95240898
+    g44 = 1.8014998
+    g52 = 1.0508330
+    g54 = 4.4108898
+
+    xldot = xni + d["xfact"]
+    # Synchronous
+    xndt_1 = (
+        d["del1"] * np.sin(xli - fasx2)
+        + d["del2"] * np.sin(2.0 * (xli - fasx4))
+        + d["del3"] * np.sin(3.0 * (xli - fasx6))
+    )
+    xnddt_1 = (
+        d["del1"] * np.cos(xli - fasx2)
+        + 2.0 * d["del2"] * np.cos(2.0 * (xli - fasx4))
+        + 3.0 * d["del3"] * np.cos(3.0 * (xli - fasx6))
+    )
+    # Half day
+    xomi = d["argpo"] + d["argpdot"] * atime
+    x2omi = xomi + xomi
+    x2li = xli + xli
+    xndt_2 = (
+        d["d2201"] * np.sin(x2omi + xli - g22)
+        + d["d2211"] * np.sin(xli - g22)
+        + d["d3210"] * np.sin(xomi + xli - g32)
+        + d["d3222"] * np.sin(-xomi + xli - g32)
+        + d["d4410"] * np.sin(x2omi + x2li - g44)
+        + d["d4422"] * np.sin(x2li - g44)
+        + d["d5220"] * np.sin(xomi + xli - g52)
+        + d["d5232"] * np.sin(-xomi + xli - g52)
+        + d["d5421"] * np.sin(xomi + x2li - g54)
+        + d["d5433"] * np.sin(-xomi + x2li - g54)
+    )
+    xnddt_2 = (
+        d["d2201"] * np.cos(x2omi + xli - g22)
+        + d["d2211"] * np.cos(xli - g22)
+        + d["d3210"] * np.cos(xomi + xli - g32)
+        + d["d3222"] * np.cos(-xomi + xli - g32)
+        + d["d5220"] * np.cos(xomi + xli - g52)
+        + d["d5232"] * np.cos(-xomi + xli - g52)
+        + 2.0
+        * (
+            d["d4410"] * np.cos(x2omi + x2li - g44)
+            + d["d4422"] * np.cos(x2li - g44)
+            + d["d5421"] * np.cos(xomi + x2li - g54)
+            + d["d5433"] * np.cos(-xomi + x2li - g54)
+        )
+    )
+    synchronous = d["irez"] == SYNCHRONOUS_RESONANCE
+    xndt = np.where(synchronous, xndt_1, xndt_2)
+    xnddt = np.where(synchronous, xnddt_1, xnddt_2) * xldot
+    return xndt, xldot, xnddt
+
+
+def _dspace(
+    d: dict[str, NDArray],
+    t: NDArray,
+    *,
+    em: NDArray,
+    argpm: NDArray,
+    inclm: NDArray,
+    mm: NDArray,
+    nodem: NDArray,
+    nm: NDArray,
+) -> tuple[NDArray, NDArray, NDArray, NDArray, NDArray, NDArray]:
+    """Deep space secular effects and resonance integration.
+
+    The Euler-Maclaurin integrator of the reference implementation is run for all the (satellite, time)
+    pairs at once: each iteration advances by 720 minutes every pair that has not reached its time yet.
+
+    Args:
+        d (dict[str, NDArray]): Deep space coefficients, shape (K, 1).
+        t (NDArray): Times since epoch (min), shape (K, T).
+        em (NDArray): Eccentricities.
+        argpm (NDArray): Arguments of perigee (rad).
+        inclm (NDArray): Inclinations (rad).
+        mm (NDArray): Mean anomalies (rad).
+        nodem (NDArray): Right ascensions of the ascending node (rad).
+        nm (NDArray): Mean motions (rad/min).
+
+    Returns:
+        tuple[NDArray, NDArray, NDArray, NDArray, NDArray, NDArray]: em, argpm, inclm, mm, nodem, nm.
+    """
+    step = 720.0  # [min]
+    step2 = 259200.0  # [min2] step * step / 2
+
+    theta = np.mod(d["gsto"] + t * RPTIM, TWOPI)
+    em = em + d["dedt"] * t
+    inclm = inclm + d["didt"] * t
+    argpm = argpm + d["domdt"] * t
+    nodem = nodem + d["dnodt"] * t
+    mm = mm + d["dmdt"] * t
+
+    resonant = np.broadcast_to(d["irez"] != 0, t.shape)
+    if not resonant.any():
+        return em, argpm, inclm, mm, nodem, nm
+
+    delt = np.where(t > 0.0, step, -step)
+    atime = np.zeros(t.shape)
+    xni = np.broadcast_to(d["no"], t.shape).copy()
+    xli = np.broadcast_to(d["xlamo"], t.shape).copy()
+    active = resonant & (np.abs(t) >= step)
+    while active.any():
+        xndt, xldot, xnddt = _resonance_rates(d, xli, xni, atime)
+        xli = np.where(active, xli + xldot * delt + xndt * step2, xli)
+        xni = np.where(active, xni + xndt * delt + xnddt * step2, xni)
+        atime = np.where(active, atime + delt, atime)
+        active = resonant & (np.abs(t - atime) >= step)
+
+    xndt, xldot, xnddt = _resonance_rates(d, xli, xni, atime)
+    ft = t - atime
+    nm_res = xni + xndt * ft + xnddt * ft * ft * 0.5
+    xl = xli + xldot * ft + xndt * ft * ft * 0.5
+    mm_res = np.where(d["irez"] != SYNCHRONOUS_RESONANCE, xl - 2.0 * nodem + 2.0 * theta, xl - nodem - argpm + theta)
+    return (
+        em,
+        argpm,
+        inclm,
+        np.where(resonant, mm_res, mm),
+        nodem,
+        np.where(resonant, nm_res, nm),
+    )
+
+
+def _sgp4(
+    c: dict[str, NDArray], tsince: NDArray, deep: dict[str, NDArray] | None
+) -> tuple[NDArray, NDArray, NDArray]:
+    """Propagate a set of satellites sharing the same method (near earth or deep space).
+
+    Args:
+        c (dict[str, NDArray]): Initialized coefficients, shape (K, 1).
+        tsince (NDArray): Times since epoch (min), shape (K, T).
+        deep (dict[str, NDArray] | None): Deep space coefficients, None for near earth satellites.
+
+    Returns:
+        tuple[NDArray, NDArray, NDArray]: TEME positions [km] (K, T, 3), velocities [km/s] (K, T, 3)
+            and error codes (K, T).
+    """
+    t = tsince
+    vkmpersec = SGP4_RE * SGP4_XKE / 60.0
+    error = np.zeros(t.shape, dtype=int)
+
+    # ---------------- secular gravity and atmospheric drag ----------------
+    xmdf = c["mo"] + c["mdot"] * t
+    argpdf = c["argpo"] + c["argpdot"] * t
+    nodedf = c["nodeo"] + c["nodedot"] * t
+    t2 = t * t
+    nodem = nodedf + c["nodecf"] * t2
+    tempa = 1.0 - c["cc1"] * t
+    tempe = c["bstar"] * c["cc4"] * t
+    templ = c["t2cof"] * t2
+
+    if deep is None:
+        simple = np.broadcast_to(c["isimp"], t.shape)
+        delomg = c["omgcof"] * t
+        delmtemp = 1.0 + c["eta"] * np.cos(xmdf)
+        delm = c["xmcof"] * (delmtemp**3 - c["delmo"])
+        temp = np.where(simple, 0.0, delomg + delm)
+        mm = xmdf + temp
+        argpm = argpdf - temp
+        t3 = t2 * t
+        t4 = t3 * t
+        tempa = np.where(simple, tempa, tempa - c["d2"] * t2 - c["d3"] * t3 - c["d4"] * t4)
+        tempe = np.where(simple, tempe, tempe + c["bstar"] * c["cc5"] * (np.sin(mm) - c["sinmao"]))
+        templ = np.where(simple, templ, templ + c["t3cof"] * t3 + t4 * (c["t4cof"] + t * c["t5cof"]))
+        nm = np.broadcast_to(c["no"], t.shape)
+        em = np.broadcast_to(c["ecco"], t.shape)
+        inclm = np.broadcast_to(c["inclo"], t.shape)
+    else:
+        em, argpm, inclm, mm, nodem, nm = _dspace(
+            deep,
+            t,
+            em=np.broadcast_to(c["ecco"], t.shape),
+            argpm=argpdf,
+            inclm=np.broadcast_to(c["inclo"], t.shape),
+            mm=xmdf,
+            nodem=nodem,
+            nm=np.broadcast_to(c["no"], t.shape),
+        )
+
+    error[nm <= 0.0] = 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        am = (SGP4_XKE / nm) ** X2O3 * tempa * tempa
+        nm = SGP4_XKE / am**1.5
+    em = em - tempe
+    error[(error == 0) & ((em >= 1.0) | (em < MIN_ECCENTRICITY))] = 1
+    em = np.maximum(em, 1.0e-6)
+    mm = mm + c["no"] * templ
+    xlm = mm + argpm + nodem
+    nodem = np.fmod(nodem, TWOPI)
+    argpm = np.mod(argpm, TWOPI)
+    xlm = np.mod(xlm, TWOPI)
+    mm = np.mod(xlm - argpm - nodem, TWOPI)
+
+    # ---------------- lunar-solar periodics ----------------
+    ep, xincp, argpp, nodep, mp = em, inclm, argpm, nodem, mm
+    sinip = np.sin(xincp)
+    cosip = np.cos(xincp)
+    aycof = c["aycof"]
+    xlcof = c["xlcof"]
+    con41 = c["con41"]
+    x1mth2 = c["x1mth2"]
+    x7thm1 = c["x7thm1"]
+    if deep is not None:
+        ep, xincp, nodep, argpp, mp = _dpper(deep, t, ep=ep, inclp=xincp, nodep=nodep, argpp=argpp, mp=mp)
+        negative = xincp < 0.0
+        xincp = np.where(negative, -xincp, xincp)
+        nodep = np.where(negative, nodep + m.pi, nodep)
+        argpp = np.where(negative, argpp - m.pi, argpp)
+        error[(error == 0) & ((ep < 0.0) | (ep > 1.0))] = 3
+
+        sinip = np.sin(xincp)
+        cosip = np.cos(xincp)
+        aycof = -0.5 * SGP4_J3OJ2 * sinip
+        xlcof = (
+            -0.25
+            * SGP4_J3OJ2
+            * sinip
+            * (3.0 + 5.0 * cosip)
+            / np.where(np.abs(cosip + 1.0) > SINGULAR_COS_INCLINATION, 1.0 + cosip, SINGULAR_COS_INCLINATION)
+        )
+        cosisq = cosip * cosip
+        con41 = 3.0 * cosisq - 1.0
+        x1mth2 = 1.0 - cosisq
+        x7thm1 = 7.0 * cosisq - 1.0
+
+    # ---------------- long period periodics ----------------
+    axnl = ep * np.cos(argpp)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        temp = 1.0 / (am * (1.0 - ep * ep))
+    aynl = ep * np.sin(argpp) + temp * aycof
+    xl = mp + argpp + nodep + temp * xlcof * axnl
+
+    # ---------------- solve kepler's equation ----------------
+    u = np.mod(xl - nodep, TWOPI)
+    eo1 = u.copy()
+    sineo1 = np.sin(eo1)
+    coseo1 = np.cos(eo1)
+    converging = np.ones(u.shape, dtype=bool)
+    for _ in range(10):
+        # The trigonometric values of the last Newton iterate are kept, as in the reference implementation
+        sineo1 = np.where(converging, np.sin(eo1), sineo1)
+        coseo1 = np.where(converging, np.cos(eo1), coseo1)
+        tem5 = (u - aynl * coseo1 + axnl * sineo1 - eo1) / (1.0 - coseo1 * axnl - sineo1 * aynl)
+        tem5 = np.clip(tem5, -0.95, 0.95)
+        eo1 = np.where(converging, eo1 + tem5, eo1)
+        converging &= np.abs(tem5) >= KEPLER_TOLERANCE
+        if not converging.any():
+            break
+
+    # ---------------- short period preliminary quantities ----------------
+    ecose = axnl * coseo1 + aynl * sineo1
+    esine = axnl * sineo1 - aynl * coseo1
+    el2 = axnl * axnl + aynl * aynl
+    pl = am * (1.0 - el2)
+    error[(error == 0) & (pl < 0.0)] = 4
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rl = am * (1.0 - ecose)
+        rdotl = np.sqrt(am) * esine / rl
+        rvdotl = np.sqrt(pl) / rl
+        betal = np.sqrt(1.0 - el2)
+        temp = esine / (1.0 + betal)
+        sinu = am / rl * (sineo1 - aynl - axnl * temp)
+        cosu = am / rl * (coseo1 - axnl + aynl * temp)
+        su = np.arctan2(sinu, cosu)
+        sin2u = (cosu + cosu) * sinu
+        cos2u = 1.0 - 2.0 * sinu * sinu
+        temp = 1.0 / pl
+        temp1 = 0.5 * SGP4_J2 * temp
+        temp2 = temp1 * temp
+
+        # ---------------- update for short period periodics ----------------
+        mrt = rl * (1.0 - 1.5 * temp2 * betal * con41) + 0.5 * temp1 * x1mth2 * cos2u
+        su = su - 0.25 * temp2 * x7thm1 * sin2u
+        xnode = nodep + 1.5 * temp2 * cosip * sin2u
+        xinc = xincp + 1.5 * temp2 * cosip * sinip * cos2u
+        mvt = rdotl - nm * temp1 * x1mth2 * sin2u / SGP4_XKE
+        rvdot = rvdotl + nm * temp1 * (x1mth2 * cos2u + 1.5 * con41) / SGP4_XKE
+
+    # ---------------- orientation vectors ----------------
+    sinsu = np.sin(su)
+    cossu = np.cos(su)
+    snod = np.sin(xnode)
+    cnod = np.cos(xnode)
+    sini = np.sin(xinc)
+    cosi = np.cos(xinc)
+    xmx = -snod * cosi
+    xmy = cnod * cosi
+    uvec = np.stack([xmx * sinsu + cnod * cossu, xmy * sinsu + snod * cossu, sini * sinsu], axis=-1)
+    vvec = np.stack([xmx * cossu - cnod * sinsu, xmy * cossu - snod * sinsu, sini * cossu], axis=-1)
+
+    r = (mrt * SGP4_RE)[..., None] * uvec
+    v = (mvt[..., None] * uvec + rvdot[..., None] * vvec) * vkmpersec
+
+    error[(error == 0) & (mrt < 1.0)] = 6
+    # Decayed satellites still get a state, as in the reference implementation
+    invalid = (error != 0) & (error != DECAYED_ERROR)
+    r[invalid] = np.nan
+    v[invalid] = np.nan
+    return r, v, error
+
+
+class SGP4Model(OrbitalDynamicModel):
+    """SGP4/SDP4 dynamic model for one or several TLE.
+
+    All the satellites are initialized at once and propagated together: every array attribute has a shape (K,)
+    with K the number of satellites.
+    """
+
+    def __init__(
+        self,
+        *,
+        epoch_jd: NDArray | float,
+        bstar: NDArray | float,
+        ecco: NDArray | float,
+        argpo: NDArray | float,
+        inclo: NDArray | float,
+        mo: NDArray | float,
+        no_kozai: NDArray | float,
+        nodeo: NDArray | float,
+        satnum: NDArray | int | None = None,
+    ) -> None:
+        """Class constructor.
+
+        Args:
+            epoch_jd (NDArray | float): Epochs of the elements, julian dates (UTC).
+            bstar (NDArray | float): Drag terms (1/earth radii).
+            ecco (NDArray | float): Eccentricities (-).
+            argpo (NDArray | float): Arguments of perigee (rad).
+            inclo (NDArray | float): Inclinations (rad).
+            mo (NDArray | float): Mean anomalies (rad).
+            no_kozai (NDArray | float): Kozai mean motions (rad/min).
+            nodeo (NDArray | float): Right ascensions of the ascending node (rad).
+            satnum (NDArray | int | None): NORAD catalog numbers, optional.
+        """
+        self.epoch_jd = np.atleast_1d(np.asarray(epoch_jd, dtype=float))
+        self.satnum = (
+            np.zeros(self.epoch_jd.shape, dtype=int)
+            if satnum is None
+            else np.atleast_1d(np.asarray(satnum, dtype=int))
+        )
+        elements = {
+            "bstar": bstar,
+            "ecco": ecco,
+            "argpo": argpo,
+            "inclo": inclo,
+            "mo": mo,
+            "no_kozai": no_kozai,
+            "nodeo": nodeo,
+        }
+        self._coefficients = self._initialize(
+            {key: np.atleast_1d(np.asarray(value, dtype=float)) for key, value in elements.items()}
+        )
+        self._deep_idx = np.flatnonzero(self._coefficients["deep"])
+        self._deep_coefficients = self._initialize_deep_space(self._deep_idx)
+
+    @classmethod
+    def from_tle(cls, TLE: tuple[str, str] | list[str]) -> "SGP4Model":
+        """Create the model of a single satellite from its TLE.
+
+        Args:
+            TLE (tuple[str, str] | list[str]): Two-line element set, an optional title line is allowed.
+
+        Returns:
+            SGP4Model: Instance with one satellite.
+        """
+        return cls.from_tles([TLE])
+
+    @classmethod
+    def from_tles(cls, TLEs: list[tuple[str, str]] | list[list[str]]) -> "SGP4Model":
+        """Create the model of several satellites from their TLE.
+
+        Args:
+            TLEs (list[tuple[str, str]] | list[list[str]]): Two-line element sets.
+
+        Returns:
+            SGP4Model: Instance with one satellite per TLE.
+        """
+        return cls.from_catalog(
+            TLECatalog.from_lines([line for TLE in TLEs for line in TLE[-2:]], strict=True)
+        )
+
+    @classmethod
+    def from_catalog(cls, catalog: TLECatalog) -> "SGP4Model":
+        """Create the model of all the satellites of a catalog.
+
+        Args:
+            catalog (TLECatalog): Columnar TLE store.
+
+        Returns:
+            SGP4Model: Instance with one satellite per catalog entry.
+        """
+        return cls(
+            epoch_jd=catalog.epoch_jd,
+            bstar=catalog.bstar,
+            ecco=catalog.ecco,
+            argpo=catalog.argpo,
+            inclo=catalog.inclo,
+            mo=catalog.mo,
+            no_kozai=catalog.no_kozai,
+            nodeo=catalog.nodeo,
+            satnum=catalog.satnum,
+        )
+
+    @property
+    def epoch(self) -> NDArray:
+        """Epochs of the elements as timestamps (s), like KeplerianModel.epoch."""
+        return (self.epoch_jd - JD_UNIX_EPOCH) * 86400
+
+    def __len__(self) -> int:
+        """Number of satellites."""
+        return len(self.epoch_jd)
+
+    def _initialize(self, el: dict[str, NDArray]) -> dict[str, NDArray]:
+        """Compute the near earth coefficients of every satellite (sgp4init).
+
+        Args:
+            el (dict[str, NDArray]): Mean elements.
+
+        Returns:
+            dict[str, NDArray]: Coefficients named as in the reference implementation.
+        """
+        ecco, inclo, argpo, mo, bstar = el["ecco"], el["inclo"], el["argpo"], el["mo"], el["bstar"]
+
+        # ---------------- un-kozai the mean motion ----------------
+        eccsq = ecco * ecco
+        omeosq = 1.0 - eccsq
+        rteosq = np.sqrt(omeosq)
+        cosio = np.cos(inclo)
+        cosio2 = cosio * cosio
+        ak = (SGP4_XKE / el["no_kozai"]) ** X2O3
+        d1 = 0.75 * SGP4_J2 * (3.0 * cosio2 - 1.0) / (rteosq * omeosq)
+        delta = d1 / (ak * ak)
+        adel = ak * (1.0 - delta * delta - delta * (1.0 / 3.0 + 134.0 * delta * delta / 81.0))
+        delta = d1 / (adel * adel)
+        no = el["no_kozai"] / (1.0 + delta)
+
+        ao = (SGP4_XKE / no) ** X2O3
+        sinio = np.sin(inclo)
+        po = ao * omeosq
+        con42 = 1.0 - 5.0 * cosio2
+        con41 = -con42 - cosio2 - cosio2
+        posq = po * po
+        rp = ao * (1.0 - ecco)
+        gsto = gstime(self.epoch_jd)
+
+        # ---------------- atmospheric model ----------------
+        ss = 78.0 / SGP4_RE + 1.0
+        qzms2t = ((120.0 - 78.0) / SGP4_RE) ** 4
+        perige = (rp - 1.0) * SGP4_RE  # [km]
+        low_perigee = perige < LOW_PERIGEE_KM
+        sfour_km = np.where(perige < MIN_PERIGEE_KM, 20.0, perige - 78.0)
+        qzms24 = np.where(low_perigee, ((120.0 - sfour_km) / SGP4_RE) ** 4, qzms2t)
+        sfour = np.where(low_perigee, sfour_km / SGP4_RE + 1.0, ss)
+
+        pinvsq = 1.0 / posq
+        tsi = 1.0 / (ao - sfour)
+        eta = ao * ecco * tsi
+        etasq = eta * eta
+        eeta = ecco * eta
+        psisq = np.abs(1.0 - etasq)
+        coef = qzms24 * tsi**4
+        coef1 = coef / psisq**3.5
+        cc2 = (
+            coef1
+            * no
+            * (
+                ao * (1.0 + 1.5 * etasq + eeta * (4.0 + etasq))
+                + 0.375 * SGP4_J2 * tsi / psisq * con41 * (8.0 + 3.0 * etasq * (8.0 + etasq))
+            )
+        )
+        cc1 = bstar * cc2
+        eccentric = ecco > CIRCULAR_ECCENTRICITY
+        safe_ecco = np.where(eccentric, ecco, 1.0)
+        safe_eeta = np.where(eccentric, eeta, 1.0)
+        cc3 = np.where(eccentric, -2.0 * coef * tsi * SGP4_J3OJ2 * no * sinio / safe_ecco, 0.0)
+        x1mth2 = 1.0 - cosio2
+        cc4 = (
+            2.0
+            * no
+            * coef1
+            * ao
+            * omeosq
+            * (
+                eta * (2.0 + 0.5 * etasq)
+                + ecco * (0.5 + 2.0 * etasq)
+                - SGP4_J2
+                * tsi
+                / (ao * psisq)
+                * (
+                    -3.0 * con41 * (1.0 - 2.0 * eeta + etasq * (1.5 - 0.5 * eeta))
+                    + 0.75 * x1mth2 * (2.0 * etasq - eeta * (1.0 + etasq)) * np.cos(2.0 * argpo)
+                )
+            )
+        )
+        cc5 = 2.0 * coef1 * ao * omeosq * (1.0 + 2.75 * (etasq + eeta) + eeta * etasq)
+
+        # ---------------- secular rates ----------------
+        cosio4 = cosio2 * cosio2
+        temp1 = 1.5 * SGP4_J2 * pinvsq * no
+        temp2 = 0.5 * temp1 * SGP4_J2 * pinvsq
+        temp3 = -0.46875 * SGP4_J4 * pinvsq * pinvsq * no
+        mdot = (
+            no
+            + 0.5 * temp1 * rteosq * con41
+            + 0.0625 * temp2 * rteosq * (13.0 - 78.0 * cosio2 + 137.0 * cosio4)
+        )
+        argpdot = (
+            -0.5 * temp1 * con42
+            + 0.0625 * temp2 * (7.0 - 114.0 * cosio2 + 395.0 * cosio4)
+            + temp3 * (3.0 - 36.0 * cosio2 + 49.0 * cosio4)
+        )
+        xhdot1 = -temp1 * cosio
+        nodedot = xhdot1 + (0.5 * temp2 * (4.0 - 19.0 * cosio2) + 2.0 * temp3 * (3.0 - 7.0 * cosio2)) * cosio
+
+        deep = TWOPI / no >= DEEP_SPACE_PERIOD_MIN
+        isimp = (rp < SIMPLE_PERIGEE_KM / SGP4_RE + 1.0) | deep
+
+        # ---------------- higher order drag terms ----------------
+        cc1sq = cc1 * cc1
+        d2 = 4.0 * ao * tsi * cc1sq
+        temp = d2 * tsi * cc1 / 3.0
+        d3 = (17.0 * ao + sfour) * temp
+        d4 = 0.5 * temp * ao * tsi * (221.0 * ao + 31.0 * sfour) * cc1
+        t3cof = d2 + 2.0 * cc1sq
+        t4cof = 0.25 * (3.0 * d3 + cc1 * (12.0 * d2 + 10.0 * cc1sq))
+        t5cof = 0.2 * (3.0 * d4 + 12.0 * cc1 * d3 + 6.0 * d2 * d2 + 15.0 * cc1sq * (2.0 * d2 + cc1sq))
+
+        coefficients = {
+            **el,
+            "no": no,
+            "eccsq": eccsq,
+            "gsto": gsto,
+            "con41": con41,
+            "x1mth2": x1mth2,
+            "x7thm1": 7.0 * cosio2 - 1.0,
+            "cc1": cc1,
+            "cc4": cc4,
+            "cc5": cc5,
+            "eta": eta,
+            "mdot": mdot,
+            "argpdot": argpdot,
+            "nodedot": nodedot,
+            "xpidot": argpdot + nodedot,
+            "omgcof": bstar * cc3 * np.cos(argpo),
+            "xmcof": np.where(eccentric, -X2O3 * coef * bstar / safe_eeta, 0.0),
+            "nodecf": 3.5 * omeosq * xhdot1 * cc1,
+            "t2cof": 1.5 * cc1,
+            "xlcof": -0.25
+            * SGP4_J3OJ2
+            * sinio
+            * (3.0 + 5.0 * cosio)
+            / np.where(np.abs(cosio + 1.0) > SINGULAR_COS_INCLINATION, 1.0 + cosio, SINGULAR_COS_INCLINATION),
+            "aycof": -0.5 * SGP4_J3OJ2 * sinio,
+            "delmo": (1.0 + eta * np.cos(mo)) ** 3,
+            "sinmao": np.sin(mo),
+            "isimp": isimp,
+            "deep": deep,
+        }
+        for key, value in (("d2", d2), ("d3", d3), ("d4", d4), ("t3cof", t3cof), ("t4cof", t4cof), ("t5cof", t5cof)):
+            coefficients[key] = np.where(isimp, 0.0, value)
+        return coefficients
+
+    def _initialize_deep_space(self, idx: NDArray) -> dict[str, NDArray]:
+        """Compute the lunar-solar and resonance coefficients of the deep space satellites.
+
+        Args:
+            idx (NDArray): Indices of the deep space satellites.
+
+        Returns:
+            dict[str, NDArray]: Deep space coefficients, shape (len(idx),).
+        """
+        if len(idx) == 0:
+            return {}
+        c = {key: value[idx] for key, value in self._coefficients.items()}
+        ds = _dscom(
+            self.epoch_jd[idx] - JD_1950, c["ecco"], argpp=c["argpo"], inclp=c["inclo"], nodep=c["nodeo"], np_=c["no"]
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            resonance = _dsinit(c, ds)
+        deep = {key: value for key, value in ds.items() if key not in ("sol", "lun")}
+        deep.update(resonance)
+        deep.update({key: c[key] for key in ("gsto", "argpo", "argpdot", "no")})
+        return deep
+
+    def propagate_tsince(
+        self, tsince_min: NDArray, satellites: NDArray | None = None
+    ) -> tuple[NDArray, NDArray, NDArray]:
+        """Propagate all the satellites, or some of them.
+
+        Args:
+            tsince_min (NDArray): Minutes since the epoch of each satellite, either shape (T,) shared by all
+                the satellites or shape (K, T).
+            satellites (NDArray | None): Indices of the K satellites to be propagated, all of them if None.
+
+        Returns:
+            tuple[NDArray, NDArray, NDArray]: TEME positions [km] (K, T, 3), velocities [km/s] (K, T, 3)
+                and SGP4 error codes (K, T), 0 if no error. Positions and velocities are NaN on error.
+        """
+        satellites = np.arange(len(self)) if satellites is None else np.atleast_1d(np.asarray(satellites, dtype=int))
+        tsince = np.broadcast_to(np.asarray(tsince_min, dtype=float), (len(satellites), np.shape(tsince_min)[-1]))
+        positions = np.empty((*tsince.shape, 3))
+        velocities = np.empty((*tsince.shape, 3))
+        errors = np.empty(tsince.shape, dtype=int)
+
+        deep = self._coefficients["deep"][satellites]
+        for rows, deep_space in ((np.flatnonzero(~deep), False), (np.flatnonzero(deep), True)):
+            if len(rows) == 0:
+                continue
+            idx = satellites[rows]
+            c = {key: value[idx, None] for key, value in self._coefficients.items()}
+            deep_c = None
+            if deep_space:
+                deep_rows = np.searchsorted(self._deep_idx, idx)
+                deep_c = {key: value[deep_rows, None] for key, value in self._deep_coefficients.items()}
+            r, v, error = _sgp4(c, tsince[rows], deep_c)
+            positions[rows] = r
+            velocities[rows] = v
+            errors[rows] = error
+        return positions, velocities, errors
+
+    def _propagate_first(self, tsince_min: NDArray) -> tuple[NDArray, NDArray]:
+        """Propagate the first satellite, the single-satellite interface of the dynamic models.
+
+        Args:
+            tsince_min (NDArray): Minutes since the epoch, shape (T,).
+
+        Returns:
+            tuple[NDArray, NDArray]: TEME positions [km] (T, 3) and velocities [km/s] (T, 3).
+
+        Raises:
+            ValueError: If the propagation fails (SGP4 error code, e.g. decayed satellite).
+        """
+        r, v, errors = self.propagate_tsince(tsince_min, satellites=np.zeros(1, dtype=int))
+        if np.any(errors):
+            step = int(np.flatnonzero(errors[0])[0])
+            code = int(errors[0, step])
+            raise ValueError(
+                f"SGP4 propagation of satellite {int(self.satnum[0])} failed at {float(tsince_min[step]):.3f} min "
+                f"from epoch: {SGP4_ERRORS.get(code, f'error {code}')}."
+            )
+        return r[0], v[0]
+
+    def propagate_jd(self, jd: NDArray) -> tuple[NDArray, NDArray, NDArray]:
+        """Propagate all the satellites at common julian dates.
+
+        Args:
+            jd (NDArray): Julian dates (UTC), shape (T,).
+
+        Returns:
+            tuple[NDArray, NDArray, NDArray]: TEME positions [km] (K, T, 3), velocities [km/s] (K, T, 3)
+                and SGP4 error codes (K, T).
+        """
+        return self.propagate_tsince((np.asarray(jd, dtype=float)[None, :] - self.epoch_jd[:, None]) * 1440.0)
+
+    def keplerian2cartesian(
+        self,
+    ) -> tuple[tuple[float, float, float], tuple[float, float, float]]:
+        """Exposed method used to retrieve the PVT at epoch in km - km/s, for the first satellite.
+
+        Returns:
+            tuple[tuple[float, float, float],tuple[float, float, float]]: Position [km] / Speed [km/s]
+
+        Raises:
+            ValueError: If the propagation fails (SGP4 error code, e.g. decayed satellite).
+
+        """
+        r, v = self._propagate_first(np.zeros(1))
+        return (tuple(r[0].tolist()), tuple(v[0].tolist()))  # type: ignore[return-value]
+
+    def propagate(
+        self, propagation_time: float, dt_s: float
+    ) -> tuple[list[tuple[float, float, float]], list[tuple[float, float, float]]]:
+        """Propagate the orbit of the first satellite for an amount of time, starting from the TLE epoch.
+
+        Args:
+            propagation_time (float): Amount of seconds to propagate.
+            dt_s (float): Delta t between two steps.
+
+        Returns:
+            tuple[list[tuple[float, float, float]], list[tuple[float, float, float]]]: Returns two list
+              with the positions [km]/ instantanate speed [km/s] in TEME.
+
+        Raises:
+            ValueError: If the propagation fails (SGP4 error code, e.g. decayed satellite).
+        """
+        tsince = np.arange(1, int(propagation_time / dt_s) + 1) * dt_s / 60.0
+        r, v = self._propagate_first(tsince)
+        return (
+            [tuple(pos) for pos in r.tolist()],
+            [tuple(vel) for vel in v.tolist()],
+        )  # type: ignore[return-value]
+
+    def propagate_chunks(
+        self,
+        propagation_time: float,
+        dt_s: float,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        start_step: int = 0,
+    ) -> Iterator[tuple[NDArray, NDArray]]:
+        """Propagate the orbit of the first satellite for an amount of time, yielding the states by chunks.
+
+        Args:
+            propagation_time (float): Amount of seconds to propagate.
+            dt_s (float): Delta t between two steps.
+            chunk_size (int): Maximum number of steps per chunk.
+            start_step (int): Index of the first step yielded, the propagation starting at its time.
+
+        Yields:
+            tuple[NDArray, NDArray]: Positions [km] / instantanate speeds [km/s] in TEME, shape (n, 3).
+
+        Raises:
+            ValueError: If the propagation fails (SGP4 error code, e.g. decayed satellite).
+        """
+        n_steps = int(propagation_time / dt_s)
+        for start in range(start_step, n_steps, chunk_size):
+            tsince = np.arange(start + 1, min(start + chunk_size, n_steps) + 1) * dt_s / 60.0
+            yield self._propagate_first(tsince)
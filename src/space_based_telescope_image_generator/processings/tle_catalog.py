@@ -0,0 +1,341 @@
+"""Bulk loading of TLE catalogs into a columnar element store.
+
+The catalog is read at once into a (N, 69) character array and every field is decoded column-wise using the
+fixed TLE layout, so that full catalogs (~30k objects) are loaded without one Python object per TLE.
+"""
+
+import warnings
+from pathlib import Path
+
+import numpy as np
+from numpy.typing import NDArray
+
+from space_based_telescope_image_generator.utils.constants import (
+    JD_UNIX_EPOCH,
+    MU,
+    PI,
+    RE,
+)
+
+TLE_LINE_LENGTH = 69
+TWO_DIGITS_YEAR_PIVOT = 57  # Two digits years below are in the 2000s, the first TLE dating from 1957
+_ZERO = ord("0")
+
+
+def _as_char_array(lines: list[bytes]) -> NDArray:
+    """Stack TLE lines into a fixed width uint8 array.
+
+    Args:
+        lines (list[bytes]): TLE lines, without line terminators.
+
+    Returns:
+        NDArray: Array (N, 69) of characters, shorter lines are padded with spaces.
+    """
+    if not lines:
+        return np.zeros((0, TLE_LINE_LENGTH), dtype=np.uint8)
+    fixed = np.array(lines, dtype=f"S{TLE_LINE_LENGTH}")
+    chars = fixed.view(np.uint8).reshape(len(lines), TLE_LINE_LENGTH)
+    return np.where(chars == 0, ord(" "), chars).astype(np.uint8)
+
+
+def _checksum_ok(chars: NDArray) -> NDArray:
+    """Verify the modulo 10 checksum of every line.
+
+    Args:
+        chars (NDArray): Array (N, 69) of characters.
+
+    Returns:
+        NDArray: Boolean mask (N,) of the valid lines.
+    """
+    body = chars[:, :68]
+    digits = np.where((body >= _ZERO) & (body <= _ZERO + 9), body - _ZERO, 0).astype(int)
+    total = digits.sum(axis=1) + (body == ord("-")).sum(axis=1)
+    return (total % 10) == (chars[:, 68].astype(int) - _ZERO)
+
+
+def _parse_decimal(chars: NDArray) -> NDArray:
+    """Decode a column block holding signed decimal numbers (e.g. " 97.3788", "-.00000084").
+
+    The digits are accumulated into an exact integer mantissa, then divided once by the matching power of ten,
+    which gives the same result as float() on each field.
+
+    Args:
+        chars (NDArray): Array (N, W) of characters.
+
+    Returns:
+        NDArray: Decoded values (N,).
+    """
+    width = chars.shape[1]
+    is_digit = (chars >= _ZERO) & (chars <= _ZERO + 9)
+    has_dot = (chars == ord(".")).any(axis=1)
+    dot_position = np.where(has_dot, np.argmax(chars == ord("."), axis=1), width)
+
+    columns = np.arange(width)
+    after_dot = columns[None, :] > dot_position[:, None]
+    decimals = (is_digit & after_dot).sum(axis=1)
+
+    mantissa = np.zeros(len(chars), dtype=np.int64)
+    for column in range(width):
+        digit = is_digit[:, column]
+        mantissa = np.where(digit, mantissa * 10 + (chars[:, column].astype(np.int64) - _ZERO), mantissa)
+    sign = np.where((chars == ord("-")).any(axis=1), -1.0, 1.0)
+    return sign * mantissa / 10.0**decimals
+
+
+def _parse_implied_decimal(chars: NDArray) -> NDArray:
+    """Decode a block of digits with an implied leading decimal point (e.g. eccentricity "0006145").
+
+    Args:
+        chars (NDArray): Array (N, W) of characters.
+
+    Returns:
+        NDArray: Decoded values (N,).
+    """
+    padded = np.where(chars == ord(" "), _ZERO, chars)
+    return _parse_decimal(padded) / 10.0 ** chars.shape[1]
+
+
+def _parse_exponential(chars: NDArray) -> NDArray:
+    """Decode the TLE exponential notation with implied decimal point (e.g. " 26070-2" = 0.26070e-2).
+
+    Args:
+        chars (NDArray): Array (N, 8) of characters.
+
+    Returns:
+        NDArray: Decoded values (N,).
+    """
+    sign = np.where(chars[:, 0] == ord("-"), -1.0, 1.0)
+    mantissa = _parse_implied_decimal(chars[:, 1:6])
+    exponent = _parse_decimal(chars[:, 6:8])
+    return sign * mantissa * 10.0**exponent
+
+
+def _parse_satnum(chars: NDArray) -> NDArray:
+    """Decode the catalog numbers, including the Alpha-5 scheme (e.g. "A0001" = 100001).
+
+    Args:
+        chars (NDArray): Array (N, 5) of characters.
+
+    Returns:
+        NDArray: NORAD catalog numbers (N,).
+    """
+    first = chars[:, 0].astype(int)
+    letter = (first >= ord("A")) & (first <= ord("Z"))
+    # Alpha-5 skips the letters I and O to avoid confusion with 1 and 0
+    letter_value = first - ord("A") + 10 - (first > ord("I")) - (first > ord("O"))
+    leading = np.where(letter, letter_value, np.where(first == ord(" "), 0, first - _ZERO))
+    return leading * 10000 + _parse_decimal(chars[:, 1:]).astype(int)
+
+
+def _epoch_to_jd(chars: NDArray) -> NDArray:
+    """Convert the epoch field (two digits year + fractional day of year) into julian dates.
+
+    Args:
+        chars (NDArray): Array (N, 14) of characters, columns 19 to 32 of the first line.
+
+    Returns:
+        NDArray: Julian dates (UTC).
+    """
+    two_digits_year = _parse_decimal(chars[:, :2]).astype(int)
+    year = np.where(two_digits_year < TWO_DIGITS_YEAR_PIVOT, 2000, 1900) + two_digits_year
+    day_of_year = _parse_decimal(chars[:, 2:])
+    jan_first = (year - 1970).astype("datetime64[Y]").astype("datetime64[D]").astype(float)  # [days] since 1970
+    return JD_UNIX_EPOCH + jan_first + day_of_year - 1.0
+
+
+class TLECatalog:
+    """Columnar store of TLE mean elements.
+
+    Every attribute is a NumPy array of shape (N,). Angles are in radians and mean motion in rad/min,
+    i.e. the units used by SGP4Model.
+    """
+
+    _COLUMNS = (
+        "satnum",
+        "epoch_jd",
+        "ndot",
+        "nddot",
+        "bstar",
+        "inclo",
+        "nodeo",
+        "ecco",
+        "argpo",
+        "mo",
+        "no_kozai",
+    )
+
+    def __init__(
+        self,
+        *,
+        satnum: NDArray,
+        epoch_jd: NDArray,
+        ndot: NDArray,
+        nddot: NDArray,
+        bstar: NDArray,
+        inclo: NDArray,
+        nodeo: NDArray,
+        ecco: NDArray,
+        argpo: NDArray,
+        mo: NDArray,
+        no_kozai: NDArray,
+        names: NDArray | None = None,
+    ) -> None:
+        """Class constructor.
+
+        Args:
+            satnum (NDArray): NORAD catalog numbers.
+            epoch_jd (NDArray): Epochs, julian dates (UTC).
+            ndot (NDArray): First derivative of the mean motion (rev/day2).
+            nddot (NDArray): Second derivative of the mean motion (rev/day3).
+            bstar (NDArray): Drag terms (1/earth radii).
+            inclo (NDArray): Inclinations (rad).
+            nodeo (NDArray): Right ascensions of the ascending node (rad).
+            ecco (NDArray): Eccentricities (-).
+            argpo (NDArray): Arguments of perigee (rad).
+            mo (NDArray): Mean anomalies (rad).
+            no_kozai (NDArray): Kozai mean motions (rad/min).
+            names (NDArray | None): Object names (3LE title lines), empty strings if not provided.
+        """
+        self.satnum = satnum
+        self.epoch_jd = epoch_jd
+        self.ndot = ndot
+        self.nddot = nddot
+        self.bstar = bstar
+        self.inclo = inclo
+        self.nodeo = nodeo
+        self.ecco = ecco
+        self.argpo = argpo
+        self.mo = mo
+        self.no_kozai = no_kozai
+        self.names = np.full(len(satnum), "", dtype=object) if names is None else names
+
+    @classmethod
+    def from_file(cls, catalog_path: Path, strict: bool = False) -> "TLECatalog":
+        """Load a local 2LE or 3LE catalog file.
+
+        Args:
+            catalog_path (Path): Path to the catalog file.
+            strict (bool): Raise instead of dropping the TLE with a wrong checksum or layout.
+
+        Returns:
+            TLECatalog: Catalog with one entry per valid TLE.
+        """
+        if not catalog_path.is_file():
+            raise FileNotFoundError(f"TLE catalog not found: {catalog_path}")
+        return cls.from_lines(catalog_path.read_bytes().splitlines(), strict=strict)
+
+    @classmethod
+    def from_lines(cls, lines: list[bytes] | list[str], strict: bool = False) -> "TLECatalog":
+        """Build a catalog from the lines of a 2LE or 3LE file.
+
+        Args:
+            lines (list[bytes] | list[str]): Catalog lines, title lines are optional.
+            strict (bool): Raise instead of dropping the TLE with a wrong checksum or layout.
+
+        Returns:
+            TLECatalog: Catalog with one entry per valid TLE.
+        """
+        # The element lines are ASCII, the title lines of real catalogs may not be
+        raw = [line.encode("utf-8") if isinstance(line, str) else line for line in lines]
+        raw = [line.rstrip() for line in raw]
+
+        # Pair each "1 " line with the following "2 " line, the line before being the optional title
+        first_idx = [
+            i
+            for i in range(len(raw) - 1)
+            if raw[i][:2] == b"1 " and raw[i + 1][:2] == b"2 "
+        ]
+        line1 = _as_char_array([raw[i] for i in first_idx])
+        line2 = _as_char_array([raw[i + 1] for i in first_idx])
+        names = np.array(
+            [
+                raw[i - 1].decode("utf-8", "replace").removeprefix("0 ").strip()
+                if i > 0 and raw[i - 1][:2] not in (b"1 ", b"2 ") and not raw[i - 1].startswith(b"#")
+                else ""
+                for i in first_idx
+            ],
+            dtype=object,
+        )
+
+        valid = (
+            _checksum_ok(line1)
+            & _checksum_ok(line2)
+            & (line1[:, 2:7] == line2[:, 2:7]).all(axis=1)  # Same satellite on both lines
+        )
+        if not valid.all():
+            message = f"{int((~valid).sum())} TLE with an invalid checksum or layout in the catalog."
+            if strict:
+                raise ValueError(message)
+            warnings.warn(f"{message} They are ignored.", stacklevel=2)
+        line1, line2, names = line1[valid], line2[valid], names[valid]
+
+        return cls(
+            satnum=_parse_satnum(line1[:, 2:7]),
+            epoch_jd=_epoch_to_jd(line1[:, 18:32]),
+            ndot=_parse_decimal(line1[:, 33:43]),
+            nddot=_parse_exponential(line1[:, 44:52]),
+            bstar=_parse_exponential(line1[:, 53:61]),
+            inclo=np.radians(_parse_decimal(line2[:, 8:16])),
+            nodeo=np.radians(_parse_decimal(line2[:, 17:25])),
+            ecco=_parse_implied_decimal(line2[:, 26:33]),
+            argpo=np.radians(_parse_decimal(line2[:, 34:42])),
+            mo=np.radians(_parse_decimal(line2[:, 43:51])),
+            no_kozai=_parse_decimal(line2[:, 52:63]) * 2 * PI / 1440.0,
+            names=names,
+        )
+
+    def __len__(self) -> int:
+        """Number of objects in the catalog."""
+        return len(self.satnum)
+
+    def filter(self, mask: NDArray) -> "TLECatalog":
+        """Build a sub-catalog.
+
+        Args:
+            mask (NDArray): Boolean mask or indices of the entries to keep.
+
+        Returns:
+            TLECatalog: Selected entries.
+        """
+        return TLECatalog(
+            **{column: getattr(self, column)[mask] for column in self._COLUMNS},
+            names=self.names[mask],
+        )
+
+    def select_norad_ids(self, norad_ids: list[int] | NDArray) -> "TLECatalog":
+        """Keep the objects with the given NORAD catalog numbers.
+
+        Args:
+            norad_ids (list[int] | NDArray): NORAD catalog numbers.
+
+        Returns:
+            TLECatalog: Selected entries.
+        """
+        return self.filter(np.isin(self.satnum, norad_ids))
+
+    @property
+    def semi_major_axis(self) -> NDArray:
+        """Semi-major axis of each orbit (km), from the mean motion."""
+        return (MU / (self.no_kozai / 60.0) ** 2) ** (1 / 3) / 1e3
+
+    @property
+    def perigee_altitude(self) -> NDArray:
+        """Perigee altitude of each orbit (km)."""
+        return self.semi_major_axis * (1.0 - self.ecco) - RE / 1e3
+
+    @property
+    def apogee_altitude(self) -> NDArray:
+        """Apogee altitude of each orbit (km)."""
+        return self.semi_major_axis * (1.0 + self.ecco) - RE / 1e3
+
+    def select_altitude_band(self, min_altitude_km: float, max_altitude_km: float) -> "TLECatalog":
+        """Keep the objects whose orbit crosses an altitude band.
+
+        Args:
+            min_altitude_km (float): Lower bound of the band (km).
+            max_altitude_km (float): Upper bound of the band (km).
+
+        Returns:
+            TLECatalog: Objects with perigee below the upper bound and apogee above the lower bound.
+        """
+        return self.filter((self.perigee_altitude <= max_altitude_km) & (self.apogee_altitude >= min_altitude_km))
@@ -11,28 +11,10 @@ from space_based_telescope_image_generator.objects.tracking_satellite import (
 
 from space_based_telescope_image_generator.processings.attitude import ConstantSlewAttitudeModel
 from space_based_telescope_image_generator.processings.propagation import KeplerianModel
+from space_based_telescope_image_generator.processings.relative_motion import YamanakaAnkersenModel
 from space_based_telescope_image_generator.processings.scene_manager import SceneManager
 
-# Firstly we define a target
-
-rusty_sat = RustySatellite(
-    kepler_dynamic_model=KeplerianModel.from_pvt(
-        position=[
-            7000,
-            0,
-            0
-        ],
-        velocity=[
-            0,
-            8,
-            0
-        ],
-        epoch=datetime.now()
-    ),
-    attitude_model=ConstantSlewAttitudeModel([0,0,0], 10) #Constant Slew of 10deg/s on each axis
-)
-
-# Then we define a Satellite (our camera)
+# Firstly we define a Satellite (our camera)
 camera_fov = 20
 camera_resolution = (1280, 720)
 
@@ -54,6 +36,16 @@ satellite = TrackingSatellite(
     image_height=camera_resolution[1],
     image_width=camera_resolution[0],
 )
+
+# Then we define a target, 100m below the satellite. Its motion is propagated relatively to the satellite orbit,
+# which is eccentric (8 km/s at 7000 km), hence the Yamanaka-Ankersen model.
+rusty_sat = RustySatellite(
+    kepler_dynamic_model=YamanakaAnkersenModel(
+        chief=satellite.kepler_dynamic_model,
+        relative_position_lvlh=(-0.1, 0, 0),
+    ),
+    attitude_model=ConstantSlewAttitudeModel([0,0,0], 10) #Constant Slew of 10deg/s on each axis
+)
 satellite.target_pointing(
     rusty_sat.get_position()
 )  # We explicitely say that the satellite has to point to the target
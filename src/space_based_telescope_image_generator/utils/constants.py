@@ -8,6 +8,7 @@ atmosphere_radius = earth_radius + 50
 au_km = 1500000  # 1UA = 150Million km. Too far away for Povray so for object far away we will use 1UA = 1 500 000 km (scale 1:100)
 earth_sun_distance = au_km  # 150 million km (1UA)
 starmap_sphere_radius = 2 * au_km
+EARTH_TEXTURE_LONGITUDE_OFFSET_DEG = 180.0  # [deg] The left edge of a spherical image map is along +x, so the Greenwich meridian of the Earth texture (its centre) is along -x
 
 
 MU = 3.986004418e14  # [m3/s2] Standard gravitational constant of the Earth
@@ -15,5 +16,7 @@ J2 = 1082.62668e-6  # [-] Perturbation constant from gravitational potential
 RE = 6378.137e3  # [m] Equatorial radius of the Earth
 DAY_SECONDS = 86400  # [s] Seconds in a solar day
 PI = m.pi  # Pi
+JD_UNIX_EPOCH = 2440587.5  # [days] Julian date of 1970 January 1 0h UT
+EARTH_ROTATION_RATE = 7.292115146706979e-5  # [rad/s] Sidereal rotation rate of the Earth
 
 OBLIQUITY = m.radians(-23.45)  # [deg] Obliquity of the Earth about the ecliptic
@@ -0,0 +1,108 @@
+"""Projection of the target ground truth onto the images."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from space_based_telescope_image_generator.objects.targets.primitive_cubesat import PrimitiveCubesat
+from space_based_telescope_image_generator.objects.targets.target_object import TargetObject
+from space_based_telescope_image_generator.processings.annotations import (
+    compute_annotations,
+    read_annotations,
+    write_annotations,
+)
+from space_based_telescope_image_generator.processings.attitude import ConstantSlewAttitudeModel
+from space_based_telescope_image_generator.processings.pointing import CameraModel, compute_pointing
+from space_based_telescope_image_generator.processings.propagation import KeplerianModel
+from space_based_telescope_image_generator.processings.quaternions import quaternion_to_matrix
+
+CAMERA = CameraModel(30.0, 640, 480)
+SAT_POSITION = np.array([[7000.0, 0.0, 0.0]])
+SAT_VELOCITY = np.array([[0.0, 7.5, 0.0]])
+RANGE_KM = 2.0
+TARGET_POSITION = SAT_POSITION + np.array([0.0, RANGE_KM, 0.0])  # Ahead on the orbit
+IDENTITY = np.array([[1.0, 0.0, 0.0, 0.0]])
+BOUNDING_RADIUS_KM = 0.01
+# Body points: up (radial), right (cross-track) and far outside of the image
+KEYPOINTS_KM = np.array([[0.01, 0.0, 0.0], [0.0, 0.0, 0.02], [0.0, 0.0, 5.0]])
+TLE = [
+    "1 06251U 62025E   06176.82412014  .00008885  00000-0  12808-3 0  3985",
+    "2 06251  58.0579  54.0425 0030035 139.1568 221.1854 15.56387291  6774",
+]
+
+
+def _annotate(
+    target_positions: np.ndarray = TARGET_POSITION, keypoints: np.ndarray = KEYPOINTS_KM
+) -> dict[str, np.ndarray]:
+    """Annotate a frame whose camera looks at the target, the zenith being upwards."""
+    pointing = compute_pointing(SAT_POSITION, SAT_VELOCITY, TARGET_POSITION)
+    return compute_annotations(
+        SAT_POSITION, target_positions, IDENTITY, pointing, CAMERA, keypoints, BOUNDING_RADIUS_KM
+    )
+
+
+def test_keypoints_projection() -> None:
+    """The target is at the image centre, the zenith upwards and the orbit normal to the right."""
+    annotations = _annotate()
+    centre = np.array([CAMERA.width / 2, CAMERA.height / 2])
+    np.testing.assert_allclose(annotations["centroid_px"][0], centre)
+    assert annotations["range_km"][0] == pytest.approx(RANGE_KM)
+
+    expected = centre + CAMERA.focal_px / RANGE_KM * np.array([[0.0, -0.01], [0.02, 0.0], [5.0, 0.0]])
+    np.testing.assert_allclose(annotations["keypoints_px"][0], expected)
+    np.testing.assert_array_equal(annotations["keypoints_visible"][0], [True, True, False])
+
+    # The keypoint outside of the image widens the box up to the image border
+    u_min, v_min, u_max, v_max = annotations["bbox_px"][0]
+    assert (u_min, u_max) == (pytest.approx(centre[0]), CAMERA.width)
+    assert (v_min, v_max) == (pytest.approx(expected[0, 1]), pytest.approx(centre[1]))
+    assert annotations["in_image"][0]
+    assert not annotations["earth_occluded"][0]
+
+
+def test_relative_attitude() -> None:
+    """The relative quaternion maps the target body frame into the camera frame."""
+    annotations = _annotate()
+    pointing = compute_pointing(SAT_POSITION, SAT_VELOCITY, TARGET_POSITION)
+    np.testing.assert_allclose(
+        quaternion_to_matrix(annotations["relative_quaternion"]), np.swapaxes(pointing.rotation, -1, -2), atol=1e-12
+    )
+
+
+def test_bounding_sphere_without_keypoints() -> None:
+    """Targets without keypoints get the box of their bounding sphere."""
+    annotations = _annotate(keypoints=np.zeros((0, 3)))
+    u_min, v_min, u_max, v_max = annotations["bbox_px"][0]
+    radius_px = CAMERA.focal_px * BOUNDING_RADIUS_KM / RANGE_KM
+    assert u_max - u_min == pytest.approx(2 * radius_px)
+    assert v_max - v_min == pytest.approx(2 * radius_px)
+
+
+def test_target_behind_the_earth() -> None:
+    """A target on the other side of the Earth is occluded and out of the image."""
+    annotations = _annotate(target_positions=-SAT_POSITION)
+    assert annotations["earth_occluded"][0]
+    assert not annotations["keypoints_visible"][0].any()
+    assert not annotations["in_image"][0]
+
+
+def test_columnar_file(tmp_path: Path) -> None:
+    """The columns are written next to the frames and read back, all of the same length."""
+    annotations = _annotate()
+    path = write_annotations(tmp_path, annotations)
+    assert path.parent == tmp_path
+    read = read_annotations(tmp_path)
+    assert read.keys() == annotations.keys()
+    for name, column in annotations.items():
+        np.testing.assert_array_equal(read[name], column)
+    with pytest.raises(ValueError, match="same length"):
+        write_annotations(tmp_path, {"range_km": np.zeros(2), "in_image": np.zeros(3)})
+
+
+def test_geometry_of_the_targets() -> None:
+    """Targets know their geometry by default, their keypoints lying on the bounding sphere."""
+    target = PrimitiveCubesat(KeplerianModel.from_tle(TLE), ConstantSlewAttitudeModel((0.0, 0.0, 0.0), 1.0))
+    assert TargetObject.has_geometry
+    assert target.has_geometry
+    np.testing.assert_allclose(np.linalg.norm(target.keypoints(), axis=-1), target.bounding_radius_km)
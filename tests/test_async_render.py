@@ -0,0 +1,80 @@
+"""Asynchronous renders, POV-Ray being replaced by a script writing a fixed image to its output pipe."""
+
+import asyncio
+import itertools
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from space_based_telescope_image_generator.processings.async_render import AsyncRenderer, ppm_to_array
+from space_based_telescope_image_generator.processings.memory import MemoryEstimator
+
+HEIGHT, WIDTH = 6, 8
+MAX_CONCURRENCY = 2
+N_RENDERS = 6
+RESCALED_LEVEL = 128  # 8 bits level of the 0x8080 pixels of the fake renders
+FAKE_POVRAY = """
+import os, sys, time
+start = time.time()
+time.sleep(float(os.environ.get("FAKE_POVRAY_DELAY_S", "0.2")))
+sys.stdout.buffer.write(b"P6\\n# fake POV-Ray\\n{width} {height}\\n65535\\n" + b"\\x80\\x80" * ({width} * {height} * 3))
+with open({log!r}, "a") as log:
+    log.write(f"{{start}} {{time.time()}}\\n")
+"""
+
+
+def _renderer(tmp_path: Path, max_concurrency: int = 1, frame_timeout_s: float | None = None) -> AsyncRenderer:
+    """Build a renderer running the fake POV-Ray script, its start and stop times being logged."""
+    script = tmp_path.joinpath("povray")
+    script.write_text(f"#!{sys.executable}" + FAKE_POVRAY.format(width=WIDTH, height=HEIGHT, log=str(tmp_path / "log")))
+    script.chmod(0o755)
+    scene_manager = SimpleNamespace(satellite=SimpleNamespace(image_width=WIDTH, image_height=HEIGHT))
+    return AsyncRenderer(
+        scene_manager,  # type: ignore[arg-type]
+        max_concurrency,
+        frame_timeout_s,
+        povray_binary=str(script),
+        memory_estimator=MemoryEstimator(tmp_path),
+    )
+
+
+def test_ppm_decoding() -> None:
+    """8 and 16 bits binary PPM are decoded, header comments included."""
+    pixels = np.arange(2 * 3 * 3, dtype=np.uint16).reshape(2, 3, 3) * 1000
+    image = ppm_to_array(b"P6 # comment\n3 2\n65535\n" + pixels.astype(">u2").tobytes())
+    assert image.dtype == np.uint16
+    np.testing.assert_array_equal(image, pixels)
+    np.testing.assert_array_equal(ppm_to_array(b"P6\n3 2 255\n" + bytes(range(18))), np.arange(18).reshape(2, 3, 3))
+    with pytest.raises(ValueError, match="P6"):
+        ppm_to_array(b"P3\n1 1\n255\n0 0 0\n")
+
+
+def test_concurrency_is_bounded(tmp_path: Path) -> None:
+    """No more than max_concurrency POV-Ray processes run at once, and they do run together."""
+    renderer = _renderer(tmp_path, max_concurrency=MAX_CONCURRENCY)
+
+    async def render_all() -> list[np.ndarray]:
+        """Start every render at once."""
+        return await asyncio.gather(*(renderer.render_povstring("sphere {}") for _ in range(N_RENDERS)))
+
+    images = asyncio.run(render_all())
+    assert all(image.dtype == np.uint8 and image.shape == (HEIGHT, WIDTH, 3) for image in images)
+    assert all((image == RESCALED_LEVEL).all() for image in images)
+
+    intervals = [tuple(map(float, line.split())) for line in tmp_path.joinpath("log").read_text().splitlines()]
+    assert len(intervals) == N_RENDERS
+    events = sorted(itertools.chain(((start, 1) for start, _ in intervals), ((stop, -1) for _, stop in intervals)))
+    running = list(itertools.accumulate(change for _, change in events))
+    assert max(running) == MAX_CONCURRENCY
+
+
+def test_timed_out_render_is_killed(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """A render over its timeout raises, its POV-Ray process being killed before writing anything."""
+    monkeypatch.setenv("FAKE_POVRAY_DELAY_S", "30")
+    renderer = _renderer(tmp_path, frame_timeout_s=0.5)
+    with pytest.raises(TimeoutError):
+        asyncio.run(renderer.render_povstring("sphere {}"))
+    assert not tmp_path.joinpath("log").exists()
@@ -0,0 +1,108 @@
+"""Attitude profiles sampled from tables and analytic functions."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from space_based_telescope_image_generator.processings.attitude import (
+    AttitudeDynamicModel,
+    CallableAttitudeModel,
+    ConstantSlewAttitudeModel,
+    TabulatedAttitudeModel,
+)
+from space_based_telescope_image_generator.processings.quaternions import (
+    quaternion_multiply,
+    rotation_vector_to_quaternion,
+)
+
+AXIS = np.array([1.0, 2.0, -2.0]) / 3.0
+RATE_RAD_S = 0.05
+INITIAL_QUATERNION = np.array([0.5, 0.5, -0.5, 0.5])
+TABLE_TIMES_S = np.array([0.0, 3.0, 4.0, 11.0, 20.0])  # Irregular telemetry times
+DURATION_S = 20.0
+DT_S = 0.25
+TOLERANCE = 1e-12
+CHUNK_SIZE = 7
+
+
+def _spin(times: np.ndarray) -> np.ndarray:
+    """Attitude spinning at a constant rate about a fixed axis."""
+    return quaternion_multiply(INITIAL_QUATERNION, rotation_vector_to_quaternion(RATE_RAD_S * times[:, None] * AXIS))
+
+
+def _same_rotation(p: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """Distance between the rotations of unit quaternions, q and -q being the same rotation."""
+    return 1 - np.abs(np.sum(p * q, axis=-1))
+
+
+def test_slerp_follows_a_constant_rate_spin() -> None:
+    """SLERP between the irregular table rows is exact for a spin about a fixed axis."""
+    model = TabulatedAttitudeModel(TABLE_TIMES_S, _spin(TABLE_TIMES_S))
+    quaternions = np.concatenate(list(model.propagate_quaternion_chunks(DURATION_S, DT_S, chunk_size=7)))
+    times = np.arange(1, int(DURATION_S / DT_S) + 1) * DT_S
+    assert _same_rotation(quaternions, _spin(times)).max() < TOLERANCE
+
+
+@pytest.mark.parametrize("interpolation", ["slerp", "squad"])
+def test_table_rows_are_hit_and_held(interpolation: str) -> None:
+    """The interpolation goes through the table rows and holds the attitude outside of the table."""
+    shuffled = np.array([3, 0, 4, 1, 2])
+    # Unnormalised and sign flipped rows describe the same rotations
+    table = _spin(TABLE_TIMES_S) * np.array([2.0, -1.0, 1.0, -3.0, 1.0])[:, None]
+    model = TabulatedAttitudeModel(TABLE_TIMES_S[shuffled], table[shuffled], interpolation)
+    assert _same_rotation(model.attitude_at(TABLE_TIMES_S), _spin(TABLE_TIMES_S)).max() < TOLERANCE
+    held = model.attitude_at(np.array([-5.0, TABLE_TIMES_S[-1] + 5.0]))
+    assert _same_rotation(held, _spin(TABLE_TIMES_S[[0, -1]])).max() < TOLERANCE
+
+
+def test_invalid_tables_are_rejected() -> None:
+    """Duplicated times, missing quaternions and unknown interpolations raise."""
+    with pytest.raises(ValueError, match="unique"):
+        TabulatedAttitudeModel(np.zeros(2), _spin(np.zeros(2)))
+    with pytest.raises(ValueError, match="one quaternion"):
+        TabulatedAttitudeModel(TABLE_TIMES_S, _spin(TABLE_TIMES_S)[:-1])
+    with pytest.raises(ValueError, match="Unknown interpolation"):
+        TabulatedAttitudeModel(TABLE_TIMES_S, _spin(TABLE_TIMES_S), "linear")
+
+
+def test_csv_table_with_epoch(tmp_path: Path) -> None:
+    """A CSV table with a header is read, its times being offset by the epoch."""
+    epoch = 1000.0
+    path = tmp_path.joinpath("attitude.csv")
+    rows = np.column_stack([TABLE_TIMES_S + epoch, _spin(TABLE_TIMES_S)])
+    np.savetxt(path, rows, delimiter=",", header="time,qw,qx,qy,qz", comments="")
+    model = TabulatedAttitudeModel.from_csv(path, epoch=epoch - 1.0)
+    np.testing.assert_allclose(model.times_s, TABLE_TIMES_S + 1.0)
+    assert _same_rotation(model.init_quaternion, _spin(TABLE_TIMES_S[:1])[0]) < TOLERANCE
+
+
+def test_callable_profile() -> None:
+    """An analytic profile is sampled at the frame times, directly or through its table."""
+    times = np.arange(1, int(DURATION_S / DT_S) + 1) * DT_S
+    direct = CallableAttitudeModel(_spin)
+    assert _same_rotation(direct.propagate_quaternions(DURATION_S, DT_S), _spin(times)).max() < TOLERANCE
+    tabulated = CallableAttitudeModel(_spin, table_step_s=3.0, table_duration_s=DURATION_S)
+    assert _same_rotation(tabulated.propagate_quaternions(DURATION_S, DT_S), _spin(times)).max() < TOLERANCE
+    with pytest.raises(ValueError, match="table_duration_s"):
+        CallableAttitudeModel(_spin, table_step_s=3.0)
+
+
+def test_sampled_rates_integrate_to_the_samples() -> None:
+    """The body rates of a sampled profile give back its attitudes once integrated."""
+    model = TabulatedAttitudeModel(TABLE_TIMES_S, _spin(TABLE_TIMES_S) * np.array([1, -1, 1, -1, 1])[:, None])
+    integrated = np.concatenate(list(AttitudeDynamicModel.propagate_quaternion_chunks(model, DURATION_S, DT_S)))
+    assert _same_rotation(integrated, model.propagate_quaternions(DURATION_S, DT_S)).max() < TOLERANCE
+
+
+@pytest.mark.parametrize("start_step", [0, 3, 7, 45, 80, 85])
+def test_chunks_start_at_a_step(start_step: int) -> None:
+    """Starting at a step gives the attitudes of the whole propagation from that step on, integrated or not."""
+    models = [TabulatedAttitudeModel(TABLE_TIMES_S, _spin(TABLE_TIMES_S)), ConstantSlewAttitudeModel((10, 20, 30), 3)]
+    for model in models:
+        for propagate in (type(model).propagate_quaternion_chunks, AttitudeDynamicModel.propagate_quaternion_chunks):
+            expected = np.concatenate(list(propagate(model, DURATION_S, DT_S, CHUNK_SIZE)))
+            chunks = list(propagate(model, DURATION_S, DT_S, CHUNK_SIZE, start_step))
+            assert all(len(chunk) <= CHUNK_SIZE for chunk in chunks)
+            quaternions = np.concatenate(chunks) if chunks else np.zeros((0, 4))
+            np.testing.assert_array_equal(quaternions, expected[start_step:])
@@ -0,0 +1,82 @@
+"""Longest-first packing of the jobs and online fit of their render time."""
+
+import numpy as np
+import pytest
+
+from space_based_telescope_image_generator.processings.cost_model import (
+    CostModel,
+    RenderFeatures,
+    pack_longest_first,
+)
+
+TRUE_COEFFICIENTS = np.array([0.2, 5.0, 30.0, 200.0, 40.0])  # [s], far from the prior
+N_OBSERVATIONS = 60
+RELATIVE_TOLERANCE = 1e-3
+LPT_BOUND = 4 / 3  # Graham bound of the longest-first makespan over the optimal one
+
+
+def _features(rng: np.random.Generator, profile: str = "PrimitiveCubesat") -> RenderFeatures:
+    """Draw the features of a render."""
+    earth_fraction = float(rng.uniform(0.0, 0.8))
+    return RenderFeatures(
+        earth_fraction=earth_fraction,
+        atmosphere_fraction=earth_fraction + float(rng.uniform(0.0, 0.2)),
+        target_area_px=float(rng.uniform(0.0, 2e5)),
+        media=bool(rng.integers(2)),
+        pixels=int(rng.choice([640 * 480, 1280 * 720, 1920 * 1080])),
+        profile=profile,
+        n_frames=int(rng.integers(1, 5)),
+    )
+
+
+def test_longest_jobs_first() -> None:
+    """Each job goes to the worker free first, the longest ones being assigned first."""
+    costs = {"a": 7.0, "b": 5.0, "c": 4.0, "d": 3.0, "e": 3.0, "f": 2.0}
+    assignments, wall_clock_s = pack_longest_first(costs, 2)
+    assert assignments == [["a", "d", "f"], ["b", "c", "e"]]
+    assert wall_clock_s == sum(costs.values()) / 2
+
+    # Taking the short jobs first leaves the long one alone at the end
+    assert pack_longest_first({0: 1.0, 1: 1.0, 2: 1.0, 3: 1.0, 4: 4.0}, 2) == ([[4], [0, 1, 2, 3]], 4.0)
+    with pytest.raises(ValueError, match="At least one worker"):
+        pack_longest_first(costs, 0)
+
+
+@pytest.mark.parametrize("n_workers", [1, 3, 8])
+def test_longest_first_bound(n_workers: int) -> None:
+    """Every job is assigned once, and the wall-clock time stays within the longest-first bound."""
+    rng = np.random.default_rng(n_workers)
+    costs = {job: float(cost) for job, cost in enumerate(rng.lognormal(0.0, 1.0, 50))}
+    assignments, wall_clock_s = pack_longest_first(costs, n_workers)
+    assert sorted(job for jobs in assignments for job in jobs) == list(costs)
+    assert wall_clock_s == pytest.approx(max(sum(costs[job] for job in jobs) for jobs in assignments))
+    for jobs in assignments:
+        assert [costs[job] for job in jobs] == sorted((costs[job] for job in jobs), reverse=True)
+    lower_bound = max(sum(costs.values()) / n_workers, *costs.values())
+    assert lower_bound <= wall_clock_s <= LPT_BOUND * lower_bound
+
+
+def test_render_times_are_learnt() -> None:
+    """The coefficients of a profile converge to the measured render times, new profiles using the shared ones."""
+    rng = np.random.default_rng(0)
+    model = CostModel()
+    for _ in range(N_OBSERVATIONS):
+        features = _features(rng)
+        model.observe(features, features.n_frames * float(features.regressors() @ TRUE_COEFFICIENTS))
+
+    for profile in ("PrimitiveCubesat", "RustySatellite"):
+        features = _features(rng, profile)
+        expected_s = features.n_frames * float(features.regressors() @ TRUE_COEFFICIENTS)
+        assert model.predict(features) == pytest.approx(expected_s, rel=RELATIVE_TOLERANCE)
+    assert model.n_observations == {"PrimitiveCubesat": N_OBSERVATIONS, "*": N_OBSERVATIONS}
+
+
+def test_prior_predictions() -> None:
+    """Before any measurement, the prior orders the renders, with a floor for empty scenes."""
+    model = CostModel()
+    limb = RenderFeatures(earth_fraction=0.5, atmosphere_fraction=0.7, target_area_px=0.0, media=True, pixels=10**6)
+    space = limb.model_copy(update={"earth_fraction": 0.0, "atmosphere_fraction": 0.0})
+    assert model.predict(limb) > model.predict(space)
+    assert CostModel(prior=(0.0,) * 5).frame_time(space) == pytest.approx(1e-3)
+    with pytest.raises(ValueError, match="forgetting"):
+        CostModel(forgetting=0.0)
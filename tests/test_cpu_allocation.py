@@ -0,0 +1,76 @@
+"""Split of the CPUs of a host into render slots, on a fake two-node topology."""
+
+from pathlib import Path
+
+import pytest
+
+from space_based_telescope_image_generator.processings import cpu_allocation
+from space_based_telescope_image_generator.processings.cpu_allocation import CpuAllocation, parse_cpu_list
+
+NODES = {0: "0-3", 1: "4-7"}
+# Hyper-threads of a core are two CPUs apart: (0, 2), (1, 3), (4, 6) and (5, 7)
+CORE_IDS = {0: 0, 1: 1, 2: 0, 3: 1, 4: 0, 5: 1, 6: 0, 7: 1}
+CPUS = list(range(8))
+
+
+@pytest.fixture
+def topology(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Expose the fake topology in place of the system one."""
+    for node, cpu_list in NODES.items():
+        node_folder = tmp_path.joinpath("node", f"node{node}")
+        node_folder.mkdir(parents=True)
+        node_folder.joinpath("cpulist").write_text(f"{cpu_list}\n")
+        for cpu in parse_cpu_list(cpu_list):
+            cpu_folder = tmp_path.joinpath("cpu", f"cpu{cpu}", "topology")
+            cpu_folder.mkdir(parents=True)
+            cpu_folder.joinpath("physical_package_id").write_text(f"{node}\n")
+            cpu_folder.joinpath("core_id").write_text(f"{CORE_IDS[cpu]}\n")
+    monkeypatch.setattr(cpu_allocation, "_SYSTEM_FOLDER", tmp_path)
+
+
+def test_cpu_lists() -> None:
+    """Ranges and single CPUs of the Linux lists are expanded."""
+    assert parse_cpu_list("0-3,8,10-11\n") == [0, 1, 2, 3, 8, 10, 11]
+    assert parse_cpu_list("") == []
+
+
+@pytest.mark.usefixtures("topology")
+def test_slots_follow_the_cores_and_nodes() -> None:
+    """Hyper-threads of a core share a slot, and a slot stays in its node."""
+    assert CpuAllocation(2, cpus=CPUS).slots() == [(0, 2), (1, 3), (4, 6), (5, 7)]
+    assert CpuAllocation(1, cpus=CPUS).slots() == [(0,), (2,), (1,), (3,), (4,), (6,), (5,), (7,)]
+    assert CpuAllocation(4, cpus=CPUS).slots() == [(0, 2, 1, 3), (4, 6, 5, 7)]
+    assert CpuAllocation(2, pinning="numa", cpus=CPUS).slots() == [(0, 1, 2, 3)] * 2 + [(4, 5, 6, 7)] * 2
+    assert CpuAllocation(2, pinning=None, cpus=CPUS).slots() == [()] * 4
+
+
+@pytest.mark.usefixtures("topology")
+def test_leftover_cpus() -> None:
+    """CPUs left by the nodes are grouped across the nodes, and a render wider than the host uses every CPU."""
+    # One slot of 3 per node, the CPUs 3 and 7 left together are not enough for another slot
+    assert CpuAllocation(3, cpus=CPUS).slots() == [(0, 2, 1), (4, 6, 5)]
+    # Node 1 reduced to a single CPU, grouped with the CPU left by node 0
+    assert CpuAllocation(2, cpus=[0, 1, 2, 4]).slots() == [(0, 2), (1, 4)]
+    assert CpuAllocation(16, cpus=CPUS).slots() == [tuple(CPUS)]
+
+
+def test_unknown_topology(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Without topology, the CPUs form a single sorted node."""
+    monkeypatch.setattr(cpu_allocation, "_SYSTEM_FOLDER", tmp_path)
+    allocation = CpuAllocation(2, cpus=[5, 1, 3])
+    assert allocation.nodes == [[1, 3, 5]]
+    assert allocation.slots() == [(1, 3)]
+
+
+def test_candidate_splits() -> None:
+    """The splits use every CPU, from single-threaded renders to one render."""
+    assert CpuAllocation.candidate_splits(12) == [1, 2, 3, 4, 6, 12]
+    assert CpuAllocation.candidate_splits(1) == [1]
+
+
+def test_invalid_allocations() -> None:
+    """A render needs a thread, and the pinning must be known."""
+    with pytest.raises(ValueError, match="at least one thread"):
+        CpuAllocation(0)
+    with pytest.raises(ValueError, match="Unknown pinning"):
+        CpuAllocation(pinning="socket")
@@ -0,0 +1,87 @@
+"""Sharded frame datasets and the in-place trimming of their last shard."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from space_based_telescope_image_generator.processings.dataset import (
+    DatasetReader,
+    DatasetWriter,
+    shard_file_name,
+    truncate_npy,
+)
+
+FRAME_SHAPE = (5, 4, 3)
+FRAMES_PER_SHARD = 3
+
+
+def _frames(n_frames: int) -> np.ndarray:
+    """Random 16 bits frames."""
+    return np.random.default_rng(n_frames).integers(0, 2**16, (n_frames, *FRAME_SHAPE), dtype=np.uint16)
+
+
+@pytest.mark.parametrize("version", [(1, 0), (2, 0)])
+def test_truncated_npy_keeps_its_first_rows(tmp_path: Path, version: tuple[int, int]) -> None:
+    """The truncated file is a valid .npy file of the first rows, without any trailing data."""
+    path = tmp_path.joinpath("array.npy")
+    array = np.arange(1000 * 6, dtype=np.float32).reshape(1000, 2, 3)
+    with path.open("wb") as file:
+        np.lib.format.write_array(file, array, version=version)
+    data_offset = path.stat().st_size - array.nbytes
+
+    truncate_npy(path, 7)
+    np.testing.assert_array_equal(np.load(path), array[:7])
+    assert path.stat().st_size == data_offset + array[:7].nbytes
+    truncate_npy(path, 0)
+    assert np.load(path).shape == (0, 2, 3)
+
+
+def test_invalid_truncations(tmp_path: Path) -> None:
+    """Rows cannot be added, nor Fortran-ordered arrays truncated."""
+    path = tmp_path.joinpath("array.npy")
+    np.save(path, np.zeros((4, 2)))
+    with pytest.raises(ValueError, match="Cannot keep 5 rows"):
+        truncate_npy(path, 5)
+    np.save(path, np.asfortranarray(np.zeros((4, 2))))
+    with pytest.raises(ValueError, match="Cannot keep 2 rows"):
+        truncate_npy(path, 2)
+
+
+@pytest.mark.parametrize("n_frames", [7, 6])
+def test_dataset_round_trip(tmp_path: Path, n_frames: int) -> None:
+    """Frames and metadata are read back by index, the last shard holding only its frames."""
+    frames = _frames(n_frames)
+    with DatasetWriter(tmp_path, FRAME_SHAPE, np.uint16, FRAMES_PER_SHARD, {"fps": 10}) as writer:
+        for index, frame in enumerate(frames):
+            assert writer.append(frame, {"time": 0.1 * index, "position": np.full(3, index)}) == index
+
+    n_shards = -(-n_frames // FRAMES_PER_SHARD)
+    shard_sizes = [np.load(tmp_path.joinpath(shard_file_name(k)), mmap_mode="r").shape[0] for k in range(n_shards)]
+    assert shard_sizes == [FRAMES_PER_SHARD] * (n_shards - 1) + [n_frames - (n_shards - 1) * FRAMES_PER_SHARD]
+    assert not tmp_path.joinpath(shard_file_name(n_shards)).exists()
+
+    reader = DatasetReader(tmp_path)
+    assert len(reader) == n_frames
+    assert reader.attributes == {"fps": 10}
+    for index in range(n_frames):
+        np.testing.assert_array_equal(reader[index], frames[index])
+    np.testing.assert_array_equal(reader[-1], frames[-1])
+    metadata = reader.frame_metadata(n_frames - 1)
+    assert metadata["time"] == pytest.approx(0.1 * (n_frames - 1))
+    np.testing.assert_array_equal(metadata["position"], np.full(3, n_frames - 1))
+    with pytest.raises(IndexError):
+        reader[n_frames]
+
+
+def test_invalid_appends(tmp_path: Path) -> None:
+    """Frames must have the dataset shape, and the metadata the same fields."""
+    writer = DatasetWriter(tmp_path, FRAME_SHAPE, np.uint16, FRAMES_PER_SHARD)
+    with pytest.raises(ValueError, match="Frame of shape"):
+        writer.append(np.zeros((1, *FRAME_SHAPE)))
+    writer.append(_frames(1)[0], {"time": 0.0})
+    with pytest.raises(ValueError, match="same for every frame"):
+        writer.append(_frames(1)[0], {"epoch": 0.0})
+    writer.close()
+    with pytest.raises(ValueError, match="closed"):
+        writer.append(_frames(1)[0], {"time": 0.0})
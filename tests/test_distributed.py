@@ -0,0 +1,81 @@
+"""Workers sharing a task folder, in separate processes."""
+
+import json
+import multiprocessing
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from space_based_telescope_image_generator.processings import distributed
+from space_based_telescope_image_generator.processings.distributed import TaskFolder, run_task_worker
+
+N_TASKS = 24
+N_WORKERS = 4
+MAX_ATTEMPTS = 2
+
+
+def _record_task(task: dict[str, Any], task_folder: Path, scenes: dict, render_admission: object = None) -> None:
+    """Task standing for a render: one marker file per run, the poison task always failing."""
+    if task["kind"] == "poison":
+        raise RuntimeError("poison task")
+    time.sleep(0.02)
+    Path(task["output_folder"]).joinpath(f"{task['task_id']}.{os.getpid()}").touch()
+
+
+def test_claim_of_old_pending_task_is_not_stale(tmp_path: Path) -> None:
+    """A task pending for longer than the timeout is claimed with a fresh heartbeat."""
+    tasks = TaskFolder(tmp_path, stale_after_s=1.0)
+    tasks.submit("task", {"kind": "frames"})
+    old = time.time() - 60.0
+    os.utime(tmp_path.joinpath("pending", "task.json"), (old, old))
+
+    task = tasks.claim()
+    assert task is not None and task["attempts"] == 1
+    assert tasks.requeue_stale() == 0
+    assert tasks.heartbeat("task")
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="fork start method needed")
+def test_workers_share_the_tasks(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Several workers run every task, take over a stale claim and survive a task that always fails."""
+    task_folder, output_folder = tmp_path.joinpath("tasks"), tmp_path.joinpath("outputs")
+    output_folder.mkdir()
+    tasks = TaskFolder(task_folder, stale_after_s=1.0)
+    for k in range(N_TASKS):
+        tasks.submit(f"task_{k:03d}", {"kind": "record", "output_folder": str(output_folder)})
+    tasks.submit("task_poison", {"kind": "poison", "output_folder": str(output_folder)})
+
+    # Claim of a worker that crashed a while ago
+    stale = tasks.claim()
+    assert stale is not None
+    old = time.time() - 60.0
+    os.utime(task_folder.joinpath("claimed", f"{stale['task_id']}.json"), (old, old))
+
+    monkeypatch.setattr(distributed, "run_task", _record_task)
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(
+            target=run_task_worker,
+            args=(task_folder,),
+            # Timeout far above the heartbeats of a loaded host, the 60 s old claim being still stale
+            kwargs={"stale_after_s": 10.0, "heartbeat_s": 0.1, "poll_s": 0.05, "max_attempts": MAX_ATTEMPTS},
+        )
+        for _ in range(N_WORKERS)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60.0)
+    assert [worker.exitcode for worker in workers] == [0] * N_WORKERS
+
+    assert tasks.counts() == {"pending": 0, "claimed": 0, "done": N_TASKS, "failed": 1}
+    for k in range(N_TASKS):
+        assert list(output_folder.glob(f"task_{k:03d}.*")), f"task_{k:03d} has not been run"
+    taken_over = json.loads(task_folder.joinpath("done", f"{stale['task_id']}.json").read_text())
+    assert taken_over["attempts"] == 2
+    poison = json.loads(task_folder.joinpath("failed", "task_poison.json").read_text())
+    assert poison["attempts"] == MAX_ATTEMPTS
+    assert "poison task" in poison["error"]
@@ -0,0 +1,81 @@
+"""Sun direction and Earth rotation against published reference values."""
+
+from datetime import UTC, datetime
+
+import numpy as np
+import pytest
+
+from space_based_telescope_image_generator.processings.ephemeris import (
+    JD_J2000,
+    SimulationClock,
+    earth_rotation_angle,
+    gstime,
+    sun_direction,
+)
+from space_based_telescope_image_generator.utils.constants import DAY_SECONDS, JD_UNIX_EPOCH
+
+SIDEREAL_DAY_S = 86164.0905  # [s] Rotation period of the Earth
+GMST_TOLERANCE_DEG = 1e-6
+SUN_TOLERANCE_DEG = 0.01  # [deg] Accuracy of the low precision formulas of the Astronomical Almanac
+OBLIQUITY_DEG = 23.44
+
+
+def _timestamp(jd: float) -> float:
+    """Convert a julian date into a timestamp."""
+    return (jd - JD_UNIX_EPOCH) * DAY_SECONDS
+
+
+def _angle_deg(u: np.ndarray, v: np.ndarray) -> float:
+    """Angle between two unit vectors."""
+    return float(np.degrees(np.arccos(np.clip(np.dot(u, v), -1.0, 1.0))))
+
+
+@pytest.mark.parametrize(
+    ("jd", "expected_deg"),
+    [
+        (JD_J2000, 280.46061837),  # J2000 epoch
+        (2448854.5 + (12 + 14 / 60) / 24, 152.578787886),  # 1992 August 20 12:14 UT1, Vallado example 3-5
+    ],
+)
+def test_gmst_reference_values(jd: float, expected_deg: float) -> None:
+    """GMST follows the IAU 1982 model."""
+    assert np.degrees(gstime(jd)) == pytest.approx(expected_deg, abs=GMST_TOLERANCE_DEG)
+
+
+def test_earth_rotation_period() -> None:
+    """The Earth gets back to the same angle after a sidereal day, and the angles are in [0, 2pi[."""
+    angles = earth_rotation_angle(np.array([0.0, SIDEREAL_DAY_S, DAY_SECONDS / 2]))
+    assert np.degrees(angles[1] - angles[0]) == pytest.approx(0.0, abs=GMST_TOLERANCE_DEG)
+    assert np.all((angles >= 0) & (angles < 2 * np.pi))
+
+
+def test_sun_direction_reference_value() -> None:
+    """Sun direction of 2006 April 2 0h UTC, Vallado example 5-1."""
+    expected = np.array([0.9771945, 0.1924424, 0.0834308])
+    sun = sun_direction(np.array([_timestamp(2453827.5)]))[0]
+    assert np.linalg.norm(sun) == pytest.approx(1.0)
+    assert _angle_deg(sun, expected / np.linalg.norm(expected)) < SUN_TOLERANCE_DEG
+
+
+@pytest.mark.parametrize(
+    ("date", "declination_deg"),
+    [
+        (datetime(2024, 3, 20, 3, 6, tzinfo=UTC), 0.0),  # March equinox
+        (datetime(2024, 6, 20, 20, 51, tzinfo=UTC), OBLIQUITY_DEG),  # June solstice
+        (datetime(2024, 12, 21, 9, 20, tzinfo=UTC), -OBLIQUITY_DEG),  # December solstice
+    ],
+)
+def test_sun_declination_at_equinox_and_solstices(date: datetime, declination_deg: float) -> None:
+    """The Sun crosses the equator at the equinox and reaches the obliquity at the solstices."""
+    sun = sun_direction(np.array([date.timestamp()]))[0]
+    assert np.degrees(np.arcsin(sun[2])) == pytest.approx(declination_deg, abs=SUN_TOLERANCE_DEG)
+
+
+def test_timeline_of_the_clock() -> None:
+    """The frames start one step after the clock start and their timeline is computed once."""
+    clock = SimulationClock(_timestamp(JD_J2000))
+    timeline = clock.timeline(4, 0.5)
+    np.testing.assert_allclose(timeline.times - clock.start_timestamp, [0.5, 1.0, 1.5, 2.0])
+    assert clock.timeline(4, 0.5) is timeline
+    np.testing.assert_allclose(timeline.sun_directions, sun_direction(timeline.times))
+    assert len(timeline) == len(timeline.earth_rotation_deg)
@@ -0,0 +1,75 @@
+"""Entry and exit times of the visibility events."""
+
+import numpy as np
+import pytest
+
+from space_based_telescope_image_generator.processings.events import EventFinder, VisibilityEvent
+from space_based_telescope_image_generator.utils.constants import earth_radius
+
+RADIUS_KM = 7000.0
+SPEED_KM_S = 7.5
+DT_S = 10.0
+TOLERANCE_S = 1e-3
+ANGULAR_RATE = SPEED_KM_S / RADIUS_KM  # [rad/s]
+SHADOW_HALF_ANGLE = np.arcsin(earth_radius / RADIUS_KM)  # [rad] Half of the orbit arc in the cylindrical shadow
+ENTRY_S = (np.pi - SHADOW_HALF_ANGLE) / ANGULAR_RATE
+EXIT_S = (np.pi + SHADOW_HALF_ANGLE) / ANGULAR_RATE
+MARGIN_S = 200.0  # Sunlit arc sampled after the eclipse, shorter than the sunlit part of the orbit
+
+
+def _sun(times: np.ndarray) -> np.ndarray:
+    """Keep the Sun along x."""
+    return np.broadcast_to([1.0, 0.0, 0.0], (len(times), 3))
+
+
+def _find_eclipses(times: np.ndarray) -> list[VisibilityEvent]:
+    """Eclipses of a target on a circular equatorial orbit, the Sun lying in the orbit plane."""
+    phase = ANGULAR_RATE * times
+    positions = RADIUS_KM * np.stack([np.cos(phase), np.sin(phase), 0 * phase], axis=-1)
+    velocities = SPEED_KM_S * np.stack([-np.sin(phase), np.cos(phase), 0 * phase], axis=-1)
+    finder = EventFinder(kinds=("eclipse",), sun_direction_function=_sun, tolerance_s=TOLERANCE_S)
+    # The satellite follows the target 1 km behind, the eclipse only depends on the target
+    return finder.find(times, positions - velocities / ANGULAR_RATE / RADIUS_KM, velocities, positions, velocities)
+
+
+def test_entry_and_exit_are_refined_between_the_samples() -> None:
+    """The eclipse entry and exit are found within the tolerance, far from the frame times."""
+    events = _find_eclipses(np.arange(0.0, EXIT_S + MARGIN_S, DT_S))
+    assert len(events) == 1
+    assert events[0].kind == "eclipse"
+    assert events[0].start == pytest.approx(ENTRY_S, abs=TOLERANCE_S)
+    assert events[0].end == pytest.approx(EXIT_S, abs=TOLERANCE_S)
+
+
+def test_events_spanning_the_first_or_last_sample() -> None:
+    """Events running at the first sample start there, events running at the last sample end there."""
+    middle = 0.5 * (ENTRY_S + EXIT_S)
+    (ongoing,) = _find_eclipses(np.arange(middle, EXIT_S + MARGIN_S, DT_S))
+    assert ongoing.start == middle
+    assert ongoing.end == pytest.approx(EXIT_S, abs=TOLERANCE_S)
+
+    times = np.arange(0.0, middle, DT_S)
+    (unfinished,) = _find_eclipses(times)
+    assert unfinished.start == pytest.approx(ENTRY_S, abs=TOLERANCE_S)
+    assert unfinished.end == times[-1]
+
+    times = np.arange(ENTRY_S + DT_S, EXIT_S - DT_S, DT_S)
+    (whole,) = _find_eclipses(times)
+    assert (whole.start, whole.end) == (times[0], times[-1])
+
+
+def test_several_events_are_sorted() -> None:
+    """Two orbits give two eclipses, sorted by start time, and the frames inside them are flagged."""
+    period = 2 * np.pi / ANGULAR_RATE
+    times = np.arange(0.0, 2 * period, DT_S)
+    events = _find_eclipses(times)
+    assert [event.start for event in events] == pytest.approx([ENTRY_S, ENTRY_S + period], abs=TOLERANCE_S)
+    dead = EventFinder.dead_frames(times, events)
+    in_shadow = (times % period > ENTRY_S) & (times % period < EXIT_S)
+    np.testing.assert_array_equal(dead, in_shadow)
+
+
+def test_unknown_kinds_are_rejected() -> None:
+    """Only the kinds of EVENT_KINDS can be looked for."""
+    with pytest.raises(ValueError, match="Unknown event kinds"):
+        EventFinder(kinds=("eclipse", "moon"))
@@ -0,0 +1,76 @@
+"""Frame slots shared between processes, their recycling and the ownership of the shared memory."""
+
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pytest
+
+from space_based_telescope_image_generator.processings.frame_ring import FrameRing
+
+FRAME_SHAPE = (4, 6, 3)
+N_FRAMES = 10
+TIMEOUT_S = 30.0
+
+
+def _produce(ring: FrameRing) -> None:
+    """Write frames filled with their index, then close the ring of the worker."""
+    for frame_index in range(N_FRAMES):
+        slot, frame = ring.acquire(timeout=TIMEOUT_S)
+        frame[...] = frame_index
+        ring.publish(slot, frame_index)
+    ring.close_stream()
+    ring.close()
+
+
+def test_slots_are_recycled_once_every_reader_released_them() -> None:
+    """A published slot stays in use until the last reader releases it, the producer being blocked meanwhile."""
+    with FrameRing(2, FRAME_SHAPE, n_readers=2) as ring:
+        first, _ = ring.acquire()
+        second, _ = ring.acquire()
+        with pytest.raises(TimeoutError):
+            ring.acquire(timeout=0.05)
+        ring.publish(first, 0)
+        for reader in range(2):
+            assert ring.receive(reader, timeout=TIMEOUT_S) == (first, 0)
+        ring.release(first)
+        with pytest.raises(TimeoutError):
+            ring.acquire(timeout=0.05)
+        ring.release(first)
+        assert ring.acquire(timeout=TIMEOUT_S)[0] == first
+        ring.close_stream()
+        assert ring.receive(1, timeout=TIMEOUT_S) is None
+        assert second != first
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="fork start method needed")
+def test_worker_does_not_free_the_ring() -> None:
+    """A worker closing its ring only detaches from it, the creating process keeps and frees the memory."""
+    ring = FrameRing(3, FRAME_SHAPE, dtype=np.uint16)
+    name = ring._frames_memory.name
+    producer = multiprocessing.get_context("fork").Process(target=_produce, args=(ring,))
+    producer.start()
+    received = []
+    while (published := ring.receive(timeout=TIMEOUT_S)) is not None:
+        slot, frame_index = published
+        np.testing.assert_array_equal(ring.view(slot), np.full(FRAME_SHAPE, frame_index))
+        received.append(frame_index)
+        ring.release(slot)
+    producer.join(timeout=TIMEOUT_S)
+    assert producer.exitcode == 0
+    assert received == list(range(N_FRAMES))
+
+    # The blocks survive the worker, and are unlinked by their owner
+    SharedMemory(name=name).close()
+    ring.close()
+    ring.close()
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=name)
+
+
+def test_invalid_rings() -> None:
+    """A ring needs slots and readers."""
+    with pytest.raises(ValueError, match="slot"):
+        FrameRing(0, FRAME_SHAPE)
+    with pytest.raises(ValueError, match="reader"):
+        FrameRing(1, FRAME_SHAPE, n_readers=0)
@@ -0,0 +1,118 @@
+"""Rotation stacks between the frames of a sequence."""
+
+import numpy as np
+import pytest
+
+from space_based_telescope_image_generator.processings.frames import (
+    FRAMES,
+    FrameStack,
+    axis_rotation,
+    ecef_to_eci,
+    eci_to_ecef,
+    lvlh_rotation,
+    perifocal_rotation,
+)
+from space_based_telescope_image_generator.processings.quaternions import quaternion_to_matrix
+from space_based_telescope_image_generator.utils.constants import EARTH_ROTATION_RATE
+
+N_FRAMES = 16
+RADIUS_KM = 7000.0
+TOLERANCE = 1e-12
+
+
+def _sequence() -> FrameStack:
+    """Draw the chief states and camera pointing of a sequence."""
+    rng = np.random.default_rng(0)
+    positions = RADIUS_KM * rng.normal(size=(N_FRAMES, 3))
+    velocities = rng.normal(size=(N_FRAMES, 3))
+    boresight = rng.normal(size=(N_FRAMES, 3))
+    boresight /= np.linalg.norm(boresight, axis=-1, keepdims=True)
+    sky = np.cross(boresight, rng.normal(size=(N_FRAMES, 3)))
+    sky /= np.linalg.norm(sky, axis=-1, keepdims=True)
+    return FrameStack(np.linspace(0.0, 600.0, N_FRAMES), positions, velocities, boresight, sky)
+
+
+@pytest.mark.parametrize(("axis", "vector", "expected"), [(0, 1, 2), (1, 2, 0), (2, 0, 1)])
+def test_axis_rotations_are_right_handed(axis: int, vector: int, expected: int) -> None:
+    """A quarter turn about an axis brings the next axis onto the following one."""
+    np.testing.assert_allclose(axis_rotation(np.pi / 2, axis) @ np.eye(3)[vector], np.eye(3)[expected], atol=TOLERANCE)
+    assert axis_rotation(np.zeros((2, 5)), axis).shape == (2, 5, 3, 3)
+
+
+def test_unknown_axis_is_rejected() -> None:
+    """Only the x, y and z axes are allowed."""
+    with pytest.raises(ValueError, match="Wrong axis number"):
+        axis_rotation(0.0, 3)
+
+
+def test_perifocal_rotation() -> None:
+    """The perigee of an orbit lies at the argument of perigee from the node, in the inclined plane."""
+    raan, inclination, arg_perigee = 0.3, 1.0, 0.4
+    node = np.array([np.cos(raan), np.sin(raan), 0.0])
+    normal = np.array([np.sin(inclination) * np.sin(raan), -np.sin(inclination) * np.cos(raan), np.cos(inclination)])
+    rotation = perifocal_rotation(raan, inclination, arg_perigee)
+    perigee = rotation[:, 0]
+    np.testing.assert_allclose(rotation[:, 2], normal, atol=TOLERANCE)
+    assert np.dot(perigee, node) == pytest.approx(np.cos(arg_perigee))
+    assert np.dot(np.cross(node, perigee), normal) == pytest.approx(np.sin(arg_perigee))
+
+
+def test_lvlh_axes() -> None:
+    """The LVLH axes are radial, along-track and orbit normal."""
+    frames = _sequence()
+    rotation = lvlh_rotation(frames.chief_positions, frames.chief_velocities)
+    radial = frames.chief_positions / np.linalg.norm(frames.chief_positions, axis=-1, keepdims=True)
+    np.testing.assert_allclose(rotation[..., 0], radial, atol=TOLERANCE)
+    assert np.all(np.sum(rotation[..., 1] * frames.chief_velocities, axis=-1) > 0)
+    np.testing.assert_allclose(np.linalg.det(rotation), 1.0)
+
+
+def test_earth_fixed_states() -> None:
+    """A point fixed on the Earth has no ECEF velocity, and the conversions are inverse of each other."""
+    times = np.linspace(0.0, 3600.0, N_FRAMES)
+    ecef_positions = np.broadcast_to([RADIUS_KM, 0.0, 1000.0], (N_FRAMES, 3))
+    eci_positions, eci_velocities = ecef_to_eci(times, ecef_positions, np.zeros((N_FRAMES, 3)))
+    np.testing.assert_allclose(eci_positions[:, 2], ecef_positions[:, 2])
+    np.testing.assert_allclose(
+        eci_velocities, np.cross([0.0, 0.0, EARTH_ROTATION_RATE], eci_positions), atol=TOLERANCE
+    )
+    back_positions, back_velocities = eci_to_ecef(times, eci_positions, eci_velocities)
+    np.testing.assert_allclose(back_positions, ecef_positions, atol=1e-9)
+    np.testing.assert_allclose(back_velocities, 0.0, atol=TOLERANCE)
+    assert eci_to_ecef(times, eci_positions)[1] is None
+
+
+def test_rotations_compose() -> None:
+    """The rotations between two frames go through the ECI frame and are inverse of each other."""
+    frames = _sequence()
+    for from_frame in FRAMES:
+        for to_frame in FRAMES:
+            forward = frames.rotation(from_frame, to_frame)
+            round_trip = forward @ frames.rotation(to_frame, from_frame)
+            np.testing.assert_allclose(round_trip, np.broadcast_to(np.eye(3), round_trip.shape), atol=TOLERANCE)
+            through_eci = frames.rotation("eci", to_frame) @ frames.rotation(from_frame, "eci")
+            np.testing.assert_allclose(through_eci, np.broadcast_to(forward, through_eci.shape), atol=TOLERANCE)
+    assert frames.rotation("lvlh", "camera") is frames.rotation("lvlh", "camera")
+
+
+def test_conversions_and_quaternions() -> None:
+    """Vectors are converted with the rotation stacks, which have the same quaternions."""
+    frames = _sequence()
+    boresight = frames.convert(frames.boresight, "eci", "camera")
+    np.testing.assert_allclose(boresight, np.tile([0.0, 0.0, 1.0], (N_FRAMES, 1)), atol=TOLERANCE)
+    np.testing.assert_allclose(frames.convert(frames.sky, "eci", "camera")[:, 1], 1.0)
+    quaternions = frames.quaternions("ecef", "lvlh")
+    np.testing.assert_allclose(quaternion_to_matrix(quaternions), frames.rotation("ecef", "lvlh"), atol=TOLERANCE)
+
+
+def test_missing_inputs_are_reported() -> None:
+    """A frame needing unknown inputs, or an unknown frame, raises."""
+    frames = FrameStack(times=np.zeros(1))
+    with pytest.raises(ValueError, match="chief states"):
+        frames.rotation("lvlh", "eci")
+    with pytest.raises(ValueError, match="camera pointing"):
+        frames.rotation("eci", "camera")
+    with pytest.raises(ValueError, match="Unknown frame"):
+        frames.rotation("eci", "body")
+    with pytest.raises(ValueError, match="frame times"):
+        FrameStack().rotation("ecef", "eci")
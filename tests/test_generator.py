@@ -0,0 +1,90 @@
+"""Sampling of the generation jobs and resumption of their queue."""
+
+from pathlib import Path
+
+import pytest
+
+from space_based_telescope_image_generator.processings.generator import Distribution, JobQueue, SamplingSpec
+
+LINE1 = "1 06251U 62025E   06176.82412014  .00008885  00000-0  12808-3 0  3985"
+LINE2 = "2 06251  58.0579  54.0425 0030035 139.1568 221.1854 15.56387291  6774"
+N_JOBS = 5
+MAX_ATTEMPTS = 2
+FULL_TURN_DEG = 360.0
+
+
+def _spec(**fields: object) -> SamplingSpec:
+    """Build a sampling spec of cubesats around the 06251 orbit."""
+    return SamplingSpec.model_validate(
+        {
+            "n_jobs": N_JOBS,
+            "satellite_tle": [LINE1, LINE2],
+            "orbit_offsets": {"nu": {"kind": "normal", "std": 0.01}},
+            "target_options": {"PrimitiveCubesat": {"size": 0.0002}},
+            **fields,
+        }
+    )
+
+
+def test_jobs_only_depend_on_the_seed_and_their_index() -> None:
+    """A job is sampled the same way whatever the sampled jobs, with the options of its target class."""
+    spec = _spec()
+    jobs = [spec.sample_job(job_index) for job_index in range(N_JOBS)]
+    assert spec.sample_job(3) == jobs[3]
+    assert jobs[3] != jobs[2]
+    assert _spec(seed=1).sample_job(3) != jobs[3]
+    assert jobs[0].target_options == {"size": 0.0002}
+    assert all(0.0 <= angle < FULL_TURN_DEG for angle in jobs[0].initial_attitude_deg)
+
+
+def test_sampled_numbers_are_checked() -> None:
+    """Text cannot be sampled for a numerical parameter, nor an unknown target class."""
+    with pytest.raises(ValueError, match="Numerical value expected"):
+        _spec(fov_deg={"kind": "choice", "choices": [30.0, "wide"], "weights": [0.0, 1.0]}).sample_job(0)
+    with pytest.raises(ValueError, match="Unknown target class"):
+        _spec(target_class={"value": "Asteroid"}).sample_job(0)
+    with pytest.raises(ValueError, match="Unknown distribution"):
+        Distribution(kind="poisson")
+
+
+def test_queue_is_resumed(tmp_path: Path) -> None:
+    """Jobs left running by a stopped run are pending again, done jobs are kept and not submitted twice."""
+    path = tmp_path.joinpath("jobs.sqlite")
+    spec = _spec()
+    jobs = [spec.sample_job(job_index) for job_index in range(N_JOBS)]
+    queue = JobQueue(path)
+    assert queue.submit(jobs) == N_JOBS
+    first, second = queue.claim("worker"), queue.claim("worker")
+    assert first is not None and second is not None
+    assert (first.job_index, second.job_index) == (0, 1)
+    queue.complete(first.job_index, tmp_path, elapsed_s=3.0)
+    queue.close()  # The run stops with the second job running
+
+    queue = JobQueue(path)
+    assert queue.requeue_running() == 1
+    assert queue.submit(jobs) == 0
+    assert queue.counts() == {"pending": N_JOBS - 1, "running": 0, "done": 1, "failed": 0}
+    assert sorted(queue.pending_ids()) == list(range(1, N_JOBS))
+    assert queue.timings() == {0: 3.0}
+
+    # Longest predicted job first, then in index order
+    queue.set_predictions({3: 10.0, 2: 5.0})
+    claimed = [queue.claim("worker") for _ in range(N_JOBS)]
+    assert [job.job_index for job in claimed if job is not None] == [3, 2, 1, 4]
+    assert claimed[-1] is None
+    queue.close()
+
+
+def test_failed_jobs_are_retried(tmp_path: Path) -> None:
+    """A failing job is pending again until it was attempted max_attempts times."""
+    queue = JobQueue(tmp_path.joinpath("jobs.sqlite"))
+    queue.submit([_spec().sample_job(0)])
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        job = queue.claim("worker")
+        assert job is not None
+        queue.fail(job.job_index, f"attempt {attempt}", MAX_ATTEMPTS)
+    assert queue.counts()["failed"] == 1
+    assert queue.claim("worker") is None
+    # A failed job is not run again by a resumed run
+    assert queue.requeue_running() == 0
+    queue.close()
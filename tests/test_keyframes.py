@@ -0,0 +1,83 @@
+"""Keyframe spacing driven by the predicted image motion."""
+
+import numpy as np
+import pytest
+
+from space_based_telescope_image_generator.processings.keyframes import KeyframeScheduler
+from space_based_telescope_image_generator.processings.pointing import CameraPointing, compute_pointing
+
+N_FRAMES = 200
+CHUNK_SIZE = 7
+FOCAL_PX = 1000.0
+RANGE_KM = 1.0
+TARGET_RADIUS_KM = 0.005
+THRESHOLD_PX = 1.0
+SPIN_RAD_PER_FRAME = 0.01
+SAT_POSITION = np.array([7000.0, 0.0, 0.0])
+SAT_VELOCITY = np.array([0.0, 7.5, 0.0])
+
+
+def _spinning_target(n_frames: int = N_FRAMES) -> tuple[np.ndarray, np.ndarray, CameraPointing, np.ndarray]:
+    """Build a still scene where only the target spins about its z axis, at a constant rate."""
+    sat_positions = np.tile(SAT_POSITION, (n_frames, 1))
+    target_positions = sat_positions + np.array([0.0, RANGE_KM, 0.0])
+    pointing = compute_pointing(sat_positions, np.tile(SAT_VELOCITY, (n_frames, 1)), target_positions)
+    half_angles = 0.5 * SPIN_RAD_PER_FRAME * np.arange(n_frames)
+    zeros = np.zeros(n_frames)
+    quaternions = np.stack([np.cos(half_angles), zeros, zeros, np.sin(half_angles)], axis=-1)
+    return sat_positions, target_positions, pointing, quaternions
+
+
+def _expected_spacing() -> int:
+    """Frames between two keyframes: the outline moves by 2 sin(angle / 2) target radii."""
+    radius_px = FOCAL_PX * TARGET_RADIUS_KM / RANGE_KM
+    return int(2 * np.arcsin(THRESHOLD_PX / (2 * radius_px)) / SPIN_RAD_PER_FRAME) + 1
+
+
+def test_keyframes_follow_the_motion_threshold() -> None:
+    """A constant spin gives evenly spaced keyframes, the first frame being one."""
+    scheduler = KeyframeScheduler(THRESHOLD_PX, TARGET_RADIUS_KM)
+    keyframes = scheduler.select(*_spinning_target(), FOCAL_PX)
+    assert keyframes[0]
+    np.testing.assert_array_equal(np.diff(np.flatnonzero(keyframes)), _expected_spacing())
+
+
+def test_chunks_give_the_same_keyframes() -> None:
+    """The last keyframe is carried over from a chunk to the next one, until the scheduler is reset."""
+    sat_positions, target_positions, pointing, quaternions = _spinning_target()
+    scheduler = KeyframeScheduler(THRESHOLD_PX, TARGET_RADIUS_KM)
+    whole = scheduler.select(sat_positions, target_positions, pointing, quaternions, FOCAL_PX)
+
+    scheduler.reset()
+    chunks = []
+    for start in range(0, N_FRAMES, CHUNK_SIZE):
+        chunk = slice(start, start + CHUNK_SIZE)
+        chunk_pointing = compute_pointing(
+            sat_positions[chunk], np.tile(SAT_VELOCITY, (len(sat_positions[chunk]), 1)), target_positions[chunk]
+        )
+        selected = scheduler.select(
+            sat_positions[chunk], target_positions[chunk], chunk_pointing, quaternions[chunk], FOCAL_PX
+        )
+        chunks.append(selected)
+    np.testing.assert_array_equal(np.concatenate(chunks), whole)
+
+
+def test_max_hold_frames() -> None:
+    """Still scenes are rendered once, or every max_hold_frames frames."""
+    sat_positions, target_positions, pointing, quaternions = _spinning_target()
+    still = np.broadcast_to(quaternions[:1], quaternions.shape)
+    scheduler = KeyframeScheduler(THRESHOLD_PX, TARGET_RADIUS_KM)
+    assert np.flatnonzero(scheduler.select(sat_positions, target_positions, pointing, still, FOCAL_PX)).tolist() == [0]
+
+    max_hold = 5
+    scheduler = KeyframeScheduler(THRESHOLD_PX, TARGET_RADIUS_KM, max_hold_frames=max_hold)
+    keyframes = scheduler.select(sat_positions, target_positions, pointing, still, FOCAL_PX)
+    np.testing.assert_array_equal(np.diff(np.flatnonzero(keyframes)), max_hold + 1)
+
+
+def test_invalid_settings_are_rejected() -> None:
+    """The threshold must be positive and the interpolation known."""
+    with pytest.raises(ValueError, match="positive"):
+        KeyframeScheduler(0.0)
+    with pytest.raises(ValueError, match="Unknown interpolation"):
+        KeyframeScheduler(interpolation="morph")
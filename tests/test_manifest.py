@@ -0,0 +1,87 @@
+"""Resumption of an interrupted render from the manifest of its files."""
+
+from pathlib import Path
+
+import numpy as np
+
+from space_based_telescope_image_generator.processings.manifest import (
+    MANIFEST_FILE_NAME,
+    ManifestEntry,
+    RenderManifest,
+    state_fingerprint,
+)
+from space_based_telescope_image_generator.processings.propagation import KeplerianModel
+
+SETTINGS = {"framerate": 10, "duration_s": 2.5, "orbit": {"a": 7000.0}}
+N_FRAMES = 3
+
+
+def _write_frames(folder: Path, manifest: RenderManifest, n_frames: int) -> list[Path]:
+    """Write and record frames."""
+    paths = []
+    for frame_index in range(n_frames):
+        path = folder.joinpath(f"image_{frame_index}.png")
+        path.write_bytes(bytes([frame_index]) * (frame_index + 1))
+        manifest.record(path, frame_index=frame_index, traced=frame_index % 2 == 0)
+        paths.append(path)
+    return paths
+
+
+def test_recorded_files_are_resumed(tmp_path: Path) -> None:
+    """Files recorded with the same settings and left unchanged are complete for the next render."""
+    paths = _write_frames(tmp_path, RenderManifest(tmp_path, SETTINGS), N_FRAMES)
+    paths[1].write_bytes(b"\x09\x09")  # Same size, other content
+
+    manifest = RenderManifest(tmp_path, SETTINGS)
+    assert [manifest.is_complete(path) for path in paths] == [True, False, True]
+    assert manifest.entry(paths[2]) == ManifestEntry(
+        name="image_2.png", size=3, sha256=manifest.entries["image_2.png"].sha256, frame_index=2, traced=True
+    )
+    assert manifest.entry(tmp_path.joinpath("image_3.png")) is None
+    # The settings are read back from the manifest when they are not given
+    assert RenderManifest(tmp_path).settings == SETTINGS
+
+
+def test_interrupted_record_is_ignored(tmp_path: Path) -> None:
+    """A line cut by an interruption is skipped, the next records being still read back."""
+    paths = _write_frames(tmp_path, RenderManifest(tmp_path, SETTINGS), 2)
+    manifest_path = tmp_path.joinpath(MANIFEST_FILE_NAME)
+    manifest_path.write_text(manifest_path.read_text() + '{"name": "image_2.png", "si')
+
+    manifest = RenderManifest(tmp_path, SETTINGS)
+    assert list(manifest.entries) == ["image_0.png", "image_1.png"]
+    gif_path = tmp_path.joinpath("video.gif")
+    gif_path.write_bytes(b"GIF")
+    manifest.record(gif_path, frames=["a", "b"])
+    entry = RenderManifest(tmp_path, SETTINGS).entry(gif_path)
+    assert entry is not None and entry.frames == ["a", "b"] and entry.frame_index is None
+    assert all(path.exists() for path in paths)
+
+
+def test_manifest_is_restarted(tmp_path: Path) -> None:
+    """Other settings, or a reset, discard the recorded files."""
+    _write_frames(tmp_path, RenderManifest(tmp_path, SETTINGS), N_FRAMES)
+    assert not RenderManifest(tmp_path, {**SETTINGS, "framerate": 20}).entries
+    _write_frames(tmp_path, RenderManifest(tmp_path, SETTINGS), N_FRAMES)
+    assert len(RenderManifest(tmp_path, SETTINGS).entries) == N_FRAMES
+    assert not RenderManifest(tmp_path, SETTINGS, reset=True).entries
+    assert not RenderManifest(tmp_path, SETTINGS).entries
+
+
+def test_fingerprints_follow_the_state() -> None:
+    """Models in the same state share a fingerprint, whatever change of their state being detected."""
+    orbit = KeplerianModel(a=7000.0, e=0.001, i=98.0, Omega=0.0, omega=0.0, nu=0.0, epoch=1.15e9)
+    assert state_fingerprint(orbit) == state_fingerprint(orbit.model_copy())
+    assert state_fingerprint(orbit) != state_fingerprint(orbit.model_copy(update={"nu": 1.0}))
+
+    table = np.zeros((100, 4))
+    fingerprint = state_fingerprint({"table": table})
+    table[50, 0] = 1.0
+    assert state_fingerprint({"table": table}) != fingerprint
+
+    def _scaled(factor: float) -> object:
+        """Build a function whose state is its closure."""
+        return lambda x: factor * x
+
+    assert state_fingerprint(_scaled(2.0)) == state_fingerprint(_scaled(2.0))
+    assert state_fingerprint(_scaled(2.0)) != state_fingerprint(_scaled(3.0))
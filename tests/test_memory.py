@@ -0,0 +1,73 @@
+"""Memory admission of the renders of several processes."""
+
+import itertools
+import multiprocessing
+import sqlite3
+import time
+from pathlib import Path
+
+import pytest
+
+from space_based_telescope_image_generator.processings.memory import HostMemoryBudget, MemoryEstimator
+
+N_WORKERS = 3
+N_RENDERS = 4
+BUDGET_BYTES = 1000.0
+RENDER_BYTES = 600.0  # Two renders do not fit in the budget
+
+
+def _fake_renders(budget: HostMemoryBudget, log_folder: Path, worker: int) -> None:
+    """Run renders standing for POV-Ray runs, each one reserving most of the budget."""
+    for k in range(N_RENDERS):
+        with budget.reserve(RENDER_BYTES):
+            start = time.time()
+            time.sleep(0.02)
+            log_folder.joinpath(f"{worker}_{k}").write_text(f"{start} {time.time()}")
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="fork start method needed")
+def test_host_budget_is_shared_by_the_processes(tmp_path: Path) -> None:
+    """The renders of processes sharing a budget never run together when they do not fit in it."""
+    budget = HostMemoryBudget(BUDGET_BYTES, tmp_path.joinpath("budget.sqlite"), poll_s=0.005)
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_fake_renders, args=(budget, tmp_path, k)) for k in range(N_WORKERS)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60.0)
+    assert [worker.exitcode for worker in workers] == [0] * N_WORKERS
+
+    intervals = sorted(
+        tuple(map(float, path.read_text().split())) for path in tmp_path.iterdir() if path.suffix != ".sqlite"
+    )
+    assert len(intervals) == N_WORKERS * N_RENDERS
+    for (_, previous_stop), (next_start, _) in itertools.pairwise(intervals):
+        assert previous_stop <= next_start
+    assert budget.reserved_bytes() == 0.0
+
+
+def test_reservations_of_dead_processes_are_dropped(tmp_path: Path) -> None:
+    """A crashed worker does not keep its memory reserved."""
+    budget = HostMemoryBudget(BUDGET_BYTES, tmp_path.joinpath("budget.sqlite"), poll_s=0.005)
+    process = multiprocessing.get_context().Process(target=time.sleep, args=(0.0,))
+    process.start()
+    process.join()
+    with budget.reserve(0.0):
+        pass
+    connection = sqlite3.connect(budget.path)
+    connection.execute("INSERT INTO reservations (pid, nbytes) VALUES (?, ?)", (process.pid, BUDGET_BYTES))
+    connection.commit()
+    connection.close()
+
+    with budget.reserve(RENDER_BYTES):
+        assert budget.reserved_bytes() == RENDER_BYTES
+
+
+def test_learnt_peaks_are_merged(tmp_path: Path) -> None:
+    """Workers sharing a peaks file keep the measurements of each other."""
+    path = tmp_path.joinpath("memory_peaks.json")
+    first, second = MemoryEstimator(tmp_path, path), MemoryEstimator(tmp_path, path)
+    first.observe("a", 100.0)
+    second.observe("b", 200.0)
+    first.observe("a", 50.0)
+    assert MemoryEstimator(tmp_path, path).measured == {"a": 100.0, "b": 200.0}
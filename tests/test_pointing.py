@@ -0,0 +1,109 @@
+"""Camera pointing and roll laws of the Tracking Satellite."""
+
+import numpy as np
+import pytest
+
+from space_based_telescope_image_generator.objects.tracking_satellite import TrackingSatellite
+from space_based_telescope_image_generator.processings.pointing import (
+    InertialRollLaw,
+    LVLHRollLaw,
+    RollLaw,
+    SunConstrainedRollLaw,
+    compute_pointing,
+)
+from space_based_telescope_image_generator.processings.propagation import KeplerianModel
+
+RADIUS_KM = 7000.0
+SPEED_KM_S = 7.5
+RANGE_KM = 50.0
+N_FRAMES = 64
+TOLERANCE = 1e-12
+TLE = [
+    "1 06251U 62025E   06176.82412014  .00008885  00000-0  12808-3 0  3985",
+    "2 06251  58.0579  54.0425 0030035 139.1568 221.1854 15.56387291  6774",
+]
+
+
+def _random_geometry() -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Draw satellite states and target positions around them."""
+    rng = np.random.default_rng(0)
+    positions = rng.normal(size=(N_FRAMES, 3))
+    positions *= RADIUS_KM / np.linalg.norm(positions, axis=-1, keepdims=True)
+    velocities = np.cross(positions, rng.normal(size=(N_FRAMES, 3)))
+    velocities *= SPEED_KM_S / np.linalg.norm(velocities, axis=-1, keepdims=True)
+    return positions, velocities, positions + RANGE_KM * rng.normal(size=(N_FRAMES, 3))
+
+
+@pytest.mark.parametrize(
+    "roll_law",
+    [LVLHRollLaw(), LVLHRollLaw((0.0, 0.0, 1.0)), InertialRollLaw(), SunConstrainedRollLaw(np.array([1.0, 0, 0]))],
+    ids=type,
+)
+def test_sky_is_a_unit_vector_orthogonal_to_the_boresight(roll_law: RollLaw) -> None:
+    """The sky vector is the roll law reference projected orthogonally to the line of sight."""
+    positions, velocities, targets = _random_geometry()
+    pointing = compute_pointing(positions, velocities, targets, roll_law=roll_law)
+    assert len(pointing) == N_FRAMES
+    np.testing.assert_allclose(np.linalg.norm(pointing.sky, axis=-1), 1.0, atol=TOLERANCE)
+    np.testing.assert_allclose(np.sum(pointing.sky * pointing.boresight, axis=-1), 0.0, atol=TOLERANCE)
+    primary, _ = roll_law.reference_vectors(positions, velocities, None)
+    assert np.all(np.sum(pointing.sky * primary, axis=-1) > 0)
+    # The camera frame is a rotation with the boresight and the sky as axes
+    rotation = pointing.rotation
+    identity = np.broadcast_to(np.eye(3), rotation.shape)
+    np.testing.assert_allclose(rotation @ np.swapaxes(rotation, -1, -2), identity, atol=TOLERANCE)
+
+
+def test_zenith_is_up_when_looking_along_track() -> None:
+    """Looking at a target ahead on the orbit, the sky is the radial direction."""
+    position, velocity = np.array([RADIUS_KM, 0.0, 0.0]), np.array([0.0, SPEED_KM_S, 0.0])
+    pointing = compute_pointing(position, velocity, position + np.array([0.0, RANGE_KM, 0.0]))
+    np.testing.assert_allclose(pointing.sky[0], [1.0, 0.0, 0.0], atol=TOLERANCE)
+
+
+def test_nadir_target_falls_back_on_the_orbit_normal() -> None:
+    """A target below the satellite makes the zenith degenerate, the orbit normal is kept upwards instead."""
+    position, velocity = np.array([RADIUS_KM, 0.0, 0.0]), np.array([0.0, SPEED_KM_S, 0.0])
+    pointing = compute_pointing(position, velocity, position - np.array([RANGE_KM, 0.0, 0.0]))
+    np.testing.assert_allclose(pointing.sky[0], [0.0, 0.0, 1.0], atol=TOLERANCE)
+
+
+def test_time_varying_sun_needs_the_frame_times() -> None:
+    """A Sun direction given as a function of time is evaluated at the frame times."""
+    positions, velocities, targets = _random_geometry()
+    roll_law = SunConstrainedRollLaw(lambda times: np.stack([np.cos(times), np.sin(times), 0 * times], axis=-1))
+    with pytest.raises(ValueError, match="Frame times"):
+        compute_pointing(positions, velocities, targets, roll_law=roll_law)
+    times = np.linspace(0.0, 1.0, N_FRAMES)
+    pointing = compute_pointing(positions, velocities, targets, roll_law=roll_law, times=times)
+    sun = roll_law.reference_vectors(positions, velocities, times)[0]
+    assert np.all(np.sum(pointing.sky * sun, axis=-1) > 0)
+
+
+def test_line_of_sight_rate() -> None:
+    """A target passing at the closest range moves at speed / range rad/s, with or without its velocity."""
+    dt_s = 0.01
+    times = np.arange(-1, 2) * dt_s
+    sat_positions = np.zeros((len(times), 3))
+    sat_velocities = np.zeros((len(times), 3))
+    target_positions = np.stack([SPEED_KM_S * times, np.full_like(times, RANGE_KM), 0 * times], axis=-1)
+    target_velocities = np.broadcast_to([SPEED_KM_S, 0.0, 0.0], target_positions.shape)
+    expected = np.degrees(SPEED_KM_S / RANGE_KM)
+    # The satellite stands at the origin, where the LVLH frame is undefined
+    roll_law = InertialRollLaw()
+    exact = compute_pointing(sat_positions, sat_velocities, target_positions, target_velocities, roll_law=roll_law)
+    assert exact.los_rate_deg_s[1] == pytest.approx(expected, rel=TOLERANCE)
+    differences = compute_pointing(sat_positions, sat_velocities, target_positions, roll_law=roll_law, dt_s=dt_s)
+    assert differences.los_rate_deg_s[1] == pytest.approx(expected, rel=1e-6)
+
+
+def test_tracking_satellite_points_with_its_roll_law() -> None:
+    """The camera of the satellite gets the sky vector of its roll law."""
+    satellite = TrackingSatellite(KeplerianModel.from_tle(TLE), roll_law=InertialRollLaw())
+    target = (np.array(satellite.position) + np.array([RANGE_KM, 0.0, 0.0])).tolist()
+    assert satellite.target_pointing(target) == target
+    expected = compute_pointing(
+        np.array(satellite.position), np.array(satellite.velocity), np.array(target), roll_law=InertialRollLaw()
+    )
+    np.testing.assert_allclose(satellite.sky, expected.sky[0])
+    assert "sky" in str(satellite.get_camera())
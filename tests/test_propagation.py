@@ -0,0 +1,72 @@
+"""Streaming of the orbit propagations by chunks."""
+
+import numpy as np
+import pytest
+
+from space_based_telescope_image_generator.processings.propagation import KeplerianModel, OrbitalDynamicModel
+from space_based_telescope_image_generator.processings.relative_motion import ClohessyWiltshireModel
+from space_based_telescope_image_generator.processings.sgp4 import SGP4Model
+
+TLE = [
+    "1 06251U 62025E   06176.82412014  .00008885  00000-0  12808-3 0  3985",
+    "2 06251  58.0579  54.0425 0030035 139.1568 221.1854 15.56387291  6774",
+]
+DURATION_S = 1000.5
+DT_S = 0.5
+CHUNK_SIZE = 7
+N_STEPS = int(DURATION_S / DT_S)
+
+
+def _concatenate(chunks: list[tuple[np.ndarray, np.ndarray]]) -> tuple[np.ndarray, np.ndarray]:
+    """Stack the positions and velocities of the chunks of a propagation."""
+    return np.concatenate([pos for pos, _ in chunks]), np.concatenate([vel for _, vel in chunks])
+
+
+@pytest.mark.parametrize("model", [KeplerianModel.from_tle(TLE), SGP4Model.from_tle(TLE)], ids=type)
+def test_chunks_do_not_change_the_states(model: KeplerianModel | SGP4Model) -> None:
+    """Small chunks hold the same states as the whole propagation, the integrator state being carried over."""
+    chunks = list(model.propagate_chunks(DURATION_S, DT_S, chunk_size=CHUNK_SIZE))
+    assert all(len(pos) == len(vel) == CHUNK_SIZE for pos, vel in chunks[:-1])
+    assert 0 < len(chunks[-1][0]) <= CHUNK_SIZE
+
+    positions, velocities = _concatenate(chunks)
+    expected_positions, expected_velocities = model.propagate(DURATION_S, DT_S)
+    assert len(positions) == int(DURATION_S / DT_S)
+    np.testing.assert_array_equal(positions, expected_positions)
+    np.testing.assert_array_equal(velocities, expected_velocities)
+
+
+def test_sgp4_chunks_match_the_epoch_offsets() -> None:
+    """The chunk states are the SGP4 states one step apart after the epoch."""
+    model = SGP4Model.from_tle(TLE)
+    positions, velocities = _concatenate(list(model.propagate_chunks(DURATION_S, DT_S, chunk_size=CHUNK_SIZE)))
+    tsince_min = np.arange(1, len(positions) + 1) * DT_S / 60.0
+    expected_positions, expected_velocities, errors = model.propagate_tsince(tsince_min)
+    assert not errors.any()
+    np.testing.assert_array_equal(positions, expected_positions[0])
+    np.testing.assert_array_equal(velocities, expected_velocities[0])
+
+
+@pytest.mark.parametrize(
+    "model",
+    [
+        KeplerianModel.from_tle(TLE),
+        SGP4Model.from_tle(TLE),
+        ClohessyWiltshireModel(KeplerianModel.from_tle(TLE), (0.1, -2.0, 0.3), (0.001, 0.0, -0.002)),
+    ],
+    ids=type,
+)
+@pytest.mark.parametrize("start_step", [0, 5, 300, N_STEPS - 1, N_STEPS + 3])
+def test_chunks_start_at_a_step(model: OrbitalDynamicModel, start_step: int) -> None:
+    """Starting at a step gives the states of the whole propagation from that step on."""
+    expected_positions, expected_velocities = _concatenate(
+        list(model.propagate_chunks(DURATION_S, DT_S, chunk_size=CHUNK_SIZE))
+    )
+    chunks = list(model.propagate_chunks(DURATION_S, DT_S, CHUNK_SIZE, start_step))
+    if start_step >= N_STEPS:
+        assert not chunks
+        return
+    assert all(len(pos) <= CHUNK_SIZE for pos, _ in chunks)
+    positions, velocities = _concatenate(chunks)
+    np.testing.assert_array_equal(positions, expected_positions[start_step:])
+    np.testing.assert_array_equal(velocities, expected_velocities[start_step:])
@@ -0,0 +1,86 @@
+"""Quaternion algebra of the attitude propagation."""
+
+import numpy as np
+
+from space_based_telescope_image_generator.processings.attitude import AttitudeDynamicModel, ConstantSlewAttitudeModel
+from space_based_telescope_image_generator.processings.quaternions import (
+    euler_to_quaternion,
+    matrix_to_quaternion,
+    quaternion_cumulative_product,
+    quaternion_multiply,
+    quaternion_normalize,
+    quaternion_to_euler,
+    quaternion_to_matrix,
+)
+
+N_QUATERNIONS = 37  # Not a power of two, so that the last scan step is partial
+DURATION_S = 1000.0
+DT_S = 0.7
+TOLERANCE = 1e-12
+FULL_TURN_DEG = 360.0
+
+
+def _random_quaternions(*shape: int) -> np.ndarray:
+    """Draw unit quaternions uniformly."""
+    return quaternion_normalize(np.random.default_rng(0).normal(size=(*shape, 4)))
+
+
+def _same_rotation(p: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """Distance between the rotations of unit quaternions, q and -q being the same rotation."""
+    return 1 - np.abs(np.sum(p * q, axis=-1))
+
+
+def _axis_rotation(axis: int, angle_deg: float) -> np.ndarray:
+    """Rotation matrix about a coordinate axis."""
+    c, s = np.cos(np.radians(angle_deg)), np.sin(np.radians(angle_deg))
+    i, j = (axis + 1) % 3, (axis + 2) % 3
+    rotation = np.eye(3)
+    rotation[i, i], rotation[i, j], rotation[j, i], rotation[j, j] = c, -s, s, c
+    return rotation
+
+
+def test_prefix_product_matches_the_sequential_product() -> None:
+    """The parallel scan gives q0, q0*q1, q0*q1*q2, ... along any axis."""
+    q = _random_quaternions(2, N_QUATERNIONS)
+    expected = q.copy()
+    for k in range(1, N_QUATERNIONS):
+        expected[:, k] = quaternion_multiply(expected[:, k - 1], q[:, k])
+    np.testing.assert_allclose(quaternion_cumulative_product(q), expected, atol=TOLERANCE)
+    np.testing.assert_allclose(
+        quaternion_cumulative_product(np.swapaxes(q, 0, 1), axis=0), np.swapaxes(expected, 0, 1), atol=TOLERANCE
+    )
+
+
+def test_euler_angles_follow_povray_order() -> None:
+    """A POV-Ray `rotate <x, y, z>` triplet rotates about x first, then y, then z."""
+    angles = (30.0, -50.0, 120.0)
+    expected = _axis_rotation(2, angles[2]) @ _axis_rotation(1, angles[1]) @ _axis_rotation(0, angles[0])
+    np.testing.assert_allclose(quaternion_to_matrix(euler_to_quaternion(np.array(angles))), expected, atol=TOLERANCE)
+
+
+def test_euler_round_trip() -> None:
+    """Triplets read back from quaternions give the same rotations, gimbal lock included."""
+    q = _random_quaternions(N_QUATERNIONS)
+    angles = quaternion_to_euler(q)
+    assert np.all((angles >= 0) & (angles < FULL_TURN_DEG))
+    assert _same_rotation(euler_to_quaternion(angles), q).max() < TOLERANCE
+
+    gimbal_lock = euler_to_quaternion(np.array([[10.0, 90.0, 20.0], [10.0, -90.0, 20.0]]))
+    assert _same_rotation(euler_to_quaternion(quaternion_to_euler(gimbal_lock)), gimbal_lock).max() < TOLERANCE
+
+
+def test_matrix_round_trip() -> None:
+    """Rotation matrices are converted back into the same rotations, with a non-negative scalar part."""
+    q = _random_quaternions(N_QUATERNIONS)
+    back = matrix_to_quaternion(quaternion_to_matrix(q))
+    assert np.all(back[:, 0] >= 0)
+    assert _same_rotation(back, q).max() < TOLERANCE
+
+
+def test_integrated_body_rates_match_the_closed_form_slew() -> None:
+    """Accumulating constant body rates step by step gives the closed form constant slew."""
+    model = ConstantSlewAttitudeModel((10.0, 20.0, 30.0), 1.5)
+    closed_form = np.concatenate(list(model.propagate_quaternion_chunks(DURATION_S, DT_S)))
+    integrated = np.concatenate(list(AttitudeDynamicModel.propagate_quaternion_chunks(model, DURATION_S, DT_S)))
+    assert len(closed_form) == int(DURATION_S / DT_S)
+    assert _same_rotation(integrated, closed_form).max() < TOLERANCE
@@ -0,0 +1,118 @@
+"""Closed form relative motions against the integration of the two-body problem."""
+
+import numpy as np
+import pytest
+
+from space_based_telescope_image_generator.processings.propagation import OrbitalDynamicModel
+from space_based_telescope_image_generator.processings.relative_motion import (
+    MU_KM,
+    ClohessyWiltshireModel,
+    RelativeMotionModel,
+    YamanakaAnkersenModel,
+    inertial_to_lvlh,
+    lvlh_to_inertial,
+)
+
+PERIGEE_KM = 7000.0
+INCLINATION_RAD = 0.5
+TRUE_ANOMALY_RAD = 0.5  # Chief epoch away from the perigee
+RELATIVE_POSITION_KM = (0.1, -0.2, 0.05)
+RELATIVE_VELOCITY_KM_S = (1e-4, -2e-4, 1e-4)
+DURATION_S = 6000.0
+DT_S = 60.0
+RK4_STEP_S = 1.0
+LINEARISATION_ERROR_KM = 1e-3  # [km] Second order terms, |rho|^2 / r for about 1 km of separation
+
+
+def _two_body(state: np.ndarray, times: np.ndarray) -> np.ndarray:
+    """Integrate two-body states with a fixed step RK4, returning the states at the given times."""
+
+    def derivative(y: np.ndarray) -> np.ndarray:
+        radius = np.linalg.norm(y[..., :3], axis=-1, keepdims=True)
+        return np.concatenate([y[..., 3:], -MU_KM * y[..., :3] / radius**3], axis=-1)
+
+    states = []
+    sub_steps = round(DT_S / RK4_STEP_S)
+    for _ in times:
+        for _ in range(sub_steps):
+            k1 = derivative(state)
+            k2 = derivative(state + RK4_STEP_S / 2 * k1)
+            k3 = derivative(state + RK4_STEP_S / 2 * k2)
+            k4 = derivative(state + RK4_STEP_S * k3)
+            state = state + RK4_STEP_S / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+        states.append(state)
+    return np.stack(states, axis=-2)
+
+
+class _TwoBodyChief(OrbitalDynamicModel):
+    """Chief on a Keplerian orbit, propagated by numerical integration."""
+
+    def __init__(self, eccentricity: float) -> None:
+        """Put the chief on an inclined orbit of the given eccentricity, past its perigee."""
+        semi_latus_rectum = PERIGEE_KM * (1 + eccentricity)
+        f = TRUE_ANOMALY_RAD
+        radius = semi_latus_rectum / (1 + eccentricity * np.cos(f))
+        position = radius * np.array([np.cos(f), np.sin(f), 0.0])
+        velocity = np.sqrt(MU_KM / semi_latus_rectum) * np.array([-np.sin(f), eccentricity + np.cos(f), 0.0])
+        c, s = np.cos(INCLINATION_RAD), np.sin(INCLINATION_RAD)
+        rotation = np.array([[1.0, 0.0, 0.0], [0.0, c, -s], [0.0, s, c]])
+        self.state = np.concatenate([rotation @ position, rotation @ velocity])
+        self.epoch = 0.0
+
+    def keplerian2cartesian(self) -> tuple[tuple[float, float, float], tuple[float, float, float]]:
+        """State at epoch."""
+        return tuple(self.state[:3].tolist()), tuple(self.state[3:].tolist())  # type: ignore[return-value]
+
+    def propagate(
+        self, propagation_time: float, dt_s: float
+    ) -> tuple[list[tuple[float, float, float]], list[tuple[float, float, float]]]:
+        """Integrate the chief orbit."""
+        states = _two_body(self.state, np.arange(1, int(propagation_time / dt_s) + 1) * dt_s)
+        return [tuple(s) for s in states[:, :3].tolist()], [tuple(s) for s in states[:, 3:].tolist()]  # type: ignore[misc]
+
+
+@pytest.mark.parametrize(
+    ("model_class", "eccentricity"),
+    [
+        (ClohessyWiltshireModel, 0.0),
+        (YamanakaAnkersenModel, 0.0),
+        (YamanakaAnkersenModel, 0.1),
+        (YamanakaAnkersenModel, 0.5),
+    ],
+)
+def test_relative_motion_matches_two_body(model_class: type[RelativeMotionModel], eccentricity: float) -> None:
+    """The relative states follow the difference of the integrated chief and target orbits."""
+    chief = _TwoBodyChief(eccentricity)
+    model = model_class(chief, RELATIVE_POSITION_KM, RELATIVE_VELOCITY_KM_S)
+    times = np.arange(1, int(DURATION_S / DT_S) + 1) * DT_S
+    target_state = np.concatenate([np.asarray(state) for state in model.keplerian2cartesian()])
+    states = _two_body(np.stack([chief.state, target_state]), times)
+
+    expected, _ = inertial_to_lvlh(states[0, :, :3], states[0, :, 3:], states[1, :, :3], states[1, :, 3:])
+    relative_positions, _ = model.propagate_relative(times)
+    np.testing.assert_allclose(relative_positions, expected, atol=LINEARISATION_ERROR_KM)
+
+    positions = np.concatenate([pos for pos, _ in model.propagate_chunks(DURATION_S, DT_S, chunk_size=7)])
+    np.testing.assert_allclose(positions, states[1, :, :3], atol=LINEARISATION_ERROR_KM)
+
+
+def test_clohessy_wiltshire_needs_a_circular_chief() -> None:
+    """On an eccentric chief, the Clohessy-Wiltshire motion drifts away from the two-body one."""
+    chief = _TwoBodyChief(0.1)
+    model = ClohessyWiltshireModel(chief, RELATIVE_POSITION_KM, RELATIVE_VELOCITY_KM_S)
+    times = np.arange(1, int(DURATION_S / DT_S) + 1) * DT_S
+    target_state = np.concatenate([np.asarray(state) for state in model.keplerian2cartesian()])
+    states = _two_body(np.stack([chief.state, target_state]), times)
+    expected, _ = inertial_to_lvlh(states[0, :, :3], states[0, :, 3:], states[1, :, :3], states[1, :, 3:])
+    assert np.abs(model.propagate_relative(times)[0] - expected).max() > 100 * LINEARISATION_ERROR_KM
+
+
+def test_lvlh_round_trip() -> None:
+    """The LVLH conversion of inertial states is inverted by lvlh_to_inertial."""
+    chief = _TwoBodyChief(0.1)
+    rng = np.random.default_rng(0)
+    position, velocity = chief.state[:3] + rng.normal(size=3), chief.state[3:] + 1e-3 * rng.normal(size=3)
+    relative = inertial_to_lvlh(chief.state[:3], chief.state[3:], position, velocity)
+    back = lvlh_to_inertial(chief.state[:3], chief.state[3:], *relative)
+    np.testing.assert_allclose(back[0], position, rtol=1e-12)
+    np.testing.assert_allclose(back[1], velocity, rtol=1e-12)
@@ -0,0 +1,65 @@
+"""In-memory renders, the POV-Ray run being replaced by a fixed image."""
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from space_based_telescope_image_generator.processings.scene_manager import SceneManager
+from space_based_telescope_image_generator.processings.sensor import SensorModel, apply_sensor
+
+HEIGHT, WIDTH = 12, 16
+MAX_16_BITS = 65535
+
+
+def _scene_manager(image: np.ndarray | None, sensor: SensorModel | None = None) -> SceneManager:
+    """Build a scene manager whose POV-Ray runs return an image, without any scene."""
+    scene_manager = SceneManager.__new__(SceneManager)
+    scene_manager.satellite = SimpleNamespace(sensor=sensor, image_width=WIDTH, image_height=HEIGHT)
+    scene_manager._run_povray = lambda output_file, objects, quality: None if output_file else image
+    return scene_manager
+
+
+def test_16_bits_are_rounded_to_8_bits() -> None:
+    """16 bits channels are rescaled to 8 bits with rounding, 8 bits images being kept."""
+    image = np.array([[[0, 128, 129], [32767, 32768, MAX_16_BITS]]], dtype=np.uint16)
+    np.testing.assert_array_equal(SceneManager.to_rgb8(image), [[[0, 0, 1], [127, 128, 255]]])
+    assert SceneManager.to_rgb8(image).dtype == np.uint8
+    levels = np.arange(256, dtype=np.uint8)
+    np.testing.assert_array_equal(SceneManager.to_rgb8(levels.astype(np.uint16) * 257), levels)
+    assert SceneManager.to_rgb8(levels) is levels
+
+
+def test_render_in_memory(tmp_path: Path) -> None:
+    """The image is returned, written into the given array and optionally saved."""
+    image = np.random.default_rng(0).integers(0, MAX_16_BITS + 1, (HEIGHT, WIDTH, 3), dtype=np.uint16)
+    scene_manager = _scene_manager(image)
+    expected = SceneManager.to_rgb8(image)
+    np.testing.assert_array_equal(scene_manager.render_image_array(), expected)
+
+    out = np.zeros((2, HEIGHT, WIDTH, 3), dtype=np.uint8)
+    sink = tmp_path.joinpath("images", "0.png")
+    assert np.shares_memory(scene_manager.render_image_array(sink, out=out[1]), out)
+    np.testing.assert_array_equal(out, [np.zeros_like(expected), expected])
+    np.testing.assert_array_equal(np.asarray(Image.open(sink)), expected)
+
+    with pytest.raises(ValueError, match="folder"):
+        scene_manager.render_image_array(tmp_path)
+
+
+def test_sensor_is_applied_in_memory() -> None:
+    """The sensor image of the render is the first frame of the sensor pipeline."""
+    image = np.random.default_rng(1).integers(0, 256, (HEIGHT, WIDTH, 3), dtype=np.uint8)
+    sensor = SensorModel(fov_deg=10.0)
+    scene_manager = _scene_manager(image, sensor)
+    np.testing.assert_array_equal(scene_manager.render_image_array(apply_sensor=False), image)
+    digital = scene_manager.render_image_array(apply_sensor=True)
+    np.testing.assert_array_equal(digital, apply_sensor(sensor, image[None], np.zeros(1, dtype=int))[0])
+
+
+def test_missing_image_is_an_error() -> None:
+    """A POV-Ray run without an image is reported."""
+    with pytest.raises(ValueError, match="did not return the image"):
+        _scene_manager(None).render_image_array()
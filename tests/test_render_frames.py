@@ -0,0 +1,91 @@
+"""Frame range renders, the POV-Ray run being replaced by an image of the scene state."""
+
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from space_based_telescope_image_generator.objects.targets.primitive_cubesat import PrimitiveCubesat
+from space_based_telescope_image_generator.objects.tracking_satellite import TrackingSatellite
+from space_based_telescope_image_generator.processings import scene_manager as scene_manager_module
+from space_based_telescope_image_generator.processings.attitude import ConstantSlewAttitudeModel
+from space_based_telescope_image_generator.processings.keyframes import KeyframeScheduler
+from space_based_telescope_image_generator.processings.propagation import KeplerianModel
+from space_based_telescope_image_generator.processings.relative_motion import ClohessyWiltshireModel
+from space_based_telescope_image_generator.processings.scene_manager import SceneManager
+from space_based_telescope_image_generator.processings.sensor import SensorModel
+
+TLE = [
+    "1 06251U 62025E   06176.82412014  .00008885  00000-0  12808-3 0  3985",
+    "2 06251  58.0579  54.0425 0030035 139.1568 221.1854 15.56387291  6774",
+]
+HEIGHT, WIDTH = 12, 16
+FRAMERATE = 4
+DURATION_S = 5.0
+N_FRAMES = 20
+RANGES = [(0, 7), (7, 14), (14, N_FRAMES)]
+
+
+def _scene_image(scene_manager: SceneManager) -> np.ndarray:
+    """Build an image standing for the render of the current state of the scene."""
+    state = (scene_manager.satellite.position, scene_manager.satellite.sky, scene_manager.target.position)
+    digest = np.frombuffer(hashlib.sha256(repr(state).encode()).digest(), dtype=np.uint8)
+    return np.resize(digest, (HEIGHT, WIDTH, 3))
+
+
+@pytest.fixture
+def scene_manager(monkeypatch: pytest.MonkeyPatch) -> SceneManager:
+    """Build a scene of a cubesat drifting away from the camera satellite, without any POV-Ray run."""
+    monkeypatch.setattr(scene_manager_module, "verify_home_folder", lambda: None)
+    monkeypatch.setattr(scene_manager_module, "check_resolutions", lambda: None)
+    orbit = KeplerianModel.from_tle(TLE)
+    target = PrimitiveCubesat(
+        ClohessyWiltshireModel(orbit, (0.05, -0.5, 0.02), (0.0, 0.001, 0.0)), ConstantSlewAttitudeModel((0, 0, 0), 10)
+    )
+    satellite = TrackingSatellite(orbit, fov=5.0, image_width=WIDTH, image_height=HEIGHT, sensor=SensorModel())
+    manager = SceneManager(target, satellite, sun_direction_deg=30.0)
+
+    def render(path: Path, objects: list | None = None, quality: int | None = None) -> None:
+        """Write the image of the scene state."""
+        Image.fromarray(_scene_image(manager)).save(path)
+
+    monkeypatch.setattr(manager, "_render_scene", render)
+    return manager
+
+
+def test_views_start_at_a_frame(scene_manager: SceneManager) -> None:
+    """The poses of a sequence started at a frame are those of the whole sequence from that frame on."""
+    views = list(scene_manager.frame_views(FRAMERATE, DURATION_S))
+    assert len(views) == N_FRAMES
+    for start in (0, 9, N_FRAMES - 1):
+        for view, expected in zip(scene_manager.frame_views(FRAMERATE, DURATION_S, start), views[start:], strict=True):
+            assert view.time == expected.time
+            for name in ("sat_position", "look_at", "sky", "target_position", "target_quaternion"):
+                np.testing.assert_array_equal(getattr(view, name), getattr(expected, name))
+
+
+def test_ranges_make_the_whole_sequence(scene_manager: SceneManager, tmp_path: Path) -> None:
+    """Frames rendered by ranges, and their sensor images, are those of a single range."""
+    whole, split = tmp_path.joinpath("whole"), tmp_path.joinpath("split")
+    scene_manager.render_frames(FRAMERATE, DURATION_S, whole, 0, N_FRAMES)
+    rendered = []
+    for start, stop in reversed(RANGES):
+        rendered = scene_manager.render_frames(FRAMERATE, DURATION_S, split, start, stop) + rendered
+    assert [path.name for path in rendered] == [f"image_{k + 1}.png" for k in range(N_FRAMES)]
+    for folder in ("steps", "sensor"):
+        names = sorted(path.name for path in whole.joinpath(folder).iterdir())
+        assert len(names) == N_FRAMES
+        assert sorted(path.name for path in split.joinpath(folder).iterdir()) == names
+        for name in names:
+            assert whole.joinpath(folder, name).read_bytes() == split.joinpath(folder, name).read_bytes()
+
+
+def test_unsupported_options_are_rejected(scene_manager: SceneManager, tmp_path: Path) -> None:
+    """The options of a whole sequence render are not silently dropped."""
+    with pytest.raises(ValueError, match="without keyframe scheduler, annotations"):
+        scene_manager.render_frames(
+            FRAMERATE, DURATION_S, tmp_path, 0, 1, keyframe_scheduler=KeyframeScheduler(), annotate=True
+        )
+    assert not tmp_path.joinpath("steps").exists()
@@ -0,0 +1,107 @@
+"""Reprojection of rendered keyframes against frames traced at the same poses."""
+
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from space_based_telescope_image_generator.processings.frames import apply_inverse_rotation, apply_rotation
+from space_based_telescope_image_generator.processings.pointing import CameraModel, compute_pointing
+from space_based_telescope_image_generator.processings.quaternions import rotation_vector_to_quaternion
+from space_based_telescope_image_generator.processings.reprojection import FrameReprojector, Keyframe, ViewState
+
+CAMERA = CameraModel(40.0, 64, 48)
+TARGET_RADIUS_KM = 0.1
+SAT_POSITION = np.array([7000.0, 0.0, 0.0])
+SAT_VELOCITY = np.array([0.0, 7.5, 0.0])
+TARGET_OFFSET_KM = np.array([0.0, 1.0, 0.0])
+TARGET_DRIFT_KM_S = np.array([0.02, 0.0, 0.01])
+SPIN_DEG_S = 3.0
+BORDER_PX = 2  # Borders uncovered by the camera rotation, filled with the keyframe colours
+
+
+def _view(time: float, look_at: np.ndarray | None = None) -> ViewState:
+    """Poses of a drifting and spinning target, tracked by the camera unless the pointing is given."""
+    target = SAT_POSITION + TARGET_OFFSET_KM + time * TARGET_DRIFT_KM_S
+    look_at = target if look_at is None else look_at
+    sky = compute_pointing(SAT_POSITION, SAT_VELOCITY, look_at).sky[0]
+    quaternion = rotation_vector_to_quaternion(np.radians([0.0, 0.0, SPIN_DEG_S * time]))
+    return ViewState(time, SAT_POSITION, SAT_VELOCITY, look_at, sky, target, quaternion)
+
+
+def _trace(view: ViewState) -> tuple[np.ndarray, np.ndarray]:
+    """Ray trace a spherical target painted by its body coordinates over a smooth sky."""
+    rays = apply_rotation(view.camera_rotation, CAMERA.ray_directions)
+    image = 128 + 100 * np.sin(5 * rays[..., 2:] + 3 * rays[..., :1] + np.arange(3))
+    relative = view.target_position - view.sat_position
+    b = rays @ relative
+    discriminant = b**2 - (relative @ relative - TARGET_RADIUS_KM**2)
+    distance = b - np.sqrt(np.maximum(discriminant, 0.0))
+    body = apply_inverse_rotation(view.target_rotation, distance[..., None] * rays - relative)
+    target = discriminant > 0
+    image = np.where(target[..., None], 128 + 100 * body / TARGET_RADIUS_KM, image)
+    return np.clip(np.rint(image), 0, 255).astype(np.uint8), target
+
+
+def _keyframe(reprojector: FrameReprojector, view: ViewState, folder: Path) -> Keyframe:
+    """Trace a keyframe and its target mask, and load them."""
+    image, target = _trace(view)
+    image_path, mask_path = folder.joinpath(f"{view.time}.png"), folder.joinpath(f"{view.time}_mask.png")
+    Image.fromarray(image).save(image_path)
+    Image.fromarray(target.astype(np.uint8) * 255).save(mask_path)
+    return reprojector.keyframe(image_path, mask_path, view)
+
+
+def _neighbour_difference(image: np.ndarray) -> np.ndarray:
+    """Largest colour difference between each pixel and its 8 neighbours, the error of a one pixel shift."""
+    height, width = image.shape[:2]
+    padded = np.pad(image.astype(float), ((1, 1), (1, 1), (0, 0)), mode="edge")
+    difference = np.zeros((height, width))
+    for dy in range(3):
+        for dx in range(3):
+            shifted = padded[dy:dy + height, dx:dx + width]
+            difference = np.maximum(difference, np.abs(shifted - image).max(axis=-1))
+    return difference
+
+
+def test_keyframe_pose_gives_back_the_keyframe(tmp_path: Path) -> None:
+    """Reprojecting a keyframe at its own poses does not change it."""
+    reprojector = FrameReprojector(CAMERA, TARGET_RADIUS_KM)
+    keyframe = _keyframe(reprojector, _view(0.0), tmp_path)
+    np.testing.assert_array_equal(reprojector.interpolate(keyframe, None, _view(0.0), 0.0), keyframe.image)
+
+
+def test_intermediate_frame_is_within_one_pixel(tmp_path: Path) -> None:
+    """Each pixel of a frame reprojected between two keyframes is at most one pixel away from the traced one.
+
+    The silhouette of the target, whose pixels mix the target and the sky, is excluded.
+    """
+    reprojector = FrameReprojector(CAMERA, TARGET_RADIUS_KM)
+    previous, following = _keyframe(reprojector, _view(0.0), tmp_path), _keyframe(reprojector, _view(2.0), tmp_path)
+    expected, target = _trace(_view(1.0))
+    image = reprojector.interpolate(previous, following, _view(1.0), 0.5)
+    assert image is not None
+
+    error = np.abs(image.astype(float) - expected).max(axis=-1)
+    padded = np.pad(target, 1, mode="edge")
+    height, width = target.shape
+    silhouette = np.zeros_like(target)
+    for dy in range(3):
+        for dx in range(3):
+            silhouette |= padded[dy:dy + height, dx:dx + width] != target
+    inside = ~silhouette
+    inside[:BORDER_PX] = inside[-BORDER_PX:] = False
+    inside[:, :BORDER_PX] = inside[:, -BORDER_PX:] = False
+    # One grey level of rounding on top of the one pixel shift
+    assert np.all(error[inside] <= _neighbour_difference(expected)[inside] + 1)
+    assert error.mean() < 1.0
+
+
+def test_disocclusions_require_a_render(tmp_path: Path) -> None:
+    """A target moving away from a fixed pointing uncovers the sky it hid, which the previous keyframe lacks."""
+    look_at = SAT_POSITION + TARGET_OFFSET_KM
+    reprojector = FrameReprojector(CAMERA, TARGET_RADIUS_KM)
+    keyframe = _keyframe(reprojector, _view(0.0, look_at), tmp_path)
+    assert reprojector.interpolate(keyframe, None, _view(10.0, look_at), 1.0) is None
+    following = _keyframe(reprojector, _view(10.0, look_at), tmp_path)
+    assert reprojector.interpolate(keyframe, following, _view(5.0, look_at), 0.5) is not None
@@ -0,0 +1,72 @@
+"""Render windows of the catalog screener against a brute force search."""
+
+import numpy as np
+
+from space_based_telescope_image_generator.objects.tracking_satellite import TrackingSatellite
+from space_based_telescope_image_generator.processings.events import line_of_sight_clearance
+from space_based_telescope_image_generator.processings.screening import CatalogScreener
+from space_based_telescope_image_generator.processings.sgp4 import SGP4Model
+from space_based_telescope_image_generator.processings.tle_catalog import TLECatalog
+from space_based_telescope_image_generator.utils.constants import DAY_SECONDS, JD_UNIX_EPOCH
+
+LINE1 = "1 06251U 62025E   06176.82412014  .00008885  00000-0  12808-3 0  3985"
+LINE2 = "2 06251  58.0579  54.0425 0030035 139.1568 221.1854 15.56387291  6774"
+SENSOR_RANGE_KM = 200.0
+DURATION_S = 6000.0
+DT_S = 10.0
+# Node and mean anomaly offsets [deg]: co-orbital, crossing planes, out of range and other plane
+OFFSETS_DEG = [(0.0, 0.5), (3.0, 0.0), (-2.0, 1.0), (0.0, 20.0), (60.0, 0.0)]
+
+
+def _with_checksum(line: str) -> str:
+    """Replace the checksum of a TLE line by the right one."""
+    total = sum(int(char) if char.isdigit() else char == "-" for char in line[:68])
+    return f"{line[:68]}{total % 10}"
+
+
+def _neighbour(satnum: int, node_offset_deg: float, mean_anomaly_offset_deg: float) -> list[str]:
+    """TLE of an object on an orbit close to the observer one."""
+    node = float(LINE2[17:25]) + node_offset_deg
+    mean_anomaly = (float(LINE2[43:51]) + mean_anomaly_offset_deg) % 360
+    return [
+        _with_checksum(f"1 {satnum}{LINE1[7:]}"),
+        _with_checksum(f"2 {satnum}{LINE2[7:17]}{node:8.4f}{LINE2[25:43]}{mean_anomaly:8.4f}{LINE2[51:]}"),
+    ]
+
+
+def _visible_runs(visible: np.ndarray) -> list[tuple[int, int]]:
+    """First and last samples of the runs of visible samples."""
+    edges = np.diff(np.pad(visible, 1).astype(int))
+    return list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1) - 1, strict=True))
+
+
+def test_windows_match_brute_force() -> None:
+    """Every run of visible samples gives one window, with entry and exit refined within a step."""
+    lines = []
+    for k, (node_offset, mean_anomaly_offset) in enumerate(OFFSETS_DEG):
+        lines += _neighbour(90001 + k, node_offset, mean_anomaly_offset)
+    catalog = TLECatalog.from_lines(lines, strict=True)
+    screener = CatalogScreener(catalog, TrackingSatellite(SGP4Model.from_tle([LINE1, LINE2])), SENSOR_RANGE_KM)
+    windows = screener.screen(DURATION_S, DT_S)
+
+    # Brute force: every object at every fine step
+    times = screener._obs_t
+    observer = screener._obs_r[None]
+    positions, _, _ = SGP4Model.from_catalog(catalog).propagate_jd(JD_UNIX_EPOCH + times / DAY_SECONDS)
+    distance = np.linalg.norm(positions - observer, axis=-1)
+    visible = (distance <= SENSOR_RANGE_KM) & (line_of_sight_clearance(observer, positions) >= 0)
+
+    n_windows = 0
+    for k, satnum in enumerate(catalog.satnum):
+        found = sorted((window for window in windows if window.satnum == satnum), key=lambda window: window.start)
+        runs = _visible_runs(visible[k])
+        assert len(found) == len(runs), f"object {satnum}"
+        for window, (first, last) in zip(found, runs, strict=True):
+            assert times[first] - DT_S < window.start <= times[first]
+            assert times[last] <= window.end < times[last] + DT_S
+            assert window.start <= window.tca <= window.end
+            # Closest approach at least as close as the samples, up to the interpolation of the observer states
+            assert window.min_range_km <= distance[k, first : last + 1].min() + 1e-3
+        n_windows += len(runs)
+    assert n_windows == len(windows) > 0
+    assert [window.min_range_km for window in windows] == sorted(window.min_range_km for window in windows)
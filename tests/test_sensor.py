@@ -0,0 +1,60 @@
+"""Linearisation and noise of the sensor model."""
+
+import numpy as np
+import pytest
+
+from space_based_telescope_image_generator.processings.sensor import SensorModel, apply_sensor, srgb_to_linear
+
+HEIGHT, WIDTH = 64, 80
+GREY = 128
+LINEAR_TOE = 0.0031308  # Linear intensity under which the sRGB curve is linear
+# Noise free optics, the only noise left being the shot noise
+CLEAN = {"read_noise_e": 0.0, "dark_current_e_s": 0.0, "psf_sigma_px": 0.0, "vignetting": 0.0}
+
+
+def _srgb_encode(linear: np.ndarray) -> np.ndarray:
+    """Apply the sRGB transfer curve."""
+    return np.where(linear <= LINEAR_TOE, 12.92 * linear, 1.055 * linear ** (1 / 2.4) - 0.055)
+
+
+def test_srgb_is_inverted() -> None:
+    """Linearisation inverts the sRGB encoding on both sides of the linear toe, keeping the float type."""
+    linear = np.linspace(0.0, 1.0, 1001, dtype=np.float32)
+    decoded = srgb_to_linear(_srgb_encode(linear).astype(np.float32))
+    assert decoded.dtype == np.float32
+    np.testing.assert_allclose(decoded, linear, atol=1e-6)
+    # Mid-grey of an 8 bits image is a fifth of the full intensity
+    assert srgb_to_linear(np.array([GREY / 255])) == pytest.approx(0.2158605, rel=1e-6)
+
+
+@pytest.mark.parametrize("srgb_input", [True, False])
+def test_grey_frame_electrons(srgb_input: bool) -> None:
+    """A uniform frame gives the electrons of its linear intensity, up to the shot noise."""
+    sensor = SensorModel(srgb_input=srgb_input, **CLEAN)
+    frames = np.full((1, HEIGHT, WIDTH), GREY, dtype=np.uint8)
+    intensity = srgb_to_linear(np.array(GREY / 255)) if srgb_input else GREY / 255
+    expected_adu = intensity * sensor.full_well_e / sensor.gain_e_per_adu
+    digital = apply_sensor(sensor, frames, np.zeros(1))
+    assert digital.dtype == np.uint16
+    assert digital.shape == frames.shape
+    shot_noise_adu = np.sqrt(intensity * sensor.full_well_e) / sensor.gain_e_per_adu
+    assert digital.mean() == pytest.approx(expected_adu, abs=5 * shot_noise_adu / np.sqrt(digital.size))
+    assert digital.std() == pytest.approx(shot_noise_adu, rel=0.1)
+
+
+def test_noise_is_seeded_per_frame() -> None:
+    """The noise of a frame only depends on its index, not on the frames processed with it."""
+    # One ADU per 255th of the full well, so that the 8 bits output does not saturate
+    sensor = SensorModel(bit_depth=8, gain_e_per_adu=20000.0 / 255, fov_deg=40.0)
+    frames = np.random.default_rng(0).integers(0, 256, (3, HEIGHT, WIDTH, 3), dtype=np.uint8)
+    stack = apply_sensor(sensor, frames, np.array([4, 5, 6]))
+    assert stack.dtype == np.uint8
+    assert 0 < stack.mean() < np.iinfo(np.uint8).max
+    np.testing.assert_array_equal(apply_sensor(sensor, frames[1:2], np.array([5])), stack[1:2])
+    assert not np.array_equal(apply_sensor(sensor, frames[1:2], np.array([7])), stack[1:2])
+
+
+def test_vignetting_needs_the_field_of_view() -> None:
+    """The cos^4 law cannot be applied without the field of view."""
+    with pytest.raises(ValueError, match="field of view"):
+        apply_sensor(SensorModel(), np.zeros((1, HEIGHT, WIDTH), dtype=np.uint8), np.zeros(1))
@@ -0,0 +1,117 @@
+"""Validation of the SGP4/SDP4 propagator against the published verification vectors.
+
+The reference states are taken from the verification file of Vallado, Crawford, Hujsak & Kelso (AIAA 2006-6753),
+"tcppver.out", for a selection of the "SGP4-VER.TLE" cases covering near earth, drag, 12 h and 24 h resonant,
+highly eccentric and decaying orbits. The states are compared at the precision of the file: 1e-8 km and 1e-9 km/s.
+"""
+
+import numpy as np
+import pytest
+
+from space_based_telescope_image_generator.processings.sgp4 import SGP4Model
+
+# TLE lines and reference states: minutes since epoch, TEME position [km] and velocity [km/s]
+VERIFICATION_CASES = [
+    (
+        "1 00005U 58002B   00179.78495062  .00000023  00000-0  28098-4 0  4753",
+        "2 00005  34.2682 348.7242 1859667 331.7664  19.3264 10.82419157413667",
+        [
+            (0.0, 7022.46529266, -1400.08296755, 0.03995155, 1.893841015, 6.405893759, 4.534807250),
+            (2160.0, 190.19796988, 7746.96653614, 5110.00675412, -6.112325142, 1.527008184, -0.139152358),
+            (4320.0, -9060.47373569, 4658.70952502, 813.68673153, -2.232832783, -4.110453490, -3.157345433),
+        ],
+    ),
+    (
+        "1 06251U 62025E   06176.82412014  .00008885  00000-0  12808-3 0  3985",
+        "2 06251  58.0579  54.0425 0030035 139.1568 221.1854 15.56387291  6774",
+        [
+            (0.0, 3988.31022699, 5498.96657235, 0.90055879, -3.290032738, 2.357652820, 6.496623475),
+            (1440.0, -2777.14682335, -5663.16031708, -2462.54889123, 4.915493146, 0.123328992, -5.896495091),
+            (2880.0, 1159.27802897, 5056.60175495, 4353.49418579, -5.968060341, -2.314790406, 4.230722669),
+        ],
+    ),
+    (
+        "1 08195U 75081A   06176.33215444  .00000099  00000-0  11873-3 0   813",
+        "2 08195  64.1586 279.0717 6877146 264.7651  20.2257  2.00491383225656",
+        [
+            (0.0, 2349.89483350, -14785.93811562, 0.02119378, 2.721488096, -3.256811655, 4.498416672),
+            (1440.0, 2890.80638268, -15446.43952300, 948.77010176, 2.654407490, -2.909344895, 4.486437362),
+            (2880.0, 3417.20931586, -16038.79510665, 1894.74934058, 2.585515864, -2.596818146, 4.456882556),
+        ],
+    ),
+    (
+        "1 11801U          80230.29629788  .01431103  00000-0  14311-1      13",
+        "2 11801  46.7916 230.4354 7318036  47.4722  10.4117  2.28537848    13",
+        [
+            (0.0, 7473.37102491, 428.94748312, 5828.74846783, 5.107155391, 6.444680305, -0.186133297),
+            (720.0, 14271.29083858, 24110.44309009, -4725.76320143, -0.320504528, 2.679841539, -2.084054355),
+            (1440.0, 9787.87836256, 33753.32249667, -15030.79874625, -1.094251553, 0.923589906, -1.522311008),
+        ],
+    ),
+    (
+        "1 23333U 94071A   94305.49999999 -.00172956  26967-3  10000-3 0    15",
+        "2 23333  28.7490   2.3720 9728298  30.4360   1.3500  0.07309491    70",
+        [
+            (0.0, -9301.24542292, 3326.10200382, 2318.36441127, -8.729303005, -0.828225037, -0.122314827),
+            (840.0, -139863.28332207, -49436.45704153, -22836.80438139, -1.663762568, -0.845315913, -0.421548627),
+            (1600.0, -200638.82986236, -82484.14969882, -39488.34331447, -1.186748462, -0.665472422, -0.337037582),
+        ],
+    ),
+    (
+        "1 24208U 96044A   06177.04061740 -.00000094  00000-0  10000-3 0  1600",
+        "2 24208   3.8536  80.0121 0026640 311.0977  48.3000  1.00778054 36119",
+        [
+            (0.0, 7534.10987189, 41266.39266843, -0.10801028, -3.027168008, 0.558848996, 0.207982755),
+            (720.0, -6874.77975542, -41530.38329422, -46.60245459, 3.027415087, -0.494671177, -0.207337260),
+            (1440.0, 5501.08137100, 41590.27784405, 138.32522930, -3.050691874, 0.409203052, 0.207958133),
+        ],
+    ),
+    (
+        "1 28872U 05037B   05333.02012661  .25992681  00000-0  24476-3 0  1534",
+        "2 28872  96.4736 157.9986 0303955 244.0492 110.6523 16.46015938 10708",
+        [
+            (0.0, -6131.82730456, 2446.52815528, -253.64211033, -0.144920228, 0.995100963, 7.658645067),
+            (25.0, 896.73799533, 447.12357305, 6607.22400507, 6.983396282, -2.925846168, -0.872655207),
+            (50.0, 5548.43325922, -2480.16469245, -1979.24314527, -2.763269534, 0.199691915, -7.482796996),
+        ],
+    ),
+]
+
+
+@pytest.mark.parametrize("line1, line2, reference", VERIFICATION_CASES)
+def test_verification_vectors(line1: str, line2: str, reference: list[tuple[float, ...]]) -> None:
+    """Each satellite propagated alone matches the reference states."""
+    reference_states = np.array(reference)
+    r, v, errors = SGP4Model.from_tle([line1, line2]).propagate_tsince(reference_states[:, 0])
+    assert np.all(errors == 0)
+    np.testing.assert_allclose(r[0], reference_states[:, 1:4], rtol=0.0, atol=1e-8)
+    np.testing.assert_allclose(v[0], reference_states[:, 4:7], rtol=0.0, atol=1e-9)
+
+
+def test_vectorised_catalog() -> None:
+    """The satellites propagated together, near earth and deep space mixed, match the reference states."""
+    model = SGP4Model.from_tles([[line1, line2] for line1, line2, _ in VERIFICATION_CASES])
+    tsince = np.array([[reference[-1][0]] for _, _, reference in VERIFICATION_CASES])
+    r, _, errors = model.propagate_tsince(tsince)
+    assert np.all(errors == 0)
+    expected = np.array([reference[-1][1:4] for _, _, reference in VERIFICATION_CASES])
+    np.testing.assert_allclose(r[:, 0], expected, rtol=0.0, atol=1e-8)
+
+    # A subset of the satellites gives the same states
+    subset = np.array([5, 1])
+    r_subset, _, _ = model.propagate_tsince(tsince[subset], satellites=subset)
+    np.testing.assert_array_equal(r_subset, r[subset])
+
+
+def test_decayed_satellite() -> None:
+    """The decay of a satellite is reported by its error code and raised by the single-satellite interface."""
+    line1, line2, _ = VERIFICATION_CASES[-1]
+    model = SGP4Model.from_tle([line1, line2])
+    _, _, errors = model.propagate_tsince(np.array([50.0, 60.0]))
+    np.testing.assert_array_equal(errors[0], [0, 6])
+    with pytest.raises(ValueError, match="decayed"):
+        model.propagate(3600.0, 60.0)
+    # Last reference state, 50 min after epoch
+    duration_s, dt_s = 3000.0, 60.0
+    positions, _ = model.propagate(duration_s, dt_s)
+    assert len(positions) == int(duration_s / dt_s)
@@ -0,0 +1,82 @@
+"""Column-wise parsing of TLE catalogs."""
+
+import math
+import warnings
+
+import numpy as np
+import pytest
+
+from space_based_telescope_image_generator.processings.tle_catalog import TLECatalog
+
+LINE1 = "1 06251U 62025E   06176.82412014  .00008885  00000-0  12808-3 0  3985"
+LINE2 = "2 06251  58.0579  54.0425 0030035 139.1568 221.1854 15.56387291  6774"
+
+
+def _with_checksum(line: str) -> str:
+    """Replace the checksum of a TLE line by the right one."""
+    total = sum(int(char) if char.isdigit() else char == "-" for char in line[:68])
+    return f"{line[:68]}{total % 10}"
+
+
+def _with_satnum(line: str, satnum: str) -> str:
+    """Replace the catalog number of a TLE line, the checksum being updated."""
+    return _with_checksum(f"{line[:2]}{satnum}{line[7:]}")
+
+
+def test_fields_are_decoded_per_column() -> None:
+    """Every field matches the value read from the fixed TLE layout."""
+    catalog = TLECatalog.from_lines([LINE1, LINE2], strict=True)
+    assert len(catalog) == 1
+    assert catalog.satnum[0] == int(LINE1[2:7])
+    # 2006, day 176.82412014, 2006 January 1 0h UT being JD 2453736.5
+    assert catalog.epoch_jd[0] == pytest.approx(2453736.5 + 175.82412014, abs=1e-8)
+    assert catalog.ndot[0] == pytest.approx(0.00008885)
+    assert catalog.nddot[0] == 0.0
+    assert catalog.bstar[0] == pytest.approx(0.12808e-3)
+    assert catalog.inclo[0] == pytest.approx(math.radians(58.0579))
+    assert catalog.nodeo[0] == pytest.approx(math.radians(54.0425))
+    assert catalog.ecco[0] == pytest.approx(0.0030035)
+    assert catalog.argpo[0] == pytest.approx(math.radians(139.1568))
+    assert catalog.mo[0] == pytest.approx(math.radians(221.1854))
+    assert catalog.no_kozai[0] == pytest.approx(15.56387291 * 2 * math.pi / 1440.0)
+
+
+def test_negative_exponential_fields() -> None:
+    """Signed mantissas and exponents of the drag terms are decoded."""
+    line1 = _with_checksum(f"{LINE1[:44]}-12345-5 -11606-4{LINE1[61:]}")
+    catalog = TLECatalog.from_lines([line1, LINE2], strict=True)
+    assert catalog.nddot[0] == pytest.approx(-0.12345e-5)
+    assert catalog.bstar[0] == pytest.approx(-0.11606e-4)
+
+
+def test_wrong_checksums_are_dropped() -> None:
+    """A TLE with a wrong checksum or mismatched lines is dropped with a warning, or raised in strict mode."""
+    corrupted = f"{LINE2[:68]}{(int(LINE2[68]) + 1) % 10}"
+    other = _with_satnum(LINE2, "06252")
+    lines = [LINE1, LINE2, LINE1, corrupted, LINE1, other]
+    with pytest.warns(UserWarning, match="2 TLE with an invalid checksum or layout"):
+        catalog = TLECatalog.from_lines(lines)
+    assert len(catalog) == 1
+    with pytest.raises(ValueError, match="invalid checksum"):
+        TLECatalog.from_lines(lines, strict=True)
+
+
+def test_alpha5_catalog_numbers() -> None:
+    """The Alpha-5 letters skip I and O, and 5 digits numbers are unchanged."""
+    numbers = {"A0001": 100001, "H9999": 179999, "J0000": 180000, "P0000": 230000, "Z9999": 339999, "99999": 99999}
+    lines = []
+    for satnum in numbers:
+        lines += [_with_satnum(LINE1, satnum), _with_satnum(LINE2, satnum)]
+    catalog = TLECatalog.from_lines(lines, strict=True)
+    np.testing.assert_array_equal(catalog.satnum, list(numbers.values()))
+    np.testing.assert_array_equal(catalog.select_norad_ids([180000, 99999]).satnum, [180000, 99999])
+
+
+def test_title_lines() -> None:
+    """3LE titles are kept as names, non-ASCII characters included, and 2LE entries get empty names."""
+    lines = ["0 ÉTOILE-1 DEB", LINE1, LINE2, _with_satnum(LINE1, "06252"), _with_satnum(LINE2, "06252")]
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        catalog = TLECatalog.from_lines(lines)
+    assert list(catalog.names) == ["ÉTOILE-1 DEB", ""]
+    assert list(TLECatalog.from_lines([line.encode() for line in lines]).names) == ["ÉTOILE-1 DEB", ""]